@@ -46,6 +46,26 @@ ON insights(topic, date DESC);
 CREATE INDEX IF NOT EXISTS idx_cards_user_status_date 
 ON cards(user_id, status, date DESC);
 
+-- 커서(키셋) 페이지네이션: (created_at, id) 순서 그대로 인덱스에서 커서 위치부터 읽음
+-- Q&A 목록 (최신순, 전체/토픽별)
+CREATE INDEX IF NOT EXISTS idx_qna_posts_created_id 
+ON qna_posts(created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_qna_posts_topic_created_id 
+ON qna_posts(topic, created_at DESC, id DESC);
+
+-- 포스트별 답변 목록 (오래된 순)
+CREATE INDEX IF NOT EXISTS idx_qna_answers_post_created_id 
+ON qna_answers(post_id, created_at, id);
+
+-- 사용자별 알림 목록 (최신순 페이지 + since_id 따라잡기는 같은 인덱스를 역방향으로)
+CREATE INDEX IF NOT EXISTS idx_alerts_user_created_id 
+ON alerts(user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_alerts_user_unread_created_id 
+ON alerts(user_id, created_at DESC, id DESC) 
+WHERE read = false;
+
 -- ANALYZE로 통계 업데이트 (쿼리 플래너 최적화)
 ANALYZE cards;
 ANALYZE gamification;
@@ -53,6 +73,7 @@ ANALYZE qna_posts;
 ANALYZE qna_answers;
 ANALYZE family_members;
 ANALYZE family_alerts;
+ANALYZE alerts;
 ANALYZE scam_checks;
 ANALYZE med_checks;
 ANALYZE reactions;
@@ -0,0 +1,57 @@
+-- Migration: 003_badge_progress_rpc
+-- Date: 2026-10-17
+-- Purpose: 배지 평가에 필요한 보유 배지 + 활동 집계를 한 번의 RPC로 조회
+--          (카드 완료마다 실행되던 테이블별 순차 쿼리 6개 → 1개)
+
+-- 1. 집계용 인덱스 (사용자별 count/sum이 인덱스만으로 처리되도록)
+CREATE INDEX IF NOT EXISTS idx_qna_posts_author
+ON qna_posts(author_id);
+
+CREATE INDEX IF NOT EXISTS idx_completed_cards_user_quiz
+ON completed_cards(user_id) INCLUDE (quiz_correct);
+
+-- 2. 배지 진행 상황 RPC
+--    p_metrics에 포함된 항목만 집계 (이미 보유한 배지의 집계는 건너뜀)
+--    지원 항목: quiz_correct, scam_checks, med_checks, reactions_received
+CREATE OR REPLACE FUNCTION get_badge_progress(
+    p_user_id TEXT,
+    p_metrics TEXT[] DEFAULT ARRAY['quiz_correct', 'scam_checks', 'med_checks', 'reactions_received']
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'badges', COALESCE(
+            (SELECT g.badges FROM gamification g WHERE g.user_id = p_user_id),
+            '[]'::jsonb
+        ),
+        'quiz_correct', CASE WHEN 'quiz_correct' = ANY(p_metrics) THEN (
+            SELECT COALESCE(SUM(cc.quiz_correct), 0)
+            FROM completed_cards cc
+            WHERE cc.user_id = p_user_id
+        ) END,
+        'scam_checks', CASE WHEN 'scam_checks' = ANY(p_metrics) THEN (
+            SELECT COUNT(*)
+            FROM scam_checks sc
+            WHERE sc.user_id = p_user_id
+        ) END,
+        'med_checks', CASE WHEN 'med_checks' = ANY(p_metrics) THEN (
+            SELECT COUNT(*)
+            FROM med_checks mc
+            WHERE mc.user_id = p_user_id
+        ) END,
+        'reactions_received', CASE WHEN 'reactions_received' = ANY(p_metrics) THEN (
+            SELECT COUNT(*)
+            FROM reactions r
+            JOIN qna_posts p ON p.id = r.target_id
+            WHERE r.target_type = 'qna_post'
+              AND p.author_id = p_user_id
+        ) END
+    );
+$$;
+
+COMMENT ON FUNCTION get_badge_progress(TEXT, TEXT[]) IS '배지 평가용 보유 배지 + 활동 집계 (BFF GamificationService)';
+
+-- 완료
+SELECT 'Migration 003_badge_progress_rpc completed successfully' AS status;
@@ -0,0 +1,172 @@
+-- Migration: 004_user_stats_counters
+-- Date: 2026-10-17
+-- Purpose: 사용자별 활동 누적 카운터 (전체 이력 스캔 제거)
+--          원본 테이블 트리거가 같은 트랜잭션에서 카운터를 증감하고,
+--          rebuild_user_stats_counters()로 원본에서 다시 집계할 수 있음
+
+-- 1. 카운터 테이블
+CREATE TABLE IF NOT EXISTS user_stats_counters (
+  user_id TEXT PRIMARY KEY REFERENCES profiles(id) ON DELETE CASCADE,
+  cards_completed INT NOT NULL DEFAULT 0,
+  quizzes_correct INT NOT NULL DEFAULT 0,
+  med_checks INT NOT NULL DEFAULT 0,
+  scam_checks INT NOT NULL DEFAULT 0,
+  posts INT NOT NULL DEFAULT 0,
+  reactions_received INT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+COMMENT ON TABLE user_stats_counters IS '사용자별 활동 누적 카운터 (트리거로 유지, BFF user_stats 서비스)';
+
+-- 2. 원자적 증감 함수 (행이 없으면 생성)
+CREATE OR REPLACE FUNCTION bump_user_stats_counter(p_user_id TEXT, p_field TEXT, p_delta INT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_user_id IS NULL OR p_delta = 0 THEN
+        RETURN;
+    END IF;
+
+    IF p_field NOT IN ('cards_completed', 'quizzes_correct', 'med_checks', 'scam_checks', 'posts', 'reactions_received') THEN
+        RAISE EXCEPTION 'unknown counter: %', p_field;
+    END IF;
+
+    EXECUTE format(
+        'INSERT INTO user_stats_counters (user_id, %1$I) VALUES ($1, GREATEST($2, 0))
+         ON CONFLICT (user_id) DO UPDATE
+         SET %1$I = GREATEST(user_stats_counters.%1$I + $2, 0), updated_at = NOW()',
+        p_field
+    ) USING p_user_id, p_delta;
+END;
+$$;
+
+-- 3. 원본 테이블 트리거
+CREATE OR REPLACE FUNCTION trg_user_stats_completed_cards()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_user_stats_counter(NEW.user_id, 'cards_completed', 1);
+        PERFORM bump_user_stats_counter(NEW.user_id, 'quizzes_correct', COALESCE(NEW.quiz_correct, 0));
+        RETURN NEW;
+    END IF;
+    PERFORM bump_user_stats_counter(OLD.user_id, 'cards_completed', -1);
+    PERFORM bump_user_stats_counter(OLD.user_id, 'quizzes_correct', -COALESCE(OLD.quiz_correct, 0));
+    RETURN OLD;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION trg_user_stats_simple_count()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+-- TG_ARGV[0]: 카운터 이름, TG_ARGV[1]: 사용자 컬럼
+DECLARE
+    v_user_id TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format('SELECT ($1).%I::text', TG_ARGV[1]) INTO v_user_id USING NEW;
+        PERFORM bump_user_stats_counter(v_user_id, TG_ARGV[0], 1);
+        RETURN NEW;
+    END IF;
+    EXECUTE format('SELECT ($1).%I::text', TG_ARGV[1]) INTO v_user_id USING OLD;
+    PERFORM bump_user_stats_counter(v_user_id, TG_ARGV[0], -1);
+    RETURN OLD;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION trg_user_stats_reactions()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+-- Q&A 게시물에 달린 리액션 → 게시물 작성자의 reactions_received
+DECLARE
+    v_row reactions%ROWTYPE;
+    v_author TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN v_row := NEW; ELSE v_row := OLD; END IF;
+
+    IF v_row.target_type = 'qna_post' THEN
+        SELECT author_id INTO v_author FROM qna_posts WHERE id = v_row.target_id;
+        PERFORM bump_user_stats_counter(v_author, 'reactions_received', CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END);
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN RETURN NEW; END IF;
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS user_stats_completed_cards ON completed_cards;
+CREATE TRIGGER user_stats_completed_cards
+AFTER INSERT OR DELETE ON completed_cards
+FOR EACH ROW EXECUTE FUNCTION trg_user_stats_completed_cards();
+
+DROP TRIGGER IF EXISTS user_stats_med_checks ON med_checks;
+CREATE TRIGGER user_stats_med_checks
+AFTER INSERT OR DELETE ON med_checks
+FOR EACH ROW EXECUTE FUNCTION trg_user_stats_simple_count('med_checks', 'user_id');
+
+DROP TRIGGER IF EXISTS user_stats_scam_checks ON scam_checks;
+CREATE TRIGGER user_stats_scam_checks
+AFTER INSERT OR DELETE ON scam_checks
+FOR EACH ROW EXECUTE FUNCTION trg_user_stats_simple_count('scam_checks', 'user_id');
+
+DROP TRIGGER IF EXISTS user_stats_qna_posts ON qna_posts;
+CREATE TRIGGER user_stats_qna_posts
+AFTER INSERT OR DELETE ON qna_posts
+FOR EACH ROW EXECUTE FUNCTION trg_user_stats_simple_count('posts', 'author_id');
+
+DROP TRIGGER IF EXISTS user_stats_reactions ON reactions;
+CREATE TRIGGER user_stats_reactions
+AFTER INSERT OR DELETE ON reactions
+FOR EACH ROW EXECUTE FUNCTION trg_user_stats_reactions();
+
+-- 4. 재계산 (원본 테이블에서 다시 집계, p_user_id가 NULL이면 전체 사용자)
+CREATE OR REPLACE FUNCTION rebuild_user_stats_counters(p_user_id TEXT DEFAULT NULL)
+RETURNS SETOF user_stats_counters
+LANGUAGE sql
+AS $$
+    INSERT INTO user_stats_counters AS c (
+        user_id, cards_completed, quizzes_correct, med_checks, scam_checks, posts, reactions_received, updated_at
+    )
+    -- 사용자별 인덱스 조회 (단일 사용자 재계산 시 다른 사용자 행을 읽지 않음)
+    SELECT
+        p.id,
+        cc.cards,
+        cc.quizzes,
+        (SELECT COUNT(*) FROM med_checks mc WHERE mc.user_id = p.id),
+        (SELECT COUNT(*) FROM scam_checks sc WHERE sc.user_id = p.id),
+        (SELECT COUNT(*) FROM qna_posts qp WHERE qp.author_id = p.id),
+        (
+            SELECT COUNT(*)
+            FROM reactions r
+            JOIN qna_posts q ON q.id = r.target_id
+            WHERE r.target_type = 'qna_post'
+              AND q.author_id = p.id
+        ),
+        NOW()
+    FROM profiles p
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*) AS cards, COALESCE(SUM(quiz_correct), 0) AS quizzes
+        FROM completed_cards
+        WHERE user_id = p.id
+    ) cc
+    WHERE p_user_id IS NULL OR p.id = p_user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        cards_completed = EXCLUDED.cards_completed,
+        quizzes_correct = EXCLUDED.quizzes_correct,
+        med_checks = EXCLUDED.med_checks,
+        scam_checks = EXCLUDED.scam_checks,
+        posts = EXCLUDED.posts,
+        reactions_received = EXCLUDED.reactions_received,
+        updated_at = NOW()
+    RETURNING *;
+$$;
+
+-- 5. 기존 데이터 초기 집계
+SELECT COUNT(*) FROM rebuild_user_stats_counters();
+
+-- 완료
+SELECT 'Migration 004_user_stats_counters completed successfully' AS status;
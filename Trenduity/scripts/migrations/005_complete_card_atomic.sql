@@ -0,0 +1,90 @@
+-- Migration: 005_complete_card_atomic
+-- Date: 2026-10-17
+-- Purpose: 카드 완료 기록 + 포인트/스트릭 갱신을 한 트랜잭션의 RPC 한 번으로 처리
+--          (중복 확인 → 게임화 조회 → 갱신 → 완료 INSERT 순차 호출 제거,
+--           동시 요청은 completed_cards UNIQUE(user_id, card_id, completed_date)로 하나만 통과)
+
+-- 1. 원자적 카드 완료 RPC
+--    반환: {"already_completed": true} 또는
+--          {"points_added", "old_total", "total_points", "streak_days", "badges"}
+--    스트릭 규칙은 GamificationService._update_streak와 동일
+--    p_card_id는 completed_cards.card_id(UUID)와 같은 타입 (TEXT로 받으면 INSERT에서 타입 오류)
+DROP FUNCTION IF EXISTS complete_card_atomic(TEXT, TEXT, DATE, DATE, INT, INT, INT, INT, INT);
+
+CREATE OR REPLACE FUNCTION complete_card_atomic(
+    p_user_id TEXT,
+    p_card_id UUID,
+    p_completed_date DATE,
+    p_activity_date DATE,
+    p_quiz_correct INT DEFAULT 0,
+    p_quiz_total INT DEFAULT 0,
+    p_base_points INT DEFAULT 5,
+    p_correct_points INT DEFAULT 2,
+    p_streak_bonus INT DEFAULT 3
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_completion_id completed_cards.id%TYPE;
+    v_gamif gamification%ROWTYPE;
+    v_diff INT;
+    v_streak INT;
+    v_points INT;
+BEGIN
+    -- 완료 선점: 같은 날 두 번째 요청은 여기서 걸러짐 (동시 요청은 유니크 인덱스에서 대기)
+    INSERT INTO completed_cards (user_id, card_id, completed_date, quiz_correct, quiz_total)
+    VALUES (p_user_id, p_card_id, p_completed_date, COALESCE(p_quiz_correct, 0), COALESCE(p_quiz_total, 0))
+    ON CONFLICT (user_id, card_id, completed_date) DO NOTHING
+    RETURNING id INTO v_completion_id;
+
+    IF v_completion_id IS NULL THEN
+        RETURN jsonb_build_object('already_completed', true);
+    END IF;
+
+    -- 게임화 행 생성/잠금 (같은 사용자의 다른 카드 완료와 직렬화)
+    INSERT INTO gamification (user_id, total_points, current_streak, longest_streak, badges)
+    VALUES (p_user_id, 0, 0, 0, '[]'::jsonb)
+    ON CONFLICT (user_id) DO NOTHING;
+
+    SELECT * INTO v_gamif FROM gamification WHERE user_id = p_user_id FOR UPDATE;
+
+    v_streak := COALESCE(v_gamif.current_streak, 0);
+    IF v_gamif.last_activity_date IS NULL THEN
+        v_streak := 1;  -- 첫 활동
+    ELSE
+        v_diff := p_activity_date - v_gamif.last_activity_date::date;
+        IF v_diff = 1 THEN
+            v_streak := v_streak + 1;  -- 연속
+        ELSIF v_diff > 1 THEN
+            v_streak := 1;  -- 끊김
+        END IF;  -- 같은 날/과거 날짜: 유지
+    END IF;
+
+    v_points := p_base_points + COALESCE(p_quiz_correct, 0) * p_correct_points;
+    IF v_streak > 0 THEN
+        v_points := v_points + p_streak_bonus;
+    END IF;
+
+    UPDATE gamification SET
+        total_points = COALESCE(v_gamif.total_points, 0) + v_points,
+        current_streak = v_streak,
+        longest_streak = GREATEST(COALESCE(v_gamif.longest_streak, 0), v_streak),
+        last_activity_date = p_activity_date
+    WHERE user_id = p_user_id;
+
+    RETURN jsonb_build_object(
+        'points_added', v_points,
+        'old_total', COALESCE(v_gamif.total_points, 0),
+        'total_points', COALESCE(v_gamif.total_points, 0) + v_points,
+        'streak_days', v_streak,
+        'badges', COALESCE(v_gamif.badges, '[]'::jsonb)
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION complete_card_atomic(TEXT, UUID, DATE, DATE, INT, INT, INT, INT, INT)
+IS '카드 완료 + 포인트/스트릭 갱신 (단일 트랜잭션, BFF GamificationService.record_card_completion)';
+
+-- 완료
+SELECT 'Migration 005_complete_card_atomic completed successfully' AS status;
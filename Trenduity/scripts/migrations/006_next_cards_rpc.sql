@@ -0,0 +1,35 @@
+-- Migration: 006_next_cards_rpc
+-- Date: 2026-10-17
+-- Purpose: 오늘의 카드 조회용 다음 카드 RPC (완료 기록과의 안티 조인)
+--          완료한 card_id 전체를 읽어 NOT IN 목록으로 보내던 2회 왕복 → RPC 1회
+--          (BFF는 결과를 사용자별 Redis 큐에 담아 두고, 큐가 빌 때만 호출)
+
+-- 1. 정렬용 인덱스 (안티 조인은 completed_cards UNIQUE(user_id, card_id, completed_date) 인덱스 사용)
+CREATE INDEX IF NOT EXISTS idx_cards_created_id
+ON cards(created_at, id);
+
+-- 2. 완료하지 않은 카드 조회 (p_user_id가 NULL이면 앞에서부터)
+CREATE OR REPLACE FUNCTION get_next_cards(
+    p_user_id TEXT,
+    p_limit INT DEFAULT 20
+)
+RETURNS SETOF cards
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT c.*
+    FROM cards c
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM completed_cards cc
+        WHERE cc.user_id = p_user_id
+          AND cc.card_id = c.id
+    )
+    ORDER BY c.created_at, c.id
+    LIMIT p_limit;
+$$;
+
+COMMENT ON FUNCTION get_next_cards(TEXT, INT) IS '사용자가 완료하지 않은 다음 카드 (BFF card_queue)';
+
+-- 완료
+SELECT 'Migration 006_next_cards_rpc completed successfully' AS status;
@@ -0,0 +1,84 @@
+-- Migration: 007_last_activity_projection
+-- Date: 2026-10-17
+-- Purpose: 사용자별 마지막 활동 시각 (가족 멤버 목록용)
+--          카드 완료/복약 체크/Q&A 질문·답변 작성 시 트리거가 user_stats_counters.last_activity_at 갱신
+--          멤버 목록은 멤버 수만큼의 기본 키 조회로 끝남 (활동 이력 전체 스캔 제거)
+
+-- 1. 카운터 행에 마지막 활동 시각 추가
+ALTER TABLE user_stats_counters
+ADD COLUMN IF NOT EXISTS last_activity_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN user_stats_counters.last_activity_at IS '마지막 활동 시각 (카드 완료/복약 체크/Q&A 작성, 트리거로 유지)';
+
+-- 2. 마지막 활동 갱신 (행이 없으면 생성, 더 이른 시각으로는 되돌리지 않음)
+CREATE OR REPLACE FUNCTION touch_user_last_activity(p_user_id TEXT, p_at TIMESTAMPTZ)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_user_id IS NULL OR p_at IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO user_stats_counters (user_id, last_activity_at)
+    VALUES (p_user_id, p_at)
+    ON CONFLICT (user_id) DO UPDATE
+    SET last_activity_at = GREATEST(user_stats_counters.last_activity_at, EXCLUDED.last_activity_at);
+END;
+$$;
+
+-- 3. 원본 테이블 트리거
+CREATE OR REPLACE FUNCTION trg_user_last_activity()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+-- TG_ARGV[0]: 사용자 컬럼, TG_ARGV[1]: 시각 컬럼
+DECLARE
+    v_user_id TEXT;
+    v_at TIMESTAMPTZ;
+BEGIN
+    EXECUTE format('SELECT ($1).%I::text, ($1).%I::timestamptz', TG_ARGV[0], TG_ARGV[1])
+    INTO v_user_id, v_at
+    USING NEW;
+    PERFORM touch_user_last_activity(v_user_id, COALESCE(v_at, NOW()));
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS user_last_activity_completed_cards ON completed_cards;
+CREATE TRIGGER user_last_activity_completed_cards
+AFTER INSERT ON completed_cards
+FOR EACH ROW EXECUTE FUNCTION trg_user_last_activity('user_id', 'completed_at');
+
+-- med_checks는 체크 시각을 checked_at에 저장 (created_at 컬럼 없음, create_med_checks_table.sql)
+DROP TRIGGER IF EXISTS user_last_activity_med_checks ON med_checks;
+CREATE TRIGGER user_last_activity_med_checks
+AFTER INSERT ON med_checks
+FOR EACH ROW EXECUTE FUNCTION trg_user_last_activity('user_id', 'checked_at');
+
+DROP TRIGGER IF EXISTS user_last_activity_qna_posts ON qna_posts;
+CREATE TRIGGER user_last_activity_qna_posts
+AFTER INSERT ON qna_posts
+FOR EACH ROW EXECUTE FUNCTION trg_user_last_activity('author_id', 'created_at');
+
+DROP TRIGGER IF EXISTS user_last_activity_qna_answers ON qna_answers;
+CREATE TRIGGER user_last_activity_qna_answers
+AFTER INSERT ON qna_answers
+FOR EACH ROW EXECUTE FUNCTION trg_user_last_activity('author_id', 'created_at');
+
+-- 4. 기존 데이터 초기 집계 (사용자별 인덱스 조회, 상관 서브쿼리 컬럼은 모두 별칭으로 한정)
+INSERT INTO user_stats_counters AS c (user_id, last_activity_at)
+SELECT
+    p.id,
+    GREATEST(
+        (SELECT MAX(cc.completed_at) FROM completed_cards cc WHERE cc.user_id = p.id),
+        (SELECT MAX(mc.checked_at) FROM med_checks mc WHERE mc.user_id = p.id),
+        (SELECT MAX(qp.created_at) FROM qna_posts qp WHERE qp.author_id = p.id),
+        (SELECT MAX(qa.created_at) FROM qna_answers qa WHERE qa.author_id = p.id)
+    )
+FROM profiles p
+ON CONFLICT (user_id) DO UPDATE
+SET last_activity_at = GREATEST(c.last_activity_at, EXCLUDED.last_activity_at);
+
+-- 완료
+SELECT 'Migration 007_last_activity_projection completed successfully' AS status;
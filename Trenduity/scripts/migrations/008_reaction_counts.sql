@@ -0,0 +1,93 @@
+-- Migration: 008_reaction_counts
+-- Date: 2026-10-17
+-- Purpose: 대상별/종류별 리액션 수 (리액션 행 전체를 읽어 세는 집계 제거)
+--          reactions 트리거가 같은 트랜잭션에서 reaction_counts를 증감하고,
+--          get_reaction_stats()가 대상 목록의 종류별 수 + 현재 사용자 리액션 여부를 1회 호출로 반환
+--          (읽는 행 수는 대상 수 × 종류 수 + 사용자 본인 리액션 수, 인기와 무관)
+
+-- 1. 카운터 테이블
+CREATE TABLE IF NOT EXISTS reaction_counts (
+  target_type TEXT NOT NULL,
+  target_id UUID NOT NULL,
+  kind TEXT NOT NULL,
+  count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (target_type, target_id, kind)
+);
+
+COMMENT ON TABLE reaction_counts IS '대상별/종류별 리액션 수 (트리거로 유지, BFF reaction_stats 서비스)';
+
+ALTER TABLE reaction_counts ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Users can view reaction counts" ON reaction_counts;
+CREATE POLICY "Users can view reaction counts"
+  ON reaction_counts FOR SELECT
+  USING (true);
+
+-- 2. 원본 테이블 트리거
+CREATE OR REPLACE FUNCTION trg_reaction_counts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO reaction_counts (target_type, target_id, kind, count)
+        VALUES (NEW.target_type, NEW.target_id, NEW.kind, 1)
+        ON CONFLICT (target_type, target_id, kind) DO UPDATE
+        SET count = reaction_counts.count + 1;
+        RETURN NEW;
+    END IF;
+
+    UPDATE reaction_counts
+    SET count = GREATEST(count - 1, 0)
+    WHERE target_type = OLD.target_type AND target_id = OLD.target_id AND kind = OLD.kind;
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS reaction_counts_reactions ON reactions;
+CREATE TRIGGER reaction_counts_reactions
+AFTER INSERT OR DELETE ON reactions
+FOR EACH ROW EXECUTE FUNCTION trg_reaction_counts();
+
+-- 3. 대상 목록의 리액션 통계 (종류별 수 + 현재 사용자 리액션 여부)
+--    사용자 리액션은 UNIQUE(user_id, target_type, target_id, kind) 인덱스로 조회
+CREATE OR REPLACE FUNCTION get_reaction_stats(
+    p_target_type TEXT,
+    p_target_ids UUID[],
+    p_user_id TEXT DEFAULT NULL
+)
+RETURNS TABLE (target_id UUID, kind TEXT, count INT, user_reacted BOOLEAN)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        COALESCE(c.target_id, r.target_id),
+        COALESCE(c.kind, r.kind),
+        COALESCE(c.count, 0),
+        r.target_id IS NOT NULL
+    FROM (
+        SELECT rc.target_id, rc.kind, rc.count
+        FROM reaction_counts rc
+        WHERE rc.target_type = p_target_type
+          AND rc.target_id = ANY(p_target_ids)
+          AND rc.count > 0
+    ) c
+    FULL JOIN (
+        SELECT re.target_id, re.kind
+        FROM reactions re
+        WHERE p_user_id IS NOT NULL
+          AND re.user_id = p_user_id
+          AND re.target_type = p_target_type
+          AND re.target_id = ANY(p_target_ids)
+    ) r ON r.target_id = c.target_id AND r.kind = c.kind;
+$$;
+
+-- 4. 기존 데이터 초기 집계
+INSERT INTO reaction_counts (target_type, target_id, kind, count)
+SELECT target_type, target_id, kind, COUNT(*)
+FROM reactions
+GROUP BY target_type, target_id, kind
+ON CONFLICT (target_type, target_id, kind) DO UPDATE
+SET count = EXCLUDED.count;
+
+-- 완료
+SELECT 'Migration 008_reaction_counts completed successfully' AS status;
@@ -0,0 +1,54 @@
+-- Migration: 009_award_badges
+-- Date: 2026-10-17
+-- Purpose: 배지 추가를 행 잠금 안에서 처리 (배지 목록을 읽고 통째로 덮어쓰는 경쟁 제거)
+--          같은 사용자의 배지 평가 작업이 동시에 돌아도 배지는 한 번만 추가되고,
+--          실제로 추가된 배지만 반환하므로 배지 알림도 한 번만 전달됨
+
+-- 1. 배지 추가 RPC
+--    반환: 이번 호출로 새로 추가된 배지 JSONB 배열 (이미 보유/게임화 행 없음이면 [])
+CREATE OR REPLACE FUNCTION award_badges(
+    p_user_id TEXT,
+    p_badges TEXT[]
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_held JSONB;
+    v_added JSONB;
+BEGIN
+    -- 동시 호출은 여기서 순서대로 대기 (두 번째 호출은 첫 번째가 추가한 배지를 봄)
+    SELECT COALESCE(g.badges, '[]'::jsonb)
+    INTO v_held
+    FROM gamification g
+    WHERE g.user_id = p_user_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN '[]'::jsonb;
+    END IF;
+
+    SELECT COALESCE(jsonb_agg(t.badge ORDER BY t.ord), '[]'::jsonb)
+    INTO v_added
+    FROM (
+        SELECT b.badge, MIN(b.ord) AS ord
+        FROM unnest(p_badges) WITH ORDINALITY AS b(badge, ord)
+        GROUP BY b.badge
+    ) t
+    WHERE NOT v_held ? t.badge;
+
+    IF jsonb_array_length(v_added) > 0 THEN
+        UPDATE gamification g
+        SET badges = v_held || v_added
+        WHERE g.user_id = p_user_id;
+    END IF;
+
+    RETURN v_added;
+END;
+$$;
+
+COMMENT ON FUNCTION award_badges(TEXT, TEXT[])
+IS '보유하지 않은 배지만 추가하고 추가된 배지 반환 (행 잠금, BFF GamificationService._award_badges)';
+
+-- 완료
+SELECT 'Migration 009_award_badges completed successfully' AS status;
@@ -22,15 +22,25 @@ class Settings(BaseSettings):
     # ⚠️ 필수: SUPABASE_URL과 SUPABASE_SERVICE_ROLE_KEY는 반드시 설정해야 함
     SUPABASE_URL: str
     SUPABASE_SERVICE_ROLE_KEY: str
+    # 동기 Supabase 쿼리를 동시에 실행할 워커 스레드 수 (이벤트 루프 블로킹 방지)
+    SUPABASE_MAX_CONCURRENCY: int = 20
+    # 공유 Supabase 클라이언트 HTTP 연결 풀 (keep-alive 재사용)
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 20
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = 20
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    SUPABASE_HTTP_TIMEOUT: float = 10.0
     
     # ==================== Database 설정 ====================
     # PostgreSQL 직접 연결 (courses API용)
     DATABASE_URL: Optional[str] = None
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_TIMEOUT: float = 5.0  # 풀이 가득 찼을 때 연결 대기 최대 시간(초)
     
     # ==================== Redis 설정 ====================
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: Optional[str] = None
-    REDIS_MAX_CONNECTIONS: int = 10
+    REDIS_MAX_CONNECTIONS: int = 50  # 요청용 공유 풀 크기 (pub/sub·작업 소비자는 전용 연결 사용)
     
     # ==================== CORS 설정 ====================
     CORS_ORIGINS: List[str] = [
@@ -49,17 +59,65 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "dev-secret-change-in-production"
     JWT_EXPIRATION: int = 3600
     SUPABASE_JWT_SECRET: Optional[str] = None  # Supabase JWT 검증용 (선택)
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    # 로컬 검증 실패 시 Supabase Auth 원격 검증 재시도 (SUPABASE_JWT_SECRET 설정 시에만 의미)
+    AUTH_REMOTE_FALLBACK: bool = False
+    AUTH_CLAIMS_CACHE_SIZE: int = 10000
     
     # ==================== 외부 API ====================
     OPENAI_API_KEY: Optional[str] = None
+    GOOGLE_API_KEY: Optional[str] = None  # Gemini (/ai 라우터)
+    GOOGLE_AI_API_KEY: Optional[str] = None  # Gemini (/chat 라우터, 없으면 GOOGLE_API_KEY 사용)
+    ANTHROPIC_API_KEY: Optional[str] = None  # Claude
     OPENAI_MODEL: str = "gpt-4o-mini"
     AZURE_OPENAI_ENDPOINT: Optional[str] = None
     AZURE_OPENAI_KEY: Optional[str] = None
     AZURE_OPENAI_DEPLOYMENT: Optional[str] = None
+    # LLM 제공자 API 기본 URL (로컬 목 서버로 바꿔 테스트/벤치마크 가능)
+    OPENAI_API_BASE: str = "https://api.openai.com"
+    GOOGLE_AI_API_BASE: str = "https://generativelanguage.googleapis.com"
+    ANTHROPIC_API_BASE: str = "https://api.anthropic.com"
+    # LLM 공유 HTTP 클라이언트 (app/core/http_clients.py)
+    LLM_HTTP2: bool = True  # h2 패키지 설치 시 HTTP/2 사용
+    LLM_HTTP_CONNECT_TIMEOUT: float = 5.0
+    LLM_HTTP_READ_TIMEOUT: float = 30.0  # 응답 생성 대기 (스트리밍은 토큰 간 간격)
+    LLM_HTTP_WRITE_TIMEOUT: float = 10.0
+    LLM_HTTP_POOL_TIMEOUT: float = 5.0  # 연결 수 상한 도달 시 빈 연결 대기
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 60.0  # 유휴 연결 유지 시간(초)
+    # LLM 게이트웨이 (app/services/llm_gateway)
+    LLM_PROVIDER_CONCURRENCY: int = 32  # 제공자별 동시 호출 상한
+    LLM_QUEUE_TIMEOUT: float = 2.0  # 동시 호출 슬롯 대기 시간(초), 초과 시 대체 모델로
+    LLM_BREAKER_FAILURES: int = 5  # 연속 실패 N회면 서킷 열림
+    LLM_BREAKER_RESET_SECONDS: float = 30.0  # 열린 뒤 시험 호출까지 대기(초)
+    LLM_HEDGE_ENABLED: bool = False  # p95 지연 초과 시 대체 모델 동시 호출 (비용 증가)
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # 헤징 기준(p95) 계산에 필요한 최소 표본 수
+    LLM_LATENCY_WINDOW: int = 200  # 모델별 지연 분포 표본 수
+    # AI 응답 캐시 (app/services/ai_response_cache.py)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL: int = 86400  # 캐시된 답변 보관 시간(초)
+    AI_CACHE_DISABLED_MODELS: str = ""  # 캐시하지 않을 모델 ID (쉼표로 구분, 예: "expert,genius")
+    AI_CACHE_MAX_PROMPT_CHARS: int = 200  # 이보다 긴 질문은 반복될 일이 적어 캐시하지 않음
+    AI_CACHE_SIMILARITY_ENABLED: bool = False  # 자모 n-gram 유사 질문도 캐시 히트로 처리
+    AI_CACHE_SIMILARITY_THRESHOLD: float = 0.85  # 유사 질문 판정 Dice 유사도 하한 (자모 2-gram)
+    AI_CACHE_INDEX_MAX_ENTRIES: int = 10000  # 워커별 유사 질문 인덱스 최대 질문 수
     
     # ==================== 레이트 리미팅 ====================
+    # 전역 토큰 버킷 (app/middleware/rate_limit.py): 분당 보충량 / 한 번에 몰아 쓸 수 있는 최대 요청 수
+    # 기본 꺼짐: 켤 때는 SUPABASE_JWT_SECRET(사용자별 버킷)과, 프록시 뒤라면 RATE_LIMIT_TRUST_FORWARDED도 설정
+    # (둘 다 없으면 모든 요청이 프록시 IP 버킷 하나를 나눠 씀)
+    RATE_LIMIT_ENABLED: bool = False
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_BURST: int = 10
+    # 경로별 버킷 (쉼표로 구분, "경로 접두사=분당:버스트", 가장 긴 접두사 우선)
+    RATE_LIMIT_ROUTES: str = "/v1/chat=20:5,/v1/ai=20:5,/v1/auth=10:5"
+    # 플랜별 배수 (쉼표로 구분, "플랜=배수", 토큰의 app_metadata.subscription_plan 기준, 없으면 FREE)
+    RATE_LIMIT_PLAN_MULTIPLIERS: str = "FREE=1,BUDGET=1.5,SAFE=2,STRONG=3"
+    # 제한하지 않는 경로 접두사 (쉼표로 구분)
+    RATE_LIMIT_EXEMPT_PATHS: str = "/health,/metrics,/docs,/redoc,/openapi.json"
+    # 프록시 뒤에서 X-Forwarded-For로 클라이언트 IP 판별 (직접 노출 시 False, 위조 가능)
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    # X-Forwarded-For를 덧붙이는 신뢰 프록시 수 (오른쪽에서 이 번째 주소를 사용, 왼쪽 값은 위조 가능)
+    RATE_LIMIT_TRUSTED_HOPS: int = 1
     
     # ==================== 로깅 ====================
     LOG_LEVEL: str = "INFO"
@@ -67,9 +125,52 @@ class Settings(BaseSettings):
     
     # ==================== 성능 ====================
     SLOW_REQUEST_THRESHOLD_MS: int = 200
+    PERFORMANCE_LOG_SAMPLE_RATE: float = 0.01  # 느리지 않은 요청 로그를 남길 비율 (느린 요청/스트림은 항상)
+    METRICS_ENABLED: bool = True  # /metrics (Prometheus 형식 요청 지표) 노출
+    METRICS_TOKEN: Optional[str] = None  # /metrics, /health/http Bearer 토큰 (프로덕션은 없으면 비공개)
     CACHE_TTL_SHORT: int = 60
     CACHE_TTL_MEDIUM: int = 600
     CACHE_TTL_LONG: int = 3600
+    # L1 (프로세스 메모리) 캐시: Redis 앞단의 핫 키 캐시
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_ENTRIES: int = 5000
+    CACHE_L1_MAX_BYTES: int = 32 * 1024 * 1024  # 32MB
+    CACHE_L1_MAX_TTL: int = 30  # 워커 간 불일치 허용 상한(초)
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    CACHE_CLEANUP_INTERVAL: int = 600  # 이전 세대 태그 키 SCAN 정리 주기(초)
+    CACHE_TAG_VERSION_TTL: int = 86400  # 태그 세대 키 TTL(초, 태그 캐시 항목 TTL의 상한)
+    CACHE_LOCK_TIMEOUT: float = 5.0  # 캐시 재계산 분산 락 유지/대기 시간(초)
+    CACHE_EARLY_EXPIRY_BETA: float = 1.0  # 확률적 조기 만료 강도 (0이면 끔)
+    CACHE_CODEC: str = "orjson"  # json | orjson | msgpack (미설치 시 json)
+    CACHE_COMPRESSION_THRESHOLD: int = 2048  # 이 크기(바이트) 이상이면 zlib 압축 (0이면 끔)
+    CACHE_COMPRESSION_LEVEL: int = 1  # zlib 압축 레벨 (1=가장 빠름)
+    USER_STATS_CACHE_TTL: int = 86400  # 사용자 활동 카운터 Redis 해시 TTL(초)
+    USER_STATS_REBUILD_INTERVAL: int = 86400  # 카운터 재계산 주기(초, 0이면 끔)
+    IDEMPOTENCY_TTL: int = 86400  # Idempotency-Key 응답 보관 시간(초)
+    IDEMPOTENCY_LOCK_TIMEOUT: float = 10.0  # 같은 키의 처리 중 요청 대기 상한(초)
+    CARD_QUEUE_SIZE: int = 20  # 사용자별 다음 카드 큐에 미리 담는 카드 수
+    CARD_QUEUE_TTL: int = 86400  # 다음 카드 큐 TTL(초, 자정이 먼저 오면 자정에 만료)
+    # 백그라운드 작업 큐 (배지 평가/알림 등 응답 후 부수 작업)
+    JOBS_BACKEND: str = "auto"  # auto | redis | inprocess | off
+    JOBS_RUN_IN_APP: bool = True  # 앱 프로세스에서도 Redis Stream 작업 처리 (별도 워커만 쓰려면 False)
+    JOBS_CONCURRENCY: int = 4
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BASE_DELAY: float = 2.0  # 재시도 대기(초, 실패마다 2배)
+    JOBS_STREAM: str = "jobs:stream"
+    JOBS_CONSUMER_GROUP: str = "bff-workers"
+    JOBS_STREAM_MAXLEN: int = 100000
+    JOBS_CLAIM_IDLE_MS: int = 60000  # 이 시간 동안 ACK 없는 작업은 다른 워커가 가져감
+    JOBS_BLOCK_MS: int = 1000
+    JOBS_INPROCESS_MAXSIZE: int = 10000
+    JOBS_SHUTDOWN_TIMEOUT: float = 5.0  # 종료 시 남은 프로세스 내 작업 처리 대기(초)
+    # 가족 알림 실시간 푸시 (Redis pub/sub → 워커별 SSE 연결)
+    ALERTS_STREAM_ENABLED: bool = True
+    ALERTS_STREAM_QUEUE_SIZE: int = 50  # 연결별 대기 메시지 상한 (넘으면 resync 이벤트로 대체)
+    ALERTS_STREAM_HEARTBEAT: int = 15  # 유휴 연결 keep-alive 주석 전송 주기(초)
+    ALERTS_UNREAD_TTL: int = 86400  # 사용자별 읽지 않은 알림 수 Redis 카운터 TTL(초)
+    # 보호자 홈 (GET /v1/dashboard/home) Redis 문서
+    GUARDIAN_SNAPSHOT_TTL: int = 86400  # 시니어 스냅샷 해시 TTL(초, 쓰기마다 연장)
+    GUARDIAN_LINKS_TTL: int = 3600  # 보호자 연동 멤버 목록 캐시 TTL(초)
     
     # ==================== 보안 ====================
     ALLOWED_FILE_EXTENSIONS: str = "jpg,jpeg,png,gif,webp,pdf"
@@ -0,0 +1,276 @@
+"""
+데이터 접근 실행 레이어
+
+supabase-py 2.0 클라이언트는 동기 HTTP 호출을 사용하므로 async 라우터에서
+그대로 `.execute()` 하면 이벤트 루프 전체가 응답을 기다리며 멈춥니다.
+이 모듈은 모든 Supabase 쿼리를 제한된 스레드 풀로 넘겨 실행합니다.
+
+PostgreSQL 직접 연결(courses API용)도 여기서 연결 풀로 관리합니다.
+
+사용법:
+    from app.core.db import run_query
+
+    result = await run_query(
+        supabase.table("cards")
+        .select("*")
+        .eq("user_id", user_id)
+    )
+"""
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+import anyio
+import anyio.to_thread
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 동시 실행 스레드 수 제한 (이벤트 루프 안에서 지연 생성)
+_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def get_query_limiter() -> anyio.CapacityLimiter:
+    """
+    Supabase 쿼리 전용 CapacityLimiter 반환
+
+    anyio.CapacityLimiter는 실행 중인 이벤트 루프가 있어야 생성할 수 있으므로
+    첫 호출 시점에 만듭니다.
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(settings.SUPABASE_MAX_CONCURRENCY)
+    return _limiter
+
+
+async def run_sync(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    블로킹 함수를 워커 스레드에서 실행
+
+    Supabase Auth 호출처럼 쿼리 빌더가 아닌 동기 호출에 사용합니다.
+    """
+    return await anyio.to_thread.run_sync(
+        functools.partial(func, *args, **kwargs),
+        limiter=get_query_limiter(),
+    )
+
+
+async def run_query(query: Any) -> Any:
+    """
+    Supabase 쿼리 빌더의 `.execute()`를 워커 스레드에서 실행
+
+    Args:
+        query: `.execute()` 직전까지 구성한 쿼리 빌더
+
+    Returns:
+        `.execute()` 결과 (APIResponse)
+    """
+    return await run_sync(query.execute)
+
+
+# ==================== PostgreSQL 연결 풀 ====================
+
+class PoolTimeout(Exception):
+    """연결 풀에서 제한 시간 내에 연결을 얻지 못함"""
+
+
+class PgConnectionPool:
+    """
+    스레드 안전 PostgreSQL 연결 풀
+
+    - 시작 시 min_size개 연결을 미리 생성
+    - 최대 max_size개까지 필요할 때 생성, 초과 요청은 timeout초까지 대기
+    - 반환 시 진행 중인 트랜잭션은 롤백, 끊어진 연결은 폐기
+    - 크기/대기 지표 제공 (metrics())
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 5.0,
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("연결 풀 크기 설정이 올바르지 않습니다 (1 <= min_size <= max_size)")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+
+        self._idle: Deque[Any] = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # 지표
+        self._acquired_total = 0
+        self._wait_total = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts_total = 0
+
+        for _ in range(min_size):
+            self._idle.append(self._connect())
+            self._size += 1
+
+    def acquire(self) -> Any:
+        """
+        연결 획득 (없으면 생성, 최대 크기면 대기)
+
+        Raises:
+            PoolTimeout: timeout초 안에 연결을 얻지 못한 경우
+        """
+        started = time.perf_counter()
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("연결 풀이 종료되었습니다.")
+                if self._idle:
+                    conn = self._idle.popleft()
+                    break
+                if self._size < self.max_size:
+                    # 슬롯을 먼저 예약하고 락 밖에서 연결 생성
+                    self._size += 1
+                    conn = None
+                    break
+
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self._timeouts_total += 1
+                    raise PoolTimeout(f"{self.timeout}초 안에 DB 연결을 얻지 못했습니다.")
+
+                waited = True
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            self._acquired_total += 1
+            if waited:
+                wait_time = time.perf_counter() - started
+                self._wait_total += 1
+                self._wait_time_total += wait_time
+                self._wait_time_max = max(self._wait_time_max, wait_time)
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        return conn
+
+    def release(self, conn: Any) -> None:
+        """연결 반환 (트랜잭션 롤백, 끊어진 연결은 폐기)"""
+        reusable = not getattr(conn, "closed", False)
+        if reusable:
+            try:
+                conn.rollback()
+            except Exception as e:
+                logger.warning(f"DB 연결 롤백 실패, 연결 폐기: {e}")
+                reusable = False
+
+        with self._cond:
+            if reusable and not self._closed:
+                self._idle.append(conn)
+            else:
+                self._size -= 1
+                self._close_quietly(conn)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """유휴 연결 모두 종료 (사용 중인 연결은 반환 시 종료)"""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._close_quietly(self._idle.popleft())
+                self._size -= 1
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        """연결 풀 크기/대기 지표"""
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "acquired_total": self._acquired_total,
+                "wait_total": self._wait_total,
+                "wait_ms_total": round(self._wait_time_total * 1000, 2),
+                "wait_ms_max": round(self._wait_time_max * 1000, 2),
+                "timeouts_total": self._timeouts_total,
+            }
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+# DB 연결 풀 (앱 시작 시 1회 생성)
+_db_pool: Optional[PgConnectionPool] = None
+
+
+def init_db_pool():
+    """
+    PostgreSQL 연결 풀 초기화
+    앱 시작 시(main.py에서) 호출, DATABASE_URL 미설정 시 건너뜀
+    """
+    global _db_pool
+    if not settings.DATABASE_URL:
+        logger.info("DATABASE_URL이 설정되지 않아 PostgreSQL 연결 풀을 만들지 않습니다.")
+        return
+
+    try:
+        import psycopg2
+        from psycopg2.extras import RealDictCursor
+
+        _db_pool = PgConnectionPool(
+            connect=lambda: psycopg2.connect(settings.DATABASE_URL, cursor_factory=RealDictCursor),
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            timeout=settings.DB_POOL_TIMEOUT,
+        )
+        logger.info(
+            f"PostgreSQL 연결 풀 초기화 성공 "
+            f"(min={settings.DB_POOL_MIN_SIZE}, max={settings.DB_POOL_MAX_SIZE})"
+        )
+    except Exception as e:
+        logger.error(f"PostgreSQL 연결 풀 초기화 실패: {e}")
+        _db_pool = None
+
+
+def close_db_pool():
+    """
+    PostgreSQL 연결 풀 종료
+    앱 종료 시(main.py에서) 호출
+    """
+    global _db_pool
+    if _db_pool is not None:
+        _db_pool.close()
+        _db_pool = None
+        logger.info("PostgreSQL 연결 풀 종료")
+
+
+def get_db_pool() -> Optional[PgConnectionPool]:
+    """초기화된 PostgreSQL 연결 풀 (없으면 None)"""
+    return _db_pool
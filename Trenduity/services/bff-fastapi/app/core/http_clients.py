@@ -0,0 +1,112 @@
+"""
+LLM 제공자별 공유 HTTP 클라이언트
+
+AI 메시지마다 httpx.AsyncClient를 새로 만들면 매번 DNS 조회 + TCP/TLS 핸드셰이크를 하고
+연결을 버립니다. 이 모듈은 제공자(openai/google/anthropic)별 클라이언트를 앱 시작 시 한 번 만들고
+연결을 재사용(keep-alive)합니다.
+
+- 제공자별 연결 수 상한 (PROVIDER_LIMITS)
+- HTTP/2: h2 패키지가 설치돼 있고 LLM_HTTP2=true이면 사용 (한 연결에서 요청 다중화)
+- 타임아웃: 연결/쓰기/풀 대기는 짧게, 읽기는 LLM 생성 시간을 고려해 길게
+- base_url: 설정(OPENAI_API_BASE 등)으로 바꿀 수 있어 로컬 목 서버로 테스트/벤치마크 가능
+
+사용법:
+    client = get_llm_client("openai")
+    response = await client.post("/v1/chat/completions", json=payload, headers=headers)
+"""
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - httpx HTTP/2 지원 여부 확인
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - 선택 의존성
+    HTTP2_AVAILABLE = False
+
+
+PROVIDERS = ("openai", "google", "anthropic")
+
+# 제공자별 연결 수 (max_connections, max_keepalive_connections)
+PROVIDER_LIMITS = {
+    "openai": (100, 20),
+    "google": (100, 20),
+    "anthropic": (50, 10),
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def provider_base_url(provider: str) -> str:
+    """제공자 API 기본 URL (설정으로 변경 가능)"""
+    return {
+        "openai": settings.OPENAI_API_BASE,
+        "google": settings.GOOGLE_AI_API_BASE,
+        "anthropic": settings.ANTHROPIC_API_BASE,
+    }[provider]
+
+
+def create_llm_client(provider: str, base_url: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    제공자용 AsyncClient 생성 (레지스트리에 등록하지 않음, 벤치마크/테스트용으로도 사용)
+    """
+    max_connections, max_keepalive = PROVIDER_LIMITS[provider]
+    return httpx.AsyncClient(
+        base_url=base_url or provider_base_url(provider),
+        http2=settings.LLM_HTTP2 and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.LLM_HTTP_CONNECT_TIMEOUT,
+            read=settings.LLM_HTTP_READ_TIMEOUT,
+            write=settings.LLM_HTTP_WRITE_TIMEOUT,
+            pool=settings.LLM_HTTP_POOL_TIMEOUT,
+        ),
+    )
+
+
+def init_llm_clients() -> None:
+    """
+    제공자별 클라이언트 생성
+    앱 시작 시(main.py lifespan에서) 호출
+    """
+    for provider in PROVIDERS:
+        if provider not in _clients:
+            _clients[provider] = create_llm_client(provider)
+    logger.info(
+        f"LLM HTTP 클라이언트 초기화: {', '.join(PROVIDERS)} "
+        f"(HTTP/2={'on' if settings.LLM_HTTP2 and HTTP2_AVAILABLE else 'off'})"
+    )
+
+
+async def close_llm_clients() -> None:
+    """
+    클라이언트 연결 정리
+    앱 종료 시(main.py lifespan에서) 호출
+    """
+    for provider, client in list(_clients.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.error(f"LLM HTTP 클라이언트 종료 실패: {provider}, {e}")
+    _clients.clear()
+
+
+def get_llm_client(provider: str) -> httpx.AsyncClient:
+    """
+    제공자 공유 클라이언트 반환
+
+    lifespan 밖(테스트, 스크립트)에서 호출되면 첫 호출 시 생성합니다.
+    """
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        client = _clients[provider] = create_llm_client(provider)
+    return client
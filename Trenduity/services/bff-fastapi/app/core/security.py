@@ -0,0 +1,115 @@
+"""
+Supabase JWT 로컬 검증
+
+SUPABASE_JWT_SECRET으로 서명/만료/audience를 직접 검증하여
+요청마다 Supabase Auth(`auth.get_user`)를 호출하는 왕복을 없앱니다.
+
+검증된 클레임은 토큰 해시를 키로 프로세스 메모리(LRU)에 보관하며,
+토큰 만료 시각이 지나면 캐시에서도 사라집니다.
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_JWT_ALGORITHMS = ["HS256"]
+
+
+class ClaimsCache:
+    """
+    검증된 JWT 클레임 LRU 캐시
+
+    - 키: 토큰 SHA-256 해시 (원본 토큰은 메모리에 남기지 않음)
+    - 값: (클레임, 만료 시각)
+    - 최대 max_size개, 초과 시 가장 오래 사용되지 않은 항목 제거
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            # 만료된 토큰은 캐시에서도 제거
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        return claims
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+
+        key = self.key(token)
+        self._entries[key] = (claims, float(claims["exp"]))
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+claims_cache = ClaimsCache(settings.AUTH_CLAIMS_CACHE_SIZE)
+
+
+def is_local_verification_enabled() -> bool:
+    """SUPABASE_JWT_SECRET이 설정되어 로컬 검증이 가능한지 여부"""
+    return bool(settings.SUPABASE_JWT_SECRET)
+
+
+def decode_supabase_token(token: str) -> Dict[str, Any]:
+    """
+    Supabase 액세스 토큰을 로컬에서 검증하고 클레임 반환 (캐시 미사용)
+
+    Raises:
+        jwt.InvalidTokenError: 서명/만료/audience 검증 실패
+    """
+    return jwt.decode(
+        token,
+        settings.SUPABASE_JWT_SECRET,
+        algorithms=SUPABASE_JWT_ALGORITHMS,
+        audience=settings.SUPABASE_JWT_AUDIENCE,
+        options={"require": ["exp", "sub"]},
+    )
+
+
+def verify_supabase_token(token: str) -> Dict[str, Any]:
+    """
+    Supabase 액세스 토큰 검증 (클레임 캐시 사용)
+
+    Returns:
+        claims: {"sub": "user_id", "email": ..., "exp": ..., ...}
+
+    Raises:
+        jwt.InvalidTokenError: 서명/만료/audience 검증 실패
+    """
+    claims = claims_cache.get(token)
+    if claims is not None:
+        return claims
+
+    claims = decode_supabase_token(token)
+    claims_cache.set(token, claims)
+    return claims
@@ -1,9 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
+import hmac
+from typing import Optional
 from app.core.config import settings
-from app.core.deps import init_redis_pool
-from app.middleware.performance import PerformanceMiddleware
+from app.core.deps import init_redis_pool, init_supabase_client, close_supabase_client, create_dedicated_redis, get_redis_client, get_supabase
+from app.core.db import init_db_pool, close_db_pool, get_db_pool
+from app.core.http_clients import init_llm_clients, close_llm_clients
+from app.utils.cache import start_invalidation_listener, stop_invalidation_listener, get_cache_stats, run_cache_cleanup_loop
+from app.services.ai_response_cache import get_response_cache_stats
+from app.services.alert_stream import alert_hub
+from app.services.jobs import init_job_queue
+from app.services.llm_gateway import get_llm_gateway
+from app.services.user_stats import run_counters_rebuild_loop
+from app.middleware.performance import PerformanceMiddleware, http_metrics
+from app.middleware.rate_limit import RateLimitMiddleware
 from app.routers import cards, insights, voice, scam, community, family, alerts, dashboard, med, gamification, usage, chat, expenses, todos, subscriptions, admin, courses, ai
 import logging
 
@@ -19,11 +32,48 @@ async def lifespan(app: FastAPI):
     logger.info("BFF 서버 시작 중...")
     init_redis_pool()  # Redis 연결 풀 초기화
     logger.info("Redis 연결 풀 초기화 완료")
+    # pub/sub 구독은 연결을 계속 점유하므로 요청용 공유 풀이 아닌 전용 연결 사용
+    start_invalidation_listener(create_dedicated_redis())  # 다른 워커의 L1 캐시 무효화 수신
+    cache_cleanup_task = asyncio.create_task(run_cache_cleanup_loop(get_redis_client))  # 이전 세대 캐시 키 정리
+    alert_hub.start(create_dedicated_redis())  # 가족 알림 실시간 푸시 구독 (워커당 전용 Redis 연결 1개)
+    init_supabase_client()  # 공유 Supabase 클라이언트 초기화
+    init_db_pool()  # PostgreSQL 연결 풀 초기화 (DATABASE_URL 설정 시)
+    init_llm_clients()  # LLM 제공자별 공유 HTTP 클라이언트 (keep-alive 연결 재사용)
+    counters_rebuild_task = None
+    if settings.USER_STATS_REBUILD_INTERVAL > 0:
+        # 사용자 활동 카운터 주기적 재계산 (트리거 누락 보정)
+        counters_rebuild_task = asyncio.create_task(run_counters_rebuild_loop(get_supabase, get_redis_client))
+    # 백그라운드 작업 큐 (Redis Stream, 없으면 프로세스 내 큐)
+    # 소비 루프(블로킹 XREADGROUP + 동시 처리 작업의 ACK)는 전용 연결 풀 사용
+    job_queue = init_job_queue(
+        get_supabase,
+        get_redis_client,
+        get_consumer_redis=lambda: create_dedicated_redis(settings.JOBS_CONCURRENCY + 1),
+    )
+    jobs_stop = asyncio.Event()
+    jobs_task = None
+    if job_queue is not None and (job_queue.backend == "inprocess" or settings.JOBS_RUN_IN_APP):
+        jobs_task = asyncio.create_task(job_queue.run(jobs_stop))
     
     yield
     
     # 종료 시
     logger.info("BFF 서버 종료 중...")
+    cache_cleanup_task.cancel()
+    if counters_rebuild_task:
+        counters_rebuild_task.cancel()
+    if jobs_task:
+        # 처리 중인 작업을 마칠 시간을 주고 종료
+        jobs_stop.set()
+        try:
+            await asyncio.wait_for(jobs_task, timeout=settings.JOBS_SHUTDOWN_TIMEOUT + 1)
+        except Exception as e:
+            logger.warning(f"작업 큐 종료 대기 실패: {e!r}")
+    stop_invalidation_listener()
+    alert_hub.stop()
+    close_supabase_client()
+    close_db_pool()
+    await close_llm_clients()
 
 app = FastAPI(
     lifespan=lifespan,
@@ -142,6 +192,9 @@ app = FastAPI(
     ],
 )
 
+# 레이트 리미터 (가장 안쪽 - 429 응답도 시간 측정/CORS 헤더 적용)
+app.add_middleware(RateLimitMiddleware)
+
 # 성능 모니터링 미들웨어 (먼저 등록 - 전체 요청 시간 측정)
 app.add_middleware(PerformanceMiddleware)
 
@@ -205,6 +258,120 @@ async def health_check():
     }
 
 
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """
+    PostgreSQL 연결 풀 상태 (크기/대기 지표)
+    """
+    pool = get_db_pool()
+    if pool is None:
+        return {
+            "ok": False,
+            "error": {
+                "code": "DB_POOL_NOT_INITIALIZED",
+                "message": "PostgreSQL 연결 풀이 초기화되지 않았어요."
+            }
+        }
+    
+    return {
+        "ok": True,
+        "data": pool.metrics()
+    }
+
+
+@app.get("/health/cache")
+async def cache_health():
+    """
+    캐시 계층별(L1 메모리 / L2 Redis) 히트율
+    """
+    return {
+        "ok": True,
+        "data": get_cache_stats()
+    }
+
+
+@app.get("/health/llm")
+async def llm_health():
+    """
+    LLM 제공자/모델별 호출 지표 (지연 p50/p95/p99, 오류, 토큰) + 서킷 브레이커 상태
+    + AI 응답 캐시 히트율/절약 토큰
+    """
+    return {
+        "ok": True,
+        "data": {
+            **get_llm_gateway().stats(),
+            "response_cache": get_response_cache_stats()
+        }
+    }
+
+
+def _metrics_access_error(request: Request) -> Optional[JSONResponse]:
+    """
+    지표 엔드포인트 접근 검사 (허용이면 None)
+    
+    공개 BFF라 라우트별 트래픽/지연이 외부에 드러나지 않도록
+    METRICS_TOKEN이 설정되면 Authorization: Bearer <METRICS_TOKEN>을 요구.
+    토큰이 없으면 개발 환경에서만 열고, 프로덕션에서는 노출하지 않음.
+    """
+    if not settings.METRICS_ENABLED or (not settings.METRICS_TOKEN and settings.ENV == "production"):
+        return JSONResponse(
+            status_code=404,
+            content={
+                "ok": False,
+                "error": {
+                    "code": "METRICS_DISABLED",
+                    "message": "지표 수집이 꺼져 있어요."
+                }
+            }
+        )
+    
+    if not settings.METRICS_TOKEN:
+        return None
+    
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode(), settings.METRICS_TOKEN.encode()):
+        return None
+    
+    return JSONResponse(
+        status_code=401,
+        content={
+            "ok": False,
+            "error": {
+                "code": "METRICS_UNAUTHORIZED",
+                "message": "지표 조회 권한이 없어요."
+            }
+        },
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+@app.get("/health/http")
+async def http_health(request: Request):
+    """
+    라우트별 요청 지표 (지연 p50/p95/p99, 상태 코드, 요청/응답 크기, 느린 요청 수)
+    """
+    error = _metrics_access_error(request)
+    if error is not None:
+        return error
+    
+    return {
+        "ok": True,
+        "data": http_metrics.snapshot()
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Prometheus 형식 요청 지표 (워커별)
+    """
+    error = _metrics_access_error(request)
+    if error is not None:
+        return error
+    
+    return PlainTextResponse(http_metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/test/redis")
 async def test_redis():
     """
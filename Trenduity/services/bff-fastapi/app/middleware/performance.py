@@ -1,54 +1,308 @@
 """
-BFF API 성능 프로파일링 미들웨어
+BFF API 성능 프로파일링 미들웨어 (순수 ASGI)
 
-모든 요청의 응답 시간을 측정하고 로깅합니다.
-느린 쿼리(>200ms)는 WARNING으로 기록합니다.
+모든 요청을 라우트(경로 템플릿)별로 집계하고 /metrics 에 Prometheus 형식으로 내보냅니다.
+- 응답 시간 히스토그램 (고정 버킷, p50/p95/p99는 버킷 보간으로 추정)
+- 처리 중인 요청 수 (in-flight 게이지)
+- 요청/응답 크기, 상태 코드별 요청 수, 느린 요청 수
+- SSE 스트리밍 응답은 첫 토큰까지의 시간(TTFT) 히스토그램을 따로 기록
+
+느린 요청(> SLOW_REQUEST_THRESHOLD_MS)과 스트림은 항상 로그로 남기고,
+나머지 요청 로그는 PERFORMANCE_LOG_SAMPLE_RATE 비율만 남깁니다.
+
+지표는 워커(프로세스)별 메모리에 있으므로 워커가 여럿이면 각 워커 값이 따로 수집됩니다.
 """
-import time
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+import random
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-class PerformanceMiddleware(BaseHTTPMiddleware):
+STREAM_MEDIA_TYPE = "text/event-stream"
+UNMATCHED_ROUTE = "unmatched"  # 라우트가 없는 요청 (404, 라우팅 전 거절 등) - 원본 경로로 라벨이 늘어나지 않도록
+
+# 히스토그램 버킷 상한 (초)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TTFT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0)
+
+
+class Histogram:
+    """버킷별 개수(비누적) + 합계 (관측 1회 = 이진 탐색 1회)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Prometheus le 버킷 값 (누적)"""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def percentile(self, p: float) -> Optional[float]:
+        """버킷 안 선형 보간으로 백분위 추정 (histogram_quantile과 같은 방식)"""
+        if not self.count:
+            return None
+
+        rank = self.count * p / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]  # +Inf 버킷은 마지막 상한으로
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class RouteMetrics:
+    """(메서드, 라우트)별 지표"""
+
+    __slots__ = ("duration", "ttft", "statuses", "request_bytes", "response_bytes", "slow")
+
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.ttft: Optional[Histogram] = None  # 스트림 응답이 있을 때만
+        self.statuses: Dict[int, int] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.slow = 0
+
+
+class HTTPMetrics:
+    """워커별 HTTP 지표 저장소"""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+
+    def route(self, method: str, route: str) -> RouteMetrics:
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        return metrics
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.in_flight = 0
+
+    def snapshot(self) -> dict:
+        """라우트별 요약 (/health/http)"""
+        routes = {}
+        for (method, route), metrics in sorted(self.routes.items(), key=lambda item: (item[0][1], item[0][0])):
+            duration = metrics.duration
+            routes[f"{method} {route}"] = {
+                "count": duration.count,
+                "p50_ms": _ms(duration.percentile(50)),
+                "p95_ms": _ms(duration.percentile(95)),
+                "p99_ms": _ms(duration.percentile(99)),
+                "avg_ms": _ms(duration.sum / duration.count) if duration.count else None,
+                "slow": metrics.slow,
+                "statuses": {str(code): count for code, count in sorted(metrics.statuses.items())},
+                "request_bytes": metrics.request_bytes,
+                "response_bytes": metrics.response_bytes,
+                **({"ttft_p95_ms": _ms(metrics.ttft.percentile(95))} if metrics.ttft else {}),
+            }
+        return {
+            "in_flight": self.in_flight,
+            "slow_threshold_ms": settings.SLOW_REQUEST_THRESHOLD_MS,
+            "routes": routes,
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 (text/plain; version=0.0.4)"""
+        routes = sorted(self.routes.items(), key=lambda item: (item[0][1], item[0][0]))
+        lines = [
+            "# HELP http_requests_in_flight 처리 중인 요청 수",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total 상태 코드별 요청 수",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), metrics in routes:
+            for code, count in sorted(metrics.statuses.items()):
+                lines.append(f"http_requests_total{_labels(method, route, status=str(code))} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds 응답 완료까지 걸린 시간",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), metrics in routes:
+            _render_histogram(lines, "http_request_duration_seconds", metrics.duration, method, route)
+
+        lines += [
+            "# HELP http_stream_ttft_seconds 스트리밍 응답 첫 청크까지 걸린 시간",
+            "# TYPE http_stream_ttft_seconds histogram",
+        ]
+        for (method, route), metrics in routes:
+            if metrics.ttft:
+                _render_histogram(lines, "http_stream_ttft_seconds", metrics.ttft, method, route)
+
+        for name, help_text, attr in (
+            ("http_request_size_bytes_total", "요청 본문 크기 합계 (Content-Length 기준)", "request_bytes"),
+            ("http_response_size_bytes_total", "응답 본문 크기 합계", "response_bytes"),
+            ("http_slow_requests_total", "SLOW_REQUEST_THRESHOLD_MS를 넘은 요청 수", "slow"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, route), metrics in routes:
+                lines.append(f"{name}{_labels(method, route)} {getattr(metrics, attr)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str, **extra: str) -> str:
+    pairs = [("method", method), ("route", route), *extra.items()]
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _render_histogram(lines: List[str], name: str, histogram: Histogram, method: str, route: str) -> None:
+    cumulative = histogram.cumulative()
+    for bound, count in zip(histogram.buckets, cumulative):
+        lines.append(f"{name}_bucket{_labels(method, route, le=f'{bound:g}')} {count}")
+    lines.append(f"{name}_bucket{_labels(method, route, le='+Inf')} {cumulative[-1]}")
+    lines.append(f"{name}_sum{_labels(method, route)} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{_labels(method, route)} {histogram.count}")
+
+
+# 워커별 지표 (미들웨어와 /metrics 가 공유)
+http_metrics = HTTPMetrics()
+
+
+class PerformanceMiddleware:
     """
-    API 응답 시간 측정 미들웨어
+    API 응답 시간/크기/상태 코드 측정 미들웨어
+
+    응답 헤더에 X-Process-Time(응답 시작까지 걸린 시간)을 추가하고,
+    스트림 응답은 request.state.ttft_ms 에도 첫 청크 시간을 기록합니다.
     """
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # 요청 시작 시간
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        metrics: HTTPMetrics = http_metrics,
+        slow_threshold_ms: Optional[float] = None,
+        log_sample_rate: Optional[float] = None,
+    ):
+        self.app = app
+        self.metrics = metrics
+        self.slow_threshold_ms = slow_threshold_ms
+        self.log_sample_rate = log_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.perf_counter()
-        
-        # 요청 처리
-        response = await call_next(request)
-        
-        # 요청 종료 시간
-        end_time = time.perf_counter()
-        process_time = (end_time - start_time) * 1000  # ms로 변환
-        
-        # 응답 헤더에 처리 시간 추가
-        response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
-        
-        # 로깅
-        log_data = {
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": response.status_code,
-            "process_time_ms": round(process_time, 2),
-        }
-        
-        # 느린 요청 경고
-        if process_time > 200:
+        status_code = 500  # 응답 시작 전 예외
+        response_bytes = 0
+        stream = False
+        ttft = None
+        completed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_bytes, stream, ttft, completed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{(time.perf_counter() - start_time) * 1000:.2f}ms")
+                stream = headers.get("content-type", "").startswith(STREAM_MEDIA_TYPE)
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                response_bytes += len(body)
+                if stream and ttft is None and body:
+                    ttft = time.perf_counter() - start_time
+                    scope.setdefault("state", {})["ttft_ms"] = round(ttft * 1000, 2)
+                if not message.get("more_body", False):
+                    completed = True
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.in_flight -= 1
+            self._record(scope, status_code, time.perf_counter() - start_time, response_bytes, stream, ttft, completed)
+
+    def _record(
+        self,
+        scope: Scope,
+        status_code: int,
+        elapsed: float,
+        response_bytes: int,
+        stream: bool,
+        ttft: Optional[float],
+        completed: bool,
+    ) -> None:
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+        method = scope["method"]
+        metrics = self.metrics.route(method, route_path)
+
+        metrics.duration.observe(elapsed)
+        metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+        metrics.response_bytes += response_bytes
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                metrics.request_bytes += int(value) if value.isdigit() else 0
+                break
+
+        process_time = elapsed * 1000
+        path = scope["path"]
+        if stream:
+            if ttft is not None:
+                if metrics.ttft is None:
+                    metrics.ttft = Histogram(TTFT_BUCKETS)
+                metrics.ttft.observe(ttft)
+            ttft_text = f"{ttft * 1000:.2f}ms" if ttft is not None else "-"
+            logger.info(
+                f"🌊 STREAM {method} {path} "
+                f"- TTFT {ttft_text}, total {process_time:.2f}ms"
+                f"{'' if completed else ' (client disconnected)'}"
+            )
+            return
+
+        threshold = self.slow_threshold_ms if self.slow_threshold_ms is not None else settings.SLOW_REQUEST_THRESHOLD_MS
+        if process_time > threshold:
+            metrics.slow += 1
             logger.warning(
-                f"⚠️ SLOW REQUEST: {log_data['method']} {log_data['path']} "
-                f"took {log_data['process_time_ms']}ms (status: {log_data['status_code']})"
+                f"⚠️ SLOW REQUEST: {method} {path} "
+                f"took {process_time:.2f}ms (status: {status_code})"
             )
-        else:
+            return
+
+        sample_rate = self.log_sample_rate if self.log_sample_rate is not None else settings.PERFORMANCE_LOG_SAMPLE_RATE
+        if sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate):
             logger.info(
-                f"✅ {log_data['method']} {log_data['path']} "
-                f"- {log_data['process_time_ms']}ms (status: {log_data['status_code']})"
+                f"✅ {method} {path} "
+                f"- {process_time:.2f}ms (status: {status_code})"
             )
-        
-        return response
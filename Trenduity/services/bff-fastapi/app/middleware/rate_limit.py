@@ -0,0 +1,318 @@
+"""
+전역 레이트 리미터 미들웨어 (토큰 버킷)
+
+사용자(검증된 JWT의 sub) 또는 클라이언트 IP별로 토큰 버킷을 두고
+요청마다 토큰 1개를 씁니다.
+- 보충 속도: 분당 per_minute개, 버킷 크기: burst개 (RATE_LIMIT_PER_MINUTE / RATE_LIMIT_BURST)
+- 경로별 버킷: RATE_LIMIT_ROUTES ("/v1/chat=20:5", 가장 긴 접두사 하나만 적용)
+- 플랜별 배수: RATE_LIMIT_PLAN_MULTIPLIERS (토큰 app_metadata.subscription_plan)
+- 초과 시 429 + Retry-After, 봉투 에러 형식 (RATE_LIMIT_EXCEEDED)
+
+버킷은 Redis 해시 하나(ratelimit:bucket:{경로}:{식별자})를 Lua 스크립트 1회로 갱신해
+워커 간에 공유합니다 (요청당 Redis 왕복 1회, 시계는 Redis TIME).
+Redis가 없거나 실패하면 REDIS_RETRY_SECONDS 동안 워커별 메모리 버킷으로 제한합니다
+(워커 수만큼 느슨해지지만 차단은 유지).
+
+JWT는 SUPABASE_JWT_SECRET 로컬 검증(클레임 캐시 공유)으로만 확인하며,
+검증할 수 없는 토큰은 IP로 제한합니다 (임의 토큰으로 버킷을 늘릴 수 없음).
+
+X-Forwarded-For는 프록시가 오른쪽에 덧붙이므로 왼쪽 값은 클라이언트가 마음대로 보낼 수 있습니다.
+클라이언트 IP는 오른쪽에서 RATE_LIMIT_TRUSTED_HOPS번째 주소(신뢰하는 프록시가 기록한 값)를 씁니다.
+
+기본 꺼짐 (RATE_LIMIT_ENABLED). 프록시 뒤에서 SUPABASE_JWT_SECRET도 RATE_LIMIT_TRUST_FORWARDED도 없으면
+모든 요청이 프록시 IP 버킷 하나로 모이므로, 켤 때 두 설정을 함께 넣습니다 (render.yaml).
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import jwt
+from redis import Redis
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.deps import get_pooled_redis
+from app.core.security import is_local_verification_enabled, verify_supabase_token
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit:bucket:"
+DEFAULT_ROUTE = "default"
+DEFAULT_PLAN = "FREE"
+REDIS_RETRY_SECONDS = 5.0  # Redis 실패 후 로컬 버킷만 쓰는 시간
+LOCAL_MAX_BUCKETS = 10000  # 워커별 메모리 버킷 최대 수 (LRU)
+
+# KEYS[1]: 버킷 해시 (tokens, ts)
+# ARGV[1]: 초당 보충량, ARGV[2]: 버킷 크기
+# 반환: {허용 여부(1/0), 남은 토큰(내림), 다음 토큰까지 대기(ms)}
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call("TIME")
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+
+local allowed = 0
+local wait_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return {allowed, math.floor(tokens), wait_ms}
+"""
+
+
+class Limit(NamedTuple):
+    """버킷 설정"""
+    per_minute: float
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        """초당 보충량"""
+        return self.per_minute / 60
+
+    def scaled(self, multiplier: float) -> "Limit":
+        if multiplier == 1:
+            return self
+        return Limit(self.per_minute * multiplier, max(1, round(self.burst * multiplier)))
+
+
+class Decision(NamedTuple):
+    """버킷에서 토큰을 꺼낸 결과"""
+    allowed: bool
+    remaining: int
+    retry_after: float  # 초 (허용이면 0)
+
+
+def parse_route_limits(text: str) -> List[Tuple[str, Limit]]:
+    """
+    "/v1/chat=20:5,/v1/ai=20:5" → [(경로 접두사, Limit), ...] (긴 접두사 먼저)
+
+    잘못된 항목은 경고 후 무시합니다.
+    """
+    routes = []
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        try:
+            prefix, spec = item.split("=", 1)
+            per_minute, burst = spec.split(":", 1)
+            routes.append((prefix.strip(), Limit(float(per_minute), max(1, int(burst)))))
+        except ValueError:
+            logger.warning(f"RATE_LIMIT_ROUTES 항목 무시: {item!r}")
+    return sorted(routes, key=lambda route: len(route[0]), reverse=True)
+
+
+def parse_plan_multipliers(text: str) -> Dict[str, float]:
+    """"FREE=1,STRONG=3" → {"FREE": 1.0, "STRONG": 3.0}"""
+    multipliers = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        try:
+            plan, value = item.split("=", 1)
+            multipliers[plan.strip().upper()] = float(value)
+        except ValueError:
+            logger.warning(f"RATE_LIMIT_PLAN_MULTIPLIERS 항목 무시: {item!r}")
+    return multipliers
+
+
+class LocalBuckets:
+    """
+    워커별 메모리 토큰 버킷 (Redis 장애 시 대체)
+
+    - 값: (남은 토큰, 마지막 갱신 시각)
+    - 최대 max_size개, 초과 시 가장 오래 사용되지 않은 버킷 제거
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, limit: Limit, now: Optional[float] = None) -> Decision:
+        if now is None:
+            now = time.monotonic()
+
+        entry = self._buckets.get(key)
+        if entry is None:
+            tokens = float(limit.burst)
+        else:
+            tokens = min(limit.burst, entry[0] + max(0.0, now - entry[1]) * limit.rate)
+
+        if tokens >= 1:
+            tokens -= 1
+            decision = Decision(True, int(tokens), 0.0)
+        else:
+            decision = Decision(False, 0, (1 - tokens) / limit.rate)
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_size:
+            self._buckets.popitem(last=False)
+        return decision
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# 워커별 대체 버킷 (미들웨어 인스턴스가 공유)
+local_buckets = LocalBuckets(LOCAL_MAX_BUCKETS)
+
+
+class RateLimitMiddleware:
+    """
+    토큰 버킷 레이트 리미터 (순수 ASGI, 본문/응답은 건드리지 않음)
+
+    인자를 생략하면 settings 값을 사용합니다.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        redis_getter: Callable[[], Optional[Redis]] = get_pooled_redis,
+        per_minute: Optional[float] = None,
+        burst: Optional[int] = None,
+        routes: Optional[str] = None,
+        plan_multipliers: Optional[str] = None,
+        exempt_paths: Optional[str] = None,
+        trust_forwarded: Optional[bool] = None,
+        trusted_hops: Optional[int] = None,
+        buckets: LocalBuckets = local_buckets,
+    ):
+        self.app = app
+        self.redis_getter = redis_getter
+        self.default_limit = Limit(
+            float(per_minute if per_minute is not None else settings.RATE_LIMIT_PER_MINUTE),
+            max(1, burst if burst is not None else settings.RATE_LIMIT_BURST),
+        )
+        self.routes = parse_route_limits(settings.RATE_LIMIT_ROUTES if routes is None else routes)
+        self.plan_multipliers = parse_plan_multipliers(
+            settings.RATE_LIMIT_PLAN_MULTIPLIERS if plan_multipliers is None else plan_multipliers
+        )
+        exempt = settings.RATE_LIMIT_EXEMPT_PATHS if exempt_paths is None else exempt_paths
+        self.exempt_paths = tuple(path.strip() for path in exempt.split(",") if path.strip())
+        self.trust_forwarded = settings.RATE_LIMIT_TRUST_FORWARDED if trust_forwarded is None else trust_forwarded
+        self.trusted_hops = max(1, settings.RATE_LIMIT_TRUSTED_HOPS if trusted_hops is None else trusted_hops)
+        self.buckets = buckets
+        self._redis_retry_at = 0.0
+
+        if settings.RATE_LIMIT_ENABLED and not self.trust_forwarded and not is_local_verification_enabled():
+            logger.warning(
+                "⚠️ 레이트 리미터가 연결 IP로만 사용자를 구분합니다. 프록시 뒤라면 모든 사용자가 버킷 하나를 공유하니 "
+                "SUPABASE_JWT_SECRET 또는 RATE_LIMIT_TRUST_FORWARDED를 설정하세요."
+            )
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        # CORS 사전 요청과 헬스 체크/문서는 제한하지 않음
+        if scope["method"] == "OPTIONS" or path.startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        route, limit = self._route_limit(path)
+        identity, plan = self._identify(scope)
+        limit = limit.scaled(self.plan_multipliers.get(plan, 1.0))
+
+        decision = self._take(f"{RATE_LIMIT_KEY_PREFIX}{route}:{identity}", limit)
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        logger.info(f"🚦 RATE LIMITED: {scope['method']} {path} ({identity}, {route}, retry {decision.retry_after:.1f}s)")
+        response = self._reject(decision, limit)
+        await response(scope, receive, send)
+
+    def _route_limit(self, path: str) -> Tuple[str, Limit]:
+        """가장 긴 접두사가 맞는 경로별 버킷, 없으면 전역 버킷"""
+        for prefix, limit in self.routes:
+            if path.startswith(prefix):
+                return prefix, limit
+        return DEFAULT_ROUTE, self.default_limit
+
+    def _identify(self, scope: Scope) -> Tuple[str, str]:
+        """(버킷 식별자, 플랜) - 검증된 토큰이면 사용자, 아니면 IP"""
+        token = None
+        forwarded: List[str] = []
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                if value[:7].lower() == b"bearer ":
+                    token = value[7:].decode("latin-1").strip()
+            elif name == b"x-forwarded-for" and self.trust_forwarded:
+                # 여러 헤더로 나뉘어 와도 순서대로 이어 붙인 하나의 목록으로 취급
+                forwarded.extend(value.decode("latin-1").split(","))
+
+        if token and is_local_verification_enabled():
+            try:
+                claims = verify_supabase_token(token)
+                plan = (claims.get("app_metadata") or {}).get("subscription_plan") or DEFAULT_PLAN
+                return f"user:{claims['sub']}", str(plan).upper()
+            except jwt.InvalidTokenError:
+                pass
+
+        client = scope.get("client")
+        ip = self._forwarded_client(forwarded) or (client[0] if client else "unknown")
+        return f"ip:{ip}", DEFAULT_PLAN
+    
+    def _forwarded_client(self, forwarded: List[str]) -> Optional[str]:
+        """
+        X-Forwarded-For에서 신뢰하는 프록시가 기록한 클라이언트 IP
+        
+        오른쪽에서 trusted_hops번째 주소 (그보다 왼쪽은 클라이언트가 위조할 수 있음).
+        주소가 모자라면 None (연결 IP 사용).
+        """
+        entries = [entry.strip() for entry in forwarded if entry.strip()]
+        if len(entries) < self.trusted_hops:
+            return None
+        return entries[-self.trusted_hops]
+
+    def _take(self, key: str, limit: Limit) -> Decision:
+        """Redis 버킷에서 토큰 1개 (실패 시 잠시 로컬 버킷)"""
+        now = time.monotonic()
+        if now >= self._redis_retry_at:
+            redis = self.redis_getter()
+            if redis is not None:
+                try:
+                    allowed, remaining, wait_ms = redis.eval(TOKEN_BUCKET_SCRIPT, 1, key, limit.rate, limit.burst)
+                    return Decision(bool(int(allowed)), int(remaining), int(wait_ms) / 1000)
+                except Exception as e:
+                    logger.warning(f"Rate limit Redis 실패, {REDIS_RETRY_SECONDS:.0f}초간 로컬 버킷 사용: {e}")
+                    self._redis_retry_at = now + REDIS_RETRY_SECONDS
+        return self.buckets.take(key, limit, now)
+
+    @staticmethod
+    def _reject(decision: Decision, limit: Limit) -> JSONResponse:
+        retry_after = max(1, int(decision.retry_after + 0.999))
+        return JSONResponse(
+            status_code=429,
+            content={
+                "ok": False,
+                "error": {
+                    "code": "RATE_LIMIT_EXCEEDED",
+                    "message": f"요청이 너무 많아요. {retry_after}초 후 다시 시도해 주세요.",
+                },
+            },
+            headers={
+                "Retry-After": str(retry_after),
+                "X-RateLimit-Limit": f"{limit.per_minute:g}",
+                "X-RateLimit-Remaining": str(decision.remaining),
+            },
+        )
@@ -2,28 +2,33 @@
 AI 라우터
 
 AI 채팅, 상담, 4가지 비서 모델(GPT-5/Gemini) 연동
+스트리밍 응답 (Server-Sent Events, /chat/stream)
+모델 장애 시 대체 모델로 자동 전환 (LLM 게이트웨이)
+반복 질문은 응답 캐시에서 반환
 """
 from fastapi import APIRouter, Depends, HTTPException, Request
-from typing import List, Dict, Optional, Literal
+from typing import AsyncIterator, List, Dict, Optional, Literal, Sequence, Tuple
 from pydantic import BaseModel, Field
+from redis import Redis
+import asyncio
 import logging
-import httpx
-import os
 from datetime import datetime
 
-from app.core.deps import get_current_user_optional
+from app.core.deps import get_current_user_optional, get_redis_client
+from app.services.ai_response_cache import CachedAnswer, lookup_response, response_scope, store_response
+from app.services.llm_gateway import (
+    ASSISTANT_MODELS,
+    LLMGateway,
+    LLMGatewayError,
+    NoProviderConfigured,
+    get_llm_gateway,
+    model_targets,
+)
+from app.utils.sse import sse_event, sse_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# 환경 변수에서 API 키 로드
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
-
-# API 엔드포인트
-OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
-GOOGLE_API_URL = "https://generativelanguage.googleapis.com/v1beta/models"
-
 
 class ConversationMessage(BaseModel):
     """대화 메시지"""
@@ -53,205 +58,46 @@ class AIResponse(BaseModel):
     response: str
     model_used: str
     tokens_used: Optional[int] = None
+    cached: bool = False
 
 
-# AI 모델별 설정
-AI_MODEL_CONFIG = {
-    "allround": {
-        "name": "만능 비서",
-        "provider": "openai",
-        "model": "gpt-5-nano",  # GPT-5 Nano (최신 OpenAI 모델)
-        "system_prompt": "당신은 시니어를 위한 만능 AI 도우미입니다. 디지털 기기 사용법, 앱 활용, 일상 생활의 모든 궁금증에 친절하고 자세하게 답변해주세요. 어르신이 이해하기 쉽게 단계별로 설명하고, 이모지를 적절히 사용해 친근하게 소통하세요.",
-    },
-    "quick": {
-        "name": "빠른 비서",
-        "provider": "google",
-        "model": "gemini-2.0-flash-lite",  # Gemini 2.0 Flash Lite (최신 빠른 모델)
-        "system_prompt": "당신은 빠르고 간결한 답변을 제공하는 AI 도우미입니다. 사용자의 질문에 핵심만 짧고 명확하게 답변하세요. 불필요한 설명은 생략하고, 꼭 필요한 정보만 전달하세요.",
-    },
-    "writer": {
-        "name": "글쓰기 비서",
-        "provider": "google",
-        "model": "gemini-2.5-flash",  # Gemini 2.5 Flash (최신 균형 모델)
-        "system_prompt": "당신은 시니어를 위한 친절한 글쓰기 도우미입니다. 사용자가 편지, 문자, 이메일, 축하 메시지 등을 작성할 때 쉽고 정중한 표현으로 도와주세요. 어려운 표현은 피하고, 따뜻하고 정감 있는 한국어를 사용하세요.",
-    },
-    "expert": {
-        "name": "척척박사 비서",
-        "provider": "openai",
-        "model": "gpt-5-mini",  # GPT-5 Mini (최신 OpenAI 경량 모델)
-        "system_prompt": "당신은 시니어를 위한 박식한 정보 도우미입니다. 건강, 생활 상식, 역사, 문화 등 다양한 분야의 질문에 쉽고 정확하게 답변해주세요. 전문 용어는 쉽게 풀어서 설명하고, 필요하면 예시를 들어주세요.",
-    },
-}
+# AI 모델별 설정 (기본 모델 + 장애 시 대체 모델): app/services/llm_gateway/models.py
+AI_MODEL_CONFIG = ASSISTANT_MODELS
 
 
-async def call_openai_api(
-    messages: List[Dict[str, str]],
-    model: str = "gpt-5-nano",
-    max_tokens: int = 500,
-    temperature: float = 0.7,
-) -> Dict:
-    """OpenAI API 호출"""
-    if not OPENAI_API_KEY:
-        logger.error("OPENAI_API_KEY not configured")
-        raise HTTPException(
+def _gateway_error(e: LLMGatewayError) -> HTTPException:
+    """게이트웨이 오류 → 에러 응답"""
+    if isinstance(e, NoProviderConfigured):
+        logger.error("AI API key not configured")
+        return HTTPException(
             status_code=500,
             detail={
                 "ok": False,
                 "error": {
                     "code": "API_KEY_MISSING",
-                    "message": "OpenAI API 키가 설정되지 않았어요. 관리자에게 문의해주세요.",
-                },
-            },
-        )
-
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    # GPT-5 모델은 max_completion_tokens 사용, 이전 모델은 max_tokens 사용
-    payload = {
-        "model": model,
-        "messages": messages,
-        "temperature": temperature,
-    }
-    
-    if model.startswith("gpt-5"):
-        payload["max_completion_tokens"] = max_tokens
-    else:
-        payload["max_tokens"] = max_tokens
-
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(OPENAI_API_URL, json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                "response": data["choices"][0]["message"]["content"],
-                "tokens_used": data.get("usage", {}).get("total_tokens", 0),
-            }
-    except httpx.HTTPStatusError as e:
-        logger.error(f"OpenAI API error: {e.response.text}")
-        raise HTTPException(
-            status_code=502,
-            detail={
-                "ok": False,
-                "error": {
-                    "code": "OPENAI_API_ERROR",
-                    "message": "AI 응답을 생성할 수 없어요. 잠시 후 다시 시도해주세요.",
+                    "message": "AI API 키가 설정되지 않았어요. 관리자에게 문의해주세요.",
                 },
             },
         )
-    except Exception as e:
-        logger.error(f"OpenAI API call failed: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "ok": False,
-                "error": {
-                    "code": "AI_REQUEST_FAILED",
-                    "message": "AI와 통신 중 오류가 발생했어요.",
-                },
+    logger.error(f"AI API call failed: {e}")
+    return HTTPException(
+        status_code=502,
+        detail={
+            "ok": False,
+            "error": {
+                "code": "AI_REQUEST_FAILED",
+                "message": "AI 응답을 생성할 수 없어요. 잠시 후 다시 시도해주세요.",
             },
-        )
-
-
-async def call_google_gemini_api(
-    messages: List[Dict[str, str]],
-    model: str = "gemini-2.0-flash-lite",
-    max_tokens: int = 500,
-    temperature: float = 0.7,
-) -> Dict:
-    """Google Gemini API 호출"""
-    if not GOOGLE_API_KEY:
-        logger.error("GOOGLE_API_KEY not configured")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "ok": False,
-                "error": {
-                    "code": "API_KEY_MISSING",
-                    "message": "Google API 키가 설정되지 않았어요. 관리자에게 문의해주세요.",
-                },
-            },
-        )
-
-    # Gemini API는 메시지 형식이 다름
-    # system 메시지는 contents의 첫 부분에 포함
-    contents = []
-    system_instruction = None
-    
-    for msg in messages:
-        if msg["role"] == "system":
-            system_instruction = msg["content"]
-        else:
-            contents.append({
-                "role": "user" if msg["role"] == "user" else "model",
-                "parts": [{"text": msg["content"]}],
-            })
-
-    payload = {
-        "contents": contents,
-        "generationConfig": {
-            "temperature": temperature,
-            "maxOutputTokens": max_tokens,
         },
-    }
-    
-    if system_instruction:
-        payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
-
-    url = f"{GOOGLE_API_URL}/{model}:generateContent?key={GOOGLE_API_KEY}"
-
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Gemini 응답 파싱
-            if "candidates" in data and len(data["candidates"]) > 0:
-                content = data["candidates"][0]["content"]["parts"][0]["text"]
-                tokens_used = data.get("usageMetadata", {}).get("totalTokenCount", 0)
-                
-                return {
-                    "response": content,
-                    "tokens_used": tokens_used,
-                }
-            else:
-                raise Exception("No response from Gemini")
-                
-    except httpx.HTTPStatusError as e:
-        logger.error(f"Gemini API error: {e.response.text}")
-        raise HTTPException(
-            status_code=502,
-            detail={
-                "ok": False,
-                "error": {
-                    "code": "GEMINI_API_ERROR",
-                    "message": "AI 응답을 생성할 수 없어요. 잠시 후 다시 시도해주세요.",
-                },
-            },
-        )
-    except Exception as e:
-        logger.error(f"Gemini API call failed: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "ok": False,
-                "error": {
-                    "code": "AI_REQUEST_FAILED",
-                    "message": "AI와 통신 중 오류가 발생했어요.",
-                },
-            },
-        )
+    )
 
 
 @router.post("/consult")
 async def ai_consult(
     request: AIConsultRequest,
     current_user: Optional[str] = Depends(get_current_user_optional),
+    redis: Optional[Redis] = Depends(get_redis_client),
+    gateway: LLMGateway = Depends(get_llm_gateway),
 ):
     """
     AI 맞춤 상담
@@ -279,42 +125,49 @@ async def ai_consult(
     # 사용자 메시지 추가
     messages.append({"role": "user", "content": request.message})
     
-    # OpenAI API 호출 (만능 비서 모델)
-    result = await call_openai_api(
-        messages=messages,
-        model="gpt-5-nano",
-        max_tokens=700,
-        temperature=0.8,
+    # 응답 캐시 (같은 질문이면 LLM 호출 없이 반환)
+    system_prompt = messages[0]["content"]
+    cache_scope = response_scope("consult", "allround", AI_MODEL_CONFIG["allround"]["model"])
+    cached = lookup_response(redis, cache_scope, system_prompt, request.message, request.conversation_history)
+    if cached:
+        return {
+            "ok": True,
+            "data": AIResponse(
+                response=cached.text,
+                model_used=f"{cached.model} (만능 비서)",
+                cached=True,
+            ).model_dump(),
+        }
+    
+    # 만능 비서 모델 호출 (장애 시 대체 모델)
+    try:
+        result = await gateway.complete(
+            model_targets(AI_MODEL_CONFIG["allround"]),
+            messages,
+            max_tokens=700,
+            temperature=0.8,
+        )
+    except LLMGatewayError as e:
+        raise _gateway_error(e)
+    
+    store_response(
+        redis, cache_scope, system_prompt, request.message, request.conversation_history,
+        result.text, result.model, result.tokens,
     )
     
     return {
         "ok": True,
         "data": AIResponse(
-            response=result["response"],
-            model_used="gpt-4o (만능 비서)",
-            tokens_used=result.get("tokens_used"),
+            response=result.text,
+            model_used=f"{result.model} (만능 비서)",
+            tokens_used=result.tokens,
         ).model_dump(),
     }
 
 
-@router.post("/chat")
-async def ai_chat(
-    request: AIChatRequest,
-    current_user: Optional[str] = Depends(get_current_user_optional),
-):
-    """
-    AI 채팅 (4가지 비서 모델)
-    
-    사용자가 선택한 AI 비서 모델과 채팅합니다.
-    - allround: GPT-4o (만능 비서)
-    - quick: Gemini 1.5 Flash (빠른 비서)
-    - writer: Gemini 1.5 Pro (글쓰기 비서)
-    - expert: GPT-4o Mini (척척박사 비서)
-    인증 없이도 사용 가능합니다.
-    """
-    user_id = current_user if current_user else "anonymous"
+def _prepare_ai_chat(request: AIChatRequest) -> Tuple[dict, List[Dict[str, str]]]:
+    """모델 설정, 대화 메시지 준비"""
     model_id = request.model_id
-    
     if model_id not in AI_MODEL_CONFIG:
         raise HTTPException(
             status_code=400,
@@ -328,7 +181,6 @@ async def ai_chat(
         )
     
     config = AI_MODEL_CONFIG[model_id]
-    logger.info(f"AI Chat request from user {user_id}, model: {config['name']}")
     
     # 대화 기록 구성
     messages = [
@@ -341,33 +193,166 @@ async def ai_chat(
     
     # 사용자 메시지 추가
     messages.append({"role": "user", "content": request.message})
+    return config, messages
+
+
+@router.post("/chat")
+async def ai_chat(
+    request: AIChatRequest,
+    current_user: Optional[str] = Depends(get_current_user_optional),
+    redis: Optional[Redis] = Depends(get_redis_client),
+    gateway: LLMGateway = Depends(get_llm_gateway),
+):
+    """
+    AI 채팅 (4가지 비서 모델)
     
-    # API 호출
-    if config["provider"] == "openai":
-        result = await call_openai_api(
-            messages=messages,
-            model=config["model"],
-            max_tokens=800 if model_id == "allround" else 500,
-            temperature=0.7,
-        )
-    else:  # google
-        result = await call_google_gemini_api(
-            messages=messages,
-            model=config["model"],
-            max_tokens=800 if model_id == "writer" else 400,
+    사용자가 선택한 AI 비서 모델과 채팅합니다.
+    - allround: GPT-4o (만능 비서)
+    - quick: Gemini 1.5 Flash (빠른 비서)
+    - writer: Gemini 1.5 Pro (글쓰기 비서)
+    - expert: GPT-4o Mini (척척박사 비서)
+    인증 없이도 사용 가능합니다.
+    """
+    user_id = current_user if current_user else "anonymous"
+    config, messages = _prepare_ai_chat(request)
+    logger.info(f"AI Chat request from user {user_id}, model: {config['name']}")
+    
+    # 응답 캐시 (같은 질문이면 LLM 호출 없이 반환)
+    cache_scope = response_scope("assistant", request.model_id, config["model"])
+    cached = lookup_response(
+        redis, cache_scope, config["system_prompt"], request.message, request.conversation_history
+    )
+    if cached:
+        return {
+            "ok": True,
+            "data": AIResponse(
+                response=cached.text,
+                model_used=f"{cached.model} ({config['name']})",
+                cached=True,
+            ).model_dump(),
+        }
+    
+    # API 호출 (장애 시 대체 모델)
+    try:
+        result = await gateway.complete(
+            model_targets(config),
+            messages,
+            max_tokens=config["max_tokens"],
             temperature=0.7,
         )
+    except LLMGatewayError as e:
+        raise _gateway_error(e)
+    
+    store_response(
+        redis, cache_scope, config["system_prompt"], request.message, request.conversation_history,
+        result.text, result.model, result.tokens,
+    )
     
     return {
         "ok": True,
         "data": AIResponse(
-            response=result["response"],
-            model_used=f"{config['model']} ({config['name']})",
-            tokens_used=result.get("tokens_used"),
+            response=result.text,
+            model_used=f"{result.model} ({config['name']})",
+            tokens_used=result.tokens,
         ).model_dump(),
     }
 
 
+@router.post("/chat/stream")
+async def ai_chat_stream(
+    request: AIChatRequest,
+    current_user: Optional[str] = Depends(get_current_user_optional),
+    redis: Optional[Redis] = Depends(get_redis_client),
+    gateway: LLMGateway = Depends(get_llm_gateway),
+):
+    """
+    AI 채팅 스트리밍 (Server-Sent Events)
+    
+    /chat과 같은 모델/대화 구성으로 답변을 생성되는 대로 보냅니다.
+    
+    이벤트:
+    - delta: {"text": "답변 조각"}
+    - done: {"model_used": "...", "tokens_used": 123, "cached": false}
+    - error: {"code": "...", "message": "..."}
+    """
+    user_id = current_user if current_user else "anonymous"
+    config, messages = _prepare_ai_chat(request)
+    logger.info(f"AI Chat stream request from user {user_id}, model: {config['name']}")
+    
+    # 캐시된 답변은 한 번에 전송
+    cache_scope = response_scope("assistant", request.model_id, config["model"])
+    cached = lookup_response(
+        redis, cache_scope, config["system_prompt"], request.message, request.conversation_history
+    )
+    if cached:
+        return sse_response(_cached_reply_events(config, cached))
+    
+    # API 키가 하나도 없으면 스트림 시작 전에 에러 응답
+    try:
+        gateway.route(model_targets(config))
+    except NoProviderConfigured as e:
+        raise _gateway_error(e)
+    
+    return sse_response(_stream_ai_reply(
+        gateway, config, messages,
+        redis=redis, cache_scope=cache_scope, history=request.conversation_history,
+    ))
+
+
+async def _cached_reply_events(config: dict, cached: CachedAnswer) -> AsyncIterator[str]:
+    """캐시된 답변을 스트리밍 이벤트 형식으로 전송"""
+    yield sse_event("delta", {"text": cached.text})
+    yield sse_event("done", {
+        "model_used": f"{cached.model} ({config['name']})",
+        "tokens_used": None,
+        "cached": True,
+    })
+
+
+async def _stream_ai_reply(
+    gateway: LLMGateway,
+    config: dict,
+    messages: List[Dict[str, str]],
+    redis: Optional[Redis] = None,
+    cache_scope: Optional[str] = None,
+    history: Sequence[ConversationMessage] = (),
+) -> AsyncIterator[str]:
+    """게이트웨이 토큰 스트림을 SSE 이벤트로 중계 (끝까지 받은 답변은 응답 캐시에 저장)"""
+    parts = []
+    relayed = False
+    try:
+        async for kind, value in gateway.stream(
+            model_targets(config), messages, max_tokens=config["max_tokens"], temperature=0.7
+        ):
+            if kind == "delta":
+                relayed = True
+                parts.append(value)
+                yield sse_event("delta", {"text": value})
+            else:
+                result = value
+    except Exception as e:
+        logger.error(f"AI chat stream failed: {e}")
+        if relayed:
+            error = {"code": "AI_STREAM_INTERRUPTED", "message": "답변을 받는 중에 문제가 생겼어요. 다시 시도해 주세요."}
+        else:
+            error = {"code": "AI_REQUEST_FAILED", "message": "AI 응답을 생성할 수 없어요. 잠시 후 다시 시도해주세요."}
+        yield sse_event("error", error)
+        return
+    except (asyncio.CancelledError, GeneratorExit):
+        logger.info(f"AI chat stream disconnected: model={config['model']}")
+        raise
+    
+    store_response(
+        redis, cache_scope, config["system_prompt"], messages[-1]["content"], history,
+        "".join(parts), result.model, result.tokens,
+    )
+    yield sse_event("done", {
+        "model_used": f"{result.model} ({config['name']})",
+        "tokens_used": result.tokens,
+        "cached": False,
+    })
+
+
 @router.get("/models")
 async def get_ai_models():
     """
@@ -1,33 +1,75 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, Optional, List
+from typing import AsyncIterator, Dict, Optional, List
+from uuid import UUID
 from pydantic import BaseModel
+from redis import Redis
 from supabase import Client
-from app.core.deps import get_supabase, get_current_user_optional
+from app.core.deps import get_supabase, get_current_user, get_current_user_optional, get_pooled_redis
+from app.core.db import run_query
+from app.services.alert_stream import HEARTBEAT, alert_hub, format_alert, get_unread_count, mark_read
+from app.utils.pagination import InvalidCursor, apply_keyset, keyset_filter, page_rows
+from app.utils.sse import sse_event, sse_response
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+MAX_LIMIT = 50
+
 
 class MarkReadRequest(BaseModel):
     """알림 읽음 처리 요청"""
     alert_ids: List[str]
 
 
+def _dummy_alerts() -> List[Dict]:
+    """로컬 개발/미인증용 더미 알림"""
+    return [
+        {
+            "id": "alert-1",
+            "type": "med_check",
+            "title": "💊 복약 체크",
+            "message": "김어머니님이 아침 약을 체크했습니다",
+            "timestamp": datetime.now().isoformat(),
+            "is_read": False,
+        },
+        {
+            "id": "alert-2",
+            "type": "card_completed",
+            "title": "📚 오늘의 카드",
+            "message": "박아버지님이 오늘의 카드를 완료했습니다",
+            "timestamp": datetime.now().isoformat(),
+            "is_read": True,
+        },
+        {
+            "id": "alert-3",
+            "type": "tool_completed",
+            "title": "🛠️ 도구 실습",
+            "message": "이할머니님이 Canva 실습을 완료했습니다",
+            "timestamp": datetime.now().isoformat(),
+            "is_read": False,
+        },
+    ]
+
+
 @router.get("")
 async def list_alerts(
-    family_id: Optional[str] = None,
+    since_id: Optional[UUID] = None,
+    cursor: Optional[str] = None,
     unread_only: bool = False,
-    limit: int = 50,
+    limit: int = MAX_LIMIT,
     db: Optional[Client] = Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_pooled_redis),
     user_id: Optional[str] = Depends(get_current_user_optional)
 ) -> Dict:
     """
-    가족 알림 목록 조회
+    내 알림 목록 조회 (실시간 스트림 연결 전/재연결 후 따라잡기용)
     
     Query params:
-        family_id: 특정 가족 ID (없으면 user가 속한 모든 가족)
+        since_id: 마지막으로 받은 알림 ID (UUID, 형식이 틀리면 422) - 주면 그 이후 알림만 오래된 순으로
+                  (없으면 최신 알림부터 최신순)
+        cursor: 최신순 목록의 다음 페이지 (이전 응답의 next_cursor)
         unread_only: true면 읽지 않은 알림만
         limit: 최대 50개
     
@@ -38,47 +80,27 @@ async def list_alerts(
             "alerts": [
               {
                 "id": "...",
-                "type": "med_check" | "card_completed" | "tool_completed",
+                "type": "encouragement" | "achievement" | "reminder",
+                "title": "...",
                 "message": "...",
                 "timestamp": "...",
-                "is_read": false,
-                "family_member_name": "김어머니"
+                "is_read": false
               }
             ],
-            "unread_count": 5
+            "unread_count": 5,
+            "latest_id": "...",  // 다음 since_id (받은 알림 중 가장 최신)
+            "has_more": false,   // limit을 넘는 알림이 더 있음
+            "next_cursor": null  // 최신순 목록에서 더 오래된 알림 페이지 커서
           }
         }
     """
-    # 로컬 개발 모드: Supabase 미설정 시 더미 데이터 반환
-    if not db:
-        logger.warning("Supabase 미설정 - 더미 알림 데이터 반환")
-        dummy_alerts = [
-            {
-                "id": "alert-1",
-                "type": "med_check",
-                "message": "김어머니님이 아침 약을 체크했습니다",
-                "timestamp": datetime.now().isoformat(),
-                "is_read": False,
-                "family_member_name": "김어머니"
-            },
-            {
-                "id": "alert-2",
-                "type": "card_completed",
-                "message": "박아버지님이 오늘의 카드를 완료했습니다",
-                "timestamp": datetime.now().isoformat(),
-                "is_read": True,
-                "family_member_name": "박아버지"
-            },
-            {
-                "id": "alert-3",
-                "type": "tool_completed",
-                "message": "이할머니님이 Canva 실습을 완료했습니다",
-                "timestamp": datetime.now().isoformat(),
-                "is_read": False,
-                "family_member_name": "이할머니"
-            }
-        ]
+    limit = max(1, min(limit, MAX_LIMIT))
+    since = str(since_id) if since_id else None
         
+    # 로컬 개발 모드(Supabase 미설정) 또는 미인증: 더미 데이터 반환
+    if not db or not user_id:
+        logger.warning("Supabase 미설정 또는 인증 없음 - 더미 알림 데이터 반환")
+        dummy_alerts = _dummy_alerts()
         filtered_alerts = [a for a in dummy_alerts if not unread_only or not a["is_read"]]
         unread_count = len([a for a in dummy_alerts if not a["is_read"]])
         
@@ -86,84 +108,87 @@ async def list_alerts(
             "ok": True,
             "data": {
                 "alerts": filtered_alerts[:limit],
-                "unread_count": unread_count
+                "unread_count": unread_count,
+                "latest_id": filtered_alerts[0]["id"] if filtered_alerts else None,
+                "has_more": False,
+                "next_cursor": None
             }
         }
     
     try:
-        # 인증되지 않은 경우 더미 데이터 반환
-        if not user_id:
-            logger.warning("인증되지 않음 - 더미 데이터 반환")
-            return {
-                "ok": True,
-                "data": {
-                    "alerts": dummy_alerts[:limit],
-                    "unread_count": 2
-                }
-            }
-        
-        # 1. 사용자가 속한 가족 확인
-        families_query = db.table('family_members') \
-            .select('family_id') \
+        query = db.table('alerts') \
+            .select('id, type, title, message, read, created_at') \
             .eq('user_id', user_id)
         
-        if family_id:
-            families_query = families_query.eq('family_id', family_id)
-        
-        families_result = families_query.execute()
-        
-        if not families_result.data:
-            return {
-                "ok": True,
-                "data": {
-                    "alerts": [],
-                    "unread_count": 0
-                }
-            }
-        
-        family_ids = [f['family_id'] for f in families_result.data]
-        
-        # 2. 알림 조회
-        query = db.table('alerts') \
-            .select('*, family_members!inner(user:users(name))') \
-            .in_('family_id', family_ids) \
-            .order('created_at', desc=True) \
-            .limit(limit)
+        if since:
+            # 커서 알림의 시각 기준으로 이후 알림 (같은 시각은 id로 구분)
+            cursor_result = await run_query(
+                db.table('alerts')
+                .select('created_at')
+                .eq('id', since)
+                .eq('user_id', user_id)
+                .limit(1)
+            )
+            if not cursor_result.data:
+                raise HTTPException(
+                    status_code=400,
+                    detail={
+                        "ok": False,
+                        "error": {
+                            "code": "INVALID_CURSOR",
+                            "message": "알림 위치를 찾지 못했어요. 목록을 새로 불러와 주세요."
+                        }
+                    }
+                )
+            cursor_at = cursor_result.data[0]['created_at']
+            query = query \
+                .or_(keyset_filter(cursor_at, since, descending=False)) \
+                .order('created_at') \
+                .order('id') \
+                .limit(limit + 1)
+        else:
+            try:
+                query = apply_keyset(query, cursor, limit)
+            except InvalidCursor:
+                raise HTTPException(
+                    status_code=400,
+                    detail={
+                        "ok": False,
+                        "error": {
+                            "code": "INVALID_CURSOR",
+                            "message": "알림 위치를 찾지 못했어요. 목록을 새로 불러와 주세요."
+                        }
+                    }
+                )
         
         if unread_only:
-            query = query.eq('is_read', False)
-        
-        alerts_result = query.execute()
+            query = query.eq('read', False)
         
-        # 3. 응답 포맷팅
-        alerts = []
-        for alert in alerts_result.data:
-            member_name = alert.get('family_members', {}).get('user', {}).get('name', '알 수 없음')
-            alerts.append({
-                "id": alert['id'],
-                "type": alert['type'],
-                "message": alert['message'],
-                "timestamp": alert['created_at'],
-                "is_read": alert['is_read'],
-                "family_member_name": member_name
-            })
+        alerts_result = await run_query(query)
+        rows, next_cursor = page_rows(alerts_result.data, limit)
         
-        # 4. 읽지 않은 알림 수 계산
-        unread_result = db.table('alerts') \
-            .select('id', count='exact') \
-            .in_('family_id', family_ids) \
-            .eq('is_read', False) \
-            .execute()
+        has_more = next_cursor is not None
+        alerts = [format_alert(row) for row in rows]
+        if since:
+            latest_id = alerts[-1]["id"] if alerts else since
+        else:
+            latest_id = alerts[0]["id"] if alerts else None
         
-        unread_count = unread_result.count or 0
+        # 읽지 않은 알림 수: Redis 카운터 (없을 때만 DB count)
+        unread_count = await get_unread_count(db, redis, user_id)
         
         return {
             "ok": True,
             "data": {
                 "alerts": alerts,
-                "unread_count": unread_count
+                "unread_count": unread_count,
+                "latest_id": latest_id,
+                "has_more": has_more,
+                "next_cursor": None if since else next_cursor
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"알림 조회 실패: {e}")
         raise HTTPException(
@@ -178,10 +203,55 @@ async def list_alerts(
         )
 
 
+@router.get("/stream")
+async def stream_alerts(
+    db: Optional[Client] = Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_pooled_redis),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    새 알림 실시간 수신 (SSE, 폴링 대체)
+    
+    연결 직후 ready 이벤트로 현재 읽지 않은 알림 수를 보내고,
+    이후 새 알림마다 alert 이벤트 1개 (알림 + 갱신된 unread_count).
+    
+    이벤트:
+        ready   {"unread_count": 3}
+        alert   {"event": "alert", "alert": {...}, "unread_count": 4}
+        unread  {"event": "unread", "unread_count": 0}   // 다른 기기에서 읽음 처리
+        resync  {"event": "resync"}   // 놓친 알림이 있음 → GET /v1/alerts?since_id= 로 따라잡기
+    
+    끊겼다가 다시 연결하면 마지막 알림 ID로 GET /v1/alerts?since_id= 를 먼저 호출하세요.
+    """
+    return sse_response(_alert_events(db, redis, current_user["id"]))
+
+
+async def _alert_events(db: Optional[Client], redis: Optional[Redis], user_id: str) -> AsyncIterator[str]:
+    """허브 큐 → SSE 이벤트 (연결이 끊기면 제너레이터가 취소되어 구독 해제)"""
+    # 개수를 세기 전에 구독해야 그 사이 발행된 알림을 놓치지 않음
+    queue = alert_hub.subscribe(user_id)
+    try:
+        try:
+            unread_count = await get_unread_count(db, redis, user_id)
+        except Exception as e:
+            logger.warning(f"읽지 않은 알림 수 조회 실패: {e}")
+            unread_count = None
+        yield sse_event("ready", {"unread_count": unread_count})
+        while True:
+            message = await queue.get()
+            if message is HEARTBEAT:
+                yield ": keep-alive\n\n"
+                continue
+            yield sse_event(message.get("event", "alert"), message)
+    finally:
+        alert_hub.unsubscribe(user_id, queue)
+
+
 @router.post("/mark-read")
 async def mark_alerts_read(
     body: MarkReadRequest,
     db: Optional[Client] = Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_pooled_redis),
     user_id: Optional[str] = Depends(get_current_user_optional)
 ) -> Dict:
     """
@@ -196,33 +266,40 @@ async def mark_alerts_read(
         {
           "ok": true,
           "data": {
-            "updated_count": 2
+            "updated_count": 2,
+            "unread_count": 3  // 카운터가 없으면 null
           }
         }
     """
-    # 로컬 개발 모드
-    if not db:
-        logger.warning("Supabase 미설정 - 더미 응답 반환")
+    # 로컬 개발 모드(Supabase 미설정) 또는 미인증
+    if not db or not user_id:
+        logger.warning("Supabase 미설정 또는 인증 없음 - 더미 응답 반환")
         return {
             "ok": True,
             "data": {
-                "updated_count": len(body.alert_ids)
+                "updated_count": len(body.alert_ids),
+                "unread_count": None
             }
         }
     
     try:
-        # 알림 읽음 처리 (사용자가 속한 가족의 알림만)
-        result = db.table('alerts') \
-            .update({'is_read': True}) \
-            .in_('id', body.alert_ids) \
-            .execute()
+        # 내 알림 중 아직 읽지 않은 것만 (실제로 바뀐 행 수만큼 카운터 감소)
+        result = await run_query(
+            db.table('alerts')
+            .update({'read': True})
+            .in_('id', body.alert_ids)
+            .eq('user_id', user_id)
+            .eq('read', False)
+        )
         
         updated_count = len(result.data) if result.data else 0
+        unread_count = mark_read(redis, user_id, updated_count)
         
         return {
             "ok": True,
             "data": {
-                "updated_count": updated_count
+                "updated_count": updated_count,
+                "unread_count": unread_count
             }
         }
     except Exception as e:
@@ -16,7 +16,8 @@ import logging
 import jwt
 from supabase import Client
 from app.core.config import settings
-from app.core.deps import get_supabase, get_current_user
+from app.core.deps import get_supabase, get_supabase_auth, get_current_user
+from app.core.db import run_query, run_sync
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -121,7 +122,7 @@ def get_current_user_from_token(token: str) -> dict:
 
 
 @router.post("/signup", response_model=dict)
-async def signup(body: SignupRequest, supabase: Client = Depends(get_supabase)):
+async def signup(body: SignupRequest, supabase: Client = Depends(get_supabase_auth)):
     """
     회원가입
     
@@ -133,7 +134,7 @@ async def signup(body: SignupRequest, supabase: Client = Depends(get_supabase)):
         raise HTTPException(status_code=503, detail={"ok": False, "error": {"message": "서비스를 사용할 수 없습니다."}})
     try:
         # 1. 이메일 중복 체크
-        existing = supabase.table("profiles").select("id").eq("email", body.email).execute()
+        existing = await run_query(supabase.table("profiles").select("id").eq("email", body.email))
         if existing.data:
             raise HTTPException(
                 status_code=400,
@@ -147,7 +148,7 @@ async def signup(body: SignupRequest, supabase: Client = Depends(get_supabase)):
             )
         
         # 2. 사용자 생성 (Supabase Auth 사용)
-        auth_response = supabase.auth.sign_up({
+        auth_response = await run_sync(supabase.auth.sign_up, {
             "email": body.email,
             "password": body.password,
             "options": {
@@ -183,7 +184,7 @@ async def signup(body: SignupRequest, supabase: Client = Depends(get_supabase)):
         
         logger.info(f"profiles 테이블에 upsert 시도: {user_data}")
         # upsert: 이미 존재하면 업데이트, 없으면 삽입
-        supabase.table("profiles").upsert(user_data).execute()
+        await run_query(supabase.table("profiles").upsert(user_data))
         logger.info(f"profiles 테이블 upsert 성공")
         
         # 4. JWT 토큰 생성
@@ -237,7 +238,7 @@ async def social_login(body: SocialLoginRequest, supabase: Client = Depends(get_
         
         # Supabase에서 access_token으로 사용자 정보 조회
         # 이미 Supabase OAuth로 인증된 토큰이므로 get_user로 검증
-        user_response = supabase.auth.get_user(body.access_token)
+        user_response = await run_sync(supabase.auth.get_user, body.access_token)
         
         if not user_response or not user_response.user:
             logger.error("소셜 로그인: 사용자 정보를 가져올 수 없음")
@@ -264,7 +265,7 @@ async def social_login(body: SocialLoginRequest, supabase: Client = Depends(get_
         logger.info(f"소셜 로그인 사용자: id={user_id}, email={email}, name={name}")
         
         # profiles 테이블에서 기존 프로필 확인
-        existing_profile = supabase.table("profiles").select("*").eq("id", user_id).execute()
+        existing_profile = await run_query(supabase.table("profiles").select("*").eq("id", user_id))
         
         is_new_user = False
         
@@ -282,7 +283,7 @@ async def social_login(body: SocialLoginRequest, supabase: Client = Depends(get_
             }
             
             try:
-                supabase.table("profiles").insert(profile_data).execute()
+                await run_query(supabase.table("profiles").insert(profile_data))
                 logger.info(f"신규 소셜 사용자 프로필 생성: {user_id}")
             except Exception as insert_err:
                 logger.warning(f"프로필 생성 실패 (이미 존재할 수 있음): {insert_err}")
@@ -290,9 +291,9 @@ async def social_login(body: SocialLoginRequest, supabase: Client = Depends(get_
         else:
             # 기존 사용자 - 마지막 로그인 시간 업데이트
             try:
-                supabase.table("profiles").update({
+                await run_query(supabase.table("profiles").update({
                     "updated_at": datetime.utcnow().isoformat()
-                }).eq("id", user_id).execute()
+                }).eq("id", user_id))
             except Exception as update_err:
                 logger.warning(f"프로필 업데이트 실패: {update_err}")
         
@@ -300,7 +301,7 @@ async def social_login(body: SocialLoginRequest, supabase: Client = Depends(get_
         token = create_jwt_token(user_id, email)
         
         # 프로필 정보 조회
-        profile_result = supabase.table("profiles").select("*").eq("id", user_id).execute()
+        profile_result = await run_query(supabase.table("profiles").select("*").eq("id", user_id))
         profile_data = profile_result.data[0] if profile_result.data else {}
         
         return {
@@ -336,7 +337,7 @@ async def social_login(body: SocialLoginRequest, supabase: Client = Depends(get_
 
 
 @router.post("/login", response_model=dict)
-async def login(body: LoginRequest, supabase: Client = Depends(get_supabase)):
+async def login(body: LoginRequest, supabase: Client = Depends(get_supabase_auth)):
     """
     로그인
     
@@ -345,7 +346,7 @@ async def login(body: LoginRequest, supabase: Client = Depends(get_supabase)):
     """
     try:
         # 1. Supabase Auth 로그인
-        auth_response = supabase.auth.sign_in_with_password({
+        auth_response = await run_sync(supabase.auth.sign_in_with_password, {
             "email": body.email,
             "password": body.password
         })
@@ -365,7 +366,7 @@ async def login(body: LoginRequest, supabase: Client = Depends(get_supabase)):
         user_id = auth_response.user.id
         
         # 2. profiles 테이블에서 프로필 정보 조회
-        user_result = supabase.table("profiles").select("*").eq("id", user_id).single().execute()
+        user_result = await run_query(supabase.table("profiles").select("*").eq("id", user_id).single())
         user_data = user_result.data
         
         # 3. JWT 토큰 생성
@@ -416,7 +417,7 @@ async def get_profile(
         raise HTTPException(status_code=503, detail={"ok": False, "error": {"message": "서비스를 사용할 수 없습니다."}})
     user_id = current_user["id"]
     try:
-        result = supabase.table("profiles").select("*").eq("id", user_id).single().execute()
+        result = await run_query(supabase.table("profiles").select("*").eq("id", user_id).single())
         
         if not result.data:
             raise HTTPException(
@@ -481,7 +482,7 @@ async def update_profile(
         update_data["updated_at"] = datetime.utcnow().isoformat()
         
         # Supabase 업데이트
-        result = supabase.table("profiles").update(update_data).eq("id", user_id).execute()
+        result = await run_query(supabase.table("profiles").update(update_data).eq("id", user_id))
         
         if not result.data:
             raise HTTPException(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from typing import Dict, Optional
 from datetime import date, datetime
 from supabase import Client
@@ -9,9 +9,19 @@ from app.core.deps import (
     get_gamification_service,
     get_redis_client
 )
+from app.core.db import run_query
 from app.schemas.card import CardCompleteRequest
+from app.services.card_queue import advance_card_queue, get_next_card
 from app.services.gamification import GamificationService
+from app.services.guardian_home import update_senior_snapshot
+from app.services.user_stats import bump_user_counters, touch_last_activity
 from app.utils.error_translator import translate_db_error, is_db_error
+from app.utils.idempotency import (
+    IDEMPOTENCY_HEADER,
+    begin_idempotent_request,
+    release_idempotency_key,
+    save_idempotent_response,
+)
 from pydantic import BaseModel
 import logging
 
@@ -23,65 +33,40 @@ def _get_completion_key(user_id: str, card_id: str) -> str:
     today = datetime.now().date().isoformat()
     return f"completed:{user_id}:{card_id}:{today}"
 
-async def _is_card_completed_today(redis: Optional[Redis], db: Optional[Client], user_id: str, card_id: str) -> bool:
-    """Redis 또는 DB에서 오늘 완료 여부 확인 (비동기 함수)"""
-    # 1. Redis 우선 확인 (빠름)
-    if redis:
-        key = _get_completion_key(user_id, card_id)
-        try:
-            if redis.exists(key) > 0:
-                logger.info(f"Redis에서 중복 감지: {key}")
-                return True
-        except Exception as e:
-            logger.error(f"Redis 완료 확인 실패: {e}")
+def _claim_card_completion(redis: Optional[Redis], user_id: str, card_id: str) -> Optional[str]:
+    """
+    오늘 완료 선점 (Redis SET NX, 24시간 TTL)
     
-    # 2. Redis 없거나 실패 시 DB에서 확인
-    if db:
-        try:
-            today = datetime.now().date().isoformat()
-            # completed_date 컬럼 사용 (날짜만 저장, 정확한 비교)
-            result = db.table('completed_cards').select('id').eq('user_id', user_id).eq('card_id', card_id).eq('completed_date', today).limit(1).execute()
-            if result.data and len(result.data) > 0:
-                logger.info(f"DB에서 중복 감지: user={user_id}, card={card_id}, date={today}")
-                return True
-        except Exception as e:
-            logger.error(f"DB 완료 확인 실패: {e}")
+    동시에 들어온 같은 카드 완료 요청 중 하나만 통과시킵니다.
+    Redis가 없거나 실패하면 None을 반환하고, DB 유니크 제약(complete_card_atomic)이 최종 방어합니다.
     
-    return False
+    Returns:
+        선점한 Redis 키 (처리 실패 시 _release_card_claim으로 해제)
 
-async def _mark_card_completed(redis: Optional[Redis], db: Optional[Client], user_id: str, card_id: str, quiz_correct: int = 0, quiz_total: int = 0):
-    """Redis와 DB에 완료 기록 (비동기 함수)"""
-    # 1. Redis에 기록 (빠른 중복 체크용, 24시간 TTL)
-    if redis:
-        key = _get_completion_key(user_id, card_id)
-        try:
-            redis.setex(key, 86400, "1")
-            logger.info(f"Redis 완료 기록: {key}")
-        except Exception as e:
-            logger.error(f"Redis 완료 기록 실패: {e}")
+    Raises:
+        ValueError("ALREADY_COMPLETED"): 이미 다른 요청이 선점
+    """
+    if not redis:
+        return None
+    key = _get_completion_key(user_id, card_id)
+    try:
+        claimed = redis.set(key, "1", nx=True, ex=86400)
+    except Exception as e:
+        logger.error(f"Redis 완료 선점 실패: {e}")
+        return None
+    if not claimed:
+        logger.info(f"Redis에서 중복 감지: {key}")
+        raise ValueError("ALREADY_COMPLETED")
+    return key
     
-    # 2. DB에 영구 기록
-    if db:
-        try:
-            today = datetime.now().date().isoformat()
-            db.table('completed_cards').insert({
-                'user_id': user_id,
-                'card_id': card_id,
-                'completed_date': today,
-                'quiz_correct': quiz_correct,
-                'quiz_total': quiz_total
-            }).execute()
-            logger.info(f"DB 완료 기록: user={user_id}, card={card_id}, date={today}")
-        except Exception as e:
-            # 중복 키 에러 감지 및 전파
-            error_str = str(e).lower()
-            logger.warning(f"DB INSERT 에러: {e}, type={type(e).__name__}, str={error_str[:200]}")
-            if 'duplicate key' in error_str or '23505' in error_str or 'unique constraint' in error_str or 'already exists' in error_str:
-                logger.info(f"DB 중복 완료 감지: user={user_id}, card={card_id}")
-                raise ValueError("ALREADY_COMPLETED")  # 중복 에러를 명시적으로 전파
-            else:
-                logger.error(f"DB 완료 기록 실패: {e}")
-                raise  # 중복이 아닌 다른 에러는 전파
+def _release_card_claim(redis: Optional[Redis], key: Optional[str]):
+    """처리 실패 시 완료 선점 해제 (재시도 가능하도록)"""
+    if not redis or not key:
+        return
+    try:
+        redis.delete(key)
+    except Exception as e:
+        logger.error(f"Redis 완료 선점 해제 실패: {e}")
 
 
 class QuizSubmitRequest(BaseModel):
@@ -91,11 +76,15 @@ class QuizSubmitRequest(BaseModel):
 @router.get("/today")
 async def get_today_card(
     user_id: Optional[str] = Depends(get_current_user_optional),
-    db: Optional[Client] = Depends(get_supabase)
+    db: Optional[Client] = Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_redis_client)
 ) -> Dict:
     """
     오늘의 카드 조회
     
+    사용자별 다음 카드 큐(Redis)에서 꺼내고, 큐가 비면 안티 조인 RPC로 다시 채웁니다.
+    큐는 카드 완료 시 갱신되고 자정에 만료됩니다.
+    
     Returns:
         { "ok": true, "data": { "card": {...} } }
     """
@@ -115,41 +104,11 @@ async def get_today_card(
             }
         }
     
-    today = date.today().isoformat()
-    
-    # 1. 오늘 카드 조회 (사용자가 완료하지 않은 카드 중 선택)
+    # 1. 오늘 카드 조회 (사용자가 완료하지 않은 카드 중 선택, 사용자별 Redis 큐)
     try:
-        # 사용자가 있으면 완료하지 않은 카드 찾기
-        if user_id:
-            # 완료한 카드 ID 목록 조회
-            completed_result = db.table('completed_cards') \
-                .select('card_id') \
-                .eq('user_id', user_id) \
-                .execute()
-            
-            completed_card_ids = [row['card_id'] for row in completed_result.data] if completed_result.data else []
-            
-            # 완료하지 않은 카드 조회
-            if completed_card_ids:
-                result = db.table('cards') \
-                    .select('*') \
-                    .not_.in_('id', completed_card_ids) \
-                    .limit(1) \
-                    .execute()
-            else:
-                # 완료한 카드가 없으면 첫 번째 카드
-                result = db.table('cards') \
-                    .select('*') \
-                    .limit(1) \
-                    .execute()
-        else:
-            # 비로그인 사용자는 첫 번째 카드
-            result = db.table('cards') \
-                .select('*') \
-                .limit(1) \
-                .execute()
-        
-        if not result.data or len(result.data) == 0:
+        card = await get_next_card(db, redis, user_id)
+    
+        if card is None:
             # 2. 카드가 없거나 모두 완료했으면 메시지 반환
             return {
                 "ok": True,
@@ -158,8 +117,6 @@ async def get_today_card(
                     "message": "모든 카드를 완료하셨어요! 내일 새로운 카드가 추가됩니다."
                 }
             }
-        else:
-            card = result.data[0]
         
         return {
             "ok": True,
@@ -208,7 +165,7 @@ async def _create_fallback_card(db: Client, user_id: str, date_str: str) -> Dict
         "status": "pending"
     }
     
-    result = db.table('cards').insert(new_card).execute()
+    result = await run_query(db.table('cards').insert(new_card))
     return result.data[0]
 
 
@@ -239,7 +196,7 @@ async def submit_quiz(
     try:
         answer = body.answer
         # 1. 카드 조회
-        card_result = db.table('cards').select('*').eq('id', card_id).execute()
+        card_result = await run_query(db.table('cards').select('*').eq('id', card_id))
         
         if not card_result.data or len(card_result.data) == 0:
             raise HTTPException(
@@ -326,6 +283,7 @@ async def submit_quiz(
 @router.post("/complete")
 async def complete_card(
     body: CardCompleteRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
     user_id: Optional[str] = Depends(get_current_user_optional),
     db: Optional[Client] = Depends(get_supabase),
     redis: Optional[Redis] = Depends(get_redis_client),
@@ -334,6 +292,10 @@ async def complete_card(
     """
     카드 완료 + 퀴즈 채점 + 게임화 업데이트
     
+    - 같은 카드는 하루 1회만 완료 (Redis SET NX 선점 + DB 유니크 제약)
+    - 완료 기록과 포인트/스트릭 갱신은 complete_card_atomic RPC 한 번으로 처리
+    - Idempotency-Key 헤더를 보내면 같은 키의 재시도에 처음 응답을 그대로 재전송
+    
     Returns:
         {
           "ok": true,
@@ -345,13 +307,15 @@ async def complete_card(
           }
         }
     """
+    idem_key, replay = await begin_idempotent_request(redis, "cards:complete", user_id, idempotency_key)
+    if replay is not None:
+        return replay
+    
+    claim_key = None
+    succeeded = False
     try:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"🔥 Complete card called: card_id={body.card_id}, user_id={user_id}")
-        
         # 1. 카드 조회
-        card_result = db.table('cards').select('*').eq('id', body.card_id).execute()
+        card_result = await run_query(db.table('cards').select('*').eq('id', body.card_id))
         
         if not card_result.data or len(card_result.data) == 0:
             raise HTTPException(
@@ -365,8 +329,6 @@ async def complete_card(
                 }
             )
         
-        logger.warning(f"🔥 Card found: {card_result.data[0].keys()}")
-        
         card = card_result.data[0]
         
         # 2. 권한 확인 (user_id가 있는 경우에만)
@@ -382,10 +344,8 @@ async def complete_card(
                 }
             )
         
-        # 3. 중복 완료 방지 (Redis 또는 DB 기반 - 1차 체크)
-        is_completed = await _is_card_completed_today(redis, db, user_id, body.card_id)
-        if is_completed:
-            logger.info(f"중복 완료 차단 (1차 체크): user={user_id}, card={body.card_id}")
+        # 카드 테이블 status 필드 체크 (있으면)
+        if card.get('status') == 'completed':
             raise HTTPException(
                 status_code=400,
                 detail={
@@ -397,8 +357,11 @@ async def complete_card(
                 }
             )
         
-        # 카드 테이블 status 필드 체크 (있으면)
-        if card.get('status') == 'completed':
+        # 3. 중복 완료 방지 - Redis 선점 (동시 요청 중 하나만 통과)
+        try:
+            claim_key = _claim_card_completion(redis, user_id, body.card_id)
+        except ValueError:
+            logger.info(f"중복 완료 차단 (Redis 선점): user={user_id}, card={body.card_id}")
             raise HTTPException(
                 status_code=400,
                 detail={
@@ -417,8 +380,6 @@ async def complete_card(
             if quiz_payload:
                 quiz_result = _grade_quiz(quiz_payload, body.quiz_answers)
         
-        # 5. 게임화 업데이트 (사용자 진행 기록은 별도 테이블에 저장)
-        from datetime import date as date_type
         # created_at은 timestamp이므로 날짜만 추출
         completion_date_str = card.get('date')
         if not completion_date_str:
@@ -427,50 +388,24 @@ async def complete_card(
                 # YYYY-MM-DDTHH:MM:SS... 형식에서 날짜 부분만 추출
                 completion_date_str = created_at.split('T')[0]
             else:
-                completion_date_str = date_type.today().isoformat()
-        logger.warning(f"🔥 Calling gamification: completion_date={completion_date_str}, quiz_result={quiz_result}")
-        
-        gamification_result = await gamification.award_for_card_completion(
-            user_id=user_id,
-            num_correct=quiz_result['correct'] if quiz_result else 0,
-            num_questions=quiz_result['total'] if quiz_result else 0,
-            completion_date=completion_date_str
-        )
-        
-        logger.warning(f"🔥 Gamification result: {gamification_result}")
-        
-        # 2차 중복 체크 (게임화 후 DB 기록 전 - 경쟁 조건 최종 방어)
-        try:
-            is_completed_final = await _is_card_completed_today(redis, db, user_id, body.card_id)
-            if is_completed_final:
-                logger.warning(f"중복 완료 차단 (2차 - DB 기록 직전): user={user_id}, card={body.card_id}")
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "ok": False,
-                        "error": {
-                            "code": "ALREADY_COMPLETED",
-                            "message": "이미 완료한 카드예요."
-                        }
-                    }
-                )
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.warning(f"2차 중복 체크 실패 (계속 진행): {e}")
+                completion_date_str = date.today().isoformat()
         
-        # 완료 기록 추가 (Redis + DB)
+        # 5. 완료 기록 + 게임화 업데이트 (단일 트랜잭션, DB 유니크 제약이 최종 방어)
+        quiz_correct = quiz_result['correct'] if quiz_result else 0
         try:
-            await _mark_card_completed(
-                redis, db, user_id, body.card_id,
-                quiz_correct=quiz_result['correct'] if quiz_result else 0,
-                quiz_total=quiz_result['total'] if quiz_result else 0
+            gamification_result = await gamification.record_card_completion(
+                user_id=user_id,
+                card_id=body.card_id,
+                num_correct=quiz_correct,
+                num_questions=quiz_result['total'] if quiz_result else 0,
+                completion_date=completion_date_str,
+                completed_date=datetime.now().date().isoformat()
             )
-            logger.warning(f"🔥 Card completion recorded")
         except ValueError as e:
-            # 중복 완료 에러 (DB UNIQUE 제약 위반)
             if "ALREADY_COMPLETED" in str(e):
-                logger.info(f"중복 완료 차단 (DB INSERT 실패): user={user_id}, card={body.card_id}")
+                # DB에는 이미 완료 기록이 있으므로 Redis 선점은 유지
+                claim_key = None
+                logger.info(f"중복 완료 차단 (DB 유니크 제약): user={user_id}, card={body.card_id}")
                 raise HTTPException(
                     status_code=400,
                     detail={
@@ -483,19 +418,25 @@ async def complete_card(
                 )
             raise
         
-        return {
+        bump_user_counters(redis, user_id, cards_completed=1, quizzes_correct=quiz_correct)
+        touch_last_activity(redis, user_id)
+        update_senior_snapshot(redis, user_id, cards_completed=1)
+        advance_card_queue(redis, user_id, body.card_id)
+        
+        response = {
             "ok": True,
             "data": {
                 **gamification_result,
                 "quiz_result": quiz_result
             }
         }
+        save_idempotent_response(redis, idem_key, response)
+        succeeded = True
+        return response
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        logger.error(f"🔥 Complete card error: {e}")
-        logger.error(f"🔥 Traceback: {traceback.format_exc()}")
+        logger.error(f"Complete card error: {e}", exc_info=True)
         
         # DB 에러인 경우 한국어 번역 적용
         if is_db_error(e):
@@ -519,6 +460,10 @@ async def complete_card(
                 }
             }
         )
+    finally:
+        if not succeeded:
+            _release_card_claim(redis, claim_key)
+            release_idempotency_key(redis, idem_key)
 
 
 def _grade_quiz(quiz: list, answers: Dict[str, int]) -> Dict:
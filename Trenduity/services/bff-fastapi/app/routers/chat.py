@@ -5,67 +5,32 @@ AI 채팅 라우터
 - 다중 AI 모델 지원 (GPT, Gemini, Claude)
 - 시니어 맞춤 시스템 프롬프트
 - 레이트 리미팅 및 사용량 추적
+- 스트리밍 응답 (Server-Sent Events, /send/stream)
+- 모델 장애 시 대체 모델로 자동 전환 (LLM 게이트웨이)
+- 반복 질문은 응답 캐시에서 반환 (사용량 미차감)
 """
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 from redis import Redis
+import asyncio
 import logging
-import httpx
-import os
 
 from app.core.deps import get_current_user, get_redis_client
+from app.services.ai_quota import refund_quota, reserve_quota
+from app.services.ai_response_cache import CachedAnswer, lookup_response, response_scope, store_response
+from app.services.llm_gateway import CHAT_MODELS, LLMGateway, LLMGatewayError, get_llm_gateway, model_targets
+from app.utils.sse import sse_event, sse_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# 환경 변수 - 각 AI 서비스 API 키
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-GOOGLE_AI_API_KEY = os.getenv("GOOGLE_AI_API_KEY", "")  # Gemini
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")  # Claude
-
 # 레이트 리미팅
 RATE_LIMIT_WINDOW = 60  # 1분
 RATE_LIMIT_MAX_REQUESTS = 10  # 최대 10회
 
-# AI 모델 설정
-AI_MODEL_CONFIG = {
-    # 빠른 일반 비서 - Gemini
-    "quick": {
-        "provider": "google",
-        "model": "gemini-1.5-flash",
-        "fallback_model": "gemini-1.5-flash",
-        "name": "빠른 일반 비서",
-    },
-    # 만능 비서 - GPT-4o-mini (빠른 GPT 계열)
-    "allround": {
-        "provider": "openai",
-        "model": "gpt-4o-mini",
-        "fallback_model": "gpt-3.5-turbo",
-        "name": "만능 비서",
-    },
-    # 글쓰기 비서 - Claude
-    "writer": {
-        "provider": "anthropic",
-        "model": "claude-3-5-sonnet-20241022",
-        "fallback_model": "claude-3-haiku-20240307",
-        "name": "글쓰기 비서",
-    },
-    # 척척박사 비서 - 플래그쉽 계열 (GPT-4o)
-    "expert": {
-        "provider": "openai",
-        "model": "gpt-4o",
-        "fallback_model": "gpt-4o-mini",
-        "name": "척척박사 비서",
-    },
-    # 천재 비서 - Claude Opus 4.5급 하이엔드 (든든 플랜 전용)
-    "genius": {
-        "provider": "anthropic",
-        "model": "claude-sonnet-4-20250514",
-        "fallback_model": "claude-3-5-sonnet-20241022",
-        "name": "천재 비서",
-    },
-}
+# AI 모델 설정 (기본 모델 + 장애 시 대체 모델): app/services/llm_gateway/models.py
+AI_MODEL_CONFIG = CHAT_MODELS
 
 # 시니어 친화적 시스템 프롬프트
 SYSTEM_PROMPT = """당신은 50-70대 시니어를 위한 친절한 AI 도우미입니다.
@@ -104,101 +69,7 @@ class ChatResponse(BaseModel):
     reply: str
     usage: Optional[dict] = None
     model_used: Optional[str] = None
-
-
-async def call_openai(messages: List[dict], model: str) -> dict:
-    """OpenAI API 호출"""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": model,
-                "messages": messages,
-                "max_tokens": 500,
-                "temperature": 0.7
-            }
-        )
-        if response.status_code != 200:
-            raise Exception(f"OpenAI API error: {response.status_code}")
-        data = response.json()
-        return {
-            "reply": data["choices"][0]["message"]["content"],
-            "usage": data.get("usage"),
-            "model_used": model
-        }
-
-
-async def call_google(messages: List[dict], model: str, system_prompt: str) -> dict:
-    """Google Gemini API 호출"""
-    # Gemini 형식으로 변환
-    contents = []
-    for msg in messages:
-        if msg["role"] == "user":
-            contents.append({"role": "user", "parts": [{"text": msg["content"]}]})
-        elif msg["role"] == "assistant":
-            contents.append({"role": "model", "parts": [{"text": msg["content"]}]})
-    
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GOOGLE_AI_API_KEY}",
-            headers={"Content-Type": "application/json"},
-            json={
-                "contents": contents,
-                "systemInstruction": {"parts": [{"text": system_prompt}]},
-                "generationConfig": {
-                    "maxOutputTokens": 500,
-                    "temperature": 0.7
-                }
-            }
-        )
-        if response.status_code != 200:
-            raise Exception(f"Google AI API error: {response.status_code}")
-        data = response.json()
-        reply = data["candidates"][0]["content"]["parts"][0]["text"]
-        return {
-            "reply": reply,
-            "usage": data.get("usageMetadata"),
-            "model_used": model
-        }
-
-
-async def call_anthropic(messages: List[dict], model: str, system_prompt: str) -> dict:
-    """Anthropic Claude API 호출"""
-    # Claude 형식으로 변환 (system은 별도)
-    claude_messages = []
-    for msg in messages:
-        if msg["role"] in ["user", "assistant"]:
-            claude_messages.append({"role": msg["role"], "content": msg["content"]})
-    
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": ANTHROPIC_API_KEY,
-                "anthropic-version": "2023-06-01",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": model,
-                "system": system_prompt,
-                "messages": claude_messages,
-                "max_tokens": 500,
-                "temperature": 0.7
-            }
-        )
-        if response.status_code != 200:
-            raise Exception(f"Anthropic API error: {response.status_code}")
-        data = response.json()
-        reply = data["content"][0]["text"]
-        return {
-            "reply": reply,
-            "usage": data.get("usage"),
-            "model_used": model
-        }
+    cached: bool = False
 
 
 # 플랜별 AI 모델 일일 사용 제한
@@ -234,72 +105,98 @@ PLAN_AI_LIMITS = {
 }
 
 
-async def check_ai_usage_limit(user_id: str, model_id: str, user_plan: str, redis: Optional[Redis]) -> dict:
+def _plan_limits(user_plan: str) -> Dict[str, int]:
+    """플랜별 모델 일일 한도"""
+    return PLAN_AI_LIMITS.get(user_plan, PLAN_AI_LIMITS["FREE"])
+
+
+def _limit_error(message: str) -> dict:
+    return {
+        "ok": False,
+        "error": {
+            "code": "AI_LIMIT_EXCEEDED",
+            "message": message
+        }
+    }
+
+
+def reserve_ai_usage(user_id: str, model_id: str, user_plan: str, redis: Optional[Redis]) -> Optional[dict]:
     """
-    AI 사용량 제한 체크
+    AI 일일 사용량 확인 + 1회 차감 (Lua 스크립트 1회, 동시 요청도 한도를 넘지 않음)
+    
+    LLM 호출이 실패하면 refund_ai_usage()로 되돌립니다.
     
     Returns:
-        {"allowed": True} 또는 {"allowed": False, "message": "...", "remaining": 0}
+        한도 초과면 에러 응답(dict), 차감했으면 None
     """
-    plan_limits = PLAN_AI_LIMITS.get(user_plan, PLAN_AI_LIMITS["FREE"])
-    daily_limit = plan_limits.get(model_id, 0)
+    quota = reserve_quota(redis, user_id, model_id, _plan_limits(user_plan))
+    if quota.allowed:
+        return None
     
-    # 무제한인 경우
-    if daily_limit == -1:
-        return {"allowed": True, "remaining": -1}
+    model_name = AI_MODEL_CONFIG.get(model_id, {}).get("name", model_id)
+    daily_limit = quota.limits.get(model_id, 0)
+    return _limit_error(
+        f"오늘 '{model_name}' 사용 횟수({daily_limit}회)를 모두 사용하셨어요. 내일 다시 시도하시거나 플랜을 업그레이드해 보세요!"
+    )
+
+
+def refund_ai_usage(user_id: str, model_id: str, redis: Optional[Redis]) -> None:
+    """차감한 사용량 되돌리기 (LLM 호출 실패, 답변 전 연결 끊김)"""
+    refund_quota(redis, user_id, model_id)
+
+
+async def _check_chat_limits(user_id: str, model_id: str, user_plan: str, redis: Optional[Redis]) -> Optional[dict]:
+    """
+    플랜에서 쓸 수 있는 모델인지 + 분당 요청 제한 확인 (일일 사용량은 reserve_ai_usage)
     
-    # 사용 불가인 경우
-    if daily_limit == 0:
+    Returns:
+        제한에 걸리면 에러 응답(dict), 통과하면 None
+    """
+    # 사용 불가 모델 (플랜 한도 0)
+    if _plan_limits(user_plan).get(model_id, 0) == 0:
         model_name = AI_MODEL_CONFIG.get(model_id, {}).get("name", model_id)
-        return {
-            "allowed": False,
-            "message": f"'{model_name}'는 현재 플랜에서 사용할 수 없어요. 플랜을 업그레이드해 보세요!",
-            "remaining": 0
-        }
+        return _limit_error(f"'{model_name}'는 현재 플랜에서 사용할 수 없어요. 플랜을 업그레이드해 보세요!")
     
-    # Redis로 일일 사용량 체크
+    # 레이트 리미팅 (분당 제한)
     if redis:
         try:
-            today = __import__('datetime').date.today().isoformat()
-            usage_key = f"ai_usage:{user_id}:{model_id}:{today}"
-            current_usage = redis.get(usage_key)
-            current_count = int(current_usage) if current_usage else 0
+            rate_limit_key = f"ratelimit:chat:{user_id}:{model_id}"
+            current_count = redis.get(rate_limit_key)
             
-            if current_count >= daily_limit:
-                model_name = AI_MODEL_CONFIG.get(model_id, {}).get("name", model_id)
+            if current_count and int(current_count) >= RATE_LIMIT_MAX_REQUESTS:
                 return {
-                    "allowed": False,
-                    "message": f"오늘 '{model_name}' 사용 횟수({daily_limit}회)를 모두 사용하셨어요. 내일 다시 시도하시거나 플랜을 업그레이드해 보세요!",
-                    "remaining": 0
+                    "ok": False,
+                    "error": {
+                        "code": "RATE_LIMIT_EXCEEDED",
+                        "message": "너무 많은 메시지를 보내셨어요. 잠시 후 다시 시도해 주세요."
+                    }
                 }
             
-            return {"allowed": True, "remaining": daily_limit - current_count - 1}
+            pipe = redis.pipeline()
+            pipe.incr(rate_limit_key)
+            pipe.expire(rate_limit_key, RATE_LIMIT_WINDOW)
+            pipe.execute()
         except Exception as e:
-            logger.warning(f"Redis usage check failed: {e}")
-            return {"allowed": True, "remaining": daily_limit}
+            logger.warning(f"Redis rate limiting failed: {e}")
     
-    return {"allowed": True, "remaining": daily_limit}
+    return None
 
 
-async def increment_ai_usage(user_id: str, model_id: str, redis: Optional[Redis]):
-    """AI 사용량 증가"""
-    if redis:
-        try:
-            today = __import__('datetime').date.today().isoformat()
-            usage_key = f"ai_usage:{user_id}:{model_id}:{today}"
-            pipe = redis.pipeline()
-            pipe.incr(usage_key)
-            pipe.expire(usage_key, 86400 * 2)  # 2일 후 만료
-            pipe.execute()
-        except Exception as e:
-            logger.warning(f"Redis usage increment failed: {e}")
+def _build_messages(body: ChatRequest, system_prompt: str) -> List[dict]:
+    """시스템 프롬프트 + 최근 대화 10개 + 사용자 메시지"""
+    messages = [{"role": "system", "content": system_prompt}]
+    for msg in body.history[-10:]:
+        messages.append({"role": msg.role, "content": msg.content})
+    messages.append({"role": "user", "content": body.message})
+    return messages
 
 
 @router.post("/send")
 async def send_message(
     body: ChatRequest,
     current_user: dict = Depends(get_current_user),
-    redis: Optional[Redis] = Depends(get_redis_client)
+    redis: Optional[Redis] = Depends(get_redis_client),
+    gateway: LLMGateway = Depends(get_llm_gateway)
 ):
     """
     AI 채팅 메시지 전송
@@ -315,97 +212,46 @@ async def send_message(
     model_id = body.model_id or "allround"
     user_plan = current_user.get("subscription_plan", "FREE")
     
-    # AI 사용량 제한 체크
-    usage_check = await check_ai_usage_limit(user_id, model_id, user_plan, redis)
-    if not usage_check.get("allowed"):
-        return {
-            "ok": False,
-            "error": {
-                "code": "AI_LIMIT_EXCEEDED",
-                "message": usage_check.get("message", "AI 사용 제한에 도달했어요.")
-            }
-        }
+    # 사용량/분당 제한 체크
+    limit_error = await _check_chat_limits(user_id, model_id, user_plan, redis)
+    if limit_error:
+        return limit_error
     
     # 모델 설정 가져오기
     model_config = AI_MODEL_CONFIG.get(model_id, AI_MODEL_CONFIG["allround"])
-    provider = model_config["provider"]
-    model = model_config["model"]
     
     # 시스템 프롬프트 (커스텀 또는 기본)
     system_prompt = body.system_prompt or SYSTEM_PROMPT
     
-    # 레이트 리미팅 (분당 제한)
-    if redis:
-        try:
-            rate_limit_key = f"ratelimit:chat:{user_id}:{model_id}"
-            current_count = redis.get(rate_limit_key)
-            
-            if current_count and int(current_count) >= RATE_LIMIT_MAX_REQUESTS:
-                return {
-                    "ok": False,
-                    "error": {
-                        "code": "RATE_LIMIT_EXCEEDED",
-                        "message": "너무 많은 메시지를 보내셨어요. 잠시 후 다시 시도해 주세요."
-                    }
-                }
-            
-            pipe = redis.pipeline()
-            pipe.incr(rate_limit_key)
-            pipe.expire(rate_limit_key, RATE_LIMIT_WINDOW)
-            pipe.execute()
-        except Exception as e:
-            logger.warning(f"Redis rate limiting failed: {e}")
-    
-    # 메시지 준비
-    messages = [{"role": "system", "content": system_prompt}]
-    for msg in body.history[-10:]:
-        messages.append({"role": msg.role, "content": msg.content})
-    messages.append({"role": "user", "content": body.message})
-    
-    # API 키 확인 및 호출
-    try:
-        result = None
-        
-        if provider == "openai" and OPENAI_API_KEY:
-            result = await call_openai(messages, model)
-        elif provider == "google" and GOOGLE_AI_API_KEY:
-            result = await call_google(messages, model, system_prompt)
-        elif provider == "anthropic" and ANTHROPIC_API_KEY:
-            result = await call_anthropic(messages, model, system_prompt)
-        
-        # 폴백: OpenAI로 대체
-        if not result and OPENAI_API_KEY:
-            fallback_model = model_config.get("fallback_model", "gpt-3.5-turbo")
-            logger.info(f"Using fallback model: {fallback_model}")
-            result = await call_openai(messages, fallback_model)
-        
-        # 성공 시 사용량 증가
-        if result:
-            await increment_ai_usage(user_id, model_id, redis)
-        
-        # 결과 반환
-        if result:
-            return {
-                "ok": True,
-                "data": {
-                    "reply": result["reply"],
-                    "usage": result.get("usage"),
-                    "model_used": result.get("model_used")
-                }
-            }
-        
-        # API 키 없으면 목업 응답
+    # 응답 캐시 (같은 질문이면 LLM 호출 없이 반환, 사용량에 포함하지 않음)
+    cache_scope = response_scope("chat", model_id, model_config["model"])
+    cached = lookup_response(redis, cache_scope, system_prompt, body.message, body.history)
+    if cached:
         return {
             "ok": True,
             "data": {
-                "reply": _get_mock_response(body.message),
+                "reply": cached.text,
                 "usage": None,
-                "model_used": "mock"
+                "model_used": cached.model,
+                "cached": True
             }
         }
-            
-    except Exception as e:
+    
+    # 일일 사용량 확인 + 차감 (원자적)
+    quota_error = reserve_ai_usage(user_id, model_id, user_plan, redis)
+    if quota_error:
+        return quota_error
+    
+    # 메시지 준비
+    messages = _build_messages(body, system_prompt)
+    
+    # 게이트웨이 호출 (실패/지연 시 대체 모델로 자동 전환)
+    try:
+        result = await gateway.complete(model_targets(model_config), messages, system_prompt=system_prompt)
+    except LLMGatewayError as e:
+        # API 키가 없거나 모든 모델 실패 시 사용량 환불 + 목업 응답
         logger.error(f"Chat API error: {e}")
+        refund_ai_usage(user_id, model_id, redis)
         return {
             "ok": True,
             "data": {
@@ -415,6 +261,134 @@ async def send_message(
             }
         }
 
+    # 답변 캐시
+    store_response(
+        redis, cache_scope, system_prompt, body.message, body.history,
+        result.text, result.model, result.tokens
+    )
+    
+    return {
+        "ok": True,
+        "data": {
+            "reply": result.text,
+            "usage": result.usage,
+            "model_used": result.model,
+            "cached": False
+        }
+    }
+
+
+@router.post("/send/stream")
+async def send_message_stream(
+    body: ChatRequest,
+    current_user: dict = Depends(get_current_user),
+    redis: Optional[Redis] = Depends(get_redis_client),
+    gateway: LLMGateway = Depends(get_llm_gateway)
+):
+    """
+    AI 채팅 메시지 전송 (스트리밍, Server-Sent Events)
+    
+    /send와 같은 제한/모델 선택을 거친 뒤 답변을 생성되는 대로 보냅니다.
+    제한에 걸리면 /send와 같은 JSON 에러 응답을 반환합니다.
+    
+    이벤트:
+    - delta: {"text": "답변 조각"}
+    - done: {"model_used": "...", "usage": {...}, "cached": false}
+    - error: {"code": "...", "message": "..."} (답변 도중 제공자 오류)
+    """
+    user_id = current_user["id"]
+    model_id = body.model_id or "allround"
+    user_plan = current_user.get("subscription_plan", "FREE")
+    
+    limit_error = await _check_chat_limits(user_id, model_id, user_plan, redis)
+    if limit_error:
+        return limit_error
+    
+    model_config = AI_MODEL_CONFIG.get(model_id, AI_MODEL_CONFIG["allround"])
+    system_prompt = body.system_prompt or SYSTEM_PROMPT
+    
+    # 캐시된 답변은 한 번에 전송 (사용량 미차감)
+    cache_scope = response_scope("chat", model_id, model_config["model"])
+    cached = lookup_response(redis, cache_scope, system_prompt, body.message, body.history)
+    if cached:
+        return sse_response(_cached_reply_events(cached))
+    
+    quota_error = reserve_ai_usage(user_id, model_id, user_plan, redis)
+    if quota_error:
+        return quota_error
+    
+    messages = _build_messages(body, system_prompt)
+    
+    return sse_response(
+        _stream_chat_reply(
+            gateway, user_id, model_id, model_config, messages, system_prompt, body.message, redis,
+            cache_scope=cache_scope, history=body.history
+        )
+    )
+
+
+async def _cached_reply_events(cached: CachedAnswer) -> AsyncIterator[str]:
+    """캐시된 답변을 스트리밍 이벤트 형식으로 전송"""
+    yield sse_event("delta", {"text": cached.text})
+    yield sse_event("done", {"model_used": cached.model, "usage": None, "cached": True})
+
+
+async def _stream_chat_reply(
+    gateway: LLMGateway,
+    user_id: str,
+    model_id: str,
+    model_config: dict,
+    messages: List[dict],
+    system_prompt: str,
+    user_message: str,
+    redis: Optional[Redis],
+    cache_scope: Optional[str] = None,
+    history: Sequence[Message] = (),
+) -> AsyncIterator[str]:
+    """
+    게이트웨이 토큰 스트림을 SSE 이벤트로 중계
+    
+    사용량은 스트림 시작 전에 차감되어 있습니다. 답변 일부를 이미 보낸 뒤
+    연결이 끊기거나 제공자 오류가 나도 제공자 토큰은 소비됐으므로 그대로 두고,
+    첫 토큰 전에 끝나면(실패, 연결 끊김) 환불합니다.
+    첫 토큰 전에 모든 모델이 실패하면(API 키 없음 포함) /send와 같이 목업 응답으로 대체합니다.
+    끝까지 받은 답변만 응답 캐시에 저장합니다.
+    """
+    parts = []
+    relayed = False
+    completed = False
+    try:
+        async for kind, value in gateway.stream(model_targets(model_config), messages, system_prompt=system_prompt):
+            if kind == "delta":
+                relayed = True
+                parts.append(value)
+                yield sse_event("delta", {"text": value})
+            else:
+                result = value
+        
+        completed = True
+        store_response(
+            redis, cache_scope, system_prompt, user_message, history,
+            "".join(parts), result.model, result.tokens
+        )
+        yield sse_event("done", {"model_used": result.model, "usage": result.usage, "cached": False})
+    except Exception as e:
+        logger.error(f"Chat stream error: {e}")
+        if not relayed:
+            yield sse_event("delta", {"text": _get_mock_response(user_message)})
+            yield sse_event("done", {"model_used": "mock", "usage": None})
+            return
+        yield sse_event("error", {
+            "code": "AI_STREAM_INTERRUPTED",
+            "message": "답변을 받는 중에 문제가 생겼어요. 다시 시도해 주세요."
+        })
+    except (asyncio.CancelledError, GeneratorExit):
+        logger.info(f"Chat stream disconnected: user={user_id}, model_id={model_id}")
+        raise
+    finally:
+        if not relayed and not completed:
+            refund_ai_usage(user_id, model_id, redis)
+
 
 def _get_mock_response(user_message: str) -> str:
     """목업 응답 생성 (API 키 없을 때)"""
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Literal
 from datetime import datetime
+from redis import Redis
 import logging
 
-from app.core.deps import get_current_user, get_supabase
+from app.core.deps import get_current_user, get_supabase, get_redis_client
+from app.core.db import run_query
+from app.services.gamification import GamificationService
+from app.services.jobs import enqueue_job
+from app.services.reaction_stats import get_reaction_stats, total_count, user_reacted_kinds
+from app.services.user_stats import bump_user_counters, touch_last_activity
 from app.utils.error_translator import translate_db_error, is_db_error
+from app.utils.pagination import ESTIMATED_COUNT, InvalidCursor, apply_keyset, page_rows
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 50
+
+INVALID_CURSOR_ERROR = {
+    "code": "INVALID_CURSOR",
+    "message": "목록 위치를 찾지 못했어요. 처음부터 다시 불러와 주세요.",
+}
 
 # Pydantic Models
 
@@ -34,13 +49,16 @@ class QnaPost(BaseModel):
     ai_summary: Optional[str] = None
     created_at: datetime
     reaction_count: int = 0
+    my_reactions: List[str] = []  # 현재 사용자가 누른 리액션 종류
 
 
 class QnaPostsResponse(BaseModel):
     """Q&A 목록 응답"""
 
     posts: List[QnaPost]
-    total: int
+    next_cursor: Optional[str] = None  # 다음 페이지 요청 시 cursor로 전달 (없으면 마지막 페이지)
+    has_more: bool = False
+    total: Optional[int] = None  # include_total=true 첫 페이지에서만 (추정치)
 
 
 class CreateQnaResponse(BaseModel):
@@ -88,14 +106,17 @@ class AnswersResponse(BaseModel):
     """답변 목록 응답"""
 
     answers: List[Answer]
-    total: int
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total: Optional[int] = None  # include_total=true 첫 페이지에서만 (추정치)
 
 
 @router.get("/qna")
 async def get_qna_list(
     topic: Optional[str] = None,
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     current_user: dict = Depends(get_current_user),
     supabase=Depends(get_supabase),
 ):
@@ -104,62 +125,54 @@ async def get_qna_list(
 
     - topic 필터링 (optional)
     - 최신순 정렬
-    - 페이지네이션
+    - 커서 페이지네이션 (응답의 next_cursor를 다음 요청의 cursor로)
+    - include_total=true면 첫 페이지에 전체 개수 추정치
     - 익명 게시물은 author_name 숨김
     """
     try:
         # 기본 쿼리 - LEFT JOIN으로 author 정보 한 번에 조회 (N+1 방지)
-        query = supabase.table("qna_posts").select(
-            "*, users!inner(name)", count="exact"
-        )
+        count = ESTIMATED_COUNT if include_total and not cursor else None
+        query = supabase.table("qna_posts").select("*, users!inner(name)", count=count)
 
         # topic 필터
         if topic:
             query = query.eq("topic", topic)
 
-        # 정렬 및 페이지네이션
-        query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
+        # 정렬 및 페이지네이션 ((created_at, id) 키셋, offset 스캔 없음)
+        try:
+            query = apply_keyset(query, cursor, limit)
+        except InvalidCursor:
+            return {"ok": False, "error": INVALID_CURSOR_ERROR}
 
         try:
-            result = query.execute()
+            result = await run_query(query)
         except Exception:
             # 테이블이 없으면 빈 목록 반환
             return {
                 "ok": True,
-                "data": QnaPostsResponse(posts=[], total=0).model_dump(),
+                "data": QnaPostsResponse(posts=[]).model_dump(),
             }
 
-        # 포스트별 리액션 수 일괄 조회 (N+1 방지)
-        post_ids = [row["id"] for row in result.data or []]
-        reaction_counts = {}
-        if post_ids:
-            try:
-                # 모든 포스트의 리액션을 한 번에 조회
-                reactions_result = (
-                    supabase.table("reactions")
-                    .select("target_id")
-                    .eq("target_type", "qna_post")
-                    .in_("target_id", post_ids)
-                    .execute()
-                )
-                
-                # target_id별 카운트
-                for reaction in reactions_result.data or []:
-                    target_id = reaction["target_id"]
-                    reaction_counts[target_id] = reaction_counts.get(target_id, 0) + 1
-            except Exception:
-                pass
+        rows, next_cursor = page_rows(result.data, limit)
+        
+        # 포스트별 리액션 수 + 내 리액션 일괄 조회 (카운터 RPC 1회, 리액션 행을 세지 않음)
+        post_ids = [row["id"] for row in rows]
+        reaction_stats = {}
+        try:
+            reaction_stats = await get_reaction_stats(supabase, "qna_post", post_ids, current_user["id"])
+        except Exception as e:
+            logger.warning(f"리액션 통계 조회 실패: {e}")
 
         # author_name 추출 및 포스트 구성
         posts = []
-        for row in result.data or []:
+        for row in rows:
             # JOIN된 author 정보 사용 (is_anon이 아닐 때만)
             author_name = None
             if not row["is_anon"] and row.get("users"):
                 author_name = row["users"].get("name")
 
-            # 미리 조회한 리액션 수 사용
-            reaction_count = reaction_counts.get(row["id"], 0)
+            # 미리 조회한 리액션 통계 사용
+            kinds = reaction_stats.get(str(row["id"]), {})
 
             posts.append(
                 QnaPost(
@@ -172,7 +185,8 @@ async def get_qna_list(
                     is_anon=row["is_anon"],
                     ai_summary=row.get("ai_summary"),
                     created_at=row["created_at"],
-                    reaction_count=reaction_count,
+                    reaction_count=total_count(kinds),
+                    my_reactions=user_reacted_kinds(kinds),
                 )
             )
 
@@ -180,7 +194,10 @@ async def get_qna_list(
         return {
             "ok": True,
             "data": QnaPostsResponse(
-                posts=posts, total=result.count or 0
+                posts=posts,
+                next_cursor=next_cursor,
+                has_more=next_cursor is not None,
+                total=result.count if count else None,
             ).model_dump(),
         }
 
@@ -208,6 +225,7 @@ async def create_qna_post(
     body: CreateQnaRequest,
     current_user: dict = Depends(get_current_user),
     supabase=Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_redis_client),
 ):
     """
     Q&A 포스트 작성
@@ -224,7 +242,7 @@ async def create_qna_post(
 
         # Insert
         try:
-            result = (
+            result = await run_query(
                 supabase.table("qna_posts")
                 .insert(
                     {
@@ -236,13 +254,14 @@ async def create_qna_post(
                         "ai_summary": ai_summary,
                     }
                 )
-                .execute()
             )
 
             if not result.data:
                 raise Exception("Insert failed")
 
             post_id = result.data[0]["id"]
+            bump_user_counters(redis, current_user["id"], posts=1)
+            touch_last_activity(redis, current_user["id"])
 
             # Envelope 응답
             return {
@@ -292,39 +311,46 @@ async def create_qna_post(
 @router.get("/qna/{post_id}/answers")
 async def get_answers(
     post_id: str,
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     supabase=Depends(get_supabase),
 ):
     """
     특정 Q&A 포스트의 답변 목록 조회
 
-    - 최신순 정렬
-    - 페이지네이션
+    - 오래된 순 정렬
+    - 커서 페이지네이션 (응답의 next_cursor를 다음 요청의 cursor로)
+    - include_total=true면 첫 페이지에 전체 개수 추정치
     - 익명 답변은 author_name 숨김
     """
     try:
         # 답변 조회 - LEFT JOIN으로 profiles 한 번에 조회 (N+1 방지)
+        count = ESTIMATED_COUNT if include_total and not cursor else None
         query = (
             supabase.table("qna_answers")
-            .select("*, profiles(display_name)", count="exact")
+            .select("*, profiles(display_name)", count=count)
             .eq("post_id", post_id)
-            .order("created_at", desc=False)  # 오래된 답변이 위로
-            .range(offset, offset + limit - 1)
         )
+        try:
+            query = apply_keyset(query, cursor, limit, descending=False)  # 오래된 답변이 위로
+        except InvalidCursor:
+            return {"ok": False, "error": INVALID_CURSOR_ERROR}
 
         try:
-            result = query.execute()
+            result = await run_query(query)
         except Exception:
             # 테이블이 없으면 빈 목록 반환
             return {
                 "ok": True,
-                "data": AnswersResponse(answers=[], total=0).model_dump(),
+                "data": AnswersResponse(answers=[]).model_dump(),
             }
+        
+        rows, next_cursor = page_rows(result.data, limit)
 
         # JOIN된 author 정보 사용 (익명이 아닌 경우만)
         answers = []
-        for row in result.data or []:
+        for row in rows:
             author_name = None
             if not row["is_anon"] and row["author_id"] and row.get("profiles"):
                 author_name = row["profiles"].get("display_name")
@@ -345,7 +371,10 @@ async def get_answers(
         return {
             "ok": True,
             "data": AnswersResponse(
-                answers=answers, total=result.count or 0
+                answers=answers,
+                next_cursor=next_cursor,
+                has_more=next_cursor is not None,
+                total=result.count if count else None,
             ).model_dump(),
         }
 
@@ -365,6 +394,7 @@ async def create_answer(
     body: CreateAnswerRequest,
     current_user: dict = Depends(get_current_user),
     supabase=Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_redis_client),
 ):
     """
     Q&A 포스트에 답변 작성
@@ -375,12 +405,11 @@ async def create_answer(
     try:
         # 포스트 존재 확인
         try:
-            post_check = (
+            post_check = await run_query(
                 supabase.table("qna_posts")
                 .select("id")
                 .eq("id", post_id)
                 .single()
-                .execute()
             )
             if not post_check.data:
                 return {
@@ -401,7 +430,7 @@ async def create_answer(
 
         # 답변 INSERT
         try:
-            result = (
+            result = await run_query(
                 supabase.table("qna_answers")
                 .insert(
                     {
@@ -411,13 +440,13 @@ async def create_answer(
                         "is_anon": body.is_anon,
                     }
                 )
-                .execute()
             )
 
             if not result.data:
                 raise Exception("Insert failed")
 
             answer_id = result.data[0]["id"]
+            touch_last_activity(redis, current_user["id"])
 
             # Envelope 응답
             return {
@@ -449,11 +478,34 @@ async def create_answer(
         }
 
 
+async def _bump_reactions_received(supabase, redis: Optional[Redis], target_type: str, target_id: str, delta: int):
+    """Q&A 게시물 리액션 변경 시 작성자의 받은 리액션 카운터 증감 (DB 카운터는 트리거가 갱신)"""
+    if target_type != "qna_post":
+        return
+    # 작성자 조회 + 카운터 + 배지 평가는 응답 후 작업으로
+    if enqueue_job(GamificationService.REACTION_RECEIVED_JOB, post_id=target_id, delta=delta):
+        return
+    if not redis:
+        return
+    try:
+        post = await run_query(
+            supabase.table("qna_posts")
+            .select("author_id")
+            .eq("id", target_id)
+            .limit(1)
+        )
+        if post.data:
+            bump_user_counters(redis, post.data[0]["author_id"], reactions_received=delta)
+    except Exception as e:
+        logger.warning(f"받은 리액션 카운터 갱신 실패: {e}")
+
+
 @router.delete("/reactions/{reaction_id}")
 async def delete_reaction(
     reaction_id: str,
     current_user: dict = Depends(get_current_user),
     supabase=Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_redis_client),
 ):
     """
     리액션 삭제
@@ -464,12 +516,11 @@ async def delete_reaction(
     try:
         # 리액션 소유권 확인
         try:
-            reaction_check = (
+            reaction_check = await run_query(
                 supabase.table("reactions")
-                .select("id, user_id")
+                .select("id, user_id, target_type, target_id")
                 .eq("id", reaction_id)
                 .single()
-                .execute()
             )
             
             if not reaction_check.data:
@@ -502,7 +553,10 @@ async def delete_reaction(
         
         # 리액션 삭제
         try:
-            supabase.table("reactions").delete().eq("id", reaction_id).execute()
+            await run_query(supabase.table("reactions").delete().eq("id", reaction_id))
+            await _bump_reactions_received(
+                supabase, redis, reaction_check.data["target_type"], reaction_check.data["target_id"], -1
+            )
             
             return {
                 "ok": True,
@@ -536,6 +590,7 @@ async def add_reaction(
     body: AddReactionRequest,
     current_user: dict = Depends(get_current_user),
     supabase=Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_redis_client),
 ):
     """
     리액션 추가/제거 (토글)
@@ -547,33 +602,36 @@ async def add_reaction(
     try:
         # 기존 리액션 확인
         try:
-            existing = (
+            existing = await run_query(
                 supabase.table("reactions")
                 .select("id")
                 .eq("user_id", current_user["id"])
                 .eq("target_type", body.target_type)
                 .eq("target_id", body.target_id)
                 .eq("kind", body.kind)
-                .execute()
             )
 
             if existing.data:
                 # 이미 있으면 삭제 (토글)
-                supabase.table("reactions").delete().eq(
+                await run_query(supabase.table("reactions").delete().eq(
                     "id", existing.data[0]["id"]
-                ).execute()
+                ))
                 added = False
             else:
                 # 없으면 추가
-                supabase.table("reactions").insert(
+                await run_query(supabase.table("reactions").insert(
                     {
                         "user_id": current_user["id"],
                         "target_type": body.target_type,
                         "target_id": body.target_id,
                         "kind": body.kind,
                     }
-                ).execute()
+                ))
                 added = True
+            
+            await _bump_reactions_received(
+                supabase, redis, body.target_type, body.target_id, 1 if added else -1
+            )
 
         except Exception as e:
             # 테이블이 없으면 에러
@@ -585,17 +643,11 @@ async def add_reaction(
                 },
             }
 
-        # 전체 리액션 수 조회
+        # 전체 리액션 수 조회 (트리거가 갱신한 카운터)
         total_reactions = 0
         try:
-            count_result = (
-                supabase.table("reactions")
-                .select("id", count="exact")
-                .eq("target_type", body.target_type)
-                .eq("target_id", body.target_id)
-                .execute()
-            )
-            total_reactions = count_result.count or 0
+            stats = await get_reaction_stats(supabase, body.target_type, [body.target_id])
+            total_reactions = total_count(stats.get(body.target_id, {}))
         except Exception:
             pass
 
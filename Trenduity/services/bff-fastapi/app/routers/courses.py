@@ -8,11 +8,19 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Any
 from datetime import datetime
 from supabase import Client
+from redis import Redis
 
-from app.core.deps import get_supabase
+from app.core.config import settings
+from app.core.deps import get_supabase, get_redis_client
+from app.core.db import run_query
+from app.utils.cache import get_cached, set_cached
 
 router = APIRouter()
 
+# 강좌/강의 카탈로그 캐시 TTL (초) - 거의 변경되지 않는 데이터
+CACHE_TTL_COURSE_CATALOG = settings.CACHE_TTL_LONG
+CACHE_TAG_COURSES = "courses"
+
 
 # ============================================================
 # DTOs (Pydantic Models)
@@ -74,7 +82,8 @@ class EnvelopeResponse(BaseModel):
 async def get_courses(
     category: Optional[str] = Query(None, description="카테고리 필터"),
     user_id: Optional[str] = None,
-    supabase: Client = Depends(get_supabase)
+    supabase: Client = Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_redis_client)
 ):
     """
     강좌 목록 조회
@@ -92,26 +101,33 @@ async def get_courses(
         user_id = "demo-user"
     
     try:
-        # 강좌 목록 조회
-        query = supabase.table("courses").select("*")
+        # 강좌 목록 조회 (카탈로그는 사용자와 무관하므로 캐싱)
+        catalog_key = f"courses:list:category_{category or 'all'}"
+        catalog = get_cached(redis, catalog_key, tags=[CACHE_TAG_COURSES])
         
-        if category:
-            query = query.eq("category", category)
-        
-        courses_result = query.order("created_at", desc=True).execute()
+        if catalog is None:
+            query = supabase.table("courses").select("*")
+            
+            if category:
+                query = query.eq("category", category)
+            
+            courses_result = await run_query(query.order("created_at", desc=True))
+            catalog = courses_result.data
+            set_cached(redis, catalog_key, catalog, CACHE_TTL_COURSE_CATALOG, tags=[CACHE_TAG_COURSES])
         
         # 사용자 진행 상황 조회
-        progress_result = supabase.table("user_course_progress")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .execute()
+        progress_result = await run_query(
+            supabase.table("user_course_progress")
+            .select("*")
+            .eq("user_id", user_id)
+        )
         
         # 진행 상황을 course_id로 매핑
         progress_map = {p["course_id"]: p for p in progress_result.data}
         
         # 응답 데이터 구성
         courses = []
-        for course in courses_result.data:
+        for course in catalog:
             progress = progress_map.get(course["id"], {})
             courses.append({
                 **course,
@@ -138,7 +154,8 @@ async def get_courses(
 async def get_course_detail(
     course_id: str,
     user_id: Optional[str] = None,
-    supabase: Client = Depends(get_supabase)
+    supabase: Client = Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_redis_client)
 ):
     """
     강좌 상세 정보 조회 (강의 목록 포함)
@@ -157,40 +174,52 @@ async def get_course_detail(
         user_id = "demo-user"
     
     try:
-        # 강좌 정보
-        course_result = supabase.table("courses").select("*").eq("id", course_id).single().execute()
+        # 강좌 정보 + 강의 목록 (사용자와 무관하므로 캐싱)
+        detail_key = f"courses:detail:{course_id}"
+        course_detail = get_cached(redis, detail_key, tags=[CACHE_TAG_COURSES])
         
-        if not course_result.data:
-            raise HTTPException(
-                status_code=404,
-                detail={
-                    "ok": False,
-                    "error": {
-                        "code": "COURSE_NOT_FOUND",
-                        "message": "강좌를 찾을 수 없어요"
+        if course_detail is None:
+            course_result = await run_query(supabase.table("courses").select("*").eq("id", course_id).single())
+            
+            if not course_result.data:
+                raise HTTPException(
+                    status_code=404,
+                    detail={
+                        "ok": False,
+                        "error": {
+                            "code": "COURSE_NOT_FOUND",
+                            "message": "강좌를 찾을 수 없어요"
+                        }
                     }
-                }
+                )
+            
+            # 강의 목록
+            lectures_result = await run_query(
+                supabase.table("lectures")
+                .select("*")
+                .eq("course_id", course_id)
+                .order("lecture_number", desc=False)
             )
-        
-        # 강의 목록
-        lectures_result = supabase.table("lectures")\
-            .select("*")\
-            .eq("course_id", course_id)\
-            .order("lecture_number", desc=False)\
-            .execute()
+            
+            course_detail = {
+                "course": course_result.data,
+                "lectures": lectures_result.data,
+            }
+            set_cached(redis, detail_key, course_detail, CACHE_TTL_COURSE_CATALOG, tags=[CACHE_TAG_COURSES])
         
         # 사용자 진행 상황
-        progress_result = supabase.table("user_course_progress")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .eq("course_id", course_id)\
-            .execute()
+        progress_result = await run_query(
+            supabase.table("user_course_progress")
+            .select("*")
+            .eq("user_id", user_id)
+            .eq("course_id", course_id)
+        )
         
         progress = progress_result.data[0] if progress_result.data else None
         
         course_data = {
-            **course_result.data,
-            "lectures": lectures_result.data,
+            **course_detail["course"],
+            "lectures": course_detail["lectures"],
             "user_progress": progress
         }
         
@@ -234,12 +263,13 @@ async def get_lecture(
         user_id = "demo-user"
     
     try:
-        result = supabase.table("lectures")\
-            .select("*")\
-            .eq("course_id", course_id)\
-            .eq("lecture_number", lecture_number)\
-            .single()\
-            .execute()
+        result = await run_query(
+            supabase.table("lectures")
+            .select("*")
+            .eq("course_id", course_id)
+            .eq("lecture_number", lecture_number)
+            .single()
+        )
         
         if not result.data:
             raise HTTPException(
@@ -295,7 +325,7 @@ async def update_progress(
     
     try:
         # 강좌 총 강의 수 확인
-        course_result = supabase.table("courses").select("total_lectures").eq("id", course_id).single().execute()
+        course_result = await run_query(supabase.table("courses").select("total_lectures").eq("id", course_id).single())
         
         if not course_result.data:
             raise HTTPException(status_code=404, detail={
@@ -307,11 +337,12 @@ async def update_progress(
         is_completed = (lecture_number >= total_lectures)
         
         # 기존 진행 상황 확인
-        existing = supabase.table("user_course_progress")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .eq("course_id", course_id)\
-            .execute()
+        existing = await run_query(
+            supabase.table("user_course_progress")
+            .select("*")
+            .eq("user_id", user_id)
+            .eq("course_id", course_id)
+        )
         
         progress_data = {
             "user_id": user_id,
@@ -326,16 +357,18 @@ async def update_progress(
         
         if existing.data:
             # Update
-            result = supabase.table("user_course_progress")\
-                .update(progress_data)\
-                .eq("user_id", user_id)\
-                .eq("course_id", course_id)\
-                .execute()
+            result = await run_query(
+                supabase.table("user_course_progress")
+                .update(progress_data)
+                .eq("user_id", user_id)
+                .eq("course_id", course_id)
+            )
         else:
             # Insert
-            result = supabase.table("user_course_progress")\
-                .insert(progress_data)\
-                .execute()
+            result = await run_query(
+                supabase.table("user_course_progress")
+                .insert(progress_data)
+            )
         
         return {
             "ok": True,
@@ -382,18 +415,19 @@ async def get_today_recommendation(
     
     try:
         # 가장 최근에 본 강좌 찾기 (Supabase는 JOIN을 지원하지 않으므로 분리 조회)
-        progress_result = supabase.table("user_course_progress")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .is_("completed_at", "null")\
-            .order("last_accessed_at", desc=True)\
-            .limit(1)\
-            .execute()
+        progress_result = await run_query(
+            supabase.table("user_course_progress")
+            .select("*")
+            .eq("user_id", user_id)
+            .is_("completed_at", "null")
+            .order("last_accessed_at", desc=True)
+            .limit(1)
+        )
         
         if progress_result.data:
             # 진행 중인 강좌 있음
             p = progress_result.data[0]
-            course = supabase.table("courses").select("*").eq("id", p["course_id"]).single().execute().data
+            course = (await run_query(supabase.table("courses").select("*").eq("id", p["course_id"]).single())).data
             
             recommendation = {
                 "type": "continue",
@@ -406,11 +440,12 @@ async def get_today_recommendation(
             }
         else:
             # 완료한 강좌 ID 목록
-            completed = supabase.table("user_course_progress")\
-                .select("course_id")\
-                .eq("user_id", user_id)\
-                .not_.is_("completed_at", "null")\
-                .execute()
+            completed = await run_query(
+                supabase.table("user_course_progress")
+                .select("course_id")
+                .eq("user_id", user_id)
+                .not_.is_("completed_at", "null")
+            )
             
             completed_ids = [c["course_id"] for c in completed.data]
             
@@ -420,7 +455,7 @@ async def get_today_recommendation(
             if completed_ids:
                 query = query.not_.in_("id", completed_ids)
             
-            course_result = query.execute()
+            course_result = await run_query(query)
             
             if course_result.data:
                 c = course_result.data[0]
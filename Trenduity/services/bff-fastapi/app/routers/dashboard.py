@@ -1,8 +1,15 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
+from redis import Redis
+from typing import Optional
 from datetime import date
+import logging
 
-from app.core.deps import get_current_user, get_supabase
+from app.core.deps import get_current_user, get_supabase, get_pooled_redis
+from app.core.db import run_query
+from app.services.guardian_home import get_guardian_home
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -31,11 +38,10 @@ async def get_dashboard_stats(
 
         # 가족 구성원 조회
         try:
-            family_links = (
+            family_links = await run_query(
                 supabase.table("family_links")
                 .select("user_id")
                 .eq("guardian_id", guardian_id)
-                .execute()
             )
             member_ids = [link["user_id"] for link in (family_links.data or [])]
         except Exception:
@@ -45,13 +51,12 @@ async def get_dashboard_stats(
         today_completions = 0
         if member_ids:
             try:
-                completions = (
+                completions = await run_query(
                     supabase.table("cards")
                     .select("id", count="exact")
                     .in_("user_id", member_ids)
                     .gte("completed_at", today)
                     .lt("completed_at", f"{today}T23:59:59")
-                    .execute()
                 )
                 today_completions = completions.count or 0
             except Exception:
@@ -60,12 +65,11 @@ async def get_dashboard_stats(
         # 미확인 알림 수
         unread_alerts = 0
         try:
-            alerts = (
+            alerts = await run_query(
                 supabase.table("alerts")
                 .select("id", count="exact")
                 .eq("user_id", guardian_id)
                 .eq("read", False)
-                .execute()
             )
             unread_alerts = alerts.count or 0
         except Exception:
@@ -88,3 +92,29 @@ async def get_dashboard_stats(
                 "message": f"통계를 불러올 수 없어요: {str(e)}",
             },
         }
+
+
+@router.get("/home")
+async def get_home(
+    current_user: dict = Depends(get_current_user),
+    supabase=Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_pooled_redis),
+):
+    """
+    보호자 홈 화면 (한 번에 조회)
+    
+    - 연동된 시니어별 포인트/스트릭/배지, 최근 7일 카드·복약 활동, 누적 활동, 마지막 활동 시각
+    - 오늘 가족 카드 완료 수, 미확인 알림 수
+    - 캐시가 모두 있으면 Redis 왕복 1회 (app/services/guardian_home.py)
+    """
+    try:
+        return {"ok": True, "data": await get_guardian_home(supabase, redis, current_user["id"])}
+    except Exception as e:
+        logger.error(f"보호자 홈 조회 실패: {e}")
+        return {
+            "ok": False,
+            "error": {
+                "code": "GUARDIAN_HOME_FAILED",
+                "message": f"홈 화면을 불러올 수 없어요: {str(e)}",
+            },
+        }
@@ -7,6 +7,7 @@ from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
 from supabase import Client
 from app.core.deps import get_current_user, get_supabase
+from app.core.db import run_query
 from app.schemas.expense import (
     ExpenseCreateRequest,
     ExpenseSingleRequest,
@@ -62,7 +63,7 @@ async def get_monthly_expenses(
         month_date = _parse_month(month)
         
         # 해당 월 지출 조회
-        result = db.table('expense_records').select('*').eq('user_id', user_id).eq('month', month_date.isoformat()).order('category').execute()
+        result = await run_query(db.table('expense_records').select('*').eq('user_id', user_id).eq('month', month_date.isoformat()).order('category'))
         
         expenses = [_format_expense(r) for r in (result.data or [])]
         
@@ -75,7 +76,7 @@ async def get_monthly_expenses(
         
         # 전월 데이터 조회
         prev_month = month_date - relativedelta(months=1)
-        prev_result = db.table('expense_records').select('amount').eq('user_id', user_id).eq('month', prev_month.isoformat()).execute()
+        prev_result = await run_query(db.table('expense_records').select('amount').eq('user_id', user_id).eq('month', prev_month.isoformat()))
         
         prev_total = sum(r['amount'] for r in (prev_result.data or []))
         change_rate = None
@@ -136,13 +137,13 @@ async def create_expense(
         month_date = _parse_month(request.month)
         
         # 삽입
-        result = db.table('expense_records').insert({
+        result = await run_query(db.table('expense_records').insert({
             'user_id': user_id,
             'month': month_date.isoformat(),
             'category': request.category,
             'amount': request.amount,
             'note': request.note,
-        }).execute()
+        }))
         
         if not result.data:
             raise Exception("INSERT 실패")
@@ -213,7 +214,7 @@ async def update_expense(
             })
         
         # 본인 소유 확인 + 업데이트
-        result = db.table('expense_records').update(update_data).eq('id', expense_id).eq('user_id', user_id).execute()
+        result = await run_query(db.table('expense_records').update(update_data).eq('id', expense_id).eq('user_id', user_id))
         
         if not result.data:
             raise HTTPException(status_code=404, detail={
@@ -263,7 +264,7 @@ async def delete_expense(
     """
     try:
         # 본인 소유 확인 + 삭제
-        result = db.table('expense_records').delete().eq('id', expense_id).eq('user_id', user_id).execute()
+        result = await run_query(db.table('expense_records').delete().eq('id', expense_id).eq('user_id', user_id))
         
         if not result.data:
             raise HTTPException(status_code=404, detail={
@@ -317,13 +318,13 @@ async def bulk_upsert_expenses(
         for expense in request.expenses:
             try:
                 # Upsert 시도 (user_id + month + category + note 조합이 unique)
-                db.table('expense_records').upsert({
+                await run_query(db.table('expense_records').upsert({
                     'user_id': user_id,
                     'month': month_date.isoformat(),
                     'category': expense.category,
                     'amount': expense.amount,
                     'note': expense.note,
-                }, on_conflict='user_id,month,category,note').execute()
+                }, on_conflict='user_id,month,category,note'))
                 saved_count += 1
             except Exception as e:
                 logger.warning(f"지출 upsert 실패 (개별): {expense.category}, {e}")
@@ -378,7 +379,7 @@ async def analyze_expenses(
         month_date = _parse_month(request.month)
         
         # 해당 월 지출 조회
-        result = db.table('expense_records').select('*').eq('user_id', user_id).eq('month', month_date.isoformat()).execute()
+        result = await run_query(db.table('expense_records').select('*').eq('user_id', user_id).eq('month', month_date.isoformat()))
         
         expenses = result.data or []
         total = sum(e['amount'] for e in expenses)
@@ -404,7 +405,7 @@ async def analyze_expenses(
         
         # 전월 데이터
         prev_month = month_date - relativedelta(months=1)
-        prev_result = db.table('expense_records').select('amount').eq('user_id', user_id).eq('month', prev_month.isoformat()).execute()
+        prev_result = await run_query(db.table('expense_records').select('amount').eq('user_id', user_id).eq('month', prev_month.isoformat()))
         prev_total = sum(r['amount'] for r in (prev_result.data or []))
         
         comparison = ""
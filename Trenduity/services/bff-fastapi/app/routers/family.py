@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
+from redis import Redis
 from typing import List, Optional
 import secrets
 
-from app.core.deps import get_current_user, get_supabase
+from app.core.deps import get_current_user, get_supabase, get_redis_client, get_pooled_redis
+from app.core.db import run_query
+from app.services.alert_stream import publish_alerts
+from app.services.guardian_home import invalidate_guardian_links
+from app.services.user_stats import get_last_activities
 
 router = APIRouter()
 
@@ -42,6 +47,7 @@ async def create_invite(
     body: InviteRequest,
     current_user: dict = Depends(get_current_user),
     supabase=Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_pooled_redis),
 ):
     """
     가족 초대 (간소화: 직접 링크 생성)
@@ -55,12 +61,11 @@ async def create_invite(
 
         # 중복 체크
         try:
-            existing = (
+            existing = await run_query(
                 supabase.table("family_links")
                 .select("id")
                 .eq("guardian_id", guardian_id)
                 .eq("user_id", body.user_id)
-                .execute()
             )
 
             if existing.data:
@@ -77,13 +82,14 @@ async def create_invite(
 
         # 가족 링크 생성
         try:
-            supabase.table("family_links").insert(
+            await run_query(supabase.table("family_links").insert(
                 {
                     "guardian_id": guardian_id,
                     "user_id": body.user_id,
                     "perms": body.perms,
                 }
-            ).execute()
+            ))
+            invalidate_guardian_links(redis, guardian_id)  # 보호자 홈 멤버 목록 갱신
         except Exception:
             # 테이블이 없으면 무시
             pass
@@ -114,12 +120,13 @@ async def create_invite(
 async def get_family_members(
     current_user: dict = Depends(get_current_user),
     supabase=Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_redis_client),
 ):
     """
     보호자가 관리하는 시니어 목록
 
     - 연동된 멤버 정보
-    - 마지막 활동 날짜
+    - 마지막 활동 시각 (카드 완료/복약 체크/Q&A 작성, 멤버 수만큼만 조회)
     - 권한 정보
     """
     try:
@@ -127,11 +134,10 @@ async def get_family_members(
 
         # 가족 링크 조회 - LEFT JOIN으로 users 정보 한 번에 가져오기 (N+1 방지)
         try:
-            result = (
+            result = await run_query(
                 supabase.table("family_links")
                 .select("user_id, perms, users!inner(name, email)")
                 .eq("guardian_id", guardian_id)
-                .execute()
             )
         except Exception:
             # 테이블이 없으면 빈 목록
@@ -140,28 +146,9 @@ async def get_family_members(
                 "data": FamilyMembersResponse(members=[]).model_dump(),
             }
 
-        # 모든 user_id에 대한 마지막 활동을 한 번에 조회 (N+1 방지)
+        # 모든 user_id에 대한 마지막 활동을 한 번에 조회 (Redis MGET → 카운터 행, 활동 이력 스캔 없음)
         user_ids = [link["user_id"] for link in result.data]
-        last_activities = {}
-        if user_ids:
-            try:
-                # 각 user의 최신 카드 날짜를 한 번에 조회
-                # Supabase는 윈도우 함수를 직접 지원하지 않으므로, 개별 조회보다는 일괄 조회 후 Python에서 처리
-                cards_result = (
-                    supabase.table("cards")
-                    .select("user_id, date")
-                    .in_("user_id", user_ids)
-                    .order("date", desc=True)
-                    .execute()
-                )
-                
-                # 각 user_id별 최신 날짜 추출
-                for card in cards_result.data or []:
-                    user_id = card["user_id"]
-                    if user_id not in last_activities:
-                        last_activities[user_id] = card["date"]
-            except Exception:
-                pass
+        last_activities = await get_last_activities(supabase, redis, user_ids)
 
         members = []
         for link in result.data:
@@ -236,13 +223,12 @@ async def get_member_profile(
         
         # 1. 가족 링크 확인 (권한 체크)
         try:
-            link = (
+            link = await run_query(
                 supabase.table("family_links")
                 .select("perms")
                 .eq("guardian_id", guardian_id)
                 .eq("user_id", user_id)
                 .single()
-                .execute()
             )
             
             if not link.data:
@@ -264,12 +250,11 @@ async def get_member_profile(
         
         # 2. 사용자 기본 정보
         try:
-            user_result = (
+            user_result = await run_query(
                 supabase.table("users")
                 .select("name, email, created_at")
                 .eq("id", user_id)
                 .single()
-                .execute()
             )
             
             if not user_result.data:
@@ -293,12 +278,11 @@ async def get_member_profile(
         
         # 3. 총 포인트 조회
         try:
-            gamification_result = (
+            gamification_result = await run_query(
                 supabase.table("gamification")
                 .select("points")
                 .eq("user_id", user_id)
                 .single()
-                .execute()
             )
             total_points = gamification_result.data.get("points", 0) if gamification_result.data else 0
         except Exception:
@@ -306,11 +290,10 @@ async def get_member_profile(
         
         # 4. 획득한 배지 조회
         try:
-            badges_result = (
+            badges_result = await run_query(
                 supabase.table("user_badges")
                 .select("badge_id")
                 .eq("user_id", user_id)
-                .execute()
             )
             badges = [row["badge_id"] for row in badges_result.data] if badges_result.data else []
         except Exception:
@@ -383,13 +366,12 @@ async def get_member_activity(
         
         # 1. 가족 링크 확인
         try:
-            link = (
+            link = await run_query(
                 supabase.table("family_links")
                 .select("perms")
                 .eq("guardian_id", guardian_id)
                 .eq("user_id", user_id)
                 .single()
-                .execute()
             )
             
             if not link.data:
@@ -416,12 +398,11 @@ async def get_member_activity(
         
         # 3. 카드 완료 데이터 조회
         try:
-            cards_result = (
+            cards_result = await run_query(
                 supabase.table("cards")
                 .select("date, completed_at")
                 .eq("user_id", user_id)
-                .gte("date", dates[-1])  # 7일 전부터
-                .execute()
+                .gte("date", dates[-1])
             )
             
             # 날짜별 완료 카운트
@@ -435,12 +416,11 @@ async def get_member_activity(
         
         # 4. 복약 체크 데이터 조회
         try:
-            med_result = (
+            med_result = await run_query(
                 supabase.table("med_checks")
                 .select("date")
                 .eq("user_id", user_id)
                 .gte("date", dates[-1])
-                .execute()
             )
             
             # 날짜별 복약 카운트
@@ -505,25 +485,25 @@ async def send_encouragement(
     body: EncourageRequest,
     current_user: dict = Depends(get_current_user),
     supabase=Depends(get_supabase),
+    redis: Optional[Redis] = Depends(get_pooled_redis),
 ):
     """
     가족 격려 메시지 보내기
 
     - 보호자가 시니어에게 응원 메시지 전송
     - 알림 테이블에 기록
-    - 모바일 앱에서 확인 가능
+    - 연결된 모바일 앱에 실시간 푸시 (/v1/alerts/stream)
     """
     try:
         guardian_id = current_user["id"]
 
         # 권한 확인 (가족 링크가 있는지)
         try:
-            link = (
+            link = await run_query(
                 supabase.table("family_links")
                 .select("id")
                 .eq("guardian_id", guardian_id)
                 .eq("user_id", body.user_id)
-                .execute()
             )
 
             if not link.data:
@@ -546,7 +526,7 @@ async def send_encouragement(
 
         # 알림 생성
         try:
-            supabase.table("alerts").insert(
+            result = await run_query(supabase.table("alerts").insert(
                 {
                     "user_id": body.user_id,
                     "type": "encouragement",
@@ -554,7 +534,8 @@ async def send_encouragement(
                     "message": body.message,
                     "read": False,
                 }
-            ).execute()
+            ))
+            publish_alerts(redis, result.data)  # 시니어 앱에 바로 푸시
         except Exception as e:
             return {
                 "ok": False,
@@ -7,8 +7,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Optional
 from app.core.deps import get_current_user, get_gamification_service, get_redis_client
 from app.services.gamification import GamificationService
+from app.utils.cache import get_cached, set_cached, user_tag
 from redis import Redis
-import json
 import logging
 
 router = APIRouter()
@@ -22,7 +22,7 @@ CACHE_TTL_LEVEL = 300  # 5분
 
 @router.get("/stats")
 async def get_user_gamification_stats(
-    user_id: str = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user),
     gamification: GamificationService = Depends(get_gamification_service),
     redis: Optional[Redis] = Depends(get_redis_client)
 ) -> Dict:
@@ -42,30 +42,24 @@ async def get_user_gamification_stats(
             }
         }
     """
+    user_id = current_user["id"]
     cache_key = f"gamification:stats:{user_id}"
+    cache_tags = [user_tag(user_id)]
     
     try:
-        # 1. 캐시 조회
-        if redis:
-            try:
-                cached = redis.get(cache_key)
-                if cached:
-                    logger.info(f"캐시 히트: {cache_key}")
-                    return json.loads(cached)
-            except Exception as e:
-                logger.warning(f"캐시 조회 실패 (계속 진행): {e}")
+        # 1. 캐시 조회 (포인트 변경 시 사용자 태그로 무효화)
+        cached = get_cached(redis, cache_key, local=False, tags=cache_tags)
+        if cached is not None:
+            logger.info(f"캐시 히트: {cache_key}")
+            return cached
         
         # 2. DB 조회
         stats = await gamification.get_user_stats(user_id)
         response = {"ok": True, "data": stats}
         
         # 3. 캐시 저장
-        if redis:
-            try:
-                redis.setex(cache_key, CACHE_TTL_STATS, json.dumps(response))
-                logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_STATS}s)")
-            except Exception as e:
-                logger.warning(f"캐시 저장 실패 (계속 진행): {e}")
+        if set_cached(redis, cache_key, response, CACHE_TTL_STATS, local=False, tags=cache_tags):
+            logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_STATS}s)")
         
         return response
     except Exception as e:
@@ -84,7 +78,7 @@ async def get_user_gamification_stats(
 
 @router.get("/level-progress")
 async def get_level_progress(
-    user_id: str = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user),
     gamification: GamificationService = Depends(get_gamification_service),
     redis: Optional[Redis] = Depends(get_redis_client)
 ) -> Dict:
@@ -104,30 +98,24 @@ async def get_level_progress(
             }
         }
     """
+    user_id = current_user["id"]
     cache_key = f"gamification:level:{user_id}"
+    cache_tags = [user_tag(user_id)]
     
     try:
-        # 1. 캐시 조회
-        if redis:
-            try:
-                cached = redis.get(cache_key)
-                if cached:
-                    logger.info(f"캐시 히트: {cache_key}")
-                    return json.loads(cached)
-            except Exception as e:
-                logger.warning(f"캐시 조회 실패 (계속 진행): {e}")
+        # 1. 캐시 조회 (포인트 변경 시 사용자 태그로 무효화)
+        cached = get_cached(redis, cache_key, local=False, tags=cache_tags)
+        if cached is not None:
+            logger.info(f"캐시 히트: {cache_key}")
+            return cached
         
         # 2. DB 조회
         progress = await gamification.calculate_level_progress(user_id)
         response = {"ok": True, "data": progress}
         
         # 3. 캐시 저장
-        if redis:
-            try:
-                redis.setex(cache_key, CACHE_TTL_LEVEL, json.dumps(response))
-                logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_LEVEL}s)")
-            except Exception as e:
-                logger.warning(f"캐시 저장 실패 (계속 진행): {e}")
+        if set_cached(redis, cache_key, response, CACHE_TTL_LEVEL, local=False, tags=cache_tags):
+            logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_LEVEL}s)")
         
         return response
     except Exception as e:
@@ -146,7 +134,7 @@ async def get_level_progress(
 
 @router.get("/badges")
 async def get_user_badges(
-    user_id: str = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user),
     gamification: GamificationService = Depends(get_gamification_service),
     redis: Optional[Redis] = Depends(get_redis_client)
 ) -> Dict:
@@ -161,18 +149,16 @@ async def get_user_badges(
             }
         }
     """
+    user_id = current_user["id"]
     cache_key = f"gamification:badges:{user_id}"
+    cache_tags = [user_tag(user_id)]
     
     try:
-        # 1. 캐시 조회
-        if redis:
-            try:
-                cached = redis.get(cache_key)
-                if cached:
-                    logger.info(f"캐시 히트: {cache_key}")
-                    return json.loads(cached)
-            except Exception as e:
-                logger.warning(f"캐시 조회 실패 (계속 진행): {e}")
+        # 1. 캐시 조회 (포인트 변경 시 사용자 태그로 무효화)
+        cached = get_cached(redis, cache_key, local=False, tags=cache_tags)
+        if cached is not None:
+            logger.info(f"캐시 히트: {cache_key}")
+            return cached
         
         # 2. DB 조회
         gamif = await gamification._get_or_create_gamification(user_id)
@@ -180,12 +166,8 @@ async def get_user_badges(
         response = {"ok": True, "data": {"badges": badges}}
         
         # 3. 캐시 저장
-        if redis:
-            try:
-                redis.setex(cache_key, CACHE_TTL_BADGES, json.dumps(response))
-                logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_BADGES}s)")
-            except Exception as e:
-                logger.warning(f"캐시 저장 실패 (계속 진행): {e}")
+        if set_cached(redis, cache_key, response, CACHE_TTL_BADGES, local=False, tags=cache_tags):
+            logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_BADGES}s)")
         
         return response
     except Exception as e:
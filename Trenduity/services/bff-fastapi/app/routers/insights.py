@@ -5,8 +5,9 @@ from pydantic import BaseModel
 from supabase import Client
 from redis import Redis
 from app.core.deps import get_supabase, get_current_user, get_redis_client
+from app.core.db import run_query
+from app.utils.cache import cached, get_cached, set_cached
 from app.utils.error_translator import translate_db_error, is_db_error
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +16,57 @@ router = APIRouter()
 # 캐시 TTL (초)
 CACHE_TTL_INSIGHTS_LIST = 300  # 5분
 CACHE_TTL_INSIGHTS_DETAIL = 600  # 10분
+CACHE_STALE_INSIGHTS_LIST = 600  # 만료 후 10분간 이전 목록 제공하며 백그라운드 갱신
+
+# 캐시 태그 (invalidate_tags로 전체/토픽별 무효화)
+CACHE_TAG_INSIGHTS = "insights"
+
+
+def insights_topic_tag(topic: Optional[str]) -> str:
+    """토픽별 인사이트 목록 캐시 태그"""
+    return f"insights:topic:{topic or 'all'}"
+
+
+@cached(
+    ttl=CACHE_TTL_INSIGHTS_LIST,
+    key_prefix="insights:list",
+    tags=lambda *args, **kwargs: [CACHE_TAG_INSIGHTS, insights_topic_tag(kwargs.get("topic"))],
+    stale_ttl=CACHE_STALE_INSIGHTS_LIST,
+    exclude_args=("db",)
+)
+async def _fetch_insights_list(
+    topic: Optional[str],
+    range: str,
+    limit: int,
+    offset: int,
+    db: Client = None,
+    redis_client: Optional[Redis] = None
+) -> Dict:
+    """인사이트 목록 DB 조회 (캐시 미스 시 키당 한 번만 실행)"""
+    # 날짜 범위 계산
+    days = 7 if range == "weekly" else 30
+    start_date = (datetime.now() - timedelta(days=days)).date()
+    
+    # 쿼리 빌드 (created_at 사용)
+    query = db.table('insights') \
+        .select('id, created_at, topic, title, summary, read_time_minutes', count='exact') \
+        .gte('created_at', start_date.isoformat()) \
+        .order('created_at', desc=True) \
+        .range(offset, offset + limit - 1)
+    
+    if topic:
+        query = query.eq('topic', topic)
+    
+    result = await run_query(query)
+    logger.info(f"인사이트 목록 DB 조회: topic={topic}, range={range}, offset={offset}")
+    
+    return {
+        "ok": True,
+        "data": {
+            "insights": result.data,
+            "total": result.count
+        }
+    }
 
 
 @router.get("")
@@ -44,53 +96,16 @@ async def list_insights(
           }
         }
     """
-    # Redis 캐시 키 생성
-    cache_key = f"insights:list:topic_{topic or 'all'}:range_{range}:limit_{limit}:offset_{offset}"
-    
     try:
-        # 1. 캐시 조회
-        if redis:
-            try:
-                cached = redis.get(cache_key)
-                if cached:
-                    logger.info(f"캐시 히트: {cache_key}")
-                    return json.loads(cached)
-            except Exception as e:
-                logger.warning(f"캐시 조회 실패 (계속 진행): {e}")
-        
-        # 2. 날짜 범위 계산
-        days = 7 if range == "weekly" else 30
-        start_date = (datetime.now() - timedelta(days=days)).date()
-        
-        # 3. 쿼리 빌드 (created_at 사용)
-        query = db.table('insights') \
-            .select('id, created_at, topic, title, summary, read_time_minutes', count='exact') \
-            .gte('created_at', start_date.isoformat()) \
-            .order('created_at', desc=True) \
-            .range(offset, offset + limit - 1)
-        
-        if topic:
-            query = query.eq('topic', topic)
-        
-        result = query.execute()
-        
-        response = {
-            "ok": True,
-            "data": {
-                "insights": result.data,
-                "total": result.count
-            }
-        }
-        
-        # 4. 캐시 저장
-        if redis:
-            try:
-                redis.setex(cache_key, CACHE_TTL_INSIGHTS_LIST, json.dumps(response))
-                logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_INSIGHTS_LIST}s)")
-            except Exception as e:
-                logger.warning(f"캐시 저장 실패 (계속 진행): {e}")
-        
-        return response
+        # 캐시 (L1 메모리 → Redis) + 동시 미스 합치기 + stale-while-revalidate
+        return await _fetch_insights_list(
+            topic=topic,
+            range=range,
+            limit=limit,
+            offset=offset,
+            db=db,
+            redis_client=redis
+        )
     except Exception as e:
         logger.error(f"인사이트 목록 조회 실패: {e}")
         
@@ -144,17 +159,14 @@ async def get_insight_detail(
         }
     """
     cache_key = f"insights:detail:{insight_id}"
+    cache_tags = [CACHE_TAG_INSIGHTS]
     
     try:
-        # 1. 캐시 조회
-        if redis:
-            try:
-                cached = redis.get(cache_key)
-                if cached:
-                    logger.info(f"캐시 히트: {cache_key}")
-                    return json.loads(cached)
-            except Exception as e:
-                logger.warning(f"캐시 조회 실패 (계속 진행): {e}")
+        # 1. 캐시 조회 (L1 메모리 → Redis)
+        cached = get_cached(redis, cache_key, tags=cache_tags)
+        if cached is not None:
+            logger.info(f"캐시 히트: {cache_key}")
+            return cached
         
         # 로컬 개발 모드: Supabase 미설정 시 더미 데이터 반환
         if not db:
@@ -177,21 +189,18 @@ async def get_insight_detail(
             }
             
             # 더미 데이터도 캐싱
-            if redis:
-                try:
-                    redis.setex(cache_key, CACHE_TTL_INSIGHTS_DETAIL, json.dumps(dummy_response))
-                    logger.info(f"더미 데이터 캐시 저장: {cache_key}")
-                except Exception as e:
-                    logger.warning(f"캐시 저장 실패: {e}")
+            if set_cached(redis, cache_key, dummy_response, CACHE_TTL_INSIGHTS_DETAIL, tags=cache_tags):
+                logger.info(f"더미 데이터 캐시 저장: {cache_key}")
             
             return dummy_response
         
         # 2. DB 조회
-        result = db.table('insights') \
-            .select('*') \
-            .eq('id', insight_id) \
-            .single() \
-            .execute()
+        result = await run_query(
+            db.table('insights')
+            .select('*')
+            .eq('id', insight_id)
+            .single()
+        )
         
         if not result.data:
             raise HTTPException(
@@ -223,13 +232,9 @@ async def get_insight_detail(
             }
         }
         
-        # 3. 캐시 저장
-        if redis:
-            try:
-                redis.setex(cache_key, CACHE_TTL_INSIGHTS_DETAIL, json.dumps(response))
-                logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_INSIGHTS_DETAIL}s)")
-            except Exception as e:
-                logger.warning(f"캐시 저장 실패 (계속 진행): {e}")
+        # 3. 캐시 저장 (L1 메모리 + Redis)
+        if set_cached(redis, cache_key, response, CACHE_TTL_INSIGHTS_DETAIL, tags=cache_tags):
+            logger.info(f"캐시 저장: {cache_key} (TTL: {CACHE_TTL_INSIGHTS_DETAIL}s)")
         
         return response
     except HTTPException:
@@ -268,19 +273,21 @@ async def follow_topic(
     """
     try:
         # 기존 팔로우 확인
-        existing = db.table('insight_follows') \
-            .select('*') \
-            .eq('user_id', user_id) \
-            .eq('topic', body.topic) \
-            .execute()
+        existing = await run_query(
+            db.table('insight_follows')
+            .select('*')
+            .eq('user_id', user_id)
+            .eq('topic', body.topic)
+        )
         
         if existing.data and len(existing.data) > 0:
             # 이미 팔로우 중 → 언팔로우
-            db.table('insight_follows') \
-                .delete() \
-                .eq('user_id', user_id) \
-                .eq('topic', body.topic) \
-                .execute()
+            await run_query(
+                db.table('insight_follows')
+                .delete()
+                .eq('user_id', user_id)
+                .eq('topic', body.topic)
+            )
             
             return {
                 "ok": True,
@@ -288,10 +295,10 @@ async def follow_topic(
             }
         else:
             # 팔로우
-            db.table('insight_follows').insert({
+            await run_query(db.table('insight_follows').insert({
                 'user_id': user_id,
                 'topic': body.topic
-            }).execute()
+            }))
             
             return {
                 "ok": True,
@@ -327,10 +334,11 @@ async def get_following_topics(
         }
     """
     try:
-        result = db.table('insight_follows') \
-            .select('topic') \
-            .eq('user_id', user_id) \
-            .execute()
+        result = await run_query(
+            db.table('insight_follows')
+            .select('topic')
+            .eq('user_id', user_id)
+        )
         
         topics = [row['topic'] for row in result.data] if result.data else []
         
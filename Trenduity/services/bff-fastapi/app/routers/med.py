@@ -5,7 +5,10 @@ from datetime import date, datetime, timedelta
 import logging
 
 from app.core.deps import get_current_user, get_supabase, get_gamification_service
+from app.core.db import run_query
 from app.services.gamification import GamificationService
+from app.services.guardian_home import update_senior_snapshot
+from app.services.user_stats import bump_user_counters, touch_last_activity
 from app.utils.error_translator import translate_db_error, is_db_error
 
 router = APIRouter()
@@ -67,13 +70,12 @@ async def check_med(
 
         # 중복 체크 방지 (같은 날 + 같은 시간대)
         try:
-            existing = (
+            existing = await run_query(
                 supabase.table("med_checks")
                 .select("id, time_slot")
                 .eq("user_id", user_id)
                 .eq("date", today)
                 .eq("time_slot", time_slot)
-                .execute()
             )
 
             if existing.data:
@@ -100,8 +102,11 @@ async def check_med(
             insert_data["medication_name"] = body.medication_name
         
         try:
-            supabase.table("med_checks").insert(insert_data).execute()
+            await run_query(supabase.table("med_checks").insert(insert_data))
             logger.info(f"복약 체크 기록: user={user_id}, date={today}, time_slot={time_slot}")
+            bump_user_counters(gamification.redis, user_id, med_checks=1)
+            touch_last_activity(gamification.redis, user_id)
+            update_senior_snapshot(gamification.redis, user_id, med_checks=1)
         except Exception as e:
             logger.error(f"복약 체크 기록 실패: {e}")
             
@@ -191,14 +196,13 @@ async def get_med_history(
         start_date = (date.today() - timedelta(days=days)).isoformat()
         
         try:
-            result = (
+            result = await run_query(
                 supabase.table("med_checks")
                 .select("date, time_slot, medication_name, checked_at", count="exact")
                 .eq("user_id", user_id)
                 .gte("date", start_date)
                 .order("date", desc=True)
                 .order("checked_at", desc=True)
-                .execute()
             )
             
             return {
@@ -264,12 +268,11 @@ async def get_med_status(
         last_7_days = [(today - timedelta(days=i)).isoformat() for i in range(7)]
 
         try:
-            checks = (
+            checks = await run_query(
                 supabase.table("med_checks")
                 .select("date")
                 .eq("user_id", user_id)
                 .in_("date", last_7_days)
-                .execute()
             )
             checked_dates = {row["date"] for row in checks.data}
         except Exception:
@@ -282,12 +285,11 @@ async def get_med_status(
         # 이번 달 총 체크 수
         this_month = today.strftime("%Y-%m")
         try:
-            month_checks = (
+            month_checks = await run_query(
                 supabase.table("med_checks")
                 .select("id", count="exact")
                 .eq("user_id", user_id)
                 .gte("date", f"{this_month}-01")
-                .execute()
             )
             total_this_month = month_checks.count or 0
         except Exception:
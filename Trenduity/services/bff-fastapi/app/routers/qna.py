@@ -3,6 +3,8 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Literal
 
 from app.core.deps import get_current_user, get_supabase
+from app.core.db import run_query
+from app.utils.pagination import ESTIMATED_COUNT, InvalidCursor, apply_keyset, page_rows
 
 router = APIRouter()
 
@@ -43,7 +45,9 @@ class QnaListResponse(BaseModel):
     """Q&A 목록 응답"""
 
     posts: List[QnaPostListItem]
-    total: int
+    next_cursor: Optional[str] = None  # 다음 페이지 요청 시 cursor로 전달 (없으면 마지막 페이지)
+    has_more: bool = False
+    total: Optional[int] = None  # include_total=true 첫 페이지에서만 (추정치)
 
 
 class CreateQnaResponse(BaseModel):
@@ -55,50 +59,59 @@ class CreateQnaResponse(BaseModel):
 @router.get("")
 async def list_qna(
     topic: Optional[str] = Query(None, description="ai_tools | digital_safety | health | general"),
-    limit: int = Query(20, le=50),
-    offset: int = Query(0),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+    include_total: bool = Query(False, description="첫 페이지에 전체 개수 추정치 포함"),
     supabase=Depends(get_supabase),
 ):
     """
     Q&A 목록 조회
 
     - 주제별 필터링 가능
-    - 생성일 기준 내림차순 정렬
+    - 생성일 기준 내림차순 정렬 ((created_at, id) 커서 페이지네이션)
     - 익명 처리 적용
     - vote_count 계산 (qna_votes 테이블 조인)
     """
     try:
         # 목록 조회
-        query = (
-            supabase.table("qna_posts")
-            .select("*", count="exact")
-            .order("created_at", desc=True)
-            .range(offset, offset + limit - 1)
-        )
+        count = ESTIMATED_COUNT if include_total and not cursor else None
+        query = supabase.table("qna_posts").select("*", count=count)
 
         if topic:
             query = query.eq("topic", topic)
+        
+        try:
+            query = apply_keyset(query, cursor, limit)
+        except InvalidCursor:
+            return {
+                "ok": False,
+                "error": {
+                    "code": "INVALID_CURSOR",
+                    "message": "목록 위치를 찾지 못했어요. 처음부터 다시 불러와 주세요.",
+                },
+            }
 
         try:
-            result = query.execute()
+            result = await run_query(query)
         except Exception:
             # 테이블이 없으면 빈 목록 반환
             return {
                 "ok": True,
-                "data": QnaListResponse(posts=[], total=0).model_dump(),
+                "data": QnaListResponse(posts=[]).model_dump(),
             }
 
+        rows, next_cursor = page_rows(result.data, limit)
+        
         # vote_count 일괄 조회 (N+1 쿼리 방지)
-        post_ids = [post["id"] for post in result.data]
+        post_ids = [post["id"] for post in rows]
         vote_counts = {}
         if post_ids:
             try:
                 # 모든 포스트의 투표를 한 번에 조회
-                votes_result = (
+                votes_result = await run_query(
                     supabase.table("qna_votes")
                     .select("post_id")
                     .in_("post_id", post_ids)
-                    .execute()
                 )
                 
                 # post_id별 카운트 집계
@@ -109,7 +122,7 @@ async def list_qna(
                 pass
         
         posts = []
-        for post in result.data:
+        for post in rows:
             # 미리 조회한 vote_count 사용
             vote_count = vote_counts.get(post["id"], 0)
 
@@ -128,7 +141,12 @@ async def list_qna(
         # Envelope 응답
         return {
             "ok": True,
-            "data": QnaListResponse(posts=posts, total=result.count or 0).model_dump(),
+            "data": QnaListResponse(
+                posts=posts,
+                next_cursor=next_cursor,
+                has_more=next_cursor is not None,
+                total=result.count if count else None,
+            ).model_dump(),
         }
 
     except Exception as e:
@@ -156,12 +174,11 @@ async def get_qna_detail(
     try:
         # 포스트 조회
         try:
-            result = (
+            result = await run_query(
                 supabase.table("qna_posts")
                 .select("*")
                 .eq("id", post_id)
                 .single()
-                .execute()
             )
         except Exception:
             return {
@@ -185,11 +202,10 @@ async def get_qna_detail(
 
         # vote_count 조회
         try:
-            vote_result = (
+            vote_result = await run_query(
                 supabase.table("qna_votes")
                 .select("id", count="exact")
                 .eq("post_id", post_id)
-                .execute()
             )
             vote_count = vote_result.count or 0
         except Exception:
@@ -243,7 +259,7 @@ async def create_qna(
 
         # 포스트 생성
         try:
-            result = (
+            result = await run_query(
                 supabase.table("qna_posts")
                 .insert(
                     {
@@ -255,7 +271,6 @@ async def create_qna(
                         "ai_summary": ai_summary,
                     }
                 )
-                .execute()
             )
         except Exception as e:
             return {
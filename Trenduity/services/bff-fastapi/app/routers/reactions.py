@@ -3,6 +3,8 @@ from pydantic import BaseModel
 from typing import Dict, Literal
 
 from app.core.deps import get_current_user, get_supabase
+from app.core.db import run_query
+from app.services.reaction_stats import get_reaction_stats
 
 router = APIRouter()
 
@@ -53,14 +55,13 @@ async def toggle_reaction(
 
         # 기존 리액션 확인
         try:
-            existing = (
+            existing = await run_query(
                 supabase.table("reactions")
                 .select("id")
                 .eq("user_id", user_id)
                 .eq("target_type", body.target_type)
                 .eq("target_id", body.target_id)
                 .eq("kind", body.kind)
-                .execute()
             )
         except Exception:
             # 테이블이 없으면 추가 시도
@@ -70,37 +71,30 @@ async def toggle_reaction(
         if existing and existing.data:
             # 이미 있으면 제거
             try:
-                supabase.table("reactions").delete().eq("id", existing.data[0]["id"]).execute()
+                await run_query(supabase.table("reactions").delete().eq("id", existing.data[0]["id"]))
             except Exception:
                 pass
             action = "removed"
         else:
             # 없으면 추가
             try:
-                supabase.table("reactions").insert(
+                await run_query(supabase.table("reactions").insert(
                     {
                         "user_id": user_id,
                         "target_type": body.target_type,
                         "target_id": body.target_id,
                         "kind": body.kind,
                     }
-                ).execute()
+                ))
                 action = "added"
             except Exception:
                 # 테이블이 없으면 무시
                 pass
 
-        # 총 개수 조회
+        # 총 개수 조회 (트리거가 갱신한 카운터)
         try:
-            count_result = (
-                supabase.table("reactions")
-                .select("id", count="exact")
-                .eq("target_type", body.target_type)
-                .eq("target_id", body.target_id)
-                .eq("kind", body.kind)
-                .execute()
-            )
-            total_count = count_result.count or 0
+            stats = await get_reaction_stats(supabase, body.target_type, [body.target_id])
+            total_count = stats.get(body.target_id, {}).get(body.kind, {}).get("count", 0)
         except Exception:
             total_count = 0
 
@@ -134,19 +128,13 @@ async def get_reactions(
 
     - kind별 총 개수
     - 현재 사용자가 리액션했는지 여부
+    - 카운터 + 내 리액션만 조회 (리액션 행 전체를 읽지 않음)
     """
     try:
         user_id = current_user["id"]
 
-        # 전체 리액션 조회
         try:
-            all_reactions = (
-                supabase.table("reactions")
-                .select("kind, user_id")
-                .eq("target_type", target_type)
-                .eq("target_id", target_id)
-                .execute()
-            )
+            stats = await get_reaction_stats(supabase, target_type, [target_id], user_id)
         except Exception:
             # 테이블이 없으면 빈 통계 반환
             return {
@@ -154,16 +142,10 @@ async def get_reactions(
                 "data": ReactionsResponse(reactions={}).model_dump(),
             }
 
-        # 카운트 집계
-        reaction_stats: Dict[str, ReactionStats] = {}
-        for r in all_reactions.data:
-            kind = r["kind"]
-            if kind not in reaction_stats:
-                reaction_stats[kind] = ReactionStats(count=0, user_reacted=False)
-
-            reaction_stats[kind].count += 1
-            if r["user_id"] == user_id:
-                reaction_stats[kind].user_reacted = True
+        reaction_stats: Dict[str, ReactionStats] = {
+            kind: ReactionStats(**kind_stats)
+            for kind, kind_stats in stats.get(target_id, {}).items()
+        }
 
         # Envelope 응답
         return {
@@ -5,7 +5,11 @@ from redis import Redis
 import logging
 
 from app.core.deps import get_current_user, get_supabase, get_redis_client
+from app.core.db import run_query
+from app.services.gamification import GamificationService
+from app.services.jobs import enqueue_job
 from app.services.scam_checker import ScamChecker
+from app.services.user_stats import bump_user_counters
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -89,13 +93,16 @@ async def check_scam(
 
         # 선택적 DB 로깅 (실패해도 응답에 영향 없음)
         try:
-            supabase.table("scam_checks").insert(
+            await run_query(supabase.table("scam_checks").insert(
                 {
                     "user_id": current_user["id"],
                     "input": body.input[:200],  # 최대 200자만 저장
                     "label": result.label,
                 }
-            ).execute()
+            ))
+            bump_user_counters(redis, current_user["id"], scam_checks=1)
+            # '사기 파수꾼' 배지 평가는 응답 후 작업으로 (작업 큐가 없으면 생략)
+            enqueue_job(GamificationService.BADGE_CHECK_JOB, user_id=current_user["id"])
         except Exception:
             # 로깅 실패는 무시 (테이블이 아직 없을 수 있음)
             pass
@@ -6,11 +6,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional, Dict, List
 from datetime import datetime, timedelta
+from functools import lru_cache
 from redis import Redis
 import logging
 import json
 
 from app.core.deps import get_current_user, get_redis_client, get_supabase
+from app.core.db import run_query
+from app.services.ai_quota import AI_MODEL_IDS, UNLIMITED, get_quota, reserve_quota
 from app.schemas.subscription import (
     PlanType,
     AIModelType,
@@ -27,22 +30,63 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_usage_key(user_id: str, model_id: str, date: str) -> str:
-    """사용량 Redis 키 생성"""
-    return f"usage:{user_id}:{model_id}:{date}"
+async def _load_subscription(supabase, user_id: str) -> Dict:
+    """
+    활성 구독 조회 (만료 확인 + 추가 도우미 여부)
+    
+    Returns:
+        {"plan_type": PlanType, "is_active": bool, "expires_at": str | None, "addon_active": bool}
+    """
+    subscription = {
+        "plan_type": PlanType.FREE,
+        "is_active": True,
+        "expires_at": None,
+        "addon_active": False,
+    }
+    
+    try:
+        if supabase:
+            result = await run_query(supabase.table("subscriptions").select("*").eq(
+                "user_id", user_id
+            ).eq("is_active", True).order("created_at", desc=True).limit(1))
+            
+            if result.data and len(result.data) > 0:
+                sub = result.data[0]
+                subscription["plan_type"] = PlanType(sub.get("plan_type", "free"))
+                subscription["is_active"] = sub.get("is_active", True)
+                expires_at = subscription["expires_at"] = sub.get("expires_at")
+                
+                # 만료 확인
+                if expires_at:
+                    exp_date = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+                    if exp_date < datetime.utcnow().replace(tzinfo=exp_date.tzinfo):
+                        subscription["plan_type"] = PlanType.FREE
+                        subscription["is_active"] = False
+            
+            # 추가 도우미 확인
+            addon_result = await run_query(supabase.table("subscriptions").select("id").eq(
+                "user_id", user_id
+            ).eq("plan_type", "addon").eq("is_active", True))
+            subscription["addon_active"] = len(addon_result.data) > 0 if addon_result.data else False
+    except Exception as e:
+        logger.warning(f"Supabase query failed: {e}")
+    
+    return subscription
 
 
-def get_today() -> str:
-    """오늘 날짜 문자열"""
-    return datetime.utcnow().strftime("%Y-%m-%d")
+def _effective_limits(plan_type: PlanType, addon_active: bool) -> Dict[str, int]:
+    """플랜 한도 + 추가 도우미 한도"""
+    limits = PLAN_LIMITS.get(plan_type.value, PLAN_LIMITS["free"]).copy()
+    if addon_active:
+        for model_id, addon_count in PLAN_LIMITS["addon"].items():
+            limits[model_id] = limits.get(model_id, 0) + addon_count
+    return limits
 
 
-@router.get("/plans")
-async def get_plans():
+@lru_cache(maxsize=1)
+def _build_plans_response() -> Dict:
     """
-    사용 가능한 플랜 목록 조회
-    
-    모든 구독 플랜 정보와 가격, 기능을 반환합니다.
+    플랜 목록 응답 생성 (PLAN_INFO/PLAN_LIMITS는 정적이므로 프로세스당 1회만 계산)
     """
     plans = []
     for plan_type, info in PLAN_INFO.items():
@@ -69,6 +113,16 @@ async def get_plans():
     }
 
 
+@router.get("/plans")
+async def get_plans():
+    """
+    사용 가능한 플랜 목록 조회
+    
+    모든 구독 플랜 정보와 가격, 기능을 반환합니다.
+    """
+    return _build_plans_response()
+
+
 @router.get("/me")
 async def get_my_subscription(
     current_user: dict = Depends(get_current_user),
@@ -81,69 +135,25 @@ async def get_my_subscription(
     현재 플랜, 사용량, 남은 횟수 등을 반환합니다.
     """
     user_id = current_user["id"]
-    today = get_today()
     
     # Supabase에서 구독 정보 조회
-    plan_type = PlanType.FREE
-    is_active = True
-    expires_at = None
-    addon_active = False
+    subscription = await _load_subscription(supabase, user_id)
+    plan_type = subscription["plan_type"]
     
-    try:
-        if supabase:
-            result = supabase.table("subscriptions").select("*").eq(
-                "user_id", user_id
-            ).eq("is_active", True).order("created_at", desc=True).limit(1).execute()
-            
-            if result.data and len(result.data) > 0:
-                sub = result.data[0]
-                plan_type = PlanType(sub.get("plan_type", "free"))
-                is_active = sub.get("is_active", True)
-                expires_at = sub.get("expires_at")
-                
-                # 만료 확인
-                if expires_at:
-                    exp_date = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
-                    if exp_date < datetime.utcnow().replace(tzinfo=exp_date.tzinfo):
-                        plan_type = PlanType.FREE
-                        is_active = False
-            
-            # 추가 도우미 확인
-            addon_result = supabase.table("subscriptions").select("*").eq(
-                "user_id", user_id
-            ).eq("plan_type", "addon").eq("is_active", True).execute()
-            addon_active = len(addon_result.data) > 0 if addon_result.data else False
-    except Exception as e:
-        logger.warning(f"Supabase query failed: {e}")
-    
-    # 플랜 정보
+    # 플랜 정보 + 한도 (추가 도우미 적용)
     plan_info = PLAN_INFO.get(plan_type.value, PLAN_INFO["free"])
-    limits = PLAN_LIMITS.get(plan_type.value, PLAN_LIMITS["free"]).copy()
-    
-    # 추가 도우미 적용
-    if addon_active:
-        addon_limits = PLAN_LIMITS["addon"]
-        for model_id, addon_count in addon_limits.items():
-            limits[model_id] = limits.get(model_id, 0) + addon_count
-    
-    # Redis에서 오늘 사용량 조회
+    limits = _effective_limits(plan_type, subscription["addon_active"])
+            
+    # 오늘 사용량 (모델 5개를 Redis 1회로 조회)
+    quota = get_quota(redis, user_id, limits)
     usage: Dict[str, UsageSummary] = {}
-    for model_id in ["quick", "allround", "writer", "expert", "genius"]:
-        used_count = 0
-        if redis:
-            try:
-                key = get_usage_key(user_id, model_id, today)
-                count = redis.get(key)
-                used_count = int(count) if count else 0
-            except Exception as e:
-                logger.warning(f"Redis usage query failed: {e}")
-        
+    for model_id in AI_MODEL_IDS:
         limit = limits.get(model_id, 0)
         usage[model_id] = UsageSummary(
             model_id=model_id,
-            used_count=used_count,
+            used_count=quota.used.get(model_id, 0),
             limit=limit,
-            remaining=max(0, limit - used_count),
+            remaining=quota.remaining(model_id),
         )
     
     # 특수 기능 활성화 여부
@@ -157,8 +167,8 @@ async def get_my_subscription(
             plan_name=plan_info["name"],
             plan_price=plan_info["price"],
             plan_features=plan_info["features"],
-            is_active=is_active,
-            expires_at=expires_at,
+            is_active=subscription["is_active"],
+            expires_at=subscription["expires_at"],
             usage={k: v.model_dump() for k, v in usage.items()},
             can_use_fintech=can_use_fintech,
             can_use_coaching=can_use_coaching,
@@ -179,50 +189,16 @@ async def check_usage(
     사용 전 호출하여 남은 횟수를 확인합니다.
     """
     user_id = current_user["id"]
-    today = get_today()
-    
-    # 플랜 조회
-    plan_type = PlanType.FREE
-    addon_active = False
-    
-    try:
-        if supabase:
-            result = supabase.table("subscriptions").select("plan_type").eq(
-                "user_id", user_id
-            ).eq("is_active", True).order("created_at", desc=True).limit(1).execute()
-            
-            if result.data and len(result.data) > 0:
-                plan_type = PlanType(result.data[0].get("plan_type", "free"))
-            
-            # 추가 도우미 확인
-            addon_result = supabase.table("subscriptions").select("id").eq(
-                "user_id", user_id
-            ).eq("plan_type", "addon").eq("is_active", True).execute()
-            addon_active = len(addon_result.data) > 0 if addon_result.data else False
-    except Exception as e:
-        logger.warning(f"Supabase query failed: {e}")
-    
-    # 제한 계산
-    limits = PLAN_LIMITS.get(plan_type.value, PLAN_LIMITS["free"]).copy()
-    if addon_active:
-        addon_limits = PLAN_LIMITS["addon"]
-        for mid, addon_count in addon_limits.items():
-            limits[mid] = limits.get(mid, 0) + addon_count
     
+    # 플랜 조회 + 제한 계산
+    subscription = await _load_subscription(supabase, user_id)
+    limits = _effective_limits(subscription["plan_type"], subscription["addon_active"])
     limit = limits.get(model_id, 0)
     
     # 사용량 조회
-    used_count = 0
-    if redis:
-        try:
-            key = get_usage_key(user_id, model_id, today)
-            count = redis.get(key)
-            used_count = int(count) if count else 0
-        except Exception as e:
-            logger.warning(f"Redis query failed: {e}")
-    
-    can_use = used_count < limit
-    remaining = max(0, limit - used_count)
+    quota = get_quota(redis, user_id, limits)
+    can_use = quota.used.get(model_id, 0) < limit
+    remaining = quota.remaining(model_id)
     
     if not can_use:
         return {
@@ -257,32 +233,15 @@ async def record_usage(
     AI 호출 성공 후 사용량을 기록합니다.
     """
     user_id = current_user["id"]
-    today = get_today()
     
-    if redis:
-        try:
-            key = get_usage_key(user_id, model_id, today)
-            pipe = redis.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, 86400 * 2)  # 2일 후 만료
-            result = pipe.execute()
-            new_count = result[0]
-            
-            return {
-                "ok": True,
-                "data": {
-                    "model_id": model_id,
-                    "used_count": new_count,
-                }
-            }
-        except Exception as e:
-            logger.error(f"Redis usage record failed: {e}")
+    # 클라이언트가 AI 호출 후 기록하는 경로라 한도와 관계없이 1회 증가 (/chat/send는 서버에서 차감)
+    quota = reserve_quota(redis, user_id, model_id, {model_id: UNLIMITED})
     
     return {
         "ok": True,
         "data": {
             "model_id": model_id,
-            "used_count": 1,
+            "used_count": max(quota.used.get(model_id, 0), 1),  # Redis 없으면 1
         }
     }
 
@@ -312,20 +271,20 @@ async def upgrade_plan(
     
     try:
         # 기존 구독 비활성화
-        supabase.table("subscriptions").update({
+        await run_query(supabase.table("subscriptions").update({
             "is_active": False,
             "updated_at": datetime.utcnow().isoformat()
-        }).eq("user_id", user_id).eq("is_active", True).neq("plan_type", "addon").execute()
+        }).eq("user_id", user_id).eq("is_active", True).neq("plan_type", "addon"))
         
         # 새 구독 생성
         expires_at = datetime.utcnow() + timedelta(days=30)
-        result = supabase.table("subscriptions").insert({
+        result = await run_query(supabase.table("subscriptions").insert({
             "user_id": user_id,
             "plan_type": plan_type.value,
             "is_active": True,
             "starts_at": datetime.utcnow().isoformat(),
             "expires_at": expires_at.isoformat(),
-        }).execute()
+        }))
         
         plan_info = PLAN_INFO.get(plan_type.value, PLAN_INFO["free"])
         
@@ -372,20 +331,20 @@ async def purchase_addon(
     
     try:
         # 기존 추가 도우미 비활성화
-        supabase.table("subscriptions").update({
+        await run_query(supabase.table("subscriptions").update({
             "is_active": False,
             "updated_at": datetime.utcnow().isoformat()
-        }).eq("user_id", user_id).eq("plan_type", "addon").eq("is_active", True).execute()
+        }).eq("user_id", user_id).eq("plan_type", "addon").eq("is_active", True))
         
         # 새 추가 도우미 생성
         expires_at = datetime.utcnow() + timedelta(days=30)
-        result = supabase.table("subscriptions").insert({
+        result = await run_query(supabase.table("subscriptions").insert({
             "user_id": user_id,
             "plan_type": "addon",
             "is_active": True,
             "starts_at": datetime.utcnow().isoformat(),
             "expires_at": expires_at.isoformat(),
-        }).execute()
+        }))
         
         return {
             "ok": True,
@@ -6,6 +6,7 @@ from typing import Dict, Optional, List
 from datetime import datetime
 from supabase import Client
 from app.core.deps import get_current_user, get_supabase
+from app.core.db import run_query
 from app.schemas.todo import (
     TodoCreateRequest,
     TodoUpdateRequest,
@@ -62,7 +63,7 @@ async def get_todos(
             query = query.eq('is_completed', True)
         
         # 정렬: 미완료 먼저, 그 다음 마감일 순, 생성일 순
-        result = query.order('is_completed').order('due_date', nullsfirst=False).order('created_at', desc=True).execute()
+        result = await run_query(query.order('is_completed').order('due_date', nullsfirst=False).order('created_at', desc=True))
         
         todos = [_format_todo(r) for r in (result.data or [])]
         
@@ -73,7 +74,7 @@ async def get_todos(
         
         # 필터가 all이 아니면 전체 카운트 별도 조회
         if filter != 'all':
-            all_result = db.table('todo_items').select('id, is_completed').eq('user_id', user_id).execute()
+            all_result = await run_query(db.table('todo_items').select('id, is_completed').eq('user_id', user_id))
             all_todos = all_result.data or []
             total_count = len(all_todos)
             pending_count = len([t for t in all_todos if not t['is_completed']])
@@ -113,7 +114,7 @@ async def get_todo(
         { "ok": true, "data": { "todo": {...} } }
     """
     try:
-        result = db.table('todo_items').select('*').eq('id', todo_id).eq('user_id', user_id).single().execute()
+        result = await run_query(db.table('todo_items').select('*').eq('id', todo_id).eq('user_id', user_id).single())
         
         if not result.data:
             raise HTTPException(status_code=404, detail={
@@ -172,7 +173,7 @@ async def create_todo(
         if request.reminder_time:
             insert_data['reminder_time'] = request.reminder_time.isoformat()
         
-        result = db.table('todo_items').insert(insert_data).execute()
+        result = await run_query(db.table('todo_items').insert(insert_data))
         
         if not result.data:
             raise Exception("INSERT 실패")
@@ -237,7 +238,7 @@ async def update_todo(
             })
         
         # 본인 소유 확인 + 업데이트
-        result = db.table('todo_items').update(update_data).eq('id', todo_id).eq('user_id', user_id).execute()
+        result = await run_query(db.table('todo_items').update(update_data).eq('id', todo_id).eq('user_id', user_id))
         
         if not result.data:
             raise HTTPException(status_code=404, detail={
@@ -288,9 +289,9 @@ async def toggle_todo(
     """
     try:
         # 본인 소유 확인 + 업데이트
-        result = db.table('todo_items').update({
+        result = await run_query(db.table('todo_items').update({
             'is_completed': request.is_completed
-        }).eq('id', todo_id).eq('user_id', user_id).execute()
+        }).eq('id', todo_id).eq('user_id', user_id))
         
         if not result.data:
             raise HTTPException(status_code=404, detail={
@@ -348,7 +349,7 @@ async def update_reminder(
             'notification_sent': False,  # 알림 시간 변경 시 재발송 가능하도록
         }
         
-        result = db.table('todo_items').update(update_data).eq('id', todo_id).eq('user_id', user_id).execute()
+        result = await run_query(db.table('todo_items').update(update_data).eq('id', todo_id).eq('user_id', user_id))
         
         if not result.data:
             raise HTTPException(status_code=404, detail={
@@ -400,7 +401,7 @@ async def delete_todo(
     """
     try:
         # 본인 소유 확인 + 삭제
-        result = db.table('todo_items').delete().eq('id', todo_id).eq('user_id', user_id).execute()
+        result = await run_query(db.table('todo_items').delete().eq('id', todo_id).eq('user_id', user_id))
         
         if not result.data:
             raise HTTPException(status_code=404, detail={
@@ -454,7 +455,7 @@ async def get_upcoming_reminders(
         now = datetime.now()
         end_time = now + timedelta(hours=hours)
         
-        result = db.table('todo_items').select('*').eq('user_id', user_id).eq('is_completed', False).gte('reminder_time', now.isoformat()).lte('reminder_time', end_time.isoformat()).order('reminder_time').execute()
+        result = await run_query(db.table('todo_items').select('*').eq('user_id', user_id).eq('is_completed', False).gte('reminder_time', now.isoformat()).lte('reminder_time', end_time.isoformat()).order('reminder_time'))
         
         todos = [_format_todo(r) for r in (result.data or [])]
         
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List, Literal
 
 from app.core.deps import get_current_user, get_supabase, get_gamification_service
+from app.core.db import run_query
 from app.services.gamification import GamificationService
 
 router = APIRouter()
@@ -84,12 +85,11 @@ async def get_tool_progress(
 
         # DB에서 진행 상황 조회
         try:
-            result = (
+            result = await run_query(
                 supabase.table("tools_progress")
                 .select("step, status")
                 .eq("user_id", current_user["id"])
                 .eq("tool", tool)
-                .execute()
             )
             progress_map = {row["step"]: row["status"] for row in result.data}
         except Exception:
@@ -164,14 +164,14 @@ async def update_tool_progress(
 
         # Upsert 진행 상황
         try:
-            supabase.table("tools_progress").upsert(
+            await run_query(supabase.table("tools_progress").upsert(
                 {
                     "user_id": current_user["id"],
                     "tool": body.tool,
                     "step": body.step,
                     "status": body.status,
                 }
-            ).execute()
+            ))
         except Exception:
             # 테이블이 없으면 무시 (나중에 생성될 예정)
             pass
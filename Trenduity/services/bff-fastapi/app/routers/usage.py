@@ -5,6 +5,7 @@ from typing import Optional
 import logging
 
 from app.core.deps import get_current_user, get_supabase
+from app.core.db import run_query
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -59,13 +60,12 @@ async def get_usage_stats(
 
         # 1. 권한 확인 (가족 링크 존재 여부)
         try:
-            link = (
+            link = await run_query(
                 supabase.table("family_links")
                 .select("perms")
                 .eq("guardian_id", guardian_id)
                 .eq("user_id", user_id)
                 .single()
-                .execute()
             )
 
             if not link.data:
@@ -114,13 +114,12 @@ async def get_usage_stats(
 
         # 3. 통계 조회
         try:
-            stats_result = (
+            stats_result = await run_query(
                 supabase.table("usage_counters")
                 .select("*")
                 .eq("user_id", user_id)
                 .eq("month", month)
                 .single()
-                .execute()
             )
 
             if stats_result.data:
@@ -227,13 +226,12 @@ async def get_usage_history(
 
         # 1. 권한 확인
         try:
-            link = (
+            link = await run_query(
                 supabase.table("family_links")
                 .select("perms")
                 .eq("guardian_id", guardian_id)
                 .eq("user_id", user_id)
                 .single()
-                .execute()
             )
 
             if not link.data or not link.data.get("perms", {}).get("read", False):
@@ -278,13 +276,12 @@ async def get_usage_history(
 
         # 3. 모든 월의 통계 조회 (한 번에)
         try:
-            stats_result = (
+            stats_result = await run_query(
                 supabase.table("usage_counters")
                 .select("*")
                 .eq("user_id", user_id)
                 .in_("month", month_list)
                 .order("month", desc=True)
-                .execute()
             )
 
             stats_dict = {row["month"]: row for row in stats_result.data or []}
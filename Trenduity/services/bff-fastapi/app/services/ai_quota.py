@@ -0,0 +1,183 @@
+"""
+AI 일일 사용량 (쿼터)
+
+사용자별 하루 사용량을 Redis 해시 하나(ai_quota:{user_id}:{날짜}, 필드 = 모델 ID)에 두고,
+확인 + 차감(예약) + 환불을 Lua 스크립트 한 번으로 원자적으로 처리합니다.
+- 동시 요청이 한도를 넘겨 사용하지 않음 (GET 후 INCR 사이 경쟁 없음)
+- 요청당 Redis 왕복 1회 (LLM 호출 실패 시 환불 1회)
+- 결과에 5개 모델 전체 사용량이 함께 와서 남은 횟수 조회도 1회
+
+한도(limits)는 호출자가 플랜에 맞게 넘깁니다 ({모델 ID: 하루 한도}, -1은 무제한, 없으면 0).
+
+이전 카운터(/chat의 ai_usage:{user_id}:{모델}:{날짜}, /subscriptions의 usage:{user_id}:{모델}:{UTC 날짜})에서
+옮겨올 때 그날 사용량이 초기화되지 않도록, 오늘 해시가 아직 없으면 스크립트가 첫 접근 때
+모델별로 두 카운터 중 큰 값으로 채웁니다 (두 카운터는 같은 메시지를 각각 셌을 수 있어 합치지 않음).
+이전 키는 하루짜리라 배포 다음 날부터는 읽을 값이 없습니다.
+Redis를 쓸 수 없으면 플랜에서 쓸 수 있는 모델(한도 0 아님)은 허용합니다 (기존 동작과 동일).
+
+사용법:
+    quota = reserve_quota(redis, user_id, "allround", limits)
+    if not quota.allowed:
+        ...  # 한도 초과
+    try:
+        ...  # LLM 호출
+    except Exception:
+        refund_quota(redis, user_id, "allround")
+"""
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Mapping, NamedTuple, Optional
+
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+AI_MODEL_IDS = ("quick", "allround", "writer", "expert", "genius")
+UNLIMITED = -1
+QUOTA_KEY_PREFIX = "ai_quota:"
+QUOTA_KEY_TTL = 86400 * 2  # 2일 후 만료
+# 해시 도입 전 일일 카운터 (/chat, /subscriptions) - 오늘 해시가 없을 때 한 번 옮겨 옴
+LEGACY_CHAT_KEY_PREFIX = "ai_usage:"
+LEGACY_SUBSCRIPTION_KEY_PREFIX = "usage:"
+
+# KEYS[1]: 사용자 일일 사용량 해시
+# KEYS[2..]: 모델별 이전 카운터 쌍 (ARGV 모델 순서, 모델마다 ai_usage: / usage: 키)
+# ARGV[1]: reserve(확인 + 차감) | refund(환불) | peek(조회), ARGV[2]: 대상 모델, ARGV[3]: TTL(초)
+# ARGV[4..]: 모델, 한도 쌍 (-1은 무제한)
+# 반환: {허용 여부(1/0), 모델별 사용량...} (ARGV 모델 순서)
+QUOTA_SCRIPT = """
+local op = ARGV[1]
+local target = ARGV[2]
+local allowed = 1
+
+if #KEYS > 1 and redis.call("EXISTS", KEYS[1]) == 0 then
+    local seeded = false
+    for i = 4, #ARGV, 2 do
+        local n = i - 2
+        local chat = tonumber(redis.call("GET", KEYS[n]) or "0") or 0
+        local subscription = tonumber(redis.call("GET", KEYS[n + 1]) or "0") or 0
+        local used = math.max(chat, subscription)
+        if used > 0 then
+            redis.call("HSET", KEYS[1], ARGV[i], used)
+            seeded = true
+        end
+    end
+    if seeded then
+        redis.call("EXPIRE", KEYS[1], ARGV[3])
+    end
+end
+
+if op == "reserve" then
+    local limit = 0
+    for i = 4, #ARGV, 2 do
+        if ARGV[i] == target then
+            limit = tonumber(ARGV[i + 1])
+        end
+    end
+    local used = tonumber(redis.call("HGET", KEYS[1], target) or "0")
+    if limit >= 0 and used >= limit then
+        allowed = 0
+    else
+        redis.call("HINCRBY", KEYS[1], target, 1)
+        redis.call("EXPIRE", KEYS[1], ARGV[3])
+    end
+elseif op == "refund" then
+    local used = tonumber(redis.call("HGET", KEYS[1], target) or "0")
+    if used > 0 then
+        redis.call("HINCRBY", KEYS[1], target, -1)
+    end
+end
+
+local result = {allowed}
+for i = 4, #ARGV, 2 do
+    result[#result + 1] = tonumber(redis.call("HGET", KEYS[1], ARGV[i]) or "0")
+end
+return result
+"""
+
+
+class QuotaStatus(NamedTuple):
+    """쿼터 스크립트 결과"""
+    allowed: bool
+    used: Dict[str, int]  # 모델별 오늘 사용량
+    limits: Dict[str, int]
+
+    def remaining(self, model_id: str) -> int:
+        """남은 횟수 (무제한은 -1)"""
+        limit = self.limits.get(model_id, 0)
+        if limit == UNLIMITED:
+            return UNLIMITED
+        return max(0, limit - self.used.get(model_id, 0))
+
+    def all_remaining(self) -> Dict[str, int]:
+        return {model_id: self.remaining(model_id) for model_id in self.limits}
+
+
+def quota_key(user_id: str, day: Optional[date] = None) -> str:
+    """사용자 일일 사용량 해시 키"""
+    return f"{QUOTA_KEY_PREFIX}{user_id}:{(day or date.today()).isoformat()}"
+
+
+def legacy_usage_keys(user_id: str, model_ids) -> List[str]:
+    """모델별 이전 일일 카운터 키 쌍 (/chat은 로컬 날짜, /subscriptions는 UTC 날짜였음)"""
+    today = date.today().isoformat()
+    utc_today = datetime.utcnow().strftime("%Y-%m-%d")
+    keys = []
+    for model_id in model_ids:
+        keys.append(f"{LEGACY_CHAT_KEY_PREFIX}{user_id}:{model_id}:{today}")
+        keys.append(f"{LEGACY_SUBSCRIPTION_KEY_PREFIX}{user_id}:{model_id}:{utc_today}")
+    return keys
+
+
+def _full_limits(limits: Mapping[str, int]) -> Dict[str, int]:
+    """5개 모델 전체 한도 (지정 안 된 모델은 0)"""
+    full = {model_id: 0 for model_id in AI_MODEL_IDS}
+    full.update(limits)
+    return full
+
+
+def _run(
+    redis: Optional[Redis],
+    op: str,
+    user_id: str,
+    model_id: str,
+    limits: Mapping[str, int],
+) -> QuotaStatus:
+    limits = _full_limits(limits)
+    # Redis 없이도 플랜에서 쓸 수 없는 모델(한도 0)은 막음
+    fallback = QuotaStatus(op != "reserve" or limits.get(model_id, 0) != 0, {mid: 0 for mid in limits}, limits)
+    if not redis:
+        return fallback
+
+    args = [op, model_id, QUOTA_KEY_TTL]
+    for mid, limit in limits.items():
+        args.extend([mid, int(limit)])
+
+    try:
+        keys = [quota_key(user_id), *legacy_usage_keys(user_id, limits)]
+        result = redis.eval(QUOTA_SCRIPT, len(keys), *keys, *args)
+        used = {mid: int(count) for mid, count in zip(limits, result[1:])}
+        return QuotaStatus(bool(int(result[0])), used, limits)
+    except Exception as e:
+        logger.warning(f"AI quota {op} failed: {e}")
+        return fallback
+
+
+def reserve_quota(redis: Optional[Redis], user_id: str, model_id: str, limits: Mapping[str, int]) -> QuotaStatus:
+    """한도 안이면 1회 차감 (한도 초과면 차감하지 않고 allowed=False)"""
+    return _run(redis, "reserve", user_id, model_id, limits)
+
+
+def refund_quota(
+    redis: Optional[Redis],
+    user_id: str,
+    model_id: str,
+    limits: Optional[Mapping[str, int]] = None,
+) -> QuotaStatus:
+    """예약한 1회 환불 (LLM 호출 실패 등, limits는 결과의 남은 횟수 계산용)"""
+    return _run(redis, "refund", user_id, model_id, limits or {})
+
+
+def get_quota(redis: Optional[Redis], user_id: str, limits: Mapping[str, int]) -> QuotaStatus:
+    """전체 모델 사용량/남은 횟수 조회 (차감 없음)"""
+    return _run(redis, "peek", user_id, "", limits)
@@ -0,0 +1,315 @@
+"""
+AI 응답 캐시
+
+시니어들이 같은 질문("카카오톡 사진 보내는 법", "스미싱이 뭐예요")을 반복해서 하므로,
+같은 모델/시스템 프롬프트에 같은 질문이 오면 LLM을 다시 호출하지 않고 저장된 답변을 돌려줍니다.
+
+- 정확 일치: (범위, 모델, 시스템 프롬프트, 정규화된 질문) 해시 키 → app.utils.cache (L1 + Redis)
+- 유사 질문: 자모 n-gram 유사도 인덱스 (프로세스 메모리, AI_CACHE_SIMILARITY_ENABLED)
+- 정규화: 유니코드 NFKC + 소문자 + 공백/문장부호/이모지 제거 ("보내는 법?" == "보내는법")
+- 이전 대화가 있는 요청은 답변이 문맥에 따라 달라지므로 캐시하지 않습니다.
+- 캐시 응답은 LLM 호출이 없으므로 일일 사용량(PLAN_AI_LIMITS)에 포함하지 않습니다 (라우터에서 처리).
+
+사용법:
+    scope = response_scope("chat", model_id, model_config["model"])
+    hit = lookup_response(redis, scope, system_prompt, message, history)
+    if hit:
+        return hit.text
+    ...
+    store_response(redis, scope, system_prompt, message, history, result.text, result.model, result.tokens)
+"""
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Sequence, Set, Tuple
+
+from redis import Redis
+
+from app.core.config import settings
+from app.utils.cache import get_cached, set_cached
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ai_cache"
+NGRAM_SIZE = 2  # 한글은 띄어쓰기가 들쭉날쭉해서 공백 없는 문자 2-gram 사용
+
+_STRIP_PATTERN = re.compile(r"[\W_]+")
+_DIGITS_PATTERN = re.compile(r"\d+")
+
+
+class CachedAnswer(NamedTuple):
+    """캐시된 답변"""
+    text: str
+    model: str
+    tokens: Optional[int]
+    similarity: float  # 정확 일치면 1.0
+
+
+def normalize_prompt(text: str) -> str:
+    """질문 정규화 (NFKC, 소문자, 공백/문장부호/이모지 제거)"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _STRIP_PATTERN.sub("", text)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def disabled_models() -> Set[str]:
+    """캐시하지 않는 모델 ID (AI_CACHE_DISABLED_MODELS)"""
+    return {m.strip() for m in settings.AI_CACHE_DISABLED_MODELS.split(",") if m.strip()}
+
+
+def response_scope(endpoint: str, model_id: str, model: str) -> Optional[str]:
+    """
+    캐시 범위 (엔드포인트 + 모델 ID + 실제 모델명)
+
+    모델 설정이 바뀌면 범위도 바뀌어 이전 답변을 쓰지 않습니다.
+    캐시를 끈 모델이면 None.
+    """
+    if not settings.AI_CACHE_ENABLED or model_id in disabled_models():
+        return None
+    return f"{endpoint}:{model_id}:{model}"
+
+
+# ==================== 유사 질문 인덱스 ====================
+
+def _ngrams(text: str) -> FrozenSet[str]:
+    if len(text) <= NGRAM_SIZE:
+        return frozenset([text])
+    return frozenset(text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1))
+
+
+def _jamo_ngrams(text: str) -> FrozenSet[str]:
+    """자모 단위 n-gram ("뭐예요"/"뭐에요", "카톡"/"카톡으로" 같은 작은 차이에 덜 민감)"""
+    return _ngrams(unicodedata.normalize("NFD", text))
+
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class NgramIndex:
+    """
+    정규화된 질문의 n-gram 역색인 (프로세스 메모리, LRU)
+
+    버킷(범위 + 시스템 프롬프트)별로 질문을 모아 두고, 새 질문과 음절 n-gram을 하나라도
+    공유하는 후보만 자모 n-gram Dice 유사도로 비교합니다.
+    숫자가 다른 질문("112" vs "119")은 같은 질문으로 보지 않습니다.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # (버킷, 질문) → (음절 n-gram, 자모 n-gram)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[FrozenSet[str], FrozenSet[str]]]" = OrderedDict()
+        self._postings: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, bucket: str, prompt: str) -> None:
+        with self._lock:
+            key = (bucket, prompt)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+
+            grams = _ngrams(prompt)
+            self._entries[key] = (grams, _jamo_ngrams(prompt))
+            for gram in grams:
+                self._postings[(bucket, gram)].add(prompt)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, bucket: str, prompt: str) -> None:
+        with self._lock:
+            if (bucket, prompt) in self._entries:
+                self._remove((bucket, prompt))
+
+    def find(self, bucket: str, prompt: str, threshold: float) -> Optional[Tuple[str, float]]:
+        """가장 비슷한 질문과 유사도 (threshold 미만이면 None)"""
+        jamo = _jamo_ngrams(prompt)
+        digits = _DIGITS_PATTERN.findall(prompt)
+
+        with self._lock:
+            candidates: Set[str] = set()
+            for gram in _ngrams(prompt):
+                candidates.update(self._postings.get((bucket, gram), ()))
+
+            best: Optional[Tuple[str, float]] = None
+            for candidate in candidates:
+                score = _dice(jamo, self._entries[(bucket, candidate)][1])
+                if score < threshold or (best and score <= best[1]):
+                    continue
+                if _DIGITS_PATTERN.findall(candidate) != digits:
+                    continue
+                best = (candidate, score)
+
+            if best:
+                self._entries.move_to_end((bucket, best[0]))
+            return best
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        bucket, prompt = key
+        grams, _ = self._entries.pop(key)
+        for gram in grams:
+            posting = self._postings.get((bucket, gram))
+            if posting is None:
+                continue
+            posting.discard(prompt)
+            if not posting:
+                del self._postings[(bucket, gram)]
+
+
+# ==================== 지표 ====================
+
+class ResponseCacheStats:
+    """응답 캐시 히트/미스, 절약 토큰"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.saved_tokens = 0
+
+    def record_hit(self, similar: bool, tokens: Optional[int]) -> None:
+        with self._lock:
+            if similar:
+                self.similar_hits += 1
+            else:
+                self.exact_hits += 1
+            self.saved_tokens += tokens or 0
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def record_store(self) -> None:
+        with self._lock:
+            self.stores += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            total = hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / total, 4) if total else 0.0,
+                "stores": self.stores,
+                "saved_tokens": self.saved_tokens,
+            }
+
+
+similarity_index = NgramIndex(settings.AI_CACHE_INDEX_MAX_ENTRIES)
+response_cache_stats = ResponseCacheStats()
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """히트율, 절약 토큰, 유사 질문 인덱스 크기"""
+    return {**response_cache_stats.snapshot(), "index_entries": len(similarity_index)}
+
+
+# ==================== 조회/저장 ====================
+
+def _cacheable_prompt(prompt: str, history: Sequence[Any]) -> Optional[str]:
+    """캐시 대상이면 정규화된 질문, 아니면 None"""
+    if history or len(prompt) > settings.AI_CACHE_MAX_PROMPT_CHARS:
+        return None
+    return normalize_prompt(prompt) or None
+
+
+def _bucket(scope: str, system_prompt: Optional[str]) -> str:
+    return f"{scope}:{_digest(system_prompt or '')}"
+
+
+def _entry_key(bucket: str, normalized: str) -> str:
+    return f"{KEY_PREFIX}:{bucket}:{_digest(normalized)}"
+
+
+def lookup_response(
+    redis: Optional[Redis],
+    scope: Optional[str],
+    system_prompt: Optional[str],
+    prompt: str,
+    history: Sequence[Any] = (),
+) -> Optional[CachedAnswer]:
+    """
+    캐시된 답변 조회 (정확 일치 → 유사 질문 순서)
+
+    Args:
+        scope: response_scope() 결과 (None이면 조회하지 않음)
+        history: 이전 대화 (있으면 조회하지 않음)
+    """
+    normalized = _cacheable_prompt(prompt, history) if scope else None
+    if normalized is None:
+        return None
+
+    bucket = _bucket(scope, system_prompt)
+    entry = get_cached(redis, _entry_key(bucket, normalized))
+    similarity = 1.0
+
+    if entry is not None and settings.AI_CACHE_SIMILARITY_ENABLED:
+        # 다른 워커가 저장한 답변도 이 워커의 유사 질문 인덱스에 등록
+        similarity_index.add(bucket, normalized)
+    elif entry is None and settings.AI_CACHE_SIMILARITY_ENABLED:
+        match = similarity_index.find(bucket, normalized, settings.AI_CACHE_SIMILARITY_THRESHOLD)
+        if match:
+            matched, similarity = match
+            entry = get_cached(redis, _entry_key(bucket, matched))
+            if entry is None:
+                # 만료된 답변은 인덱스에서도 제거
+                similarity_index.discard(bucket, matched)
+
+    if entry is None:
+        response_cache_stats.record_miss()
+        return None
+
+    answer = CachedAnswer(entry["text"], entry["model"], entry.get("tokens"), similarity)
+    response_cache_stats.record_hit(similar=similarity < 1.0, tokens=answer.tokens)
+    logger.info(f"💾 AI cache HIT scope={scope} similarity={similarity:.2f} saved_tokens={answer.tokens or 0}")
+    return answer
+
+
+def store_response(
+    redis: Optional[Redis],
+    scope: Optional[str],
+    system_prompt: Optional[str],
+    prompt: str,
+    history: Sequence[Any],
+    text: str,
+    model: str,
+    tokens: Optional[int],
+) -> bool:
+    """LLM 답변 저장 (캐시 대상이 아니면 저장하지 않음)"""
+    normalized = _cacheable_prompt(prompt, history) if scope else None
+    if normalized is None or not text:
+        return False
+
+    bucket = _bucket(scope, system_prompt)
+    stored = set_cached(
+        redis,
+        _entry_key(bucket, normalized),
+        {"text": text, "model": model, "tokens": tokens},
+        ttl=settings.AI_CACHE_TTL,
+    )
+    if settings.AI_CACHE_SIMILARITY_ENABLED:
+        similarity_index.add(bucket, normalized)
+    response_cache_stats.record_store()
+    return stored
@@ -0,0 +1,302 @@
+"""
+가족 알림 실시간 푸시
+
+보호자 앱이 GET /v1/alerts 를 주기적으로 폴링하지 않도록, 새 알림을 연결된 클라이언트에 바로 내려보냅니다.
+- 발행: 알림을 DB에 기록한 쪽(API/작업 워커)이 publish_alerts() 호출
+  → Lua 스크립트 1회로 읽지 않은 알림 수 증가 + Redis 채널 alerts:user:{user_id} 에 PUBLISH
+- 수신: 워커마다 패턴 구독(alerts:user:*) 연결 1개 → 그 워커에 붙은 SSE 연결 큐로만 전달
+  (연결 수와 관계없이 워커당 Redis 연결 1개, 유휴 연결은 큐 하나만 차지)
+- 읽지 않은 알림 수: Redis 카운터 alerts:unread:{user_id} 를 증감으로 유지
+  (없으면 DB count 1회로 채움, 읽음 처리 시 감소 + 다른 기기에 unread 이벤트)
+
+메시지 형식 (SSE data):
+    {"event": "alert", "alert": {...}, "unread_count": 3}
+    {"event": "unread", "unread_count": 0}
+    {"event": "resync"}  # 연결 큐가 넘쳐 메시지를 버림 → REST since_id로 따라잡기
+
+Redis가 없으면 같은 워커의 연결에만 전달하고 unread_count는 null로 보냅니다.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from redis import Redis
+from supabase import Client
+
+from app.core.config import settings
+from app.core.db import run_query
+
+logger = logging.getLogger(__name__)
+
+
+ALERT_CHANNEL_PREFIX = "alerts:user:"
+UNREAD_KEY_PREFIX = "alerts:unread:"
+
+# 카운터가 있을 때만 증가 (없는 카운터를 1부터 시작하면 실제보다 작게 보임) + 같은 스크립트에서 PUBLISH
+# ARGV[1]은 unread_count 값 앞까지의 JSON (Lua에서 JSON을 다시 인코딩하지 않도록 이어 붙임)
+PUBLISH_ALERT_SCRIPT = """
+local unread = "null"
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    unread = redis.call("INCR", KEYS[1])
+    redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+redis.call("PUBLISH", KEYS[2], ARGV[1] .. unread .. "}")
+return unread == "null" and -1 or unread
+"""
+
+# 읽음 처리: 0 아래로 내려가지 않게 감소 + 다른 기기에 새 값 전달
+DECREMENT_UNREAD_SCRIPT = """
+local current = redis.call("GET", KEYS[1])
+if not current then
+    return -1
+end
+local unread = math.max(0, tonumber(current) - tonumber(ARGV[1]))
+redis.call("SET", KEYS[1], unread, "EX", ARGV[2])
+redis.call("PUBLISH", KEYS[2], '{"event":"unread","unread_count":' .. unread .. "}")
+return unread
+"""
+
+RESYNC_MESSAGE = {"event": "resync"}
+HEARTBEAT = None  # 큐에 넣는 keep-alive 신호
+HEARTBEAT_BATCH = 500
+
+
+def alert_channel(user_id: str) -> str:
+    """사용자 알림 채널"""
+    return f"{ALERT_CHANNEL_PREFIX}{user_id}"
+
+
+def unread_key(user_id: str) -> str:
+    """사용자 읽지 않은 알림 수 카운터 키"""
+    return f"{UNREAD_KEY_PREFIX}{user_id}"
+
+
+def format_alert(row: Dict[str, Any]) -> Dict[str, Any]:
+    """alerts 행 → API/푸시 공통 형식"""
+    return {
+        "id": row["id"],
+        "type": row["type"],
+        "title": row.get("title"),
+        "message": row["message"],
+        "timestamp": row.get("created_at"),
+        "is_read": bool(row.get("read")),
+    }
+
+
+class AlertHub:
+    """
+    워커별 알림 연결 관리 (사용자 → 연결 큐 목록)
+
+    구독 스레드에서 받은 메시지는 이벤트 루프로 넘겨 dispatch() 에서 처리합니다.
+    """
+
+    def __init__(self, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.ALERTS_STREAM_QUEUE_SIZE
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.resyncs = 0
+
+    @property
+    def connections(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        """연결 1개 등록 (같은 사용자의 여러 기기는 큐를 따로 가짐)"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def dispatch(self, user_id: str, message: Dict[str, Any]) -> int:
+        """이 워커에 연결된 사용자 큐에 메시지 전달 (전달한 연결 수)"""
+        queues = self._subscribers.get(user_id)
+        if not queues:
+            return 0
+        for queue in queues:
+            self._put(queue, message)
+        self.delivered += len(queues)
+        return len(queues)
+
+    def _put(self, queue: asyncio.Queue, message: Optional[Dict[str, Any]]) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # 못 따라오는 연결: 쌓인 메시지를 버리고 REST since_id로 따라잡게 함
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_MESSAGE)
+            self.resyncs += 1
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        """구독 스레드 콜백 → 이벤트 루프에서 전달"""
+        channel = message.get("channel")
+        data = message.get("data")
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        if not channel or not data or self._loop is None:
+            return
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            logger.warning(f"알림 메시지 형식 오류: {channel}")
+            return
+        user_id = channel[len(ALERT_CHANNEL_PREFIX):]
+        self._loop.call_soon_threadsafe(self.dispatch, user_id, payload)
+
+    async def send_heartbeats(self) -> int:
+        """비어 있는 연결 큐에 keep-alive 신호 (HEARTBEAT_BATCH개마다 이벤트 루프 양보)"""
+        sent = 0
+        for queues in list(self._subscribers.values()):
+            for queue in list(queues):
+                if queue.empty():
+                    queue.put_nowait(HEARTBEAT)
+                    sent += 1
+                    if sent % HEARTBEAT_BATCH == 0:
+                        await asyncio.sleep(0)
+        return sent
+
+    async def _heartbeat_loop(self) -> None:
+        """유휴 연결 keep-alive (연결마다 타이머를 두지 않고 주기마다 전체 큐에 신호)"""
+        while True:
+            await asyncio.sleep(settings.ALERTS_STREAM_HEARTBEAT)
+            await self.send_heartbeats()
+
+    def start(self, redis_client: Optional[Redis]) -> None:
+        """
+        패턴 구독 스레드 + keep-alive 태스크 시작
+        앱 시작 시(main.py lifespan에서) 호출
+        """
+        if not settings.ALERTS_STREAM_ENABLED:
+            return
+        self._loop = asyncio.get_running_loop()
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        if redis_client is None or self._thread is not None:
+            return
+
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(**{f"{ALERT_CHANNEL_PREFIX}*": self._on_message})
+            self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            logger.info(f"알림 푸시 구독 시작: {ALERT_CHANNEL_PREFIX}*")
+        except Exception as e:
+            logger.error(f"알림 푸시 구독 시작 실패: {e}")
+            self._thread = None
+
+    def stop(self) -> None:
+        """앱 종료 시(main.py에서) 호출"""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        if self._thread is not None:
+            try:
+                self._thread.stop()
+            except Exception as e:
+                logger.warning(f"알림 푸시 구독 종료 실패: {e}")
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._subscribers),
+            "connections": self.connections,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+            "listening": self._thread is not None,
+        }
+
+
+# 워커별 허브 (SSE 엔드포인트와 구독 스레드가 공유)
+alert_hub = AlertHub()
+
+
+def publish_alerts(redis: Optional[Redis], rows: Optional[List[Dict[str, Any]]]) -> int:
+    """
+    DB에 기록한 알림(INSERT 결과 행)을 수신자 연결로 발행 (파이프라인 1회 왕복)
+
+    Redis가 없거나 실패하면 이 워커의 연결에만 전달합니다.
+    Returns: 발행한 알림 수
+    """
+    if not isinstance(rows, list):
+        return 0  # INSERT 결과 행을 돌려받지 못함
+    alerts = [(row["user_id"], format_alert(row)) for row in rows if row.get("user_id")]
+    if not alerts:
+        return 0
+
+    if redis is not None:
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for user_id, alert in alerts:
+                prefix = json.dumps({"event": "alert", "alert": alert}, ensure_ascii=False)[:-1]
+                pipe.eval(
+                    PUBLISH_ALERT_SCRIPT, 2, unread_key(user_id), alert_channel(user_id),
+                    f'{prefix},"unread_count":', settings.ALERTS_UNREAD_TTL,
+                )
+            pipe.execute()
+            return len(alerts)
+        except Exception as e:
+            logger.warning(f"알림 발행 실패 - 이 워커 연결에만 전달: {e}")
+
+    for user_id, alert in alerts:
+        alert_hub.dispatch(user_id, {"event": "alert", "alert": alert, "unread_count": None})
+    return len(alerts)
+
+
+async def get_unread_count(db: Optional[Client], redis: Optional[Redis], user_id: str) -> int:
+    """읽지 않은 알림 수 (Redis 카운터, 없으면 DB count 후 채움)"""
+    if redis is not None:
+        try:
+            cached = redis.get(unread_key(user_id))
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"읽지 않은 알림 수 캐시 조회 실패: {e}")
+
+    if db is None:
+        return 0
+    result = await run_query(
+        db.table("alerts")
+        .select("id", count="exact")
+        .eq("user_id", user_id)
+        .eq("read", False)
+        .limit(1)
+    )
+    unread = result.count or 0
+
+    if redis is not None:
+        try:
+            # 그 사이 발행/읽음 처리로 생긴 카운터는 덮어쓰지 않음
+            redis.set(unread_key(user_id), unread, ex=settings.ALERTS_UNREAD_TTL, nx=True)
+        except Exception as e:
+            logger.warning(f"읽지 않은 알림 수 캐시 저장 실패: {e}")
+    return unread
+
+
+def mark_read(redis: Optional[Redis], user_id: str, count: int) -> Optional[int]:
+    """
+    읽음 처리한 알림 수만큼 카운터 감소 + 같은 사용자의 다른 연결에 새 값 전달
+
+    Returns: 새 unread 값 (카운터가 없으면 None)
+    """
+    if count <= 0 or redis is None:
+        return None
+    try:
+        unread = redis.eval(
+            DECREMENT_UNREAD_SCRIPT, 2, unread_key(user_id), alert_channel(user_id),
+            count, settings.ALERTS_UNREAD_TTL,
+        )
+    except Exception as e:
+        logger.warning(f"읽지 않은 알림 수 감소 실패: {e}")
+        return None
+    return None if int(unread) < 0 else int(unread)
+
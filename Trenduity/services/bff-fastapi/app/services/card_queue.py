@@ -0,0 +1,158 @@
+"""
+사용자별 다음 카드 큐
+
+오늘의 카드 조회 때마다 완료한 카드 ID 전체를 읽어 NOT IN 목록으로 보내지 않도록,
+사용자가 아직 완료하지 않은 카드 몇 장을 미리 골라 Redis 리스트에 보관합니다.
+- Redis: cards:queue:{user_id} (앞에서부터 다음 카드, 카드 행을 캐시 코덱으로 인코딩)
+- 큐가 비었거나 만료되면 get_next_cards RPC(완료 기록과의 안티 조인)로 다시 채움
+- 카드 완료 시 advance_card_queue()로 큐 앞 카드를 제거
+- 만료: CARD_QUEUE_TTL과 자정 중 빠른 쪽 (날짜가 바뀌면 새 카드를 반영해 다시 채움)
+
+남은 카드가 없으면 빈 표시를 자정까지 저장해 같은 날 반복 조회에서 DB를 읽지 않습니다.
+Redis가 없으면 매번 RPC로 한 장만 조회합니다.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis import Redis
+from supabase import Client
+
+from app.core.config import settings
+from app.core.db import run_query
+from app.utils.cache_codec import decode_value, encode_value
+
+logger = logging.getLogger(__name__)
+
+
+QUEUE_KEY_PREFIX = "cards:queue:"
+ANONYMOUS_QUEUE = "_anon"
+NEXT_CARDS_RPC = "get_next_cards"
+EMPTY_MARKER = "__empty__"
+
+
+def card_queue_key(user_id: Optional[str]) -> str:
+    """사용자 카드 큐 Redis 키 (비로그인 사용자는 공용 큐)"""
+    return f"{QUEUE_KEY_PREFIX}{user_id or ANONYMOUS_QUEUE}"
+
+
+def seconds_until_midnight(now: Optional[datetime] = None) -> int:
+    """다음 자정까지 남은 초 (최소 1)"""
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def _queue_ttl() -> int:
+    return min(settings.CARD_QUEUE_TTL, seconds_until_midnight())
+
+
+def _is_empty_marker(raw: Any) -> bool:
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", "surrogateescape")
+    return raw == EMPTY_MARKER
+
+
+def _peek_queue(redis: Optional[Redis], key: str) -> Tuple[bool, Optional[Dict]]:
+    """
+    큐 맨 앞 항목 조회
+
+    Returns:
+        (hit, card) - 큐가 없으면 (False, None), 남은 카드 없음 표시면 (True, None)
+    """
+    if not redis:
+        return False, None
+    try:
+        raw = redis.lindex(key, 0)
+        if raw is None:
+            return False, None
+        if _is_empty_marker(raw):
+            return True, None
+        return True, decode_value(raw)
+    except Exception as e:
+        logger.warning(f"카드 큐 조회 실패: {key}, {e}")
+        return False, None
+
+
+def _fill_queue(redis: Optional[Redis], key: str, cards: List[Dict]) -> None:
+    if not redis:
+        return
+    items = [encode_value(card) for card in cards] or [EMPTY_MARKER]
+    try:
+        pipe = redis.pipeline()
+        pipe.delete(key)
+        pipe.rpush(key, *items)
+        pipe.expire(key, _queue_ttl())
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"카드 큐 저장 실패: {key}, {e}")
+
+
+async def _fetch_next_cards(db: Client, user_id: Optional[str], limit: int) -> List[Dict]:
+    """완료하지 않은 카드 조회 (안티 조인 RPC, 없으면 이전 방식)"""
+    try:
+        result = await run_query(db.rpc(NEXT_CARDS_RPC, {"p_user_id": user_id, "p_limit": limit}))
+        return list(result.data or [])
+    except Exception as e:
+        # 마이그레이션(006_next_cards_rpc.sql) 미적용 시
+        logger.warning(f"다음 카드 RPC 실패, 완료 목록 조회로 대체: {e}")
+        return await _fetch_next_cards_fallback(db, user_id, limit)
+
+
+async def _fetch_next_cards_fallback(db: Client, user_id: Optional[str], limit: int) -> List[Dict]:
+    query = db.table('cards').select('*')
+    if user_id:
+        completed_result = await run_query(
+            db.table('completed_cards')
+            .select('card_id')
+            .eq('user_id', user_id)
+        )
+        completed_card_ids = list({row['card_id'] for row in completed_result.data or []})
+        if completed_card_ids:
+            query = query.not_.in_('id', completed_card_ids)
+    result = await run_query(query.limit(limit))
+    return list(result.data or [])
+
+
+async def get_next_card(db: Client, redis: Optional[Redis], user_id: Optional[str]) -> Optional[Dict]:
+    """
+    사용자의 다음(오늘) 카드 조회 (Redis 큐 → 안티 조인 RPC)
+
+    Returns:
+        카드 행, 남은 카드가 없으면 None
+    """
+    key = card_queue_key(user_id)
+    hit, card = _peek_queue(redis, key)
+    if hit:
+        return card
+
+    limit = settings.CARD_QUEUE_SIZE if redis else 1
+    cards = await _fetch_next_cards(db, user_id, limit)
+    _fill_queue(redis, key, cards)
+    return cards[0] if cards else None
+
+
+def advance_card_queue(redis: Optional[Redis], user_id: Optional[str], card_id: str) -> None:
+    """
+    카드 완료 후 큐 갱신
+
+    완료한 카드가 큐 맨 앞이면 꺼내고, 아니면(다른 경로로 받은 카드 등) 큐를 비워
+    다음 조회 때 다시 채웁니다.
+    """
+    if not redis or not user_id:
+        return
+    key = card_queue_key(user_id)
+    try:
+        hit, head = _peek_queue(redis, key)
+        if not hit:
+            return
+        if head is not None and str(head.get('id')) == str(card_id) and redis.llen(key) > 1:
+            redis.lpop(key)
+        else:
+            redis.delete(key)
+    except Exception as e:
+        logger.warning(f"카드 큐 갱신 실패, 삭제: {key}, {e}")
+        try:
+            redis.delete(key)
+        except Exception:
+            pass
@@ -2,6 +2,13 @@ from datetime import date, timedelta
 from typing import Dict, List, Optional
 from supabase import Client
 from redis import Redis
+from app.core.db import run_query
+from app.utils.cache import get_cached, set_cached, invalidate_tags, user_tag
+from app.services.alert_stream import publish_alerts
+from app.services.guardian_home import update_senior_snapshot
+from app.services.jobs import JobQueue, enqueue_job, job_handler
+from app.services.user_stats import bump_user_counters, get_cached_user_counters, get_user_counters
+from app.utils.error_translator import is_missing_function_error
 import json
 import logging
 
@@ -40,29 +47,60 @@ class GamificationService:
         5: 1000,   # 1000+ 포인트
     }
     
-    def __init__(self, db: Client, redis: Optional[Redis] = None):
+    # 배지 규칙: (배지 이름, 기준 지표, 임계값) - 획득 시 이 순서대로 추가
+    BADGE_RULES = [
+        ("첫걸음", "total_points", 5),
+        ("포인트 100", "total_points", 100),
+        ("포인트 500", "total_points", 500),
+        ("포인트 1000", "total_points", 1000),
+        ("일주일 연속", "streak_days", 7),
+        ("한 달 연속", "streak_days", 30),
+        ("퀴즈 마스터", "quiz_correct", 50),
+        ("사기 파수꾼", "scam_checks", 10),
+        ("안전 지킴이", "med_checks", 30),
+        ("커뮤니티 스타", "reactions_received", 10),
+    ]
+    # DB 집계가 필요한 지표 (get_badge_progress RPC로 한 번에 조회)
+    ACTIVITY_BADGE_METRICS = {"quiz_correct", "scam_checks", "med_checks", "reactions_received"}
+    BADGE_PROGRESS_RPC = "get_badge_progress"
+    # 완료 기록 + 포인트/스트릭 갱신 단일 트랜잭션 RPC (migrations/005)
+    COMPLETE_CARD_RPC = "complete_card_atomic"
+    # 보유하지 않은 배지만 행 잠금 안에서 추가 (migrations/009)
+    AWARD_BADGES_RPC = "award_badges"
+    # 배지 지표 → 사용자 활동 카운터 필드 (user_stats)
+    COUNTER_FOR_METRIC = {
+        "quiz_correct": "quizzes_correct",
+        "scam_checks": "scam_checks",
+        "med_checks": "med_checks",
+        "reactions_received": "reactions_received",
+    }
+    
+    # 백그라운드 작업 이름 (app.services.jobs)
+    BADGE_CHECK_JOB = "gamification.check_badges"
+    BADGE_ALERT_JOB = "gamification.badge_alerts"
+    REACTION_RECEIVED_JOB = "gamification.reaction_received"
+    
+    def __init__(self, db: Client, redis: Optional[Redis] = None, jobs: Optional[JobQueue] = None):
         self.db = db
         self.redis = redis
+        # 작업 큐가 있으면 배지 평가를 응답 후로 미룸 (없으면 요청 안에서 바로 평가)
+        self.jobs = jobs
     
-    def _invalidate_user_cache(self, user_id: str):
+    def _invalidate_user_cache(self, user_id: str, **snapshot_fields):
         """
         사용자 게임화 데이터 캐시 무효화
         
-        포인트/배지/레벨 변경 시 호출하여 Redis 캐시를 삭제합니다.
+        포인트/배지/레벨 변경 시 호출하여 사용자 태그의 세대를 올립니다.
+        (게임화 레코드, stats/level/badges 응답 캐시가 한 번에 무효화됨)
+        새 값(total_points/streak_days/badges)을 넘기면 보호자 홈 스냅샷에도 반영합니다.
         """
         if not self.redis:
             return
         
-        try:
-            keys = [
-                f"gamification:stats:{user_id}",
-                f"gamification:level:{user_id}",
-                f"gamification:badges:{user_id}"
-            ]
-            deleted = self.redis.delete(*keys)
-            logger.info(f"캐시 무효화: user={user_id}, deleted={deleted} keys")
-        except Exception as e:
-            logger.warning(f"캐시 무효화 실패 (계속 진행): {e}")
+        invalidate_tags(self.redis, user_tag(user_id))
+        if snapshot_fields:
+            update_senior_snapshot(self.redis, user_id, **snapshot_fields)
+        logger.info(f"캐시 무효화: user={user_id}")
     
     async def award_for_card_completion(
         self,
@@ -100,30 +138,141 @@ class GamificationService:
         if streak_days > 0:
             points += self.DAILY_STREAK_BONUS
         
-        # 4. 포인트 추가 및 레벨 계산
+        # 4. 포인트 추가
         old_total = gamif['total_points']
         new_total = old_total + points
-        old_level = self._calculate_level(old_total)
-        new_level = self._calculate_level(new_total)
-        level_up = new_level > old_level
         
         # longest_streak 업데이트
         longest_streak = gamif.get('longest_streak', 0)
         if streak_days > longest_streak:
             longest_streak = streak_days
         
-        self.db.table('gamification').update({
+        await run_query(self.db.table('gamification').update({
             'total_points': new_total,
             'current_streak': streak_days,
             'longest_streak': longest_streak,
             'last_activity_date': completion_date
-        }).eq('user_id', user_id).execute()
+        }).eq('user_id', user_id))
         
         # 4-1. Redis 캐시 무효화 (개선된 버전)
-        self._invalidate_user_cache(user_id)
+        self._invalidate_user_cache(user_id, total_points=new_total, streak_days=streak_days)
         
-        # 5. 배지 확인
-        new_badges = await self._check_new_badges(user_id, new_total, streak_days)
+        # 5. 배지 확인 (작업 큐가 있으면 응답 후 평가, 획득 시 알림으로 전달)
+        new_badges = await self._evaluate_badges(
+            user_id, new_total, streak_days, existing_badges=gamif.get('badges') or []
+        )
+        
+        return self._completion_result(user_id, points, old_total, new_total, streak_days, new_badges)
+    
+    async def record_card_completion(
+        self,
+        user_id: str,
+        card_id: str,
+        num_correct: int,
+        num_questions: int,
+        completion_date: str,
+        completed_date: Optional[str] = None
+    ) -> Dict:
+        """
+        카드 완료 기록 + 포인트/스트릭 업데이트 (complete_card_atomic RPC 1회)
+        
+        완료 INSERT와 게임화 갱신이 한 트랜잭션에서 실행되어,
+        동시에 들어온 같은 카드 완료 요청 중 하나만 포인트를 받습니다.
+        RPC가 없으면(마이그레이션 005 미적용) 완료 INSERT를 먼저 해 유니크 제약으로 선점한 뒤
+        award_for_card_completion으로 처리합니다.
+        
+        Args:
+            completion_date: 스트릭 계산 기준 날짜 (카드 날짜)
+            completed_date: 완료 기록 날짜 (기본: 오늘, 하루 1회 제약 기준)
+        
+        Returns:
+            award_for_card_completion과 동일
+        
+        Raises:
+            ValueError("ALREADY_COMPLETED"): 오늘 이미 완료한 카드
+        """
+        completed_date = completed_date or date.today().isoformat()
+        
+        try:
+            result = await run_query(self.db.rpc(self.COMPLETE_CARD_RPC, {
+                'p_user_id': user_id,
+                'p_card_id': card_id,
+                'p_completed_date': completed_date,
+                'p_activity_date': completion_date,
+                'p_quiz_correct': num_correct,
+                'p_quiz_total': num_questions,
+                'p_base_points': self.BASE_CARD_POINTS,
+                'p_correct_points': self.CORRECT_ANSWER_POINTS,
+                'p_streak_bonus': self.DAILY_STREAK_BONUS,
+            }))
+            outcome = result.data
+            if isinstance(outcome, list):
+                outcome = outcome[0] if outcome else None
+            if not isinstance(outcome, dict):
+                raise ValueError(f"unexpected RPC result: {type(outcome).__name__}")
+        except Exception as e:
+            # 마이그레이션(005_complete_card_atomic.sql) 미적용일 때만 순차 처리
+            # 그 외 실패는 포인트 경합이 있는 순차 경로로 숨기지 않고 그대로 전파
+            if not is_missing_function_error(e):
+                raise
+            logger.warning(f"카드 완료 RPC 없음, 순차 처리로 대체: {e}")
+            await self._insert_completed_card(user_id, card_id, completed_date, num_correct, num_questions)
+            return await self.award_for_card_completion(
+                user_id=user_id,
+                num_correct=num_correct,
+                num_questions=num_questions,
+                completion_date=completion_date
+            )
+        
+        if outcome.get('already_completed'):
+            raise ValueError("ALREADY_COMPLETED")
+        
+        new_total = outcome['total_points']
+        streak_days = outcome['streak_days']
+        self._invalidate_user_cache(user_id, total_points=new_total, streak_days=streak_days)
+        new_badges = await self._evaluate_badges(
+            user_id, new_total, streak_days, existing_badges=outcome.get('badges') or []
+        )
+        
+        return self._completion_result(
+            user_id, outcome['points_added'], outcome['old_total'], new_total, streak_days, new_badges
+        )
+    
+    async def _insert_completed_card(
+        self,
+        user_id: str,
+        card_id: str,
+        completed_date: str,
+        quiz_correct: int,
+        quiz_total: int
+    ) -> None:
+        """완료 기록 INSERT (UNIQUE(user_id, card_id, completed_date) 위반 시 ALREADY_COMPLETED)"""
+        try:
+            await run_query(self.db.table('completed_cards').insert({
+                'user_id': user_id,
+                'card_id': card_id,
+                'completed_date': completed_date,
+                'quiz_correct': quiz_correct,
+                'quiz_total': quiz_total
+            }))
+        except Exception as e:
+            error_str = str(e).lower()
+            if 'duplicate key' in error_str or '23505' in error_str or 'unique constraint' in error_str or 'already exists' in error_str:
+                raise ValueError("ALREADY_COMPLETED")
+            raise
+    
+    def _completion_result(
+        self,
+        user_id: str,
+        points: int,
+        old_total: int,
+        new_total: int,
+        streak_days: int,
+        new_badges: List[str]
+    ) -> Dict:
+        """카드 완료 응답 구성 (레벨업 메시지 포함)"""
+        old_level = self._calculate_level(old_total)
+        new_level = self._calculate_level(new_total)
         
         result = {
             "points_added": points,
@@ -134,7 +283,7 @@ class GamificationService:
         }
         
         # 레벨업 메시지 추가
-        if level_up:
+        if new_level > old_level:
             result["level_up"] = True
             result["level_up_message"] = f"축하합니다! 레벨 {new_level}에 도달했어요! 🎉"
             logger.info(f"Level up! user={user_id}, {old_level} → {new_level}")
@@ -146,19 +295,17 @@ class GamificationService:
         게임화 레코드 조회 또는 생성 (Redis 캐싱)
         """
         cache_key = f"gamification:{user_id}"
+        cache_tags = [user_tag(user_id)]
         
-        # 1. Redis 캐시 확인
+        # 1. Redis 캐시 확인 (포인트 누적에 쓰이므로 L1 미사용)
         if self.redis:
-            try:
-                cached = self.redis.get(cache_key)
-                if cached:
-                    logger.debug(f"Redis cache hit: {cache_key}")
-                    return json.loads(cached)
-            except Exception as e:
-                logger.error(f"Redis get error: {e}")
+            cached = get_cached(self.redis, cache_key, local=False, tags=cache_tags)
+            if cached is not None:
+                logger.debug(f"Redis cache hit: {cache_key}")
+                return cached
         
         # 2. DB에서 조회
-        result = self.db.table('gamification').select('*').eq('user_id', user_id).execute()
+        result = await run_query(self.db.table('gamification').select('*').eq('user_id', user_id))
         
         if not result.data or len(result.data) == 0:
             # 신규 사용자
@@ -169,22 +316,15 @@ class GamificationService:
                 'longest_streak': 0,
                 'badges': []
             }
-            result = self.db.table('gamification').insert(new_gamif).execute()
+            result = await run_query(self.db.table('gamification').insert(new_gamif))
             gamif_data = result.data[0]
         else:
             gamif_data = result.data[0]
         
         # 3. Redis 캐시 저장
         if self.redis:
-            try:
-                self.redis.setex(
-                    cache_key,
-                    self.CACHE_TTL_GAMIFICATION,
-                    json.dumps(gamif_data)
-                )
+            if set_cached(self.redis, cache_key, gamif_data, self.CACHE_TTL_GAMIFICATION, local=False, tags=cache_tags):
                 logger.debug(f"Redis cache set: {cache_key}")
-            except Exception as e:
-                logger.error(f"Redis set error: {e}")
         
         return gamif_data
     
@@ -266,7 +406,66 @@ class GamificationService:
             # 예외 발생 시 안전하게 1 반환 (새 스트릭 시작)
             return 1
     
-    async def _check_new_badges(self, user_id: str, total_points: int, streak_days: int) -> List[str]:
+    async def _evaluate_badges(
+        self,
+        user_id: str,
+        total_points: int,
+        streak_days: int,
+        existing_badges: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        배지 평가 (작업 큐가 있으면 예약 후 빈 목록 반환)
+        
+        예약된 평가는 최신 게임화 레코드로 다시 계산하고, 새 배지는 alerts 테이블로 전달합니다.
+        """
+        if self.schedule_badge_check(user_id):
+            return []
+        return await self._check_new_badges(user_id, total_points, streak_days, existing_badges=existing_badges)
+    
+    def schedule_badge_check(self, user_id: str) -> bool:
+        """응답 후 배지 평가 예약 (작업 큐가 없거나 추가 실패 시 False)"""
+        if self.jobs is None:
+            return False
+        return self.jobs.enqueue(self.BADGE_CHECK_JOB, user_id=user_id)
+    
+    async def run_badge_check(self, user_id: str) -> List[str]:
+        """
+        최신 게임화 레코드 기준 배지 평가 + 새 배지 알림 (작업 핸들러)
+        
+        보유 배지는 get_badge_progress RPC로 다시 읽어, 예약 시점 이후 변경도 반영합니다.
+        """
+        gamif = await self._get_or_create_gamification(user_id)
+        new_badges = await self._check_new_badges(
+            user_id, gamif.get('total_points') or 0, gamif.get('current_streak') or 0
+        )
+        if new_badges and not enqueue_job(self.BADGE_ALERT_JOB, user_id=user_id, badges=new_badges):
+            await self.deliver_badge_alerts(user_id, new_badges)
+        return new_badges
+    
+    async def deliver_badge_alerts(self, user_id: str, badges: List[str]) -> None:
+        """새 배지 알림을 alerts 테이블에 기록 (type=achievement) + 실시간 푸시"""
+        if not badges:
+            return
+        result = await run_query(self.db.table('alerts').insert([
+            {
+                'user_id': user_id,
+                'type': 'achievement',
+                'title': '🏅 새 배지를 받았어요',
+                'message': f"'{badge}' 배지를 획득했어요! 축하드려요 🎉",
+                'read': False,
+            }
+            for badge in badges
+        ]))
+        publish_alerts(self.redis, result.data)  # 연결된 기기에 바로 푸시
+        logger.info(f"배지 알림 전달: user={user_id}, badges={badges}")
+    
+    async def _check_new_badges(
+        self,
+        user_id: str,
+        total_points: int,
+        streak_days: int,
+        existing_badges: Optional[List[str]] = None
+    ) -> List[str]:
         """
         새로운 배지 확인
         
@@ -281,89 +480,136 @@ class GamificationService:
         - "사기 파수꾼": 사기 검사 10회
         - "안전 지킴이": 복약 체크 30회
         - "커뮤니티 스타": Q&A 좋아요 10개
-        """
-        gamif_result = self.db.table('gamification').select('badges').eq('user_id', user_id).single().execute()
-        existing_badges = gamif_result.data.get('badges', []) if gamif_result.data else []
-        
-        new_badges = []
         
-        # 포인트 기반 배지
-        if "첫걸음" not in existing_badges and total_points >= 5:
-            new_badges.append("첫걸음")
+        아직 없는 배지만 평가하고, 활동 기반 배지에 필요한 집계는
+        Redis 활동 카운터 해시 또는 get_badge_progress RPC 한 번으로 가져옵니다.
         
-        if "포인트 100" not in existing_badges and total_points >= 100:
-            new_badges.append("포인트 100")
+        Args:
+            existing_badges: 이미 보유한 배지 (게임화 레코드에서 전달 시 보유 배지 조회 생략)
+        """
+        held = list(existing_badges) if existing_badges is not None else None
+        pending = [
+            rule for rule in self.BADGE_RULES
+            if held is None or rule[0] not in held
+        ]
+        metrics_needed = sorted({
+            metric for _, metric, _ in pending
+            if metric in self.ACTIVITY_BADGE_METRICS
+        })
+        
+        metrics = {"total_points": total_points, "streak_days": streak_days}
+        counters = get_cached_user_counters(self.redis, user_id) if held is not None and metrics_needed else None
+        if counters is not None:
+            # Redis 카운터 해시가 있으면 DB 조회 없이 평가
+            metrics.update({metric: counters[self.COUNTER_FOR_METRIC[metric]] for metric in metrics_needed})
+        elif held is None or metrics_needed:
+            # 보유 배지 + 필요한 활동 집계를 한 번에 조회
+            progress = await self._fetch_badge_progress(user_id, metrics_needed if held is not None else None)
+            held = progress.pop("badges", None) or held or []
+            metrics.update(progress)
+        
+        new_badges = [
+            name for name, metric, threshold in self.BADGE_RULES
+            if name not in held and metrics.get(metric, 0) >= threshold
+        ]
         
-        if "포인트 500" not in existing_badges and total_points >= 500:
-            new_badges.append("포인트 500")
+        if new_badges:
+            new_badges = await self._award_badges(user_id, held, new_badges)
+        if new_badges:
+            self._invalidate_user_cache(user_id, badges=tuple(new_badges))
         
-        if "포인트 1000" not in existing_badges and total_points >= 1000:
-            new_badges.append("포인트 1000")
+        return new_badges
+    
+    async def _award_badges(self, user_id: str, held: List[str], new_badges: List[str]) -> List[str]:
+        """
+        새 배지 추가 (award_badges RPC, 게임화 행 잠금 안에서 보유하지 않은 배지만 추가)
         
-        # 스트릭 기반 배지
-        if "일주일 연속" not in existing_badges and streak_days >= 7:
-            new_badges.append("일주일 연속")
+        같은 사용자의 배지 평가가 동시에 실행돼도 배지는 한 번만 추가되고,
+        실제로 추가된 배지만 반환하므로 알림도 한 번만 나갑니다.
+        """
+        try:
+            result = await run_query(self.db.rpc(self.AWARD_BADGES_RPC, {
+                'p_user_id': user_id,
+                'p_badges': new_badges,
+            }))
+            return list(result.data or [])
+        except Exception as e:
+            if not is_missing_function_error(e):
+                raise
+            # 마이그레이션(009_award_badges.sql) 미적용 시 배지 목록 덮어쓰기 (동시 평가 경쟁 가능)
+            logger.warning(f"배지 추가 RPC 없음, 배지 목록 덮어쓰기로 대체: {e}")
         
-        if "한 달 연속" not in existing_badges and streak_days >= 30:
-            new_badges.append("한 달 연속")
+        await run_query(self.db.table('gamification').update({'badges': held + new_badges}).eq('user_id', user_id))
+        return new_badges
+    
+    async def _fetch_badge_progress(self, user_id: str, metrics: Optional[List[str]]) -> Dict:
+        """
+        보유 배지와 활동 집계 조회 (get_badge_progress RPC, 쿼리 1회)
         
-        # 활동 기반 배지 (추가 쿼리 필요)
-        # 퀴즈 마스터: completed_cards 테이블에서 quiz_correct 합산 (50개 정답)
-        if "퀴즈 마스터" not in existing_badges:
-            try:
-                # completed_cards 테이블에서 quiz_correct 총합 계산
-                completed_result = self.db.table('completed_cards').select('quiz_correct').eq('user_id', user_id).execute()
-                if completed_result.data:
-                    total_correct = sum(card.get('quiz_correct', 0) for card in completed_result.data)
-                    logger.info(f"Quiz master check: user={user_id}, total_correct={total_correct}")
-                    if total_correct >= 50:
-                        new_badges.append("퀴즈 마스터")
-            except Exception as e:
-                logger.error(f"Failed to check 퀴즈 마스터 badge: {e}")
+        Args:
+            metrics: 집계할 항목 (None이면 활동 기반 전체)
         
-        # 사기 파수꾼: scam_checks 테이블에서 카운트 (10회)
-        if "사기 파수꾼" not in existing_badges:
-            try:
-                scam_result = self.db.table('scam_checks').select('id', count='exact').eq('user_id', user_id).execute()
-                scam_count = scam_result.count if scam_result.count else 0
-                logger.info(f"사기 파수꾼 check: user={user_id}, scam_checks={scam_count}")
-                if scam_count >= 10:
-                    new_badges.append("사기 파수꾼")
-            except Exception as e:
-                logger.error(f"Failed to check 사기 파수꾼 badge: {e}")
+        Returns:
+            {"badges": [...], "quiz_correct": 52, "scam_checks": 3, ...}
+        """
+        if metrics is None:
+            metrics = sorted(self.ACTIVITY_BADGE_METRICS)
         
-        # 안전 지킴이: med_checks 테이블에서 카운트 (30회)
-        if "안전 지킴이" not in existing_badges:
-            try:
-                med_result = self.db.table('med_checks').select('id', count='exact').eq('user_id', user_id).execute()
-                med_count = med_result.count if med_result.count else 0
-                logger.info(f"안전 지킴이 check: user={user_id}, med_checks={med_count}")
-                if med_count >= 30:
-                    new_badges.append("안전 지킴이")
-            except Exception as e:
-                logger.error(f"Failed to check 안전 지킴이 badge: {e}")
+        try:
+            result = await run_query(self.db.rpc(self.BADGE_PROGRESS_RPC, {
+                'p_user_id': user_id,
+                'p_metrics': metrics
+            }))
+            progress = result.data
+            if not isinstance(progress, dict):
+                raise ValueError(f"unexpected RPC result: {type(progress).__name__}")
+            return {
+                "badges": progress.get("badges") or [],
+                **{metric: progress.get(metric) or 0 for metric in metrics}
+            }
+        except Exception as e:
+            # 마이그레이션(003_badge_progress_rpc.sql) 미적용 시 테이블별 조회로 대체
+            logger.warning(f"get_badge_progress RPC 실패, 개별 쿼리로 대체: {e}")
+            return await self._fetch_badge_progress_fallback(user_id, metrics)
+    
+    async def _fetch_badge_progress_fallback(self, user_id: str, metrics: List[str]) -> Dict:
+        """RPC가 없을 때 테이블별 집계 (필요한 항목만 조회)"""
+        gamif_result = await run_query(self.db.table('gamification').select('badges').eq('user_id', user_id).single())
+        progress = {"badges": gamif_result.data.get('badges', []) if gamif_result.data else []}
         
-        # 커뮤니티 스타: 본인 게시물에 받은 좋아요 10개
-        if "커뮤니티 스타" not in existing_badges:
+        for metric in metrics:
             try:
-                # qna_posts의 author_id가 본인인 게시물에 달린 리액션 카운트
-                posts_result = self.db.table('qna_posts').select('id').eq('author_id', user_id).execute()
-                if posts_result.data:
-                    post_ids = [p['id'] for p in posts_result.data]
-                    if post_ids:
-                        reactions_result = self.db.table('reactions').select('id', count='exact').in_('target_id', post_ids).eq('target_type', 'qna_post').execute()
-                        reaction_count = reactions_result.count if reactions_result.count else 0
-                        logger.info(f"커뮤니티 스타 check: user={user_id}, reactions={reaction_count}")
-                        if reaction_count >= 10:
-                            new_badges.append("커뮤니티 스타")
+                progress[metric] = await self._count_activity(user_id, metric)
             except Exception as e:
-                logger.error(f"Failed to check 커뮤니티 스타 badge: {e}")
-        
-        if new_badges:
-            updated_badges = existing_badges + new_badges
-            self.db.table('gamification').update({'badges': updated_badges}).eq('user_id', user_id).execute()
+                logger.error(f"Failed to aggregate {metric} for badges: {e}")
         
-        return new_badges
+        logger.info(f"Badge progress (fallback): user={user_id}, {progress}")
+        return progress
+    
+    async def _count_activity(self, user_id: str, metric: str) -> int:
+        """활동 지표 하나를 테이블에서 직접 집계"""
+        if metric == "quiz_correct":
+            completed_result = await run_query(self.db.table('completed_cards').select('quiz_correct').eq('user_id', user_id))
+            return sum(card.get('quiz_correct', 0) for card in completed_result.data or [])
+        
+        if metric == "scam_checks":
+            scam_result = await run_query(self.db.table('scam_checks').select('id', count='exact').eq('user_id', user_id))
+            return int(scam_result.count or 0)
+        
+        if metric == "med_checks":
+            med_result = await run_query(self.db.table('med_checks').select('id', count='exact').eq('user_id', user_id))
+            return int(med_result.count or 0)
+        
+        if metric == "reactions_received":
+            # 본인 Q&A 게시물에 달린 리액션 수
+            posts_result = await run_query(self.db.table('qna_posts').select('id').eq('author_id', user_id))
+            post_ids = [p['id'] for p in posts_result.data or []]
+            if not post_ids:
+                return 0
+            reactions_result = await run_query(self.db.table('reactions').select('id', count='exact').in_('target_id', post_ids).eq('target_type', 'qna_post'))
+            return int(reactions_result.count or 0)
+        
+        raise ValueError(f"unknown badge metric: {metric}")
 
     TOOL_STEP_POINTS = 3
 
@@ -390,9 +636,12 @@ class GamificationService:
         gamif = await self._get_or_create_gamification(user_id)
         new_total = gamif["total_points"] + points
 
-        self.db.table("gamification").update({"total_points": new_total}).eq(
+        await run_query(self.db.table("gamification").update({"total_points": new_total}).eq(
             "user_id", user_id
-        ).execute()
+        ))
+
+        # Redis 캐시 무효화
+        self._invalidate_user_cache(user_id, total_points=new_total)
 
         return {"points_added": points, "total_points": new_total}
 
@@ -418,9 +667,15 @@ class GamificationService:
         gamif = await self._get_or_create_gamification(user_id)
         new_total = gamif["total_points"] + points
 
-        self.db.table("gamification").update({"total_points": new_total}).eq(
+        await run_query(self.db.table("gamification").update({"total_points": new_total}).eq(
             "user_id", user_id
-        ).execute()
+        ))
+
+        # Redis 캐시 무효화
+        self._invalidate_user_cache(user_id, total_points=new_total)
+        
+        # '안전 지킴이' 배지 평가는 응답 후 (작업 큐가 있을 때)
+        self.schedule_badge_check(user_id)
 
         return {"points_added": points, "total_points": new_total}
 
@@ -446,12 +701,12 @@ class GamificationService:
         gamif = await self._get_or_create_gamification(user_id)
         new_total = gamif["total_points"] + points
 
-        self.db.table("gamification").update({"total_points": new_total}).eq(
+        await run_query(self.db.table("gamification").update({"total_points": new_total}).eq(
             "user_id", user_id
-        ).execute()
+        ))
 
         # Redis 캐시 무효화 (개선된 버전)
-        self._invalidate_user_cache(user_id)
+        self._invalidate_user_cache(user_id, total_points=new_total)
 
         return {"points_added": points, "total_points": new_total}
 
@@ -474,12 +729,12 @@ class GamificationService:
         gamif = await self._get_or_create_gamification(voter_id)
         new_total = gamif["total_points"] + points
 
-        self.db.table("gamification").update({"total_points": new_total}).eq(
+        await run_query(self.db.table("gamification").update({"total_points": new_total}).eq(
             "user_id", voter_id
-        ).execute()
+        ))
 
         # Redis 캐시 무효화 (개선된 버전)
-        self._invalidate_user_cache(voter_id)
+        self._invalidate_user_cache(voter_id, total_points=new_total)
 
         return {"points_added": points, "total_points": new_total}
 
@@ -503,13 +758,10 @@ class GamificationService:
         # 게임화 데이터 조회 (캐싱 적용)
         gamif = await self._get_or_create_gamification(user_id)
 
-        # 완료한 카드 수 조회
-        cards_result = self.db.table("completed_cards").select("id", count="exact").eq("user_id", user_id).execute()
-        cards_completed = cards_result.count if cards_result.count else 0
-
-        # 퀴즈 정답 수 조회
-        quiz_result = self.db.table("completed_cards").select("quiz_correct").eq("user_id", user_id).execute()
-        quizzes_correct = sum(card.get("quiz_correct", 0) for card in quiz_result.data) if quiz_result.data else 0
+        # 완료 카드/퀴즈 정답 수 (누적 카운터, 이력 스캔 없음)
+        counters = await get_user_counters(self.db, self.redis, user_id)
+        cards_completed = counters["cards_completed"]
+        quizzes_correct = counters["quizzes_correct"]
 
         total_points = gamif.get("total_points", 0)
         level = self._calculate_level(total_points)
@@ -597,17 +849,12 @@ class GamificationService:
             bonus_points = 10
             new_total = gamif["total_points"] + bonus_points
 
-            self.db.table("gamification").update({"total_points": new_total}).eq(
+            await run_query(self.db.table("gamification").update({"total_points": new_total}).eq(
                 "user_id", user_id
-            ).execute()
+            ))
 
             # Redis 캐시 무효화
-            if self.redis:
-                try:
-                    cache_key = f"gamification:{user_id}"
-                    self.redis.delete(cache_key)
-                except Exception as e:
-                    logger.error(f"Redis delete error: {e}")
+            self._invalidate_user_cache(user_id, total_points=new_total)
 
             logger.info(f"Streak bonus awarded: user={user_id}, streak={current_streak}, bonus={bonus_points}")
 
@@ -646,3 +893,36 @@ class GamificationService:
             "longest_streak": gamif.get("longest_streak", 0),
             "last_activity_date": gamif.get("last_activity_date"),
         }
+
+
+@job_handler(GamificationService.BADGE_CHECK_JOB)
+async def check_badges_job(db: Client, redis: Optional[Redis], user_id: str) -> None:
+    """배지 평가 작업 (카드 완료/복약 체크/사기 검사/받은 리액션 후 예약)"""
+    await GamificationService(db, redis).run_badge_check(user_id)
+
+
+@job_handler(GamificationService.BADGE_ALERT_JOB)
+async def badge_alerts_job(db: Client, redis: Optional[Redis], user_id: str, badges: List[str]) -> None:
+    """배지 알림 전달 작업 (평가와 분리해 알림 INSERT만 재시도)"""
+    await GamificationService(db, redis).deliver_badge_alerts(user_id, badges)
+
+
+@job_handler(GamificationService.REACTION_RECEIVED_JOB)
+async def reaction_received_job(db: Client, redis: Optional[Redis], post_id: str, delta: int) -> None:
+    """
+    Q&A 게시물 리액션 변경 → 작성자의 받은 리액션 카운터 증감 + '커뮤니티 스타' 배지 평가 예약
+    
+    카운터 증가 뒤에 실패해 재시도되면 같은 리액션이 두 번 세어지므로,
+    배지 평가는 별도 작업으로 넘기고 이 작업은 증가 후 예외를 던지지 않습니다.
+    """
+    post = await run_query(db.table('qna_posts').select('author_id').eq('id', post_id).limit(1))
+    if not post.data:
+        return
+    author_id = post.data[0]['author_id']
+    bump_user_counters(redis, author_id, reactions_received=delta)
+    if delta <= 0 or enqueue_job(GamificationService.BADGE_CHECK_JOB, user_id=author_id):
+        return
+    try:
+        await GamificationService(db, redis).run_badge_check(author_id)
+    except Exception as e:
+        logger.error(f"받은 리액션 배지 평가 실패: user={author_id}, {e}")
@@ -0,0 +1,376 @@
+"""
+보호자 홈 (가족 대시보드) 스냅샷
+
+보호자 홈 화면은 연동된 시니어마다 포인트/스트릭/배지, 최근 7일 카드·복약 활동,
+누적 활동 카운터, 마지막 활동 시각과 보호자의 읽지 않은 알림 수를 한 번에 보여줍니다.
+엔드포인트별로 family_links/gamification/completed_cards/med_checks/alerts를 따로 조회하지 않도록
+Redis에 미리 만들어 둔 문서를 Lua 스크립트 1회로 모아 읽습니다.
+
+Redis 키:
+- guardian:links:{guardian_id}  해시 {senior_id: {"name", "perms"} JSON} (+ 빈 목록 표시 필드)
+- guardian:senior:{senior_id}   해시 스냅샷
+    total_points, streak_days, badge:{이름}, cards:{YYYY-MM-DD}, med:{YYYY-MM-DD}, built_on
+- 그 외 기존 프로젝션 재사용: user:stats:{id} (누적 카운터), user:last_activity:{id}, alerts:unread:{guardian_id}
+
+쓰기 경로는 DB 기록 후 update_senior_snapshot()으로 필요한 필드만 증가/갱신합니다.
+스냅샷이 없으면 건드리지 않고 다음 조회 때 DB에서 다시 만듭니다 (시니어당 3쿼리, 병렬).
+일별 필드가 쌓이지 않도록 만든 지 REBUILD_AFTER_DAYS가 지난 스냅샷은 조회 시 새로 만듭니다.
+"""
+import asyncio
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis import Redis
+from supabase import Client
+
+from app.core.config import settings
+from app.core.db import run_query
+from app.services.alert_stream import get_unread_count, unread_key
+from app.services.user_stats import (
+    COUNTER_FIELDS,
+    COUNTERS_KEY_PREFIX,
+    LAST_ACTIVITY_KEY_PREFIX,
+    get_last_activities,
+    get_user_counters,
+)
+
+logger = logging.getLogger(__name__)
+
+
+LINKS_KEY_PREFIX = "guardian:links:"
+SNAPSHOT_KEY_PREFIX = "guardian:senior:"
+LINKS_LOADED_FIELD = "_loaded"  # 연동된 멤버가 없는 보호자도 캐시
+BADGE_FIELD_PREFIX = "badge:"
+ACTIVITY_DAYS = 7
+REBUILD_AFTER_DAYS = 7
+
+# 보호자 링크 + 읽지 않은 알림 수 + 시니어별 (스냅샷, 누적 카운터, 마지막 활동)을 왕복 1회로
+# 시니어 키는 링크 해시를 읽은 뒤에야 알 수 있어 KEYS로 넘기지 않음 (단일 Redis 전제, 클러스터 미지원)
+READ_HOME_SCRIPT = """
+local links = redis.call("HGETALL", KEYS[1])
+local result = {links, redis.call("GET", KEYS[2]) or false}
+for i = 1, #links, 2 do
+    local member = links[i]
+    if member ~= ARGV[4] then
+        table.insert(result, member)
+        table.insert(result, redis.call("HGETALL", ARGV[1] .. member))
+        table.insert(result, redis.call("HGETALL", ARGV[2] .. member))
+        table.insert(result, redis.call("GET", ARGV[3] .. member) or false)
+    end
+end
+return result
+"""
+
+# 스냅샷이 있을 때만 적용 (없는 스냅샷을 일부 필드로 만들면 나머지가 0으로 보임)
+# ARGV: TTL, 증가 쌍 개수, 증가 쌍..., 설정 쌍...
+UPDATE_SNAPSHOT_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+local increments = tonumber(ARGV[2])
+local first_set = 3 + increments * 2
+for i = 3, first_set - 1, 2 do
+    redis.call("HINCRBY", KEYS[1], ARGV[i], ARGV[i + 1])
+end
+for i = first_set, #ARGV, 2 do
+    redis.call("HSET", KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call("EXPIRE", KEYS[1], ARGV[1])
+return 1
+"""
+
+
+def links_key(guardian_id: str) -> str:
+    """보호자 연동 멤버 해시 키"""
+    return f"{LINKS_KEY_PREFIX}{guardian_id}"
+
+
+def snapshot_key(user_id: str) -> str:
+    """시니어 스냅샷 해시 키"""
+    return f"{SNAPSHOT_KEY_PREFIX}{user_id}"
+
+
+def _today() -> date:
+    return datetime.now().date()
+
+
+def update_senior_snapshot(
+    redis: Optional[Redis],
+    user_id: Optional[str],
+    *,
+    cards_completed: int = 0,
+    med_checks: int = 0,
+    total_points: Optional[int] = None,
+    streak_days: Optional[int] = None,
+    badges: Tuple[str, ...] = (),
+) -> bool:
+    """
+    쓰기 경로에서 시니어 스냅샷 갱신 (스냅샷이 있을 때만, Lua 1회)
+
+    예: update_senior_snapshot(redis, user_id, cards_completed=1)
+        update_senior_snapshot(redis, user_id, total_points=158, streak_days=4)
+    """
+    if not redis or not user_id:
+        return False
+
+    today = _today().isoformat()
+    increments: List[Any] = []
+    if cards_completed:
+        increments += [f"cards:{today}", cards_completed]
+    if med_checks:
+        increments += [f"med:{today}", med_checks]
+
+    values: List[Any] = []
+    if total_points is not None:
+        values += ["total_points", total_points]
+    if streak_days is not None:
+        values += ["streak_days", streak_days]
+    for badge in badges:
+        values += [f"{BADGE_FIELD_PREFIX}{badge}", 1]
+
+    if not increments and not values:
+        return False
+    try:
+        return bool(redis.eval(
+            UPDATE_SNAPSHOT_SCRIPT, 1, snapshot_key(user_id),
+            settings.GUARDIAN_SNAPSHOT_TTL, len(increments) // 2, *increments, *values,
+        ))
+    except Exception as e:
+        logger.warning(f"보호자 홈 스냅샷 갱신 실패: user={user_id}, {e}")
+        return False
+
+
+def invalidate_guardian_links(redis: Optional[Redis], guardian_id: str) -> None:
+    """가족 연동 변경 시 보호자 멤버 목록 캐시 삭제"""
+    if not redis:
+        return
+    try:
+        redis.delete(links_key(guardian_id))
+    except Exception as e:
+        logger.warning(f"보호자 멤버 캐시 삭제 실패: guardian={guardian_id}, {e}")
+
+
+async def _load_links(db: Client, guardian_id: str) -> Dict[str, Dict[str, Any]]:
+    """보호자의 연동 멤버 (이름/권한)"""
+    result = await run_query(
+        db.table("family_links")
+        .select("user_id, perms, users!inner(name)")
+        .eq("guardian_id", guardian_id)
+    )
+    return {
+        row["user_id"]: {
+            "name": (row.get("users") or {}).get("name", "사용자"),
+            "perms": row.get("perms") or {},
+        }
+        for row in result.data or []
+    }
+
+
+async def build_senior_snapshot(db: Client, user_id: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """원본 테이블에서 시니어 스냅샷 생성 (게임화 1행 + 최근 7일 카드/복약, 병렬 3쿼리)"""
+    today = today or _today()
+    start = (today - timedelta(days=ACTIVITY_DAYS - 1)).isoformat()
+
+    gamification, cards, meds = await asyncio.gather(
+        run_query(
+            db.table("gamification")
+            .select("total_points, current_streak, badges")
+            .eq("user_id", user_id)
+            .limit(1)
+        ),
+        run_query(
+            db.table("completed_cards")
+            .select("completed_date")
+            .eq("user_id", user_id)
+            .gte("completed_date", start)
+        ),
+        run_query(
+            db.table("med_checks")
+            .select("date")
+            .eq("user_id", user_id)
+            .gte("date", start)
+        ),
+    )
+
+    row = gamification.data[0] if gamification.data else {}
+    snapshot: Dict[str, Any] = {
+        "total_points": row.get("total_points") or 0,
+        "streak_days": row.get("current_streak") or 0,
+        "built_on": today.isoformat(),
+    }
+    for badge in row.get("badges") or []:
+        snapshot[f"{BADGE_FIELD_PREFIX}{badge}"] = 1
+    for field, rows, column in (("cards", cards.data, "completed_date"), ("med", meds.data, "date")):
+        for item in rows or []:
+            key = f"{field}:{str(item[column])[:10]}"
+            snapshot[key] = snapshot.get(key, 0) + 1
+    return snapshot
+
+
+def _pairs(flat: List[Any]) -> Dict[str, str]:
+    return dict(zip(flat[::2], flat[1::2]))
+
+
+def _is_stale(snapshot: Dict[str, Any], today: date) -> bool:
+    built_on = snapshot.get("built_on")
+    if not built_on:
+        return True
+    return date.fromisoformat(str(built_on)) < today - timedelta(days=REBUILD_AFTER_DAYS)
+
+
+def _read_home(redis: Redis, guardian_id: str) -> Optional[Dict[str, Any]]:
+    """Lua 1회로 보호자 홈 문서 읽기 (링크 캐시가 없으면 None)"""
+    reply = redis.eval(
+        READ_HOME_SCRIPT, 2, links_key(guardian_id), unread_key(guardian_id),
+        SNAPSHOT_KEY_PREFIX, COUNTERS_KEY_PREFIX, LAST_ACTIVITY_KEY_PREFIX, LINKS_LOADED_FIELD,
+    )
+    links = _pairs(reply[0])
+    if LINKS_LOADED_FIELD not in links:
+        return None
+    links.pop(LINKS_LOADED_FIELD)
+
+    members = {}
+    for index in range(2, len(reply), 4):
+        user_id, snapshot, counters, last_activity = reply[index:index + 4]
+        members[user_id] = {
+            "link": json.loads(links[user_id]),
+            "snapshot": _pairs(snapshot),
+            "counters": _pairs(counters),
+            "last_activity": last_activity,
+        }
+    return {"unread": reply[1], "members": members}
+
+
+async def get_guardian_home(db: Optional[Client], redis: Optional[Redis], guardian_id: str) -> Dict[str, Any]:
+    """
+    보호자 홈 문서
+
+    캐시가 모두 있으면 Redis 왕복 1회로 끝나고, 없는 부분만 DB에서 채워 저장합니다.
+    """
+    today = _today()
+    home = None
+    if redis:
+        try:
+            home = _read_home(redis, guardian_id)
+            if home is None:
+                _cache_links(redis, guardian_id, await _load_links(db, guardian_id))
+                home = _read_home(redis, guardian_id)
+        except Exception as e:
+            logger.warning(f"보호자 홈 캐시 조회 실패, DB로 대체: {e}")
+            home = None
+
+    if home is None:
+        links = await _load_links(db, guardian_id)
+        home = {
+            "unread": None,
+            "members": {
+                user_id: {"link": link, "snapshot": {}, "counters": {}, "last_activity": None}
+                for user_id, link in links.items()
+            },
+        }
+
+    readable = [
+        user_id for user_id, member in home["members"].items()
+        if member["link"]["perms"].get("read", False)
+    ]
+
+    # 없는/오래된 스냅샷만 다시 만들기
+    rebuild = [user_id for user_id in readable if _is_stale(home["members"][user_id]["snapshot"], today)]
+    if rebuild:
+        built = await asyncio.gather(*(build_senior_snapshot(db, user_id, today) for user_id in rebuild))
+        for user_id, snapshot in zip(rebuild, built):
+            home["members"][user_id]["snapshot"] = snapshot
+        _cache_snapshots(redis, dict(zip(rebuild, built)))
+
+    missing_counters = [user_id for user_id in readable if not home["members"][user_id]["counters"]]
+    if missing_counters:
+        loaded = await asyncio.gather(*(get_user_counters(db, redis, user_id) for user_id in missing_counters))
+        for user_id, counters in zip(missing_counters, loaded):
+            home["members"][user_id]["counters"] = counters
+
+    missing_activity = [user_id for user_id, member in home["members"].items() if member["last_activity"] is None]
+    if missing_activity:
+        activities = await get_last_activities(db, redis, missing_activity)
+        for user_id in missing_activity:
+            home["members"][user_id]["last_activity"] = activities.get(user_id) or ""
+
+    unread = home["unread"]
+    if unread is None:
+        unread = await get_unread_count(db, redis, guardian_id)
+
+    members = [
+        _member_view(user_id, member, today, user_id in readable)
+        for user_id, member in home["members"].items()
+    ]
+    members.sort(key=lambda member: member["name"])
+    return {
+        "unread_alerts": int(unread),
+        "today_completions": sum(member.get("today", {}).get("cards_completed", 0) for member in members),
+        "members": members,
+    }
+
+
+def _member_view(user_id: str, member: Dict[str, Any], today: date, readable: bool) -> Dict[str, Any]:
+    """스냅샷 → 응답 형식 (읽기 권한이 없으면 이름/권한만)"""
+    link = member["link"]
+    view: Dict[str, Any] = {"user_id": user_id, "name": link["name"], "perms": link["perms"]}
+    if not readable:
+        return view
+
+    snapshot = member["snapshot"]
+    daily = []
+    for offset in range(ACTIVITY_DAYS):
+        day = (today - timedelta(days=offset)).isoformat()
+        daily.append({
+            "date": day,
+            "cards_completed": int(snapshot.get(f"cards:{day}", 0)),
+            "med_checks": int(snapshot.get(f"med:{day}", 0)),
+        })
+
+    counters = member["counters"]
+    view.update({
+        "last_activity": member["last_activity"] or None,
+        "total_points": int(snapshot.get("total_points", 0)),
+        "streak_days": int(snapshot.get("streak_days", 0)),
+        "badges": sorted(
+            field[len(BADGE_FIELD_PREFIX):] for field in snapshot if field.startswith(BADGE_FIELD_PREFIX)
+        ),
+        "today": daily[0],
+        "daily_activities": daily,
+        "total_cards_7days": sum(day["cards_completed"] for day in daily),
+        "total_med_checks_7days": sum(day["med_checks"] for day in daily),
+        "totals": {field: int(counters.get(field, 0)) for field in COUNTER_FIELDS},
+    })
+    return view
+
+
+def _cache_links(redis: Redis, guardian_id: str, links: Dict[str, Dict[str, Any]]) -> None:
+    """멤버 목록 저장 (빈 목록도 표시 필드로 캐시)"""
+    mapping = {user_id: json.dumps(link, ensure_ascii=False) for user_id, link in links.items()}
+    mapping[LINKS_LOADED_FIELD] = "1"
+    pipe = redis.pipeline()
+    pipe.delete(links_key(guardian_id))
+    pipe.hset(links_key(guardian_id), mapping=mapping)
+    pipe.expire(links_key(guardian_id), settings.GUARDIAN_LINKS_TTL)
+    pipe.execute()
+
+
+def _cache_snapshots(redis: Optional[Redis], snapshots: Dict[str, Dict[str, Any]]) -> None:
+    """
+    새로 만든 스냅샷 저장 (기존 일별 필드는 지우고 교체)
+
+    만드는 사이 들어온 증분은 빠질 수 있지만 다음 재생성 또는 TTL 만료 때 바로잡힙니다.
+    """
+    if not redis or not snapshots:
+        return
+    try:
+        pipe = redis.pipeline()
+        for user_id, snapshot in snapshots.items():
+            pipe.delete(snapshot_key(user_id))
+            pipe.hset(snapshot_key(user_id), mapping=snapshot)
+            pipe.expire(snapshot_key(user_id), settings.GUARDIAN_SNAPSHOT_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"보호자 홈 스냅샷 저장 실패: {e}")
@@ -0,0 +1,349 @@
+"""
+백그라운드 작업 큐
+
+응답 이후에 해도 되는 부수 작업(배지 평가, 배지 알림, 받은 리액션 카운터 등)을
+요청 경로에서 떼어내 실행합니다. 엔드포인트는 주 쓰기가 끝나면 바로 응답합니다.
+
+백엔드:
+- Redis Stream (JOBS_STREAM): 소비자 그룹으로 여러 워커가 나눠 처리, 워커가 죽으면
+  JOBS_CLAIM_IDLE_MS 뒤 다른 워커가 가져감. 별도 프로세스로 실행: python -m app.worker
+- 프로세스 내 큐: Redis가 없을 때 앱 프로세스의 asyncio 작업으로 처리 (재시작 시 유실)
+
+실패한 작업은 지수 백오프로 JOBS_MAX_ATTEMPTS회까지 재시도하고,
+그래도 실패하면 데드레터({JOBS_STREAM}:dead)에 오류와 함께 남깁니다.
+
+사용법:
+    @job_handler("gamification.check_badges")
+    async def check_badges(db, redis, user_id: str):
+        ...
+
+    get_job_queue().enqueue("gamification.check_badges", user_id=user_id)
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import anyio
+import anyio.to_thread
+from redis import Redis
+from supabase import Client
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+JobHandler = Callable[..., Awaitable[Any]]
+
+
+class UnknownJobError(LookupError):
+    """등록되지 않은 작업 이름 (재시도하지 않고 데드레터로)"""
+
+
+# 작업 이름 → 핸들러 (각 서비스 모듈이 import 시 등록)
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(name: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    작업 핸들러 등록 데코레이터
+
+    핸들러는 (db, redis, **payload)로 호출되며, 예외를 던지면 재시도됩니다.
+    재시도될 수 있으므로 같은 payload로 여러 번 실행돼도 결과가 같아야 합니다.
+    """
+    def decorator(func: JobHandler) -> JobHandler:
+        if name in _handlers and _handlers[name] is not func:
+            raise ValueError(f"이미 등록된 작업 이름: {name}")
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def retry_delay(attempt: int) -> float:
+    """재시도 대기 시간 (attempt번째 실패 후, 지수 백오프)"""
+    return settings.JOBS_RETRY_BASE_DELAY * (2 ** (attempt - 1))
+
+
+async def run_job(name: str, payload: Dict[str, Any], db: Client, redis: Optional[Redis]) -> None:
+    """등록된 핸들러로 작업 1건 실행"""
+    handler = _handlers.get(name)
+    if handler is None:
+        raise UnknownJobError(f"등록되지 않은 작업: {name}")
+    await handler(db, redis, **payload)
+
+
+class JobQueue(ABC):
+    """작업 큐 기본 클래스"""
+    backend: str = ""
+
+    def __init__(self, get_db: Callable[[], Client], get_redis: Callable[[], Optional[Redis]]):
+        self.get_db = get_db
+        self.get_redis = get_redis
+
+    @abstractmethod
+    def enqueue(self, name: str, **payload: Any) -> bool:
+        """작업 추가 (요청 경로에서 호출, 블로킹 없음). 성공 시 True"""
+
+    @abstractmethod
+    async def run(self, stop: asyncio.Event) -> None:
+        """stop이 설정될 때까지 작업 처리"""
+
+
+class InProcessJobQueue(JobQueue):
+    """
+    프로세스 내 asyncio 큐 (Redis가 없을 때)
+
+    재시도는 같은 프로세스에서 지연 후 다시 넣고, 데드레터는 최근 항목만 메모리에 보관합니다.
+    """
+    backend = "inprocess"
+
+    def __init__(self, get_db, get_redis, concurrency: int = 1, dead_letter_size: int = 1000):
+        super().__init__(get_db, get_redis)
+        self.concurrency = max(concurrency, 1)
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=settings.JOBS_INPROCESS_MAXSIZE)
+        self._retry_tasks: set = set()
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=dead_letter_size)
+
+    def enqueue(self, name: str, **payload: Any) -> bool:
+        try:
+            self._queue.put_nowait({"name": name, "payload": payload, "attempts": 0})
+            return True
+        except asyncio.QueueFull:
+            logger.error(f"작업 큐가 가득 참, 버림: {name}")
+            return False
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await stop.wait()
+            # 종료 시 남은 작업 처리 (JOBS_SHUTDOWN_TIMEOUT까지)
+            with anyio.move_on_after(settings.JOBS_SHUTDOWN_TIMEOUT):
+                await self._queue.join()
+        finally:
+            for task in workers + list(self._retry_tasks):
+                task.cancel()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        job["attempts"] += 1
+        try:
+            await run_job(job["name"], job["payload"], self.get_db(), self.get_redis())
+        except Exception as e:
+            if job["attempts"] >= settings.JOBS_MAX_ATTEMPTS or isinstance(e, UnknownJobError):
+                logger.error(f"작업 실패, 데드레터로 이동: {job['name']} ({job['attempts']}회) {e}")
+                self.dead_letters.append({**job, "error": str(e), "failed_at": time.time()})
+                return
+            delay = retry_delay(job["attempts"])
+            logger.warning(f"작업 실패, {delay:.1f}초 후 재시도: {job['name']} ({job['attempts']}회) {e}")
+            task = asyncio.create_task(self._requeue_later(job, delay))
+            self._retry_tasks.add(task)
+            task.add_done_callback(self._retry_tasks.discard)
+
+    async def _requeue_later(self, job: Dict[str, Any], delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put(job)
+
+
+# 재시도 대기열(ZSET)에서 기한이 된 작업을 스트림으로 옮김 (여러 워커가 같은 작업을 옮기지 않도록 원자적으로)
+MOVE_DUE_SCRIPT = """
+local due = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, tonumber(ARGV[2]))
+for _, raw in ipairs(due) do
+    redis.call("ZREM", KEYS[1], raw)
+    local job = cjson.decode(raw)
+    redis.call("XADD", KEYS[2], "MAXLEN", "~", ARGV[3], "*",
+        "name", job["name"], "payload", job["payload"], "attempts", job["attempts"])
+end
+return #due
+"""
+
+
+class RedisStreamJobQueue(JobQueue):
+    """
+    Redis Stream 작업 큐 (소비자 그룹)
+
+    키:
+    - {stream}: 대기 작업 (XADD / XREADGROUP / XACK)
+    - {stream}:delayed: 재시도 대기 작업 (ZSET, score=실행 시각)
+    - {stream}:dead: 최종 실패 작업 (오류 메시지 포함)
+    """
+    backend = "redis"
+
+    def __init__(self, get_db, get_redis, stream: Optional[str] = None, group: Optional[str] = None,
+                 consumer: Optional[str] = None, concurrency: int = 1,
+                 get_consumer_redis: Optional[Callable[[], Optional[Redis]]] = None):
+        super().__init__(get_db, get_redis)
+        # 소비 루프는 블로킹 읽기로 연결을 계속 점유하므로 전용 연결을 쓸 수 있게 분리 (없으면 get_redis)
+        self.get_consumer_redis = get_consumer_redis or get_redis
+        self.stream = stream or settings.JOBS_STREAM
+        self.group = group or settings.JOBS_CONSUMER_GROUP
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = max(concurrency, 1)
+        self.delayed_key = f"{self.stream}:delayed"
+        self.dead_key = f"{self.stream}:dead"
+
+    def enqueue(self, name: str, **payload: Any) -> bool:
+        redis = self.get_redis()
+        if redis is None:
+            return False
+        try:
+            redis.xadd(
+                self.stream,
+                {"name": name, "payload": json.dumps(payload, ensure_ascii=False), "attempts": 0},
+                maxlen=settings.JOBS_STREAM_MAXLEN,
+                approximate=True,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"작업 추가 실패: {name}, {e}")
+            return False
+
+    def ensure_group(self, redis: Redis) -> None:
+        try:
+            redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def run(self, stop: asyncio.Event) -> None:
+        redis = self.get_consumer_redis()
+        if redis is None:
+            logger.error("Redis 없음 - Redis Stream 작업 워커를 시작하지 않음")
+            return
+        logger.info(f"작업 워커 시작: stream={self.stream}, consumer={self.consumer}")
+        group_ready = False
+
+        while not stop.is_set():
+            try:
+                if not group_ready:
+                    await anyio.to_thread.run_sync(self.ensure_group, redis)
+                    group_ready = True
+                await anyio.to_thread.run_sync(self.move_due, redis)
+                entries = await anyio.to_thread.run_sync(self.claim_stale, redis)
+                if not entries:
+                    entries = await anyio.to_thread.run_sync(self.read_new, redis)
+                if entries:
+                    await self._process_batch(redis, entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"작업 워커 오류: {e}")
+                with anyio.move_on_after(settings.JOBS_BLOCK_MS / 1000):
+                    await stop.wait()
+
+    def move_due(self, redis: Redis) -> int:
+        return redis.eval(
+            MOVE_DUE_SCRIPT, 2, self.delayed_key, self.stream,
+            time.time(), self.concurrency * 10, settings.JOBS_STREAM_MAXLEN,
+        )
+
+    def claim_stale(self, redis: Redis) -> List:
+        """처리 중 죽은 워커의 작업 가져오기 (JOBS_CLAIM_IDLE_MS 이상 ACK 없음)"""
+        result = redis.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=settings.JOBS_CLAIM_IDLE_MS, start_id="0-0", count=self.concurrency,
+        )
+        return [entry for entry in result[1] if entry and entry[1]]
+
+    def read_new(self, redis: Redis) -> List:
+        result = redis.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=self.concurrency, block=settings.JOBS_BLOCK_MS,
+        )
+        return result[0][1] if result else []
+
+    async def _process_batch(self, redis: Redis, entries: List) -> None:
+        await asyncio.gather(*(self._process(redis, entry_id, fields) for entry_id, fields in entries))
+
+    async def _process(self, redis: Redis, entry_id: str, fields: Dict[str, str]) -> None:
+        name = fields.get("name", "")
+        attempts = int(fields.get("attempts") or 0) + 1
+        try:
+            payload = json.loads(fields.get("payload") or "{}")
+            await run_job(name, payload, self.get_db(), redis)
+        except Exception as e:
+            await anyio.to_thread.run_sync(self._handle_failure, redis, fields, attempts, e)
+        await anyio.to_thread.run_sync(self._ack, redis, entry_id)
+
+    def _ack(self, redis: Redis, entry_id: str) -> None:
+        pipe = redis.pipeline()
+        pipe.xack(self.stream, self.group, entry_id)
+        pipe.xdel(self.stream, entry_id)
+        pipe.execute()
+
+    def _handle_failure(self, redis: Redis, fields: Dict[str, str], attempts: int, error: Exception) -> None:
+        name = fields.get("name", "")
+        # 알 수 없는 작업/깨진 payload는 재시도해도 같으므로 바로 데드레터
+        if attempts >= settings.JOBS_MAX_ATTEMPTS or isinstance(error, (UnknownJobError, json.JSONDecodeError)):
+            logger.error(f"작업 실패, 데드레터로 이동: {name} ({attempts}회) {error}")
+            redis.xadd(
+                self.dead_key,
+                {**fields, "attempts": attempts, "error": str(error)[:500], "failed_at": time.time()},
+                maxlen=settings.JOBS_STREAM_MAXLEN,
+                approximate=True,
+            )
+            return
+        delay = retry_delay(attempts)
+        logger.warning(f"작업 실패, {delay:.1f}초 후 재시도: {name} ({attempts}회) {error}")
+        job = json.dumps({"name": name, "payload": fields.get("payload") or "{}", "attempts": attempts})
+        redis.zadd(self.delayed_key, {job: time.time() + delay})
+
+
+# ==================== 앱 전역 큐 ====================
+
+_queue: Optional[JobQueue] = None
+
+
+def init_job_queue(
+    get_db: Callable[[], Client],
+    get_redis: Callable[[], Optional[Redis]],
+    get_consumer_redis: Optional[Callable[[], Optional[Redis]]] = None,
+) -> Optional[JobQueue]:
+    """
+    설정(JOBS_BACKEND)에 따라 작업 큐 생성
+    
+    get_consumer_redis: Redis Stream 소비 루프 전용 연결 (없으면 get_redis 공유)
+
+    - auto: Redis가 있으면 Redis Stream, 없으면 프로세스 내 큐
+    - redis / inprocess: 고정
+    - off: 작업 큐 없음 (부수 작업을 요청 안에서 바로 실행)
+    """
+    global _queue
+    backend = settings.JOBS_BACKEND
+    if backend == "off":
+        _queue = None
+    elif backend == "redis" or (backend == "auto" and get_redis() is not None):
+        _queue = RedisStreamJobQueue(
+            get_db, get_redis, concurrency=settings.JOBS_CONCURRENCY, get_consumer_redis=get_consumer_redis,
+        )
+    else:
+        _queue = InProcessJobQueue(get_db, get_redis, concurrency=settings.JOBS_CONCURRENCY)
+    if _queue is not None:
+        logger.info(f"작업 큐 초기화: {_queue.backend}")
+    return _queue
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """앱 전역 작업 큐 (초기화 전이거나 꺼져 있으면 None)"""
+    return _queue
+
+
+def enqueue_job(name: str, **payload: Any) -> bool:
+    """전역 작업 큐에 작업 추가 (큐가 없으면 False → 호출 측에서 바로 실행)"""
+    queue = get_job_queue()
+    return queue.enqueue(name, **payload) if queue is not None else False
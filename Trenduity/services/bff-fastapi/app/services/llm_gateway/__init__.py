@@ -0,0 +1,25 @@
+"""LLM 게이트웨이 (제공자 호출, 대체 모델, 서킷 브레이커, 헤징, 호출 지표)"""
+from app.services.llm_gateway.gateway import (
+    LLMCallFailed,
+    LLMGateway,
+    LLMGatewayError,
+    LLMResult,
+    NoProviderConfigured,
+    get_llm_gateway,
+)
+from app.services.llm_gateway.models import ASSISTANT_MODELS, CHAT_MODELS, LLMTarget, model_targets
+from app.services.llm_gateway.providers import LLMProviderError
+
+__all__ = [
+    "ASSISTANT_MODELS",
+    "CHAT_MODELS",
+    "LLMCallFailed",
+    "LLMGateway",
+    "LLMGatewayError",
+    "LLMProviderError",
+    "LLMResult",
+    "LLMTarget",
+    "NoProviderConfigured",
+    "get_llm_gateway",
+    "model_targets",
+]
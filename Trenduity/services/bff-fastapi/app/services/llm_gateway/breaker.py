@@ -0,0 +1,59 @@
+"""
+제공자별 서킷 브레이커
+
+연속 실패가 LLM_BREAKER_FAILURES회에 도달하면 열림(OPEN) 상태가 되어 해당 제공자 호출을
+바로 건너뜁니다(대체 모델로 즉시 이동). LLM_BREAKER_RESET_SECONDS가 지나면 반열림(HALF_OPEN)
+상태에서 한 번만 시험 호출을 허용하고, 성공하면 닫힘(CLOSED), 실패하면 다시 열림.
+"""
+import time
+from typing import Callable
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커 (이벤트 루프 단일 스레드에서 사용)"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """호출 허용 여부 (반열림이면 시험 호출 1개만)"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """성공/실패로 판단할 수 없는 결과 (취소, 요청 오류) - 시험 호출 슬롯만 반환"""
+        self._trial_in_flight = False
@@ -0,0 +1,357 @@
+"""
+LLM 게이트웨이
+
+/chat, /ai 라우터의 모든 LLM 호출이 거치는 단일 진입점.
+
+- 대체 모델(failover): 실패하면 기다리지 않고 다음 대상(모델 설정의 fallbacks)으로 이동
+- 서킷 브레이커: 제공자별 연속 실패 시 일정 시간 호출 건너뜀 (breaker.py)
+- 지연 기반 라우팅: 대체 모델은 최근 p50 지연이 짧은 순서로 시도
+- 헤징(LLM_HEDGE_ENABLED): 기본 모델이 자신의 p95 지연 안에 응답하지 않으면
+  다음 대상을 동시에 호출하고 먼저 성공한 응답 사용 (나머지는 취소)
+- 동시 호출 제한: 제공자별 세마포어(LLM_PROVIDER_CONCURRENCY), 대기 초과 시 다음 대상으로
+- 호출 지표: 제공자/모델별 지연/토큰/오류 (metrics.py)
+
+사용법:
+    gateway = get_llm_gateway()
+    result = await gateway.complete(model_targets(CHAT_MODELS["allround"]), messages)
+    async for kind, value in gateway.stream(targets, messages):
+        ...  # ("delta", "텍스트") ... ("done", LLMResult)
+"""
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.llm_gateway.breaker import CircuitBreaker
+from app.services.llm_gateway.metrics import LLMMetrics
+from app.services.llm_gateway.models import LLMTarget
+from app.services.llm_gateway.providers import (
+    PROVIDER_CALLS,
+    PROVIDER_STREAMS,
+    LLMProviderError,
+    StreamItem,
+    total_tokens,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LLMGatewayError(Exception):
+    """게이트웨이 호출 실패"""
+    code = "AI_REQUEST_FAILED"
+
+
+class NoProviderConfigured(LLMGatewayError):
+    """호출 가능한 대상의 API 키가 하나도 없음"""
+    code = "API_KEY_MISSING"
+
+
+class LLMCallFailed(LLMGatewayError):
+    """모든 대상 호출 실패"""
+
+    def __init__(self, errors: List[Exception]):
+        super().__init__("; ".join(str(e) for e in errors) or "no attempts")
+        self.errors = errors
+
+
+class CircuitOpenError(LLMGatewayError):
+    """서킷 브레이커 열림 - 호출하지 않고 건너뜀"""
+
+
+class ProviderOverloaded(LLMGatewayError):
+    """제공자 동시 호출 상한 대기 시간 초과"""
+
+
+class LLMResult:
+    """LLM 응답"""
+
+    def __init__(
+        self,
+        text: str,
+        usage: Optional[dict],
+        target: LLMTarget,
+        latency_ms: float,
+        hedged: bool = False,
+        ttft_ms: Optional[float] = None,
+    ):
+        self.text = text
+        self.usage = usage
+        self.target = target
+        self.latency_ms = latency_ms
+        self.hedged = hedged
+        self.ttft_ms = ttft_ms
+
+    @property
+    def provider(self) -> str:
+        return self.target.provider
+
+    @property
+    def model(self) -> str:
+        return self.target.model
+
+    @property
+    def tokens(self) -> Optional[int]:
+        return total_tokens(self.usage)
+
+
+def default_api_keys() -> Dict[str, Optional[str]]:
+    """설정에서 제공자별 API 키 로드"""
+    return {
+        "openai": settings.OPENAI_API_KEY,
+        "google": settings.GOOGLE_AI_API_KEY or settings.GOOGLE_API_KEY,
+        "anthropic": settings.ANTHROPIC_API_KEY,
+    }
+
+
+def is_provider_fault(error: Exception) -> bool:
+    """
+    서킷 브레이커 실패로 셀 오류인지
+
+    요청 자체의 문제(400/401/404 등)는 제공자 장애가 아니므로 제외합니다.
+    """
+    if isinstance(error, LLMProviderError):
+        return error.status_code >= 500 or error.status_code in (200, 408, 429)
+    return True
+
+
+class LLMGateway:
+    """제공자 호출 게이트웨이 (프로세스당 1개, 이벤트 루프에서 사용)"""
+
+    def __init__(
+        self,
+        api_keys: Optional[Dict[str, Optional[str]]] = None,
+        calls: Optional[Dict[str, Callable]] = None,
+        streams: Optional[Dict[str, Callable]] = None,
+        metrics: Optional[LLMMetrics] = None,
+    ):
+        self.api_keys = default_api_keys() if api_keys is None else api_keys
+        self._calls = calls or PROVIDER_CALLS
+        self._streams = streams or PROVIDER_STREAMS
+        self.metrics = metrics or LLMMetrics()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self._breakers:
+            self._breakers[provider] = CircuitBreaker(
+                settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS
+            )
+        return self._breakers[provider]
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(settings.LLM_PROVIDER_CONCURRENCY)
+        return self._semaphores[provider]
+
+    def route(self, targets: List[LLMTarget]) -> List[LLMTarget]:
+        """
+        호출 순서 결정
+
+        API 키가 있는 대상만 사용하고, 첫 대상(사용자가 고른 모델)은 맨 앞에 유지,
+        대체 모델은 최근 p50 지연이 짧은 순 (측정값이 없으면 설정 순서 유지)
+        """
+        usable = [target for target in targets if self.api_keys.get(target.provider)]
+        if not usable:
+            raise NoProviderConfigured("AI API 키가 설정되지 않았어요")
+
+        def observed_p50(target: LLMTarget):
+            p50 = self.metrics.latency(*target).percentile(50)
+            return (p50 is None, p50 or 0.0)
+
+        return usable[:1] + sorted(usable[1:], key=observed_p50)
+
+    def hedge_delay(self, target: LLMTarget) -> Optional[float]:
+        """헤징 시작까지 대기 시간(초) = 대상의 최근 p95 지연 (표본이 부족하면 헤징 안 함)"""
+        if not settings.LLM_HEDGE_ENABLED:
+            return None
+        window = self.metrics.latency(*target)
+        if len(window) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return window.percentile(95) / 1000
+
+    async def _acquire(self, target: LLMTarget) -> asyncio.Semaphore:
+        """서킷 브레이커 확인 + 제공자 동시 호출 슬롯 확보"""
+        breaker = self.breaker(target.provider)
+        if breaker.state == CircuitBreaker.OPEN:
+            self.metrics.record_event(*target, "breaker_open")
+            raise CircuitOpenError(f"{target.provider} circuit open")
+
+        semaphore = self._semaphore(target.provider)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=settings.LLM_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.metrics.record_event(*target, "overloaded")
+            raise ProviderOverloaded(f"{target.provider} concurrency limit")
+
+        if not breaker.allow():
+            semaphore.release()
+            self.metrics.record_event(*target, "breaker_open")
+            raise CircuitOpenError(f"{target.provider} circuit open")
+        return semaphore
+
+    def _record_failure(self, target: LLMTarget, error: Exception, started: float, hedged: bool = False) -> None:
+        if is_provider_fault(error):
+            self.breaker(target.provider).record_failure()
+        else:
+            self.breaker(target.provider).release()
+        self.metrics.record_call(
+            *target, "error", (time.perf_counter() - started) * 1000, hedged=hedged, error=type(error).__name__
+        )
+
+    def _record_cancelled(self, target: LLMTarget, started: float, hedged: bool = False) -> None:
+        self.breaker(target.provider).release()
+        self.metrics.record_call(*target, "cancelled", (time.perf_counter() - started) * 1000, hedged=hedged)
+
+    async def _attempt(self, target: LLMTarget, messages: List[dict], params: dict, hedged: bool) -> LLMResult:
+        """대상 1개 호출"""
+        semaphore = await self._acquire(target)
+        started = time.perf_counter()
+        try:
+            text, usage = await self._calls[target.provider](
+                messages, target.model, api_key=self.api_keys[target.provider], **params
+            )
+        except asyncio.CancelledError:
+            self._record_cancelled(target, started, hedged)
+            raise
+        except Exception as e:
+            self._record_failure(target, e, started, hedged)
+            raise
+        finally:
+            semaphore.release()
+
+        self.breaker(target.provider).record_success()
+        result = LLMResult(text, usage, target, (time.perf_counter() - started) * 1000, hedged=hedged)
+        self.metrics.record_call(*target, "ok", result.latency_ms, tokens=result.tokens, hedged=hedged)
+        return result
+
+    async def complete(
+        self,
+        targets: List[LLMTarget],
+        messages: List[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+    ) -> LLMResult:
+        """
+        전체 응답 호출 (대체 모델 + 헤징)
+
+        Raises:
+            NoProviderConfigured: 사용할 수 있는 API 키 없음
+            LLMCallFailed: 모든 대상 실패
+        """
+        plan = self.route(targets)
+        params = {"system_prompt": system_prompt, "max_tokens": max_tokens, "temperature": temperature}
+        remaining = list(plan)
+        errors: List[Exception] = []
+        pending = set()
+        last_target = None
+
+        def launch(hedged: bool) -> None:
+            nonlocal last_target
+            last_target = remaining.pop(0)
+            pending.add(asyncio.create_task(self._attempt(last_target, messages, params, hedged)))
+
+        launch(hedged=False)
+        try:
+            while pending:
+                # 진행 중인 호출이 1개이고 다음 대상이 있을 때만 헤징 (동시에 최대 2개)
+                timeout = self.hedge_delay(last_target) if remaining and len(pending) == 1 else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.metrics.record_event(*last_target, "hedge_started")
+                    launch(hedged=True)
+                    continue
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                errors.extend(task.exception() for task in done)
+                if not pending and remaining:
+                    launch(hedged=False)
+        finally:
+            # 먼저 끝난 응답을 쓰고 나머지(헤지 패자) 취소
+            for task in pending:
+                task.cancel()
+
+        raise LLMCallFailed(errors)
+
+    async def stream(
+        self,
+        targets: List[LLMTarget],
+        messages: List[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[StreamItem]:
+        """
+        토큰 스트림 호출
+
+        ("delta", "텍스트 조각")을 yield 하고 마지막에 ("done", LLMResult)를 yield 합니다.
+        첫 토큰 전에 실패하면 다음 대상으로 넘어가고, 토큰을 보낸 뒤의 실패는 그대로 전달합니다.
+        (헤징은 하지 않음 - 두 스트림을 동시에 받으면 토큰이 섞임)
+
+        Raises:
+            NoProviderConfigured: 사용할 수 있는 API 키 없음
+            LLMCallFailed: 첫 토큰 전에 모든 대상 실패
+        """
+        params = {"system_prompt": system_prompt, "max_tokens": max_tokens, "temperature": temperature}
+        errors: List[Exception] = []
+        for target in self.route(targets):
+            try:
+                semaphore = await self._acquire(target)
+            except LLMGatewayError as e:
+                errors.append(e)
+                continue
+
+            started = time.perf_counter()
+            ttft_ms = None
+            parts: List[str] = []
+            usage = None
+            try:
+                async for kind, value in self._streams[target.provider](
+                    messages, target.model, api_key=self.api_keys[target.provider], **params
+                ):
+                    if kind == "delta":
+                        if ttft_ms is None:
+                            ttft_ms = (time.perf_counter() - started) * 1000
+                        parts.append(value)
+                        yield "delta", value
+                    else:
+                        usage = value
+            except (asyncio.CancelledError, GeneratorExit):
+                self._record_cancelled(target, started)
+                raise
+            except Exception as e:
+                self._record_failure(target, e, started)
+                if parts:
+                    raise
+                errors.append(e)
+                continue
+            finally:
+                semaphore.release()
+
+            self.breaker(target.provider).record_success()
+            result = LLMResult("".join(parts), usage, target, (time.perf_counter() - started) * 1000, ttft_ms=ttft_ms)
+            self.metrics.record_call(*target, "ok", result.latency_ms, tokens=result.tokens, ttft_ms=ttft_ms)
+            yield "done", result
+            return
+
+        raise LLMCallFailed(errors)
+
+    def stats(self) -> dict:
+        """호출 지표 + 제공자별 서킷 브레이커 상태"""
+        return {
+            "calls": self.metrics.snapshot(),
+            "breakers": {provider: breaker.state for provider, breaker in self._breakers.items()},
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """프로세스 공용 게이트웨이 (FastAPI 의존성으로도 사용)"""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
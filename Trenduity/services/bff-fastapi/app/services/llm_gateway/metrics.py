@@ -0,0 +1,102 @@
+"""
+LLM 호출 지표
+
+(제공자, 모델)별 호출 수/오류 수/토큰/지연 시간(최근 LLM_LATENCY_WINDOW개)을 프로세스 메모리에 기록합니다.
+지연 시간 분포는 대체 모델 순서 결정(지연 기반 라우팅)과 헤징 기준(p95)에 사용되고,
+/health/llm 에서 조회할 수 있습니다.
+"""
+import logging
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """최근 N개 지연 시간(ms)"""
+
+    def __init__(self, size: int):
+        self._samples = deque(maxlen=size)
+
+    def add(self, latency_ms: float) -> None:
+        self._samples.append(latency_ms)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+        return ordered[index]
+
+
+class LLMMetrics:
+    """제공자/모델별 호출 지표"""
+
+    OUTCOMES = ("ok", "error", "cancelled")
+
+    def __init__(self, window: Optional[int] = None):
+        self._window = window or settings.LLM_LATENCY_WINDOW
+        self._latency: Dict[str, LatencyWindow] = {}
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    @staticmethod
+    def _key(provider: str, model: str) -> str:
+        return f"{provider}/{model}"
+
+    def latency(self, provider: str, model: str) -> LatencyWindow:
+        key = self._key(provider, model)
+        if key not in self._latency:
+            self._latency[key] = LatencyWindow(self._window)
+        return self._latency[key]
+
+    def record_call(
+        self,
+        provider: str,
+        model: str,
+        outcome: str,
+        latency_ms: float,
+        tokens: Optional[int] = None,
+        hedged: bool = False,
+        ttft_ms: Optional[float] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """호출 1건 기록 + 구조화 로그"""
+        counts = self._counts[self._key(provider, model)]
+        counts["calls"] += 1
+        counts[outcome] += 1
+        if tokens:
+            counts["tokens"] += tokens
+        if hedged:
+            counts["hedged_calls"] += 1
+        # 성공한 호출만 지연 분포에 반영 (빠른 실패가 라우팅을 왜곡하지 않도록)
+        if outcome == "ok":
+            self.latency(provider, model).add(latency_ms)
+
+        logger.info(
+            f"🤖 LLM call provider={provider} model={model} outcome={outcome} "
+            f"latency_ms={latency_ms:.0f} tokens={tokens if tokens is not None else '-'}"
+            f"{f' ttft_ms={ttft_ms:.0f}' if ttft_ms is not None else ''}"
+            f"{' hedged=1' if hedged else ''}"
+            f"{f' error={error}' if error else ''}"
+        )
+
+    def record_event(self, provider: str, model: str, event: str) -> None:
+        """호출 전 이벤트 (breaker_open, overloaded, hedge_started)"""
+        self._counts[self._key(provider, model)][event] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        result = {}
+        for key, counts in self._counts.items():
+            window = self._latency.get(key)
+            result[key] = {
+                **counts,
+                "p50_ms": window.percentile(50) if window else None,
+                "p95_ms": window.percentile(95) if window else None,
+                "p99_ms": window.percentile(99) if window else None,
+            }
+        return result
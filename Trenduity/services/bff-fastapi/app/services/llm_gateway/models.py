@@ -0,0 +1,95 @@
+"""
+AI 비서 모델 카탈로그
+
+/chat 라우터(CHAT_MODELS)와 /ai 라우터(ASSISTANT_MODELS)가 사용하는 모델 설정.
+각 모델은 기본 (제공자, 모델)과 장애 시 대체할 fallbacks 목록을 가집니다.
+"""
+from typing import List, NamedTuple
+
+
+class LLMTarget(NamedTuple):
+    """호출 대상 (제공자, 모델)"""
+    provider: str
+    model: str
+
+
+# /chat 라우터 모델 (플랜별 사용 제한: PLAN_AI_LIMITS)
+CHAT_MODELS = {
+    # 빠른 일반 비서 - Gemini
+    "quick": {
+        "provider": "google",
+        "model": "gemini-1.5-flash",
+        "fallbacks": [LLMTarget("openai", "gpt-4o-mini")],
+        "name": "빠른 일반 비서",
+    },
+    # 만능 비서 - GPT-4o-mini (빠른 GPT 계열)
+    "allround": {
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "fallbacks": [LLMTarget("openai", "gpt-3.5-turbo"), LLMTarget("google", "gemini-1.5-flash")],
+        "name": "만능 비서",
+    },
+    # 글쓰기 비서 - Claude
+    "writer": {
+        "provider": "anthropic",
+        "model": "claude-3-5-sonnet-20241022",
+        "fallbacks": [LLMTarget("anthropic", "claude-3-haiku-20240307"), LLMTarget("openai", "gpt-4o-mini")],
+        "name": "글쓰기 비서",
+    },
+    # 척척박사 비서 - 플래그쉽 계열 (GPT-4o)
+    "expert": {
+        "provider": "openai",
+        "model": "gpt-4o",
+        "fallbacks": [LLMTarget("openai", "gpt-4o-mini"), LLMTarget("anthropic", "claude-3-5-sonnet-20241022")],
+        "name": "척척박사 비서",
+    },
+    # 천재 비서 - Claude Opus 4.5급 하이엔드 (든든 플랜 전용)
+    "genius": {
+        "provider": "anthropic",
+        "model": "claude-sonnet-4-20250514",
+        "fallbacks": [LLMTarget("anthropic", "claude-3-5-sonnet-20241022"), LLMTarget("openai", "gpt-4o")],
+        "name": "천재 비서",
+    },
+}
+
+
+# /ai 라우터 4가지 비서 모델
+ASSISTANT_MODELS = {
+    "allround": {
+        "name": "만능 비서",
+        "provider": "openai",
+        "model": "gpt-5-nano",  # GPT-5 Nano (최신 OpenAI 모델)
+        "fallbacks": [LLMTarget("google", "gemini-2.0-flash-lite")],
+        "max_tokens": 800,
+        "system_prompt": "당신은 시니어를 위한 만능 AI 도우미입니다. 디지털 기기 사용법, 앱 활용, 일상 생활의 모든 궁금증에 친절하고 자세하게 답변해주세요. 어르신이 이해하기 쉽게 단계별로 설명하고, 이모지를 적절히 사용해 친근하게 소통하세요.",
+    },
+    "quick": {
+        "name": "빠른 비서",
+        "provider": "google",
+        "model": "gemini-2.0-flash-lite",  # Gemini 2.0 Flash Lite (최신 빠른 모델)
+        "fallbacks": [LLMTarget("openai", "gpt-5-nano")],
+        "max_tokens": 400,
+        "system_prompt": "당신은 빠르고 간결한 답변을 제공하는 AI 도우미입니다. 사용자의 질문에 핵심만 짧고 명확하게 답변하세요. 불필요한 설명은 생략하고, 꼭 필요한 정보만 전달하세요.",
+    },
+    "writer": {
+        "name": "글쓰기 비서",
+        "provider": "google",
+        "model": "gemini-2.5-flash",  # Gemini 2.5 Flash (최신 균형 모델)
+        "fallbacks": [LLMTarget("openai", "gpt-5-mini")],
+        "max_tokens": 800,
+        "system_prompt": "당신은 시니어를 위한 친절한 글쓰기 도우미입니다. 사용자가 편지, 문자, 이메일, 축하 메시지 등을 작성할 때 쉽고 정중한 표현으로 도와주세요. 어려운 표현은 피하고, 따뜻하고 정감 있는 한국어를 사용하세요.",
+    },
+    "expert": {
+        "name": "척척박사 비서",
+        "provider": "openai",
+        "model": "gpt-5-mini",  # GPT-5 Mini (최신 OpenAI 경량 모델)
+        "fallbacks": [LLMTarget("google", "gemini-2.5-flash")],
+        "max_tokens": 500,
+        "system_prompt": "당신은 시니어를 위한 박식한 정보 도우미입니다. 건강, 생활 상식, 역사, 문화 등 다양한 분야의 질문에 쉽고 정확하게 답변해주세요. 전문 용어는 쉽게 풀어서 설명하고, 필요하면 예시를 들어주세요.",
+    },
+}
+
+
+def model_targets(config: dict) -> List[LLMTarget]:
+    """모델 설정 → 호출 순서대로의 대상 목록 (기본 모델 + fallbacks)"""
+    return [LLMTarget(config["provider"], config["model"])] + list(config.get("fallbacks", []))
@@ -0,0 +1,295 @@
+"""
+LLM 제공자 호출 (OpenAI / Gemini / Anthropic)
+
+제공자별 요청 형식 변환과 응답 파싱만 담당합니다. 장애 대응(서킷 브레이커, 대체 모델,
+헤징, 동시 호출 제한)은 LLMGateway(gateway.py)에서 처리합니다.
+공유 HTTP 클라이언트(app/core/http_clients.py)를 사용합니다.
+
+- complete_*: 전체 응답 1회 반환 → (텍스트, 사용량)
+- stream_*: 토큰 스트림(SSE)을 읽어 다음 튜플을 순서대로 yield
+    ("delta", "텍스트 조각")   - 생성된 토큰
+    ("usage", {...})           - 제공자가 보고한 토큰 사용량 (있을 때, 마지막 부근)
+
+스트림 순회를 멈추면(클라이언트 연결 끊김 등) 업스트림 연결도 닫혀
+제공자 쪽 생성이 중단됩니다.
+"""
+import json
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.http_clients import get_llm_client
+
+logger = logging.getLogger(__name__)
+
+StreamItem = Tuple[str, object]
+Completion = Tuple[str, Optional[dict]]
+
+
+class LLMProviderError(Exception):
+    """제공자 오류 응답 (HTTP 오류 또는 스트림 중 error 이벤트)"""
+
+    def __init__(self, provider: str, status_code: int, body: str = ""):
+        super().__init__(f"{provider} API error: {status_code}")
+        self.provider = provider
+        self.status_code = status_code
+        self.body = body
+
+
+async def _raise_for_status(provider: str, response: httpx.Response) -> None:
+    if response.status_code != 200:
+        body = (await response.aread()).decode("utf-8", "replace")
+        raise LLMProviderError(provider, response.status_code, body[:500])
+
+
+async def iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """업스트림 SSE 응답에서 data 필드만 추출"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data and data != "[DONE]":
+            yield data
+
+
+def total_tokens(usage: Optional[dict]) -> Optional[int]:
+    """제공자별 사용량 형식에서 총 토큰 수 추출"""
+    if not usage:
+        return None
+    if "total_tokens" in usage:  # OpenAI
+        return usage["total_tokens"]
+    if "totalTokenCount" in usage:  # Gemini
+        return usage["totalTokenCount"]
+    if "output_tokens" in usage:  # Anthropic
+        return usage.get("input_tokens", 0) + usage["output_tokens"]
+    return None
+
+
+# ==================== OpenAI ====================
+
+def _openai_request(messages, model, api_key, system_prompt, max_tokens, temperature) -> Tuple[dict, dict]:
+    # system 메시지가 없을 때만 system_prompt 추가
+    if system_prompt and not any(msg["role"] == "system" for msg in messages):
+        messages = [{"role": "system", "content": system_prompt}] + list(messages)
+
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+    }
+    # GPT-5 모델은 max_completion_tokens 사용, 이전 모델은 max_tokens 사용
+    if model.startswith("gpt-5"):
+        payload["max_completion_tokens"] = max_tokens
+    else:
+        payload["max_tokens"] = max_tokens
+
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    return payload, headers
+
+
+async def complete_openai(
+    messages: List[Dict[str, str]],
+    model: str,
+    api_key: str,
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+) -> Completion:
+    """OpenAI Chat Completions 호출"""
+    payload, headers = _openai_request(messages, model, api_key, system_prompt, max_tokens, temperature)
+    response = await get_llm_client("openai").post("/v1/chat/completions", json=payload, headers=headers)
+    await _raise_for_status("openai", response)
+    data = response.json()
+    return data["choices"][0]["message"]["content"], data.get("usage")
+
+
+async def stream_openai(
+    messages: List[Dict[str, str]],
+    model: str,
+    api_key: str,
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+) -> AsyncIterator[StreamItem]:
+    """OpenAI Chat Completions 스트리밍"""
+    payload, headers = _openai_request(messages, model, api_key, system_prompt, max_tokens, temperature)
+    payload["stream"] = True
+    payload["stream_options"] = {"include_usage": True}
+
+    async with get_llm_client("openai").stream(
+        "POST", "/v1/chat/completions", json=payload, headers=headers
+    ) as response:
+        await _raise_for_status("openai", response)
+        async for data in iter_sse_data(response):
+            chunk = json.loads(data)
+            for choice in chunk.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    yield "delta", text
+            if chunk.get("usage"):
+                yield "usage", chunk["usage"]
+
+
+# ==================== Google Gemini ====================
+
+def _google_payload(messages, system_prompt, max_tokens, temperature) -> dict:
+    # Gemini 형식으로 변환 (system은 systemInstruction으로)
+    contents = []
+    for msg in messages:
+        if msg["role"] == "system":
+            system_prompt = system_prompt or msg["content"]
+        else:
+            contents.append({
+                "role": "user" if msg["role"] == "user" else "model",
+                "parts": [{"text": msg["content"]}],
+            })
+
+    payload = {
+        "contents": contents,
+        "generationConfig": {"maxOutputTokens": max_tokens, "temperature": temperature},
+    }
+    if system_prompt:
+        payload["systemInstruction"] = {"parts": [{"text": system_prompt}]}
+    return payload
+
+
+async def complete_google(
+    messages: List[Dict[str, str]],
+    model: str,
+    api_key: str,
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+) -> Completion:
+    """Gemini generateContent 호출"""
+    response = await get_llm_client("google").post(
+        f"/v1beta/models/{model}:generateContent",
+        params={"key": api_key},
+        json=_google_payload(messages, system_prompt, max_tokens, temperature),
+    )
+    await _raise_for_status("google", response)
+    data = response.json()
+    if not data.get("candidates"):
+        raise LLMProviderError("google", response.status_code, "No response from Gemini")
+    return data["candidates"][0]["content"]["parts"][0]["text"], data.get("usageMetadata")
+
+
+async def stream_google(
+    messages: List[Dict[str, str]],
+    model: str,
+    api_key: str,
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+) -> AsyncIterator[StreamItem]:
+    """Gemini streamGenerateContent (alt=sse) 스트리밍"""
+    usage = None
+    async with get_llm_client("google").stream(
+        "POST",
+        f"/v1beta/models/{model}:streamGenerateContent",
+        params={"alt": "sse", "key": api_key},
+        json=_google_payload(messages, system_prompt, max_tokens, temperature),
+    ) as response:
+        await _raise_for_status("google", response)
+        async for data in iter_sse_data(response):
+            chunk = json.loads(data)
+            for candidate in chunk.get("candidates") or []:
+                for part in (candidate.get("content") or {}).get("parts") or []:
+                    if part.get("text"):
+                        yield "delta", part["text"]
+            # usageMetadata는 매 청크에 누적값으로 옴 → 마지막 값만 전달
+            usage = chunk.get("usageMetadata") or usage
+    if usage:
+        yield "usage", usage
+
+
+# ==================== Anthropic ====================
+
+def _anthropic_request(messages, model, api_key, system_prompt, max_tokens, temperature) -> Tuple[dict, dict]:
+    # Claude 형식으로 변환 (system은 별도)
+    claude_messages = []
+    for msg in messages:
+        if msg["role"] in ["user", "assistant"]:
+            claude_messages.append({"role": msg["role"], "content": msg["content"]})
+        elif msg["role"] == "system":
+            system_prompt = system_prompt or msg["content"]
+
+    payload = {
+        "model": model,
+        "messages": claude_messages,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+    }
+    if system_prompt:
+        payload["system"] = system_prompt
+
+    headers = {
+        "x-api-key": api_key,
+        "anthropic-version": "2023-06-01",
+        "Content-Type": "application/json",
+    }
+    return payload, headers
+
+
+async def complete_anthropic(
+    messages: List[Dict[str, str]],
+    model: str,
+    api_key: str,
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+) -> Completion:
+    """Anthropic Messages 호출"""
+    payload, headers = _anthropic_request(messages, model, api_key, system_prompt, max_tokens, temperature)
+    response = await get_llm_client("anthropic").post("/v1/messages", json=payload, headers=headers)
+    await _raise_for_status("anthropic", response)
+    data = response.json()
+    return data["content"][0]["text"], data.get("usage")
+
+
+async def stream_anthropic(
+    messages: List[Dict[str, str]],
+    model: str,
+    api_key: str,
+    system_prompt: Optional[str] = None,
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+) -> AsyncIterator[StreamItem]:
+    """Anthropic Messages 스트리밍"""
+    payload, headers = _anthropic_request(messages, model, api_key, system_prompt, max_tokens, temperature)
+    payload["stream"] = True
+
+    usage: Dict[str, int] = {}
+    async with get_llm_client("anthropic").stream(
+        "POST", "/v1/messages", json=payload, headers=headers
+    ) as response:
+        await _raise_for_status("anthropic", response)
+        async for data in iter_sse_data(response):
+            event = json.loads(data)
+            event_type = event.get("type")
+            if event_type == "content_block_delta":
+                text = (event.get("delta") or {}).get("text")
+                if text:
+                    yield "delta", text
+            elif event_type == "message_start":
+                usage.update((event.get("message") or {}).get("usage") or {})
+            elif event_type == "message_delta":
+                usage.update(event.get("usage") or {})
+            elif event_type == "error":
+                raise LLMProviderError("anthropic", 200, data[:500])
+    if usage:
+        yield "usage", usage
+
+
+PROVIDER_CALLS = {
+    "openai": complete_openai,
+    "google": complete_google,
+    "anthropic": complete_anthropic,
+}
+
+PROVIDER_STREAMS = {
+    "openai": stream_openai,
+    "google": stream_google,
+    "anthropic": stream_anthropic,
+}
@@ -0,0 +1,93 @@
+"""
+리액션 통계
+
+대상(Q&A 게시물, 카드 등)별 종류별 리액션 수와 현재 사용자의 리액션 여부를 조회합니다.
+리액션 행을 모두 읽어 세지 않고, reactions 트리거가 유지하는 reaction_counts 카운터와
+사용자 본인 리액션만 RPC 1회로 읽습니다 (scripts/migrations/008_reaction_counts.sql).
+목록 한 페이지(게시물 20개)도 호출 1회, 비용은 게시물 인기와 무관합니다.
+
+반환 형식:
+    {"<target_id>": {"like": {"count": 12, "user_reacted": True}, "cheer": {...}}}
+"""
+import logging
+from typing import Dict, List, Optional
+
+from supabase import Client
+
+from app.core.db import run_query
+
+logger = logging.getLogger(__name__)
+
+
+REACTION_STATS_RPC = "get_reaction_stats"
+
+ReactionStatsMap = Dict[str, Dict[str, Dict[str, object]]]
+
+
+async def get_reaction_stats(
+    db: Client,
+    target_type: str,
+    target_ids: List[str],
+    user_id: Optional[str] = None,
+) -> ReactionStatsMap:
+    """
+    대상 목록의 종류별 리액션 수 + 사용자 리액션 여부 (RPC 1회)
+
+    리액션이 없는 대상은 결과에 없습니다.
+    """
+    if not target_ids:
+        return {}
+
+    try:
+        result = await run_query(db.rpc(REACTION_STATS_RPC, {
+            "p_target_type": target_type,
+            "p_target_ids": target_ids,
+            "p_user_id": user_id,
+        }))
+        rows = result.data or []
+    except Exception as e:
+        # 마이그레이션(008_reaction_counts.sql) 미적용 시 리액션 행 집계
+        logger.warning(f"리액션 카운터 조회 실패, 리액션 행 집계로 대체: {e}")
+        return await _aggregate_from_reactions(db, target_type, target_ids, user_id)
+
+    stats: ReactionStatsMap = {}
+    for row in rows:
+        stats.setdefault(str(row["target_id"]), {})[row["kind"]] = {
+            "count": int(row.get("count") or 0),
+            "user_reacted": bool(row.get("user_reacted")),
+        }
+    return stats
+
+
+async def _aggregate_from_reactions(
+    db: Client,
+    target_type: str,
+    target_ids: List[str],
+    user_id: Optional[str],
+) -> ReactionStatsMap:
+    """리액션 행을 모두 읽어 집계 (카운터 테이블이 없을 때만)"""
+    result = await run_query(
+        db.table("reactions")
+        .select("target_id, kind, user_id")
+        .eq("target_type", target_type)
+        .in_("target_id", target_ids)
+    )
+    stats: ReactionStatsMap = {}
+    for row in result.data or []:
+        kind_stats = stats.setdefault(str(row["target_id"]), {}).setdefault(
+            row["kind"], {"count": 0, "user_reacted": False}
+        )
+        kind_stats["count"] += 1
+        if user_id and row["user_id"] == user_id:
+            kind_stats["user_reacted"] = True
+    return stats
+
+
+def total_count(kinds: Dict[str, Dict[str, object]]) -> int:
+    """대상 1개의 전체 리액션 수 (종류 합계)"""
+    return sum(int(stats["count"]) for stats in kinds.values())
+
+
+def user_reacted_kinds(kinds: Dict[str, Dict[str, object]]) -> List[str]:
+    """대상 1개에서 사용자가 누른 리액션 종류"""
+    return sorted(kind for kind, stats in kinds.items() if stats["user_reacted"])
@@ -0,0 +1,405 @@
+"""
+사용자 활동 카운터
+
+전체 이력을 매번 스캔하지 않도록 사용자별 누적 카운터를 유지합니다.
+- DB: user_stats_counters 테이블 (원본 테이블 트리거가 같은 트랜잭션에서 증감)
+- Redis: 사용자별 해시 user:stats:{user_id} (조회 O(1))
+- 재계산: rebuild_user_stats_counters RPC로 원본 테이블에서 다시 집계 (주기 작업)
+
+쓰기 경로는 DB 기록 후 bump_user_counters()로 Redis 해시만 증가시킵니다.
+해시가 없으면 건드리지 않고, 다음 조회 때 DB 카운터로 채웁니다.
+채우기는 DB 조회 전에 토큰(user:stats_fill:{user_id})을 남기고, 조회 중에 증가가 들어오면
+토큰이 지워져 이전 값으로 채우지 않습니다 (증가분이 사라지지 않도록 다음 조회에서 다시 채움).
+
+마지막 활동 시각(가족 멤버 목록)도 같은 행의 last_activity_at 컬럼(트리거 갱신)에 두고,
+Redis 문자열 user:last_activity:{user_id}로 캐시합니다 (여러 사용자 MGET 1회).
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from redis import Redis
+from supabase import Client
+
+from app.core.config import settings
+from app.core.db import run_query, run_sync
+
+logger = logging.getLogger(__name__)
+
+
+COUNTER_FIELDS = (
+    "cards_completed",
+    "quizzes_correct",
+    "med_checks",
+    "scam_checks",
+    "posts",
+    "reactions_received",
+)
+
+COUNTERS_KEY_PREFIX = "user:stats:"
+FILL_TOKEN_KEY_PREFIX = "user:stats_fill:"
+FILL_TOKEN_TTL = 30  # DB 조회 → 해시 채우기 사이 허용 시간(초)
+LAST_ACTIVITY_KEY_PREFIX = "user:last_activity:"
+NO_ACTIVITY = ""  # 활동 기록이 없는 사용자도 캐시 (빈 문자열)
+COUNTERS_TABLE = "user_stats_counters"
+REBUILD_RPC = "rebuild_user_stats_counters"
+
+# 해시가 있을 때만 증가 (없는 해시를 일부 필드로 만들면 나머지가 0으로 보임)
+# 해시가 없으면 진행 중인 채우기 토큰(KEYS[2])을 지워, 이 증가 이전에 읽은 DB 값으로 채우지 않게 함
+INCR_IF_EXISTS_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    redis.call("DEL", KEYS[2])
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call("HINCRBY", KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# DB 조회 전 토큰이 그대로이고 해시가 없을 때만 채움
+# (조회 중 증가가 들어왔거나 다른 요청이 먼저 채웠으면 덮어쓰지 않음)
+# ARGV[1]: 토큰, ARGV[2]: TTL, 이후 필드/값 쌍
+FILL_IF_ABSENT_SCRIPT = """
+if redis.call("GET", KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+redis.call("DEL", KEYS[2])
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call("HSET", KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call("EXPIRE", KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def counters_key(user_id: str) -> str:
+    """사용자 카운터 Redis 해시 키"""
+    return f"{COUNTERS_KEY_PREFIX}{user_id}"
+
+
+def fill_token_key(user_id: str) -> str:
+    """카운터 해시 채우기 토큰 Redis 키"""
+    return f"{FILL_TOKEN_KEY_PREFIX}{user_id}"
+
+
+def _empty_counters() -> Dict[str, int]:
+    return {field: 0 for field in COUNTER_FIELDS}
+
+
+def _normalize(row: Dict[str, Any]) -> Dict[str, int]:
+    """DB 행/Redis 해시 → {필드: int}"""
+    return {field: int(row.get(field) or 0) for field in COUNTER_FIELDS}
+
+
+def bump_user_counters(redis: Optional[Redis], user_id: Optional[str], **deltas: int) -> bool:
+    """
+    쓰기 경로에서 Redis 카운터 증감 (DB 카운터는 트리거가 갱신)
+    
+    예: bump_user_counters(redis, user_id, cards_completed=1, quizzes_correct=3)
+    
+    Returns:
+        해시가 있어 증가했으면 True
+    """
+    if not redis or not user_id:
+        return False
+    
+    args = []
+    for field, delta in deltas.items():
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"unknown counter: {field}")
+        if delta:
+            args.extend([field, int(delta)])
+    if not args:
+        return False
+    
+    try:
+        return bool(redis.eval(INCR_IF_EXISTS_SCRIPT, 2, counters_key(user_id), fill_token_key(user_id), *args))
+    except Exception as e:
+        # 실패 시 캐시가 틀어지지 않도록 해시 삭제 (다음 조회 때 DB에서 다시 채움)
+        logger.warning(f"카운터 증가 실패, 캐시 삭제: user={user_id}, {e}")
+        try:
+            redis.delete(counters_key(user_id))
+        except Exception:
+            pass
+        return False
+
+
+def get_cached_user_counters(redis: Optional[Redis], user_id: str) -> Optional[Dict[str, int]]:
+    """Redis 해시에서만 카운터 조회 (없으면 None, DB 조회 안 함)"""
+    if not redis:
+        return None
+    try:
+        cached = redis.hgetall(counters_key(user_id))
+        return _normalize(cached) if cached else None
+    except Exception as e:
+        logger.warning(f"카운터 캐시 조회 실패: {e}")
+        return None
+
+
+def _begin_fill(redis: Optional[Redis], user_id: str) -> Optional[str]:
+    """DB 조회 전 채우기 토큰 기록 (이후 증가가 들어오면 쓰기 경로가 지움)"""
+    if not redis:
+        return None
+    token = uuid.uuid4().hex
+    try:
+        redis.set(fill_token_key(user_id), token, ex=FILL_TOKEN_TTL)
+        return token
+    except Exception as e:
+        logger.warning(f"카운터 채우기 토큰 저장 실패: {e}")
+        return None
+
+
+def _cache_counters(redis: Optional[Redis], user_id: str, counters: Dict[str, int], token: Optional[str]) -> None:
+    if not redis or not token:
+        return
+    args = [token, settings.USER_STATS_CACHE_TTL]
+    for field, value in counters.items():
+        args.extend([field, int(value)])
+    try:
+        redis.eval(FILL_IF_ABSENT_SCRIPT, 2, counters_key(user_id), fill_token_key(user_id), *args)
+    except Exception as e:
+        logger.warning(f"카운터 캐시 저장 실패: {e}")
+
+
+async def get_user_counters(db: Client, redis: Optional[Redis], user_id: str) -> Dict[str, int]:
+    """
+    사용자 활동 카운터 조회 (Redis 해시 → DB 카운터 행 → 원본 재집계)
+    
+    Returns:
+        {"cards_completed": 15, "quizzes_correct": 25, "med_checks": 30,
+         "scam_checks": 3, "posts": 2, "reactions_received": 11}
+    """
+    counters = get_cached_user_counters(redis, user_id)
+    if counters is not None:
+        return counters
+    
+    token = _begin_fill(redis, user_id)
+    try:
+        result = await run_query(
+            db.table(COUNTERS_TABLE)
+            .select(", ".join(COUNTER_FIELDS))
+            .eq("user_id", user_id)
+            .limit(1)
+        )
+        if result.data:
+            counters = _normalize(result.data[0])
+        else:
+            # 카운터 행이 없는 사용자 (마이그레이션 이전 가입자 등): 원본에서 집계해 생성
+            rebuilt = await run_query(db.rpc(REBUILD_RPC, {"p_user_id": user_id}))
+            counters = _normalize(rebuilt.data[0]) if rebuilt.data else _empty_counters()
+    except Exception as e:
+        # 마이그레이션(004_user_stats_counters.sql) 미적용 시 원본 테이블 집계
+        logger.warning(f"카운터 테이블 조회 실패, 원본 집계로 대체: {e}")
+        return await _aggregate_from_sources(db, user_id)
+    
+    _cache_counters(redis, user_id, counters, token)
+    return counters
+
+
+async def _aggregate_from_sources(db: Client, user_id: str) -> Dict[str, int]:
+    """카운터 테이블이 없을 때 원본 테이블에서 직접 집계 (캐시하지 않음)"""
+    counters = _empty_counters()
+    
+    async def count(table: str, column: str = "user_id") -> int:
+        result = await run_query(db.table(table).select("id", count="exact").eq(column, user_id).limit(1))
+        return result.count or 0
+    
+    try:
+        counters["cards_completed"] = await count("completed_cards")
+        quiz_result = await run_query(db.table("completed_cards").select("quiz_correct").eq("user_id", user_id))
+        counters["quizzes_correct"] = sum(row.get("quiz_correct") or 0 for row in quiz_result.data or [])
+        counters["med_checks"] = await count("med_checks")
+        counters["scam_checks"] = await count("scam_checks")
+        counters["posts"] = await count("qna_posts", "author_id")
+        counters["reactions_received"] = await _count_reactions_received(db, user_id)
+    except Exception as e:
+        logger.error(f"원본 카운터 집계 실패: user={user_id}, {e}")
+    return counters
+
+
+async def _count_reactions_received(db: Client, user_id: str) -> int:
+    """사용자 Q&A 게시물에 달린 리액션 수 (004 마이그레이션의 reactions_received 집계와 동일)"""
+    posts = await run_query(db.table("qna_posts").select("id").eq("author_id", user_id))
+    post_ids = [row["id"] for row in posts.data or []]
+    if not post_ids:
+        return 0
+    result = await run_query(
+        db.table("reactions")
+        .select("id", count="exact")
+        .eq("target_type", "qna_post")
+        .in_("target_id", post_ids)
+        .limit(1)
+    )
+    return result.count or 0
+
+
+async def rebuild_user_counters(db: Client, redis: Optional[Redis], user_id: Optional[str] = None) -> int:
+    """
+    원본 테이블에서 카운터 재계산 후 Redis 해시 삭제
+    
+    트리거 누락/수동 데이터 수정 등으로 어긋난 카운터를 바로잡습니다.
+    
+    Args:
+        user_id: 특정 사용자만 (None이면 전체)
+    
+    Returns:
+        재계산한 사용자 수
+    """
+    result = await run_query(db.rpc(REBUILD_RPC, {"p_user_id": user_id}))
+    rebuilt = len(result.data or [])
+    
+    if redis:
+        try:
+            if user_id:
+                redis.delete(counters_key(user_id))
+            else:
+                await run_sync(_delete_all_cached_counters, redis)
+        except Exception as e:
+            logger.warning(f"카운터 캐시 삭제 실패: {e}")
+    
+    logger.info(f"사용자 카운터 재계산 완료: {rebuilt}명 (user={user_id or 'all'})")
+    return rebuilt
+
+
+def _delete_all_cached_counters(redis: Redis, batch_size: int = 500) -> int:
+    """user:stats:* 해시를 SCAN + UNLINK로 삭제"""
+    deleted = 0
+    batch = []
+    for key in redis.scan_iter(match=f"{COUNTERS_KEY_PREFIX}*", count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            deleted += redis.unlink(*batch)
+            batch = []
+    if batch:
+        deleted += redis.unlink(*batch)
+    return deleted
+
+
+def last_activity_key(user_id: str) -> str:
+    """사용자 마지막 활동 시각 Redis 키"""
+    return f"{LAST_ACTIVITY_KEY_PREFIX}{user_id}"
+
+
+def touch_last_activity(redis: Optional[Redis], user_id: Optional[str], at: Optional[datetime] = None) -> None:
+    """
+    쓰기 경로에서 마지막 활동 시각 캐시 갱신 (DB 컬럼은 트리거가 갱신)
+    
+    카드 완료/복약 체크/Q&A 작성 후 호출합니다.
+    """
+    if not redis or not user_id:
+        return
+    
+    at = at or datetime.now(timezone.utc)
+    try:
+        redis.set(last_activity_key(user_id), at.isoformat(), ex=settings.USER_STATS_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"마지막 활동 캐시 갱신 실패: user={user_id}, {e}")
+
+
+async def get_last_activities(db: Client, redis: Optional[Redis], user_ids: List[str]) -> Dict[str, Optional[str]]:
+    """
+    여러 사용자의 마지막 활동 시각 (ISO 문자열, 활동 없으면 None)
+    
+    Redis MGET 1회 → 없는 사용자만 카운터 행 일괄 조회 (user_id IN, 기본 키)
+    읽는 행 수는 사용자 수에 비례합니다.
+    """
+    activities: Dict[str, Optional[str]] = {}
+    if not user_ids:
+        return activities
+    
+    missing = list(user_ids)
+    if redis:
+        try:
+            cached = redis.mget([last_activity_key(user_id) for user_id in user_ids])
+            missing = []
+            for user_id, value in zip(user_ids, cached):
+                if value is None:
+                    missing.append(user_id)
+                else:
+                    activities[user_id] = value or None
+        except Exception as e:
+            logger.warning(f"마지막 활동 캐시 조회 실패: {e}")
+    
+    if not missing:
+        return activities
+    
+    try:
+        result = await run_query(
+            db.table(COUNTERS_TABLE)
+            .select("user_id, last_activity_at")
+            .in_("user_id", missing)
+        )
+        loaded = {row["user_id"]: row.get("last_activity_at") for row in result.data or []}
+    except Exception as e:
+        # 마이그레이션(007_last_activity_projection.sql) 미적용 시 사용자별 최근 완료 1건 조회
+        logger.warning(f"마지막 활동 컬럼 조회 실패, 사용자별 조회로 대체: {e}")
+        activities.update(await _latest_completions(db, missing))
+        return activities
+    
+    for user_id in missing:
+        activities[user_id] = loaded.get(user_id)
+    
+    if redis:
+        try:
+            # 그 사이 쓰기 경로가 갱신한 활동 시각은 덮어쓰지 않음
+            pipe = redis.pipeline()
+            for user_id in missing:
+                pipe.set(
+                    last_activity_key(user_id),
+                    activities[user_id] or NO_ACTIVITY,
+                    ex=settings.USER_STATS_CACHE_TTL,
+                    nx=True,
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"마지막 활동 캐시 저장 실패: {e}")
+    return activities
+
+
+async def _latest_completions(db: Client, user_ids: List[str]) -> Dict[str, Optional[str]]:
+    """사용자별 가장 최근 카드 완료 시각 (idx_completed_cards_user, 사용자당 1행, 캐시하지 않음)"""
+    async def latest(user_id: str) -> Optional[str]:
+        try:
+            result = await run_query(
+                db.table("completed_cards")
+                .select("completed_at")
+                .eq("user_id", user_id)
+                .order("completed_at", desc=True)
+                .limit(1)
+            )
+            return result.data[0]["completed_at"] if result.data else None
+        except Exception as e:
+            logger.error(f"최근 활동 조회 실패: user={user_id}, {e}")
+            return None
+    
+    results = await asyncio.gather(*(latest(user_id) for user_id in user_ids))
+    return dict(zip(user_ids, results))
+
+
+async def run_counters_rebuild_loop(
+    get_db: Callable[[], Client],
+    get_redis: Callable[[], Optional[Redis]],
+) -> None:
+    """
+    주기적 카운터 재계산 (앱 수명 동안 실행, USER_STATS_REBUILD_INTERVAL초 간격)
+    
+    여러 워커가 동시에 돌지 않도록 Redis 락을 잡은 워커만 실행합니다.
+    """
+    interval = settings.USER_STATS_REBUILD_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            redis = await run_sync(get_redis)
+            if redis is not None and not await run_sync(
+                redis.set, "lock:user_stats_rebuild", "1", nx=True, ex=max(int(interval) - 1, 1)
+            ):
+                continue
+            await rebuild_user_counters(get_db(), redis)
+        except Exception as e:
+            logger.error(f"사용자 카운터 재계산 실패: {e}")
@@ -1,17 +1,354 @@
 """
 Redis 캐싱 유틸리티
 
-자주 조회되는 데이터를 Redis에 캐싱하여 성능 향상
+자주 조회되는 데이터를 2단계로 캐싱하여 성능 향상
+- L1: 프로세스 메모리 TTL/LRU 캐시 (메모리 상한, Redis 왕복·역직렬화 없음)
+- L2: Redis (워커 간 공유)
+
+무효화는 Redis pub/sub으로 다른 워커의 L1에도 전파됩니다.
+Redis 저장 값의 직렬화/압축은 cache_codec 모듈이 담당합니다 (CACHE_CODEC).
+
+태그 무효화:
+    캐시 키에 태그별 세대(generation) 번호를 붙여 저장하고, 무효화 시에는
+    세대 카운터만 INCR 합니다 (호출자 입장에서 O(1)). 이전 세대 키는
+    TTL로 만료되거나 백그라운드 SCAN 정리 작업이 지웁니다.
+    
+    set_cached(redis, "gamification:stats", data, 60, tags=[user_tag(user_id)])
+    invalidate_tags(redis, user_tag(user_id))  # 해당 사용자 캐시 전체 무효화
 """
-import json
-from typing import Optional, Any, Callable
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Optional, Any, Callable, Dict, List, Sequence, Tuple
 from datetime import timedelta
 from functools import wraps
 import logging
 
+from app.core.config import settings
+from app.utils.cache_codec import decode_value, encode_value
+
 logger = logging.getLogger(__name__)
 
 
+# ==================== L1 (프로세스 메모리) 캐시 ====================
+
+class LocalCache:
+    """
+    프로세스 내 TTL + LRU 캐시
+    
+    - 항목 수(max_entries)와 대략적인 메모리(max_bytes) 둘 다 상한
+    - 크기는 직렬화된 JSON 길이로 추정
+    - pub/sub 리스너 스레드와 이벤트 루프가 함께 접근하므로 락 사용
+    
+    주의: 저장된 객체를 그대로 반환하므로 호출자는 반환값을 수정하면 안 됩니다.
+    """
+    
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: float, size: int) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+    
+    def delete_pattern(self, pattern: str) -> int:
+        """glob 패턴(Redis KEYS 문법과 동일한 *, ?)에 맞는 항목 삭제"""
+        with self._lock:
+            matched = [k for k in self._entries if fnmatchcase(k, pattern)]
+            for key in matched:
+                self._remove(key)
+            return len(matched)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+    
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class CacheStats:
+    """계층별 캐시 히트/미스 카운터"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        self.l1_hits = 0
+        self.l1_misses = 0
+        self.l2_hits = 0
+        self.l2_misses = 0
+    
+    def record(self, tier: str, hit: bool) -> None:
+        with self._lock:
+            name = f"{tier}_{'hits' if hit else 'misses'}"
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        def ratio(hits: int, misses: int) -> float:
+            total = hits + misses
+            return round(hits / total, 4) if total else 0.0
+        
+        with self._lock:
+            return {
+                "l1": {
+                    "hits": self.l1_hits,
+                    "misses": self.l1_misses,
+                    "hit_ratio": ratio(self.l1_hits, self.l1_misses),
+                },
+                "l2": {
+                    "hits": self.l2_hits,
+                    "misses": self.l2_misses,
+                    "hit_ratio": ratio(self.l2_hits, self.l2_misses),
+                },
+            }
+
+
+local_cache = LocalCache(
+    max_entries=settings.CACHE_L1_MAX_ENTRIES,
+    max_bytes=settings.CACHE_L1_MAX_BYTES,
+)
+cache_stats = CacheStats()
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """계층별 히트율 + L1 사용량"""
+    return {**cache_stats.snapshot(), "l1_usage": local_cache.stats()}
+
+
+def _l1_ttl(ttl_seconds: float) -> float:
+    """L1 TTL은 원래 TTL과 CACHE_L1_MAX_TTL 중 작은 값"""
+    return min(ttl_seconds, settings.CACHE_L1_MAX_TTL)
+
+
+# ==================== 태그(세대) 기반 무효화 ====================
+
+TAG_VERSION_PREFIX = "cache:tag:"
+TAG_KEY_SEPARATOR = "#"
+# pub/sub 메시지에서 태그 무효화를 패턴 무효화와 구분하는 접두사
+TAG_MESSAGE_PREFIX = "#"
+
+# 프로세스 내 태그 세대 캐시 {tag: (version, expires_at)}
+_tag_versions: Dict[str, Tuple[int, float]] = {}
+_tag_versions_lock = threading.Lock()
+
+
+def user_tag(user_id: str) -> str:
+    """사용자별 캐시 태그 ("사용자 X의 모든 캐시")"""
+    return f"user:{user_id}"
+
+
+def _tag_version_key(tag: str) -> str:
+    return f"{TAG_VERSION_PREFIX}{tag}"
+
+
+def _get_tag_versions(redis_client, tags: Sequence[str], local: bool) -> List[int]:
+    """
+    태그별 현재 세대 번호 조회
+    
+    local=True면 CACHE_L1_MAX_TTL 동안 프로세스 메모리에 보관한 값을 사용하고
+    (pub/sub 무효화 메시지로 즉시 갱신), local=False면 항상 Redis에서 읽습니다.
+    """
+    now = time.monotonic()
+    versions: Dict[str, int] = {}
+    missing = list(tags)
+    
+    if local:
+        with _tag_versions_lock:
+            missing = []
+            for tag in tags:
+                entry = _tag_versions.get(tag)
+                if entry and entry[1] > now:
+                    versions[tag] = entry[0]
+                else:
+                    missing.append(tag)
+    
+    if missing:
+        if redis_client is None:
+            fetched = [0] * len(missing)
+        else:
+            raw = redis_client.mget([_tag_version_key(t) for t in missing])
+            fetched = [int(v) if v else 0 for v in raw]
+        
+        with _tag_versions_lock:
+            for tag, version in zip(missing, fetched):
+                versions[tag] = version
+                _tag_versions[tag] = (version, now + settings.CACHE_L1_MAX_TTL)
+    
+    return [versions[tag] for tag in tags]
+
+
+def tagged_key(key: str, tags: Sequence[str], versions: Sequence[int]) -> str:
+    """
+    태그 세대를 포함한 실제 저장 키
+    
+    예: tagged_key("gamification:stats", ["user:abc"], [3])
+        → "gamification:stats#user:abc=3"
+    """
+    return key + "".join(
+        f"{TAG_KEY_SEPARATOR}{tag}={version}" for tag, version in zip(tags, versions)
+    )
+
+
+def _resolve_key(redis_client, key: str, tags: Optional[Sequence[str]], local: bool) -> str:
+    if not tags:
+        return key
+    return tagged_key(key, tags, _get_tag_versions(redis_client, tags, local))
+
+
+def invalidate_tags(redis_client, *tags: str) -> None:
+    """
+    태그 무효화 (O(1): 태그당 INCR 1회)
+    
+    해당 태그가 붙은 모든 캐시 키는 다음 조회부터 새 세대 키를 사용하므로
+    즉시 미스가 됩니다. 이전 세대 키는 TTL 또는 cleanup_stale_tagged_keys()가 정리합니다.
+    세대 키는 CACHE_TAG_VERSION_TTL 뒤 만료되고, 그 전에 해당 세대의 캐시 항목도 모두 만료됩니다.
+    
+    예: invalidate_tags(redis, user_tag(user_id))      → 사용자 X의 캐시 전체
+        invalidate_tags(redis, "insights:topic:health") → health 토픽 인사이트 전체
+    """
+    with _tag_versions_lock:
+        for tag in tags:
+            _tag_versions.pop(tag, None)
+    for tag in tags:
+        local_cache.delete_pattern(f"*{TAG_KEY_SEPARATOR}{tag}=*")
+    
+    if redis_client is None or not tags:
+        return
+    
+    try:
+        pipe = redis_client.pipeline()
+        for tag in tags:
+            pipe.incr(_tag_version_key(tag))
+            pipe.expire(_tag_version_key(tag), settings.CACHE_TAG_VERSION_TTL)
+        for tag in tags:
+            pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, f"{TAG_MESSAGE_PREFIX}{tag}")
+        pipe.execute()
+        logger.info(f"🏷️ Cache tags invalidated: {', '.join(tags)}")
+    except Exception as e:
+        logger.error(f"Cache tag invalidation error: {e}")
+
+
+def _parse_tagged_key(key: str) -> List[Tuple[str, int]]:
+    """"base#tag1=1#tag2=5" → [("tag1", 1), ("tag2", 5)]"""
+    parts = key.split(TAG_KEY_SEPARATOR)[1:]
+    parsed = []
+    for part in parts:
+        tag, sep, version = part.rpartition("=")
+        if not sep or not version.isdigit():
+            return []
+        parsed.append((tag, int(version)))
+    return parsed
+
+
+def cleanup_stale_tagged_keys(redis_client, batch_size: int = 500) -> int:
+    """
+    이전 세대 태그 키 정리 (SCAN 기반, Redis를 오래 막지 않음)
+    
+    Returns:
+        삭제한 키 수
+    """
+    if redis_client is None:
+        return 0
+    
+    deleted = 0
+    try:
+        for batch in _scan_batches(redis_client, f"*{TAG_KEY_SEPARATOR}*=*", batch_size):
+            parsed = {key: _parse_tagged_key(key) for key in batch}
+            tags = sorted({tag for tags in parsed.values() for tag, _ in tags})
+            if not tags:
+                continue
+            
+            current = dict(zip(tags, _get_tag_versions(redis_client, tags, local=False)))
+            stale = [
+                key for key, key_tags in parsed.items()
+                if key_tags and any(version < current[tag] for tag, version in key_tags)
+            ]
+            if stale:
+                deleted += redis_client.unlink(*stale)
+    except Exception as e:
+        logger.error(f"Stale cache cleanup error: {e}")
+    
+    if deleted:
+        logger.info(f"🧹 Stale tagged cache keys removed: {deleted}")
+    return deleted
+
+
+def _scan_batches(redis_client, pattern: str, batch_size: int):
+    """SCAN으로 패턴에 맞는 키를 batch_size 단위로 묶어 반환"""
+    batch: List[str] = []
+    for key in redis_client.scan_iter(match=pattern, count=batch_size):
+        batch.append(key.decode() if isinstance(key, bytes) else key)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def run_cache_cleanup_loop(get_client: Callable[[], Any]) -> None:
+    """
+    이전 세대 키 정리를 CACHE_CLEANUP_INTERVAL초마다 실행하는 백그라운드 작업
+    앱 시작 시(main.py에서) asyncio 태스크로 실행
+    """
+    from app.core.db import run_sync
+    
+    while True:
+        await asyncio.sleep(settings.CACHE_CLEANUP_INTERVAL)
+        redis_client = await run_sync(get_client)
+        if redis_client is not None:
+            await run_sync(cleanup_stale_tagged_keys, redis_client)
+
+
+# ==================== 캐시 API ====================
+
 def cache_key(*args, **kwargs) -> str:
     """
     캐시 키 생성
@@ -24,15 +361,57 @@ def cache_key(*args, **kwargs) -> str:
     return ":".join(parts)
 
 
-def get_cached(redis_client, key: str) -> Optional[Any]:
+def get_cached(
+    redis_client,
+    key: str,
+    local: bool = True,
+    tags: Optional[Sequence[str]] = None,
+) -> Optional[Any]:
     """
-    캐시에서 데이터 조회
+    캐시에서 데이터 조회 (L1 → Redis 순서)
+    
+    Args:
+        redis_client: Redis 클라이언트 (None이면 L1만 사용)
+        key: 캐시 키
+        local: L1 캐시 사용 여부 (사용자별 자주 바뀌는 데이터는 False)
+        tags: 무효화 태그 (set_cached와 같은 태그를 넘겨야 함)
     """
+    use_l1 = local and settings.CACHE_L1_ENABLED
+    try:
+        key = _resolve_key(redis_client, key, tags, use_l1)
+    except Exception as e:
+        logger.error(f"Cache get error: {e}")
+        return None
+    
+    if use_l1:
+        value = local_cache.get(key)
+        if value is not None:
+            cache_stats.record("l1", hit=True)
+            logger.debug(f"✅ Cache HIT (L1): {key}")
+            return value
+        cache_stats.record("l1", hit=False)
+    
+    if redis_client is None:
+        return None
+    
     try:
-        cached = redis_client.get(key)
+        if use_l1:
+            # 값과 남은 TTL을 한 번에 조회 (L1이 Redis보다 오래 살지 않도록)
+            pipe = redis_client.pipeline()
+            pipe.get(key)
+            pipe.pttl(key)
+            cached, pttl = pipe.execute()
+        else:
+            cached, pttl = redis_client.get(key), -1
+        
         if cached:
+            cache_stats.record("l2", hit=True)
             logger.debug(f"✅ Cache HIT: {key}")
-            return json.loads(cached)
+            value = decode_value(cached)
+            if use_l1 and pttl and pttl > 0:
+                local_cache.set(key, value, _l1_ttl(pttl / 1000), len(cached))
+            return value
+        cache_stats.record("l2", hit=False)
         logger.debug(f"❌ Cache MISS: {key}")
         return None
     except Exception as e:
@@ -41,26 +420,50 @@ def get_cached(redis_client, key: str) -> Optional[Any]:
 
 
 def set_cached(
-    redis_client, 
-    key: str, 
-    value: Any, 
-    ttl: int = 300  # 5분 기본
+    redis_client,
+    key: str,
+    value: Any,
+    ttl: int = 300,  # 5분 기본
+    local: bool = True,
+    tags: Optional[Sequence[str]] = None,
 ) -> bool:
     """
-    캐시에 데이터 저장
+    캐시에 데이터 저장 (Redis + L1)
     
     Args:
-        redis_client: Redis 클라이언트
+        redis_client: Redis 클라이언트 (None이면 L1만 저장)
         key: 캐시 키
-        value: 저장할 값 (JSON 직렬화 가능)
+        value: 저장할 값 (CACHE_CODEC으로 직렬화, 임계값 이상은 압축)
         ttl: TTL (초)
+        local: L1 캐시에도 저장할지 여부
+        tags: 무효화 태그 (invalidate_tags로 한 번에 무효화)
     """
+    if tags:
+        # 세대 키보다 오래 남으면 세대 키 만료 후 같은 번호가 다시 쓰일 때 무효화된 값이 살아남
+        ttl = min(ttl, settings.CACHE_TAG_VERSION_TTL)
     try:
-        redis_client.setex(
-            key,
-            ttl,
-            json.dumps(value, ensure_ascii=False)
-        )
+        payload = encode_value(value)
+        key = _resolve_key(redis_client, key, tags, local and settings.CACHE_L1_ENABLED)
+    except Exception as e:
+        logger.error(f"Cache set error: {e}")
+        return False
+    
+    if local and settings.CACHE_L1_ENABLED:
+        local_cache.set(key, value, _l1_ttl(ttl), len(payload))
+    
+    if redis_client is None:
+        return False
+    
+    try:
+        if tags:
+            # 세대 키가 이 항목보다 먼저 만료되지 않도록 함께 연장
+            pipe = redis_client.pipeline()
+            pipe.setex(key, ttl, payload)
+            for tag in tags:
+                pipe.expire(_tag_version_key(tag), settings.CACHE_TAG_VERSION_TTL)
+            pipe.execute()
+        else:
+            redis_client.setex(key, ttl, payload)
         logger.debug(f"💾 Cache SET: {key} (TTL: {ttl}s)")
         return True
     except Exception as e:
@@ -68,60 +471,290 @@ def set_cached(
         return False
 
 
-def invalidate_cache(redis_client, pattern: str) -> int:
+def invalidate_cache(redis_client, pattern: str, batch_size: int = 500) -> int:
     """
     캐시 무효화 (패턴 매칭)
     
+    현재 워커의 L1을 비우고, pub/sub으로 다른 워커의 L1 무효화를 요청합니다.
+    Redis 키는 KEYS 대신 SCAN + UNLINK로 나눠 삭제하여 Redis를 막지 않습니다.
+    
+    주의: 키 공간 전체를 훑으므로 요청 경로에서는 invalidate_tags()를 사용하세요.
+    
     예: invalidate_cache(redis, 'card:*') → 모든 카드 캐시 삭제
     """
+    local_cache.delete_pattern(pattern)
+    
+    if redis_client is None:
+        return 0
+    
     try:
-        keys = redis_client.keys(pattern)
-        if keys:
-            deleted = redis_client.delete(*keys)
+        redis_client.publish(settings.CACHE_INVALIDATION_CHANNEL, pattern)
+        deleted = 0
+        for batch in _scan_batches(redis_client, pattern, batch_size):
+            deleted += redis_client.unlink(*batch)
+        if deleted:
             logger.info(f"🗑️ Cache invalidated: {deleted} keys ({pattern})")
-            return deleted
-        return 0
+        return deleted
     except Exception as e:
         logger.error(f"Cache invalidation error: {e}")
         return 0
 
 
-def cached(ttl: int = 300, key_prefix: str = ""):
+# ==================== L1 무효화 리스너 (pub/sub) ====================
+
+_invalidation_thread = None
+
+
+def _handle_invalidation(message: Dict[str, Any]) -> None:
+    pattern = message.get("data")
+    if isinstance(pattern, bytes):
+        pattern = pattern.decode()
+    if not pattern:
+        return
+    
+    if pattern.startswith(TAG_MESSAGE_PREFIX):
+        # 태그 무효화: 세대 캐시를 버려 다음 조회 시 Redis에서 새 세대를 읽음
+        tag = pattern[len(TAG_MESSAGE_PREFIX):]
+        with _tag_versions_lock:
+            _tag_versions.pop(tag, None)
+        pattern = f"*{TAG_KEY_SEPARATOR}{tag}=*"
+    
+    removed = local_cache.delete_pattern(pattern)
+    logger.debug(f"L1 무효화 수신: {pattern} ({removed}개 삭제)")
+
+
+def start_invalidation_listener(redis_client) -> None:
+    """
+    다른 워커의 무효화 메시지를 받아 L1을 비우는 백그라운드 스레드 시작
+    앱 시작 시(main.py에서) 호출
+    """
+    global _invalidation_thread
+    if redis_client is None or not settings.CACHE_L1_ENABLED or _invalidation_thread is not None:
+        return
+    
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{settings.CACHE_INVALIDATION_CHANNEL: _handle_invalidation})
+        _invalidation_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        logger.info(f"L1 캐시 무효화 리스너 시작: {settings.CACHE_INVALIDATION_CHANNEL}")
+    except Exception as e:
+        logger.error(f"L1 캐시 무효화 리스너 시작 실패: {e}")
+        _invalidation_thread = None
+
+
+def stop_invalidation_listener() -> None:
+    """
+    L1 무효화 리스너 종료
+    앱 종료 시(main.py에서) 호출
+    """
+    global _invalidation_thread
+    if _invalidation_thread is not None:
+        try:
+            _invalidation_thread.stop()
+        except Exception as e:
+            logger.warning(f"L1 캐시 무효화 리스너 종료 실패: {e}")
+        _invalidation_thread = None
+
+
+# ==================== 스탬피드 방지 (single-flight / SWR) ====================
+
+# 분산 락 해제: 내가 잡은 락일 때만 삭제
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+LOCK_POLL_INTERVAL = 0.05  # 다른 워커의 계산 결과를 기다릴 때 확인 간격(초)
+
+# 프로세스 내 진행 중인 계산 {key: Future}
+_inflight: Dict[str, "asyncio.Future"] = {}
+# 백그라운드 갱신 태스크 참조 유지 (GC 방지)
+_background_tasks: set = set()
+
+
+def _acquire_lock(redis_client, lock_key: str) -> Optional[str]:
+    """SET NX PX로 짧은 분산 락 획득, 성공 시 토큰 반환"""
+    token = uuid.uuid4().hex
+    try:
+        acquired = redis_client.set(
+            lock_key, token, nx=True, px=int(settings.CACHE_LOCK_TIMEOUT * 1000)
+        )
+        return token if acquired else None
+    except Exception as e:
+        # 락을 못 쓰면 워커 간 조정 없이 계산 (프로세스 내 single-flight는 유지)
+        logger.warning(f"Cache lock error (계속 진행): {e}")
+        return token
+
+
+def _release_lock(redis_client, lock_key: str, token: str) -> None:
+    try:
+        redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+    except Exception as e:
+        logger.warning(f"Cache lock release error: {e}")
+
+
+async def _single_flight(key: str, compute: Callable[[], Any]) -> Any:
+    """
+    같은 키에 대한 동시 계산을 하나로 합침 (프로세스 내)
+    
+    먼저 온 요청만 compute()를 실행하고 나머지는 같은 결과를 기다립니다.
+    """
+    future = _inflight.get(key)
+    if future is not None:
+        return await asyncio.shield(future)
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await compute()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # 기다리는 요청이 없어도 경고가 남지 않도록 조회 처리
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+
+
+def _log_refresh_error(task: "asyncio.Task") -> None:
+    """백그라운드 갱신 실패 로깅 (이전 캐시 값은 그대로 유지됨)"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Cache background refresh error: {task.exception()}")
+
+
+def _is_fresh(entry: Dict[str, Any], beta: float) -> Tuple[bool, bool]:
     """
-    함수 결과를 캐싱하는 데코레이터
+    캐시 엔트리 상태 판단
+    
+    Returns:
+        (fresh, refresh_early)
+        - fresh: 소프트 만료 전인지
+        - refresh_early: 확률적 조기 만료(XFetch)에 걸렸는지
+          계산 시간(d)이 길수록, 만료가 가까울수록 일찍 갱신할 확률이 높음
+    """
+    now = time.time()
+    expires_at = entry["exp"]
+    if now >= expires_at:
+        return False, False
+    if beta > 0 and entry.get("d"):
+        if now - entry["d"] * beta * math.log(random.random() or 1e-12) >= expires_at:
+            return True, True
+    return True, False
+
+
+def cached(
+    ttl: int = 300,
+    key_prefix: str = "",
+    tags: Optional[Any] = None,
+    stale_ttl: int = 0,
+    early_expiry_beta: Optional[float] = None,
+    local: bool = True,
+    exclude_args: Sequence[str] = (),
+):
+    """
+    함수 결과를 캐싱하는 데코레이터 (스탬피드 방지 포함)
+    
+    - single-flight: 같은 키의 동시 미스는 프로세스 내에서 한 번만 계산하고,
+      워커 간에는 짧은 Redis 락(SET NX)으로 한 워커만 계산
+    - stale-while-revalidate: stale_ttl > 0이면 만료 후 stale_ttl 동안
+      이전 값을 즉시 반환하고 백그라운드에서 한 번만 갱신
+    - 확률적 조기 만료: 만료 직전 요청 일부가 미리 백그라운드 갱신 시작
+    
+    Args:
+        ttl: 신선한 값으로 취급할 시간(초)
+        key_prefix: 캐시 키 접두사
+        tags: 무효화 태그 목록 또는 (*args, **kwargs)를 받아 태그를 돌려주는 함수
+        stale_ttl: 만료 후 stale 값을 제공할 추가 시간(초)
+        early_expiry_beta: 조기 만료 강도 (None이면 CACHE_EARLY_EXPIRY_BETA, 0이면 끔)
+        local: L1 캐시 사용 여부
+        exclude_args: 캐시 키에서 제외할 키워드 인자 (db 클라이언트 등)
     
     사용 예:
-    @cached(ttl=3600, key_prefix="insights")
-    async def get_insights_list(topic: str):
+    @cached(ttl=3600, key_prefix="insights", stale_ttl=600, exclude_args=("db",))
+    async def get_insights_list(topic: str, db=None, redis_client=None):
         # 비싼 DB 조회
         return data
     """
+    beta = settings.CACHE_EARLY_EXPIRY_BETA if early_expiry_beta is None else early_expiry_beta
+    excluded = set(exclude_args) | {"redis_client"}
+    
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Redis 클라이언트 가져오기 (kwargs에서)
-            redis_client = kwargs.get('redis_client')
-            if not redis_client:
-                # 캐시 없이 실행
-                return await func(*args, **kwargs)
-            
             # 캐시 키 생성
             key_parts = [key_prefix, func.__name__]
             key_parts.extend(str(arg) for arg in args)
-            key = cache_key(*key_parts)
+            key = cache_key(
+                *key_parts,
+                **{k: v for k, v in kwargs.items() if k not in excluded}
+            )
             
-            # 캐시 확인
-            cached_result = get_cached(redis_client, key)
-            if cached_result is not None:
-                return cached_result
+            # Redis 클라이언트 가져오기 (kwargs에서)
+            redis_client = kwargs.get('redis_client')
+            if not redis_client:
+                # 캐시 없이 실행 (동시 요청 합치기만 적용)
+                return await _single_flight(key, lambda: func(*args, **kwargs))
+            key_tags = tags(*args, **kwargs) if callable(tags) else tags
             
-            # 함수 실행
-            result = await func(*args, **kwargs)
+            async def load() -> Any:
+                """DB 계산 후 캐시 저장 (워커 간 락 포함)"""
+                lock_key = f"lock:{key}"
+                token = _acquire_lock(redis_client, lock_key)
+                
+                if token is None:
+                    # 다른 워커가 계산 중: 결과가 저장될 때까지 대기
+                    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(LOCK_POLL_INTERVAL)
+                        entry = get_cached(redis_client, key, local=local, tags=key_tags)
+                        if entry is not None and _is_fresh(entry, 0)[0]:
+                            return entry["v"]
+                    logger.warning(f"Cache lock wait timeout, computing: {key}")
+                
+                try:
+                    started = time.monotonic()
+                    result = await func(*args, **kwargs)
+                    entry = {
+                        "v": result,
+                        "exp": time.time() + ttl,
+                        "d": round(time.monotonic() - started, 4),
+                    }
+                    set_cached(redis_client, key, entry, ttl + stale_ttl, local=local, tags=key_tags)
+                    return result
+                finally:
+                    if token is not None:
+                        _release_lock(redis_client, lock_key, token)
             
-            # 캐시 저장
-            set_cached(redis_client, key, result, ttl)
+            def refresh_in_background() -> None:
+                if key in _inflight:
+                    return
+                task = asyncio.create_task(_single_flight(key, load))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+                task.add_done_callback(_log_refresh_error)
+            
+            # 캐시 확인
+            entry = get_cached(redis_client, key, local=local, tags=key_tags)
+            if isinstance(entry, dict) and "exp" in entry and "v" in entry:
+                fresh, refresh_early = _is_fresh(entry, beta)
+                if fresh:
+                    if refresh_early:
+                        refresh_in_background()
+                    return entry["v"]
+                if stale_ttl > 0:
+                    # stale-while-revalidate: 이전 값 반환 + 한 번만 갱신
+                    refresh_in_background()
+                    return entry["v"]
             
-            return result
+            # 미스: 같은 키 동시 요청은 한 번만 계산
+            return await _single_flight(key, load)
         return wrapper
     return decorator
 
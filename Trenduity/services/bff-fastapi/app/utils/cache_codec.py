@@ -0,0 +1,189 @@
+"""
+캐시 값 직렬화 코덱
+
+Redis에 저장하는 캐시 값을 인코딩/디코딩합니다.
+- 코덱: json(표준 라이브러리), orjson, msgpack (설치된 경우) 중 선택
+- 압축: 직렬화 결과가 임계값보다 크면 zlib 압축
+- 형식 표시: 새 값은 1바이트 마커 + 코덱 ID + 압축 플래그로 시작하고,
+  마커가 없는 값은 이전 방식(json.dumps 텍스트)으로 읽어 기존 캐시도 그대로 사용
+
+저장 형식:
+    b"\\x1f" + 코덱 ID(1바이트) + 압축 플래그(b"z" 또는 b"-") + 본문
+
+압축 값은 UTF-8이 아닌 바이트를 포함하므로, decode_responses=True 연결에서는
+encoding_errors="surrogateescape"로 읽어야 원래 바이트로 복원됩니다 (deps.init_redis_pool).
+"""
+import json
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 선택 의존성
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 선택 의존성
+    msgpack = None
+
+
+FORMAT_MARKER = b"\x1f"  # JSON 텍스트는 제어 문자로 시작하지 않음
+FLAG_COMPRESSED = b"z"
+FLAG_PLAIN = b"-"
+HEADER_SIZE = 3
+
+
+class CacheCodecError(ValueError):
+    """알 수 없는 형식의 캐시 값"""
+
+
+class CacheCodec(ABC):
+    """
+    캐시 코덱 기본 클래스
+    
+    codec_id는 저장 형식에 기록되는 1바이트 식별자로, 한 번 정하면 바꾸지 않습니다.
+    """
+    name: str = ""
+    codec_id: bytes = b""
+    
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """값 → 직렬화 바이트"""
+    
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """직렬화 바이트 → 값"""
+
+
+class JsonCodec(CacheCodec):
+    """표준 라이브러리 json (한글은 이스케이프 없이 UTF-8로 저장)"""
+    name = "json"
+    codec_id = b"j"
+    
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(CacheCodec):
+    """orjson (C 구현 JSON, 결과는 표준 JSON과 호환)"""
+    name = "orjson"
+    codec_id = b"o"
+    
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(CacheCodec):
+    """msgpack (바이너리, JSON보다 작음)"""
+    name = "msgpack"
+    codec_id = b"m"
+    
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+    
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+# 코덱 레지스트리 {name: codec}, {codec_id: codec}
+_codecs_by_name: Dict[str, CacheCodec] = {}
+_codecs_by_id: Dict[bytes, CacheCodec] = {}
+
+
+def register_codec(codec: CacheCodec) -> None:
+    """코덱 등록 (codec_id는 1바이트, 기존 코덱과 겹치면 안 됨)"""
+    if len(codec.codec_id) != 1:
+        raise ValueError(f"codec_id는 1바이트여야 합니다: {codec.codec_id!r}")
+    existing = _codecs_by_id.get(codec.codec_id)
+    if existing is not None and existing.name != codec.name:
+        raise ValueError(f"codec_id 충돌: {codec.codec_id!r} ({existing.name})")
+    _codecs_by_name[codec.name] = codec
+    _codecs_by_id[codec.codec_id] = codec
+
+
+register_codec(JsonCodec())
+if orjson is not None:
+    register_codec(OrjsonCodec())
+if msgpack is not None:
+    register_codec(MsgpackCodec())
+
+
+def get_codec(name: Optional[str] = None) -> CacheCodec:
+    """
+    이름으로 코덱 조회 (None이면 CACHE_CODEC 설정)
+    
+    설치되지 않은 코덱을 설정한 경우 json으로 대체합니다.
+    """
+    name = name or settings.CACHE_CODEC
+    codec = _codecs_by_name.get(name)
+    if codec is None:
+        logger.warning(f"캐시 코덱 '{name}' 사용 불가 - json으로 대체")
+        codec = _codecs_by_name["json"]
+    return codec
+
+
+def encode_value(
+    value: Any,
+    codec: Optional[CacheCodec] = None,
+    threshold: Optional[int] = None,
+) -> bytes:
+    """
+    값 → 저장용 바이트 (마커 + 코덱 ID + 압축 플래그 + 본문)
+    
+    Args:
+        value: 직렬화할 값
+        codec: 사용할 코덱 (None이면 설정값)
+        threshold: 이 크기(바이트) 이상이면 압축 (None이면 CACHE_COMPRESSION_THRESHOLD, 0이면 압축 안 함)
+    """
+    codec = codec or get_codec()
+    threshold = settings.CACHE_COMPRESSION_THRESHOLD if threshold is None else threshold
+    
+    body = codec.dumps(value)
+    flag = FLAG_PLAIN
+    if threshold > 0 and len(body) >= threshold:
+        compressed = zlib.compress(body, settings.CACHE_COMPRESSION_LEVEL)
+        # 압축 효과가 없으면(이미 압축된 데이터 등) 원본 유지
+        if len(compressed) < len(body):
+            body, flag = compressed, FLAG_COMPRESSED
+    return FORMAT_MARKER + codec.codec_id + flag + body
+
+
+def decode_value(raw: Union[bytes, str]) -> Any:
+    """
+    저장된 값 → 원래 값
+    
+    마커가 없으면 이전 형식(json.dumps 텍스트)으로 해석합니다.
+    """
+    if isinstance(raw, str):
+        # decode_responses=True 연결: surrogateescape로 원래 바이트 복원
+        raw = raw.encode("utf-8", "surrogateescape")
+    
+    if not raw.startswith(FORMAT_MARKER):
+        return json.loads(raw)
+    
+    if len(raw) < HEADER_SIZE:
+        raise CacheCodecError("캐시 값 헤더가 잘렸습니다")
+    codec = _codecs_by_id.get(raw[1:2])
+    if codec is None:
+        raise CacheCodecError(f"알 수 없는 캐시 코덱: {raw[1:2]!r}")
+    
+    body = raw[HEADER_SIZE:]
+    flag = raw[2:3]
+    if flag == FLAG_COMPRESSED:
+        body = zlib.decompress(body)
+    elif flag != FLAG_PLAIN:
+        raise CacheCodecError(f"알 수 없는 압축 플래그: {flag!r}")
+    return codec.loads(body)
@@ -110,3 +110,24 @@ def is_db_error(error: Exception) -> bool:
         "connection", "timeout"
     ]
     return any(keyword in error_str for keyword in db_keywords)
+
+
+# RPC 함수가 없음 (마이그레이션 미적용): PostgREST 스키마 캐시에 없음 / PostgreSQL undefined_function
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+
+def is_missing_function_error(error: Exception) -> bool:
+    """
+    RPC 함수가 DB에 없어서 난 에러인지 확인 (그 외 RPC 실패와 구분해 대체 경로는 이때만 사용)
+    
+    Args:
+        error: 예외 객체
+    
+    Returns:
+        True if PGRST202 / 42883, False otherwise
+    """
+    code = getattr(error, "code", None)
+    if code in MISSING_FUNCTION_CODES:
+        return True
+    error_str = str(error)
+    return any(missing in error_str for missing in MISSING_FUNCTION_CODES)
@@ -0,0 +1,141 @@
+"""
+재시도 안전 요청 (Idempotency-Key)
+
+클라이언트가 Idempotency-Key 헤더를 보내면 첫 요청의 성공 응답을 Redis에 저장하고,
+같은 키로 다시 온 요청(네트워크 재시도, 중복 탭 등)에는 처리 없이 저장된 응답을 돌려줍니다.
+
+흐름:
+1. SET NX로 처리 중 표시를 선점 → 선점한 요청만 실제 처리
+2. 처리 성공 시 응답 저장 (IDEMPOTENCY_TTL), 실패 시 키 삭제 (같은 키로 재시도 가능)
+3. 처리 중인 키로 온 요청은 결과가 저장될 때까지 대기, IDEMPOTENCY_LOCK_TIMEOUT 초과 시 409
+
+키는 사용자별로 분리되므로 다른 사용자의 응답이 재전송되지 않습니다.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from redis import Redis
+
+from app.core.config import settings
+from app.utils.cache_codec import decode_value, encode_value
+
+logger = logging.getLogger(__name__)
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 128
+PENDING_MARKER = "__pending__"
+POLL_INTERVAL = 0.05
+
+
+def idempotency_redis_key(scope: str, user_id: str, client_key: str) -> str:
+    """Redis 키: idem:{scope}:{user_id}:{client_key}"""
+    return f"idem:{scope}:{user_id}:{client_key}"
+
+
+def _validate_client_key(client_key: str) -> None:
+    if not client_key or len(client_key) > IDEMPOTENCY_KEY_MAX_LENGTH or not client_key.isprintable():
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "ok": False,
+                "error": {
+                    "code": "INVALID_IDEMPOTENCY_KEY",
+                    "message": f"{IDEMPOTENCY_HEADER} 헤더는 {IDEMPOTENCY_KEY_MAX_LENGTH}자 이하로 보내주세요."
+                }
+            }
+        )
+
+
+def _is_pending(raw: Any) -> bool:
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", "surrogateescape")
+    return raw == PENDING_MARKER
+
+
+async def begin_idempotent_request(
+    redis: Optional[Redis],
+    scope: str,
+    user_id: Optional[str],
+    client_key: Optional[str],
+) -> Tuple[Optional[str], Optional[Dict]]:
+    """
+    Idempotency-Key 선점 또는 저장된 응답 조회
+    
+    Returns:
+        (redis_key, replay)
+        - 키/Redis가 없으면 (None, None): 멱등성 없이 처리
+        - 처음 온 요청이면 (redis_key, None): 처리 후 save/release 호출
+        - 이미 처리된 요청이면 (None, 저장된 응답): 그대로 반환
+    
+    Raises:
+        HTTPException(400): 잘못된 키
+        HTTPException(409): 같은 키의 요청이 아직 처리 중
+    """
+    if client_key is None or not user_id:
+        return None, None
+    _validate_client_key(client_key)
+    if not redis:
+        return None, None
+    
+    key = idempotency_redis_key(scope, user_id, client_key)
+    lock_timeout = settings.IDEMPOTENCY_LOCK_TIMEOUT
+    deadline = asyncio.get_running_loop().time() + lock_timeout
+    
+    while True:
+        try:
+            if redis.set(key, PENDING_MARKER, nx=True, ex=max(int(lock_timeout * 3), 1)):
+                return key, None
+            raw = redis.get(key)
+        except Exception as e:
+            # Redis 장애 시 멱등성 없이 처리 (DB 유니크 제약이 중복 반영은 막음)
+            logger.warning(f"Idempotency 키 확인 실패, 멱등성 없이 처리: {e}")
+            return None, None
+        
+        if raw is not None and not _is_pending(raw):
+            try:
+                logger.info(f"Idempotency 응답 재전송: {key}")
+                return None, decode_value(raw)
+            except Exception as e:
+                logger.warning(f"저장된 응답 해석 실패, 다시 처리: {key}, {e}")
+                release_idempotency_key(redis, key)
+                continue
+        
+        if raw is None:
+            continue  # 처리하던 요청이 실패해 키가 풀림 → 다시 선점 시도
+        
+        if asyncio.get_running_loop().time() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "ok": False,
+                    "error": {
+                        "code": "IDEMPOTENCY_IN_PROGRESS",
+                        "message": "같은 요청을 처리하고 있어요. 잠시 후 다시 시도해 주세요."
+                    }
+                }
+            )
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def save_idempotent_response(redis: Optional[Redis], key: Optional[str], response: Dict) -> None:
+    """성공 응답 저장 (같은 키로 재시도 시 재전송)"""
+    if not redis or not key:
+        return
+    try:
+        redis.set(key, encode_value(response), ex=settings.IDEMPOTENCY_TTL)
+    except Exception as e:
+        logger.warning(f"Idempotency 응답 저장 실패: {key}, {e}")
+        release_idempotency_key(redis, key)
+
+
+def release_idempotency_key(redis: Optional[Redis], key: Optional[str]) -> None:
+    """처리 실패 시 선점 해제 (같은 키로 재시도 가능)"""
+    if not redis or not key:
+        return
+    try:
+        redis.delete(key)
+    except Exception as e:
+        logger.warning(f"Idempotency 키 해제 실패: {key}, {e}")
@@ -0,0 +1,87 @@
+"""
+커서(키셋) 페이지네이션 유틸리티
+
+피드형 목록(Q&A, 답변, 알림)을 offset 대신 (created_at, id) 기준으로 이어서 조회합니다.
+offset은 앞 페이지 행을 모두 읽고 버리므로 뒤로 갈수록 느려지지만,
+키셋은 (정렬 컬럼, id) 인덱스에서 커서 위치부터 limit+1개만 읽습니다.
+
+커서는 마지막 행의 [created_at, id] JSON을 base64url로 감싼 불투명 문자열입니다.
+클라이언트는 응답의 next_cursor를 그대로 다음 요청의 cursor로 넘기면 됩니다.
+
+사용 예:
+    query = apply_keyset(db.table("qna_posts").select("*"), cursor, limit)
+    rows, next_cursor = page_rows((await run_query(query)).data, limit)
+
+전체 개수는 매 페이지 count="exact"(전체 스캔) 대신 요청한 경우 첫 페이지에서만
+count="estimated"(큰 테이블은 플래너 통계)로 계산합니다.
+"""
+import base64
+import binascii
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+ESTIMATED_COUNT = "estimated"
+
+# 커서 값이 PostgREST 필터 문법(쉼표/괄호 등)으로 새어 들어가지 않도록 id 형식 제한
+_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class InvalidCursor(ValueError):
+    """해석할 수 없는 커서"""
+
+
+def encode_cursor(created_at: Any, row_id: Any) -> str:
+    """마지막 행의 (created_at, id) → 불투명 커서"""
+    raw = json.dumps([str(created_at), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    불투명 커서 → (created_at, id)
+
+    Raises:
+        InvalidCursor: 형식이 잘못되었거나 값이 허용 범위를 벗어남
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        datetime.fromisoformat(created_at)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor(f"잘못된 커서: {cursor}") from e
+    if not isinstance(row_id, str) or not _ID_PATTERN.match(row_id):
+        raise InvalidCursor(f"잘못된 커서: {cursor}")
+    return created_at, row_id
+
+
+def keyset_filter(created_at: str, row_id: str, descending: bool = True) -> str:
+    """
+    커서 다음 행 조건 (PostgREST or 필터)
+
+    내림차순: created_at < X 또는 (created_at = X 이고 id < Y)
+    """
+    op = "lt" if descending else "gt"
+    return f"created_at.{op}.{created_at},and(created_at.eq.{created_at},id.{op}.{row_id})"
+
+
+def apply_keyset(query: Any, cursor: Optional[str], limit: int, descending: bool = True) -> Any:
+    """
+    쿼리에 (created_at, id) 정렬 + 커서 조건 + limit+1 적용 (다음 페이지 유무 확인용 1개 더)
+
+    Raises:
+        InvalidCursor: 커서를 해석할 수 없음
+    """
+    if cursor:
+        query = query.or_(keyset_filter(*decode_cursor(cursor), descending=descending))
+    return query.order("created_at", desc=descending).order("id", desc=descending).limit(limit + 1)
+
+
+def page_rows(rows: Optional[List[Dict[str, Any]]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """limit+1개 조회 결과 → (이번 페이지 행, 다음 커서 또는 None)"""
+    rows = rows or []
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1]["created_at"], page[-1]["id"])
@@ -0,0 +1,34 @@
+"""
+Server-Sent Events 응답 유틸리티
+
+AI 답변을 토큰 단위로 흘려보낼 때 사용합니다.
+
+이벤트 형식:
+    event: delta
+    data: {"text": "안녕"}
+
+클라이언트 연결이 끊기면 StreamingResponse가 제너레이터를 취소하므로
+제너레이터 쪽에서는 try/finally로 정리하면 됩니다.
+"""
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# 프록시(nginx 등) 버퍼링/캐시 방지
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """SSE 이벤트 한 개 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """SSE 이벤트 제너레이터를 스트리밍 응답으로 감싸기"""
+    return StreamingResponse(events, media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
@@ -0,0 +1,64 @@
+"""
+백그라운드 작업 워커 (별도 프로세스)
+
+Redis Stream 작업 큐(JOBS_STREAM)를 소비합니다. API 서버와 같은 환경 변수를 사용하며,
+여러 개를 띄우면 소비자 그룹으로 작업을 나눠 처리합니다.
+
+실행:
+    python -m app.worker
+
+API 프로세스에서는 작업을 넣기만 하려면 JOBS_RUN_IN_APP=false로 설정하세요.
+"""
+import asyncio
+import logging
+import signal
+import sys
+
+from app.core.config import settings
+from app.core.deps import (
+    close_supabase_client,
+    create_dedicated_redis,
+    get_redis_client,
+    get_supabase,
+    init_redis_pool,
+    init_supabase_client,
+)
+from app.services import gamification  # noqa: F401 - 작업 핸들러 등록
+from app.services.jobs import RedisStreamJobQueue
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker() -> int:
+    """SIGINT/SIGTERM을 받을 때까지 작업 처리 (처리 중인 작업은 마치고 종료)"""
+    init_redis_pool()
+    init_supabase_client()
+    if get_redis_client() is None:
+        logger.error("Redis 연결이 없어 작업 워커를 시작할 수 없습니다 (REDIS_URL 확인)")
+        return 1
+
+    queue = RedisStreamJobQueue(
+        get_supabase,
+        get_redis_client,
+        concurrency=settings.JOBS_CONCURRENCY,
+        get_consumer_redis=lambda: create_dedicated_redis(settings.JOBS_CONCURRENCY + 1),
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await queue.run(stop)
+    finally:
+        close_supabase_client()
+        logger.info("작업 워커 종료")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=settings.LOG_LEVEL,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    sys.exit(asyncio.run(run_worker()))
@@ -0,0 +1,215 @@
+"""
+가족 알림 실시간 푸시 - 워커 1개당 유휴 연결 부하 하네스
+
+SSE 엔드포인트(GET /v1/alerts/stream)를 ASGI로 직접 호출해 워커 1개에 연결 5,000개를 붙이고 측정:
+- 연결 수립 시간 (모두 ready 이벤트를 받을 때까지)
+- 연결 1개당 메모리 (tracemalloc)
+- 유휴 상태 이벤트 루프 지연 + keep-alive 1회 전체 순회 시간
+- 알림 1개 전달 지연 / 모든 사용자에게 1개씩 전달(팬아웃) 시간
+- Redis pub/sub 경로 전달 지연 (REDIS_URL에 연결되면)
+- 연결 해제 후 구독 정리 확인
+
+사용법:
+    python benchmark_alert_connections.py
+
+    # 연결 수 변경 + Redis 경로까지 측정
+    CONNECTIONS=10000 REDIS_URL=redis://localhost:6379/0 python benchmark_alert_connections.py
+"""
+import asyncio
+import os
+import statistics
+import time
+import tracemalloc
+
+from fastapi import FastAPI, Request
+from redis import Redis
+
+from app.core.config import settings
+from app.core.deps import get_current_user, get_pooled_redis, get_supabase
+from app.routers import alerts
+from app.services.alert_stream import alert_hub, publish_alerts
+
+
+CONNECTIONS = int(os.getenv("CONNECTIONS", "5000"))
+LATENCY_SAMPLES = 200
+MEMORY_SAMPLE = 500  # tracemalloc으로 메모리를 재는 추가 연결 수
+TARGET_SINGLE_MS = 5.0  # 알림 1개 전달 목표 (프로세스 내)
+TARGET_LOOP_LAG_MS = 10.0  # 유휴 연결이 있어도 이벤트 루프 지연 목표
+
+
+def fake_user(request: Request) -> dict:
+    return {"id": request.headers["x-user"]}
+
+
+def make_app(redis=None) -> FastAPI:
+    """알림 라우터만 붙인 앱 (사용자는 X-User 헤더)"""
+    app = FastAPI()
+    app.include_router(alerts.router, prefix="/v1/alerts")
+    app.dependency_overrides[get_current_user] = fake_user
+    app.dependency_overrides[get_supabase] = lambda: None
+    app.dependency_overrides[get_pooled_redis] = lambda: redis
+    return app
+
+
+class Connection:
+    """SSE 연결 1개 (받은 이벤트 수만 세고 본문은 버림)"""
+
+    __slots__ = ("user_id", "task", "disconnect", "events", "received")
+
+    def __init__(self, app: FastAPI, user_id: str):
+        self.user_id = user_id
+        self.disconnect = asyncio.Event()
+        self.events = 0
+        self.received = asyncio.Event()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/v1/alerts/stream",
+            "raw_path": b"/v1/alerts/stream",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"bench"), (b"x-user", user_id.encode())],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        self.task = asyncio.create_task(app(scope, self._receive, self._send))
+
+    async def _receive(self):
+        await self.disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message):
+        if message["type"] == "http.response.body" and message.get("body", b"").startswith(b"event:"):
+            self.events += 1
+            self.received.set()
+
+    async def next_event(self):
+        await self.received.wait()
+        self.received.clear()
+
+
+def alert_row(user_id: str, index: int) -> dict:
+    return {
+        "id": f"bench-{index}",
+        "user_id": user_id,
+        "type": "encouragement",
+        "title": "💖 가족의 응원",
+        "message": "오늘도 화이팅!",
+        "read": False,
+        "created_at": "2026-10-17T09:00:00+00:00",
+    }
+
+
+async def loop_lag_ms(samples: int = 50) -> float:
+    """sleep(0.01)이 실제로 얼마나 늦게 깨어나는지 (p99)"""
+    lags = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - start - 0.01) * 1000)
+    lags.sort()
+    return lags[int(len(lags) * 0.99) - 1]
+
+
+async def measure_single(connections, publish) -> list:
+    """알림 1개 발행 → 수신자 연결이 이벤트를 받을 때까지 (ms)"""
+    samples = []
+    step = max(1, len(connections) // LATENCY_SAMPLES)
+    for index, connection in enumerate(connections[::step][:LATENCY_SAMPLES]):
+        connection.received.clear()
+        start = time.perf_counter()
+        publish([alert_row(connection.user_id, index)])
+        await connection.next_event()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list, target: float = None) -> None:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    verdict = ""
+    if target is not None:
+        verdict = " ✅" if p99 < target else " ❌"
+    print(f"   {label:<24} p50={p50:.3f}ms  p99={p99:.3f}ms{verdict}")
+
+
+def connect_redis():
+    try:
+        redis = Redis.from_url(settings.REDIS_URL, decode_responses=True, socket_connect_timeout=1)
+        redis.ping()
+        return redis
+    except Exception as e:
+        print(f"   ⏭️ Redis 연결 실패 - 건너뜀 ({e})")
+        return None
+
+
+async def benchmark_alert_connections():
+    print(f"🚀 알림 푸시 유휴 연결 하네스 시작 (워커 1개, 연결 {CONNECTIONS:,}개)\n")
+    print("=" * 60)
+    app = make_app()
+
+    print("\n1️⃣ 연결 수립")
+    start = time.perf_counter()
+    connections = [Connection(app, f"guardian-{index}") for index in range(CONNECTIONS)]
+    await asyncio.gather(*(connection.next_event() for connection in connections))
+    elapsed = time.perf_counter() - start
+    print(f"   {CONNECTIONS:,}개 ready까지 {elapsed:.2f}s ({CONNECTIONS / elapsed:,.0f} 연결/s)")
+
+    # 메모리는 추적 오버헤드가 커서 일부 연결만 추가로 붙여 측정
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    sampled = [Connection(app, f"guardian-mem-{index}") for index in range(MEMORY_SAMPLE)]
+    await asyncio.gather(*(connection.next_event() for connection in sampled))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_connection = (after - before) / MEMORY_SAMPLE
+    connections += sampled
+    print(f"   연결당 메모리 ≈ {per_connection / 1024:.1f}KB (연결 {len(connections):,}개 ≈ {per_connection * len(connections) / 1024 / 1024:.1f}MB)")
+    print(f"   허브 연결 수: {alert_hub.connections:,}")
+
+    print("\n2️⃣ 유휴 상태")
+    lag = await loop_lag_ms()
+    print(f"   이벤트 루프 지연 p99={lag:.3f}ms {'✅' if lag < TARGET_LOOP_LAG_MS else '❌'}")
+    start = time.perf_counter()
+    sent = await alert_hub.send_heartbeats()
+    sweep = (time.perf_counter() - start) * 1000
+    lag = await loop_lag_ms()
+    print(f"   keep-alive {sent:,}개 전체 순회 {sweep:.2f}ms (주기 {settings.ALERTS_STREAM_HEARTBEAT}s), 직후 루프 지연 p99={lag:.3f}ms")
+
+    print("\n3️⃣ 프로세스 내 전달 (Redis 없음)")
+    report("알림 1개", await measure_single(connections, lambda rows: publish_alerts(None, rows)), TARGET_SINGLE_MS)
+    for connection in connections:
+        connection.received.clear()
+    start = time.perf_counter()
+    publish_alerts(None, [alert_row(connection.user_id, index) for index, connection in enumerate(connections)])
+    await asyncio.gather(*(connection.next_event() for connection in connections))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"   팬아웃 {len(connections):,}명 각 1개: {elapsed:.1f}ms ({elapsed / len(connections) * 1000:.1f}µs/연결)")
+
+    print("\n4️⃣ Redis pub/sub 경로")
+    redis = connect_redis()
+    if redis:
+        alert_hub.start(redis)
+        await asyncio.sleep(0.2)  # 패턴 구독 완료 대기
+        report("알림 1개 (왕복 포함)", await measure_single(connections, lambda rows: publish_alerts(redis, rows)))
+        alert_hub.stop()
+
+    print("\n5️⃣ 연결 해제")
+    start = time.perf_counter()
+    for connection in connections:
+        connection.disconnect.set()
+    await asyncio.gather(*(connection.task for connection in connections))
+    elapsed = time.perf_counter() - start
+    remaining = alert_hub.connections
+    print(f"   {len(connections):,}개 해제 {elapsed:.2f}s, 남은 구독 {remaining}개 {'✅' if remaining == 0 else '❌'}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 목표: 알림 1개 전달 p99 {TARGET_SINGLE_MS}ms 미만, 유휴 연결이 이벤트 루프를 막지 않음")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_alert_connections())
@@ -0,0 +1,110 @@
+"""
+JWT 검증 마이크로 벤치마크
+
+토큰 검증 경로별 1회당 소요 시간 비교:
+- 로컬 검증 (캐시 미스: 서명/만료/audience 디코딩)
+- 로컬 검증 (캐시 히트: 토큰 해시 조회)
+- 원격 검증 (supabase.auth.get_user, 네트워크 왕복)
+
+사용법:
+    # 로컬 경로만 측정
+    python benchmark_auth.py
+
+    # 원격 경로까지 측정 (실제 Supabase 액세스 토큰 필요)
+    SUPABASE_ACCESS_TOKEN=<token> python benchmark_auth.py
+"""
+import os
+import statistics
+import time
+
+import jwt
+
+from app.core import security
+from app.core.config import settings
+from app.core.deps import get_supabase
+
+
+LOCAL_ITERATIONS = 10000
+REMOTE_ITERATIONS = 20
+
+
+def make_sample_token(secret: str) -> str:
+    """벤치마크용 Supabase 형식 토큰 생성"""
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": "benchmark-user",
+            "email": "benchmark@example.com",
+            "aud": settings.SUPABASE_JWT_AUDIENCE,
+            "role": "authenticated",
+            "iat": now,
+            "exp": now + 3600,
+        },
+        secret,
+        algorithm="HS256",
+    )
+
+
+def measure(func, iterations: int) -> list:
+    """func 1회 실행 시간(ms) 목록"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list):
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"   {label:<24} p50={p50:.4f}ms  p99={p99:.4f}ms  (n={len(samples)})")
+    return p50
+
+
+def benchmark_jwt_verification():
+    """JWT 검증 경로별 성능 측정"""
+
+    print("🚀 JWT 검증 벤치마크 시작\n")
+    print("=" * 60)
+
+    if not settings.SUPABASE_JWT_SECRET:
+        # 로컬 경로 측정을 위한 임시 시크릿
+        settings.SUPABASE_JWT_SECRET = "benchmark-secret-not-for-production"
+    token = make_sample_token(settings.SUPABASE_JWT_SECRET)
+
+    print("\n1️⃣ 로컬 검증 (캐시 미스)")
+    local_miss = report(
+        "decode",
+        measure(lambda: security.decode_supabase_token(token), LOCAL_ITERATIONS),
+    )
+
+    print("\n2️⃣ 로컬 검증 (캐시 히트)")
+    security.verify_supabase_token(token)
+    local_hit = report(
+        "claims cache",
+        measure(lambda: security.verify_supabase_token(token), LOCAL_ITERATIONS),
+    )
+
+    remote = None
+    remote_token = os.getenv("SUPABASE_ACCESS_TOKEN")
+    print("\n3️⃣ 원격 검증 (supabase.auth.get_user)")
+    if remote_token:
+        supabase = get_supabase()
+        remote = report(
+            "auth.get_user",
+            measure(lambda: supabase.auth.get_user(remote_token), REMOTE_ITERATIONS),
+        )
+    else:
+        print("   ⏭️ SUPABASE_ACCESS_TOKEN 미설정 - 건너뜀")
+
+    print("\n" + "=" * 60)
+    print("📊 결과 요약")
+    print(f"   캐시 히트는 캐시 미스보다 {local_miss / local_hit:.1f}배 빠름")
+    if remote:
+        print(f"   로컬 검증(미스)은 원격 검증보다 {remote / local_miss:.0f}배 빠름")
+
+
+if __name__ == "__main__":
+    benchmark_jwt_verification()
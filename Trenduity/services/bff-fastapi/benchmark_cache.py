@@ -0,0 +1,95 @@
+"""
+2단계 캐시 벤치마크
+
+핫 키(인사이트 목록 크기의 응답) 조회 지연 비교:
+- L1 사용 (프로세스 메모리 히트)
+- L1 미사용 (매번 Redis 왕복 + json.loads)
+
+사용법:
+    # Redis 실행 필요 (REDIS_URL, 기본 redis://localhost:6379/0)
+    python benchmark_cache.py
+"""
+import statistics
+import time
+
+from redis import Redis
+
+from app.core.config import settings
+from app.utils.cache import get_cached, get_cache_stats, local_cache, set_cached, cache_stats
+
+
+ITERATIONS = 5000
+HOT_KEY = "benchmark:insights:list:topic_all:range_weekly:limit_20:offset_0"
+
+
+def make_payload() -> dict:
+    """인사이트 목록 응답과 비슷한 크기의 페이로드"""
+    return {
+        "ok": True,
+        "data": {
+            "insights": [
+                {
+                    "id": f"insight-{i}",
+                    "created_at": "2025-11-20T08:30:00",
+                    "topic": "digital_safety",
+                    "title": f"스미싱 문자 구별하는 방법 {i}",
+                    "summary": "택배 조회, 정부 지원금을 사칭한 문자에 포함된 링크는 누르지 마세요. " * 3,
+                    "read_time_minutes": 3,
+                }
+                for i in range(20)
+            ],
+            "total": 20,
+        },
+    }
+
+
+def measure(redis_client, local: bool) -> list:
+    samples = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        get_cached(redis_client, HOT_KEY, local=local)
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+def report(label: str, samples: list) -> float:
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"   {label:<20} p50={p50:.4f}ms  p99={p99:.4f}ms  (n={len(samples)})")
+    return p50
+
+
+def benchmark_hot_key():
+    """핫 키 조회 지연 측정"""
+
+    print("🚀 2단계 캐시 벤치마크 시작\n")
+    print("=" * 60)
+
+    redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        redis_client.ping()
+    except Exception as e:
+        print(f"❌ Redis 연결 실패 ({settings.REDIS_URL}): {e}")
+        return
+
+    set_cached(redis_client, HOT_KEY, make_payload(), ttl=300)
+
+    print("\n1️⃣ L1 미사용 (Redis 왕복 + json.loads)")
+    without_l1 = report("redis only", measure(redis_client, local=False))
+
+    print("\n2️⃣ L1 사용 (프로세스 메모리 히트)")
+    local_cache.clear()
+    cache_stats.reset()
+    with_l1 = report("l1 + redis", measure(redis_client, local=True))
+
+    stats = get_cache_stats()
+    print("\n" + "=" * 60)
+    print("📊 결과 요약")
+    print(f"   L1 히트율: {stats['l1']['hit_ratio'] * 100:.2f}%")
+    print(f"   L1 사용 시 {without_l1 / with_l1:.0f}배 빠름")
+
+    redis_client.delete(HOT_KEY)
+
+
+if __name__ == "__main__":
+    benchmark_hot_key()
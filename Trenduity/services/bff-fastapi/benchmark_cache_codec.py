@@ -0,0 +1,143 @@
+"""
+캐시 코덱 벤치마크
+
+페이로드 종류별로 코덱/압축 조합의 저장 크기와 인코딩·디코딩 시간 비교:
+- legacy: json.dumps(ensure_ascii=False) 텍스트 (이전 방식)
+- 등록된 코덱 (json, orjson, msgpack 설치 시) × 압축 on/off
+
+Redis 없이 실행됩니다 (직렬화 비용만 측정).
+
+사용법:
+    python benchmark_cache_codec.py
+"""
+import json
+import statistics
+import time
+
+from app.core.config import settings
+from app.utils import cache_codec
+from app.utils.cache_codec import decode_value, encode_value, get_codec
+
+
+ITERATIONS = 2000
+
+
+def card_payload() -> dict:
+    """오늘의 카드 (긴 한글 본문 + 퀴즈)"""
+    return {
+        "ok": True,
+        "data": {
+            "card": {
+                "id": "card-2025-11-20",
+                "type": "digital_safety",
+                "title": "스미싱 문자, 이렇게 구별하세요",
+                "tldr": "모르는 번호의 링크는 절대 누르지 마세요.",
+                "body": "택배 조회, 정부 지원금, 가족 사칭 문자에 포함된 링크를 누르면 "
+                        "악성 앱이 설치되어 금융 정보가 빠져나갈 수 있어요. " * 15,
+                "quiz": [
+                    {"question": f"다음 중 안전한 행동은? ({i})", "options": ["링크 누르기", "무시하고 삭제", "답장하기"], "answer": 1}
+                    for i in range(3)
+                ],
+            }
+        },
+    }
+
+
+def insight_detail_payload() -> dict:
+    """인사이트 상세 (본문 + 참고 자료)"""
+    return {
+        "ok": True,
+        "data": {
+            "insight": {
+                "id": "insight-42",
+                "topic": "ai_tools",
+                "title": "시니어를 위한 AI 도구 활용 가이드",
+                "summary": "최신 AI 도구를 쉽게 사용하는 방법",
+                "body": "ChatGPT, Copilot 등 AI 도구의 기본 사용법을 알아봅니다. " * 60,
+                "impact": "디지털 격차 해소 및 생산성 향상",
+                "references": [f"https://example.com/ref/{i}" for i in range(10)],
+            }
+        },
+    }
+
+
+def course_lectures_payload() -> dict:
+    """강좌 상세 (강의 목록)"""
+    return {
+        "course": {"id": "course-1", "title": "스마트폰 기초", "description": "카카오톡부터 은행 앱까지 " * 10},
+        "lectures": [
+            {
+                "id": f"lecture-{i}",
+                "order_index": i,
+                "title": f"{i}강. 스마트폰 설정 따라하기",
+                "content": "화면 밝기와 글자 크기를 키우는 방법을 알려드려요. " * 8,
+                "duration_minutes": 10,
+            }
+            for i in range(24)
+        ],
+    }
+
+
+def gamification_payload() -> dict:
+    """게임화 통계 (작은 값)"""
+    return {
+        "user_id": "demo-user-50s",
+        "total_points": 1280,
+        "level": 5,
+        "current_streak": 12,
+        "longest_streak": 30,
+        "badges": ["first_card", "streak_7", "quiz_master"],
+    }
+
+
+PAYLOADS = {
+    "card": card_payload(),
+    "insight_detail": insight_detail_payload(),
+    "course_lectures": course_lectures_payload(),
+    "gamification": gamification_payload(),
+}
+
+
+def measure_us(func) -> float:
+    """func 1회 실행 시간 중앙값(µs)"""
+    samples = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+def benchmark_codecs():
+    """페이로드별 코덱 비교"""
+
+    print("🚀 캐시 코덱 벤치마크 시작\n")
+    print(f"   등록된 코덱: {', '.join(sorted(cache_codec._codecs_by_name))}")
+    print(f"   압축 임계값: {settings.CACHE_COMPRESSION_THRESHOLD} bytes (zlib level {settings.CACHE_COMPRESSION_LEVEL})")
+    print("=" * 72)
+
+    for payload_name, payload in PAYLOADS.items():
+        print(f"\n📦 {payload_name}")
+        print(f"   {'format':<20} {'bytes':>8} {'encode µs':>11} {'decode µs':>11}")
+
+        legacy = json.dumps(payload, ensure_ascii=False)
+        print(
+            f"   {'legacy json':<20} {len(legacy.encode('utf-8')):>8} "
+            f"{measure_us(lambda: json.dumps(payload, ensure_ascii=False)):>11.1f} "
+            f"{measure_us(lambda: json.loads(legacy)):>11.1f}"
+        )
+
+        for codec_name in sorted(cache_codec._codecs_by_name):
+            codec = get_codec(codec_name)
+            for label, threshold in (("", 0), ("+zlib", settings.CACHE_COMPRESSION_THRESHOLD or 1)):
+                raw = encode_value(payload, codec=codec, threshold=threshold)
+                encode_us = measure_us(lambda: encode_value(payload, codec=codec, threshold=threshold))
+                decode_us = measure_us(lambda: decode_value(raw))
+                print(f"   {codec_name + label:<20} {len(raw):>8} {encode_us:>11.1f} {decode_us:>11.1f}")
+
+    print("\n" + "=" * 72)
+    print("📊 +zlib는 임계값 이상인 페이로드만 압축합니다 (작은 값은 그대로 저장)")
+
+
+if __name__ == "__main__":
+    benchmark_codecs()
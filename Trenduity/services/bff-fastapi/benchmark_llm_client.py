@@ -0,0 +1,141 @@
+"""
+LLM HTTP 클라이언트 벤치마크
+
+로컬 목 LLM 서버(OpenAI 형식 응답)에 대해 호출 1회당 소요 시간 비교:
+- 호출마다 httpx.AsyncClient 생성 (기존 방식: 클라이언트 생성 + TCP 연결 + 종료)
+- 공유 클라이언트 (app/core/http_clients.py: keep-alive 연결 재사용)
+- 공유 클라이언트 동시 호출 (CONCURRENCY개씩, 연결 풀 상한 내 재사용)
+
+로컬 루프백이라 DNS/TLS 비용은 포함되지 않습니다. 실제 제공자에서는
+호출마다 TLS 핸드셰이크(수십~수백 ms)가 추가로 절약됩니다.
+
+사용법:
+    python benchmark_llm_client.py
+"""
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from app.core.http_clients import create_llm_client
+
+
+ITERATIONS = 300
+CONCURRENCY = 20
+SERVER_DELAY = 0.002  # 목 서버 응답 생성 시간(초)
+
+MOCK_BODY = json.dumps({
+    "choices": [{"message": {"role": "assistant", "content": "안녕하세요! 무엇을 도와드릴까요?"}}],
+    "usage": {"total_tokens": 42},
+}).encode()
+
+PAYLOAD = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "user", "content": "오늘 날씨 어때요?"}],
+    "max_tokens": 500,
+}
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """HTTP/1.1 keep-alive 목 서버 (요청마다 고정 응답)"""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            await asyncio.sleep(SERVER_DELAY)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: " + str(len(MOCK_BODY)).encode() + b"\r\n\r\n" + MOCK_BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def call_with_new_client(base_url: str):
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.post(f"{base_url}/v1/chat/completions", json=PAYLOAD)
+        response.json()
+
+
+async def call_with_shared_client(client: httpx.AsyncClient):
+    response = await client.post("/v1/chat/completions", json=PAYLOAD)
+    response.json()
+
+
+async def measure(call, iterations: int) -> list:
+    """call 1회 실행 시간(ms) 목록"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def measure_concurrent(call, iterations: int, concurrency: int) -> float:
+    """동시 실행 시 호출당 평균 시간(ms)"""
+    start = time.perf_counter()
+    for _ in range(iterations // concurrency):
+        await asyncio.gather(*(call() for _ in range(concurrency)))
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def report(label: str, samples: list) -> float:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"   {label:<24} p50={p50:.3f}ms  p99={p99:.3f}ms  (n={len(samples)})")
+    return p50
+
+
+async def benchmark_llm_client():
+    """클라이언트 생성 방식별 호출 지연 측정"""
+
+    print("🚀 LLM HTTP 클라이언트 벤치마크 시작\n")
+    print("=" * 60)
+
+    server = await asyncio.start_server(handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    print(f"   목 LLM 서버: {base_url} (응답 지연 {SERVER_DELAY * 1000:.0f}ms)")
+
+    shared = create_llm_client("openai", base_url=base_url)
+    try:
+        # 워밍업
+        await call_with_new_client(base_url)
+        await call_with_shared_client(shared)
+
+        print("\n1️⃣ 호출마다 클라이언트 생성")
+        per_call = report("new AsyncClient", await measure(lambda: call_with_new_client(base_url), ITERATIONS))
+
+        print("\n2️⃣ 공유 클라이언트 (keep-alive)")
+        pooled = report("shared client", await measure(lambda: call_with_shared_client(shared), ITERATIONS))
+
+        print(f"\n3️⃣ 동시 {CONCURRENCY}개 호출 (호출당 평균)")
+        concurrent_new = await measure_concurrent(lambda: call_with_new_client(base_url), ITERATIONS, CONCURRENCY)
+        concurrent_shared = await measure_concurrent(lambda: call_with_shared_client(shared), ITERATIONS, CONCURRENCY)
+        print(f"   {'new AsyncClient':<24} {concurrent_new:.3f}ms")
+        print(f"   {'shared client':<24} {concurrent_shared:.3f}ms")
+    finally:
+        await shared.aclose()
+        server.close()
+        await server.wait_closed()
+
+    print("\n" + "=" * 60)
+    print("📊 결과 요약")
+    print(f"   호출당 절약: {per_call - pooled:.3f}ms (p50, {per_call / pooled:.1f}배)")
+    print(f"   동시 호출 시 절약: {concurrent_new - concurrent_shared:.3f}ms/호출")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_llm_client())
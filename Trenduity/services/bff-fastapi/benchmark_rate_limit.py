@@ -0,0 +1,139 @@
+"""
+레이트 리미터 미들웨어 오버헤드 벤치마크
+
+빈 ASGI 앱을 직접 호출해 미들웨어 유무의 요청 1회당 시간 차이를 측정 (목표: 0.3ms 미만):
+- IP 식별 + 로컬 버킷 (Redis 없음/장애)
+- JWT 식별(클레임 캐시 히트) + 로컬 버킷
+- IP 식별 + Redis 토큰 버킷 스크립트 (REDIS_URL에 연결되면)
+
+사용법:
+    python benchmark_rate_limit.py
+
+    # Redis 경로까지 측정
+    REDIS_URL=redis://localhost:6379/0 python benchmark_rate_limit.py
+"""
+import asyncio
+import statistics
+import time
+
+import jwt
+from redis import Redis
+
+from app.core import security
+from app.core.config import settings
+from app.middleware.rate_limit import LocalBuckets, RateLimitMiddleware
+
+
+ITERATIONS = 20000
+REDIS_ITERATIONS = 2000
+TARGET_OVERHEAD_MS = 0.3
+
+
+async def empty_app(scope, receive, send):
+    """본문 없는 200 응답"""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def make_scope(headers=()) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/v1/cards/today",
+        "headers": list(headers),
+        "client": ("203.0.113.7", 51234),
+    }
+
+
+def make_middleware(redis_getter=lambda: None) -> RateLimitMiddleware:
+    """제한에 걸리지 않도록 큰 버킷"""
+    return RateLimitMiddleware(
+        empty_app,
+        redis_getter=redis_getter,
+        per_minute=10**9,
+        burst=10**9,
+        routes="/v1/chat=20:5",
+        buckets=LocalBuckets(10000),
+    )
+
+
+async def measure(app, scope: dict, iterations: int) -> list:
+    """요청 1회 처리 시간(ms) 목록"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await app(scope, receive, send)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list, baseline: float = None) -> float:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    line = f"   {label:<28} p50={p50:.4f}ms  p99={p99:.4f}ms"
+    if baseline is not None:
+        overhead = p50 - baseline
+        verdict = "✅" if overhead < TARGET_OVERHEAD_MS else "❌"
+        line += f"  오버헤드={overhead:.4f}ms {verdict}"
+    print(line)
+    return p50
+
+
+def connect_redis():
+    try:
+        redis = Redis.from_url(settings.REDIS_URL, socket_connect_timeout=1)
+        redis.ping()
+        return redis
+    except Exception as e:
+        print(f"   ⏭️ Redis 연결 실패 - 건너뜀 ({e})")
+        return None
+
+
+async def benchmark_rate_limit():
+    print("🚀 레이트 리미터 오버헤드 벤치마크 시작\n")
+    print("=" * 60)
+    settings.RATE_LIMIT_ENABLED = True
+
+    ip_scope = make_scope()
+    if not settings.SUPABASE_JWT_SECRET:
+        settings.SUPABASE_JWT_SECRET = "benchmark-secret-not-for-production"
+    now = int(time.time())
+    token = jwt.encode(
+        {"sub": "benchmark-user", "aud": settings.SUPABASE_JWT_AUDIENCE, "iat": now, "exp": now + 3600},
+        settings.SUPABASE_JWT_SECRET,
+        algorithm="HS256",
+    )
+    jwt_scope = make_scope([(b"authorization", f"Bearer {token}".encode())])
+    security.verify_supabase_token(token)  # 실제 요청처럼 클레임 캐시에 있는 상태
+
+    print("\n0️⃣ 기준 (미들웨어 없음)")
+    baseline = report("empty app", await measure(empty_app, ip_scope, ITERATIONS))
+
+    print("\n1️⃣ IP + 로컬 버킷")
+    report("local bucket", await measure(make_middleware(), ip_scope, ITERATIONS), baseline)
+
+    print("\n2️⃣ JWT(캐시 히트) + 로컬 버킷")
+    report("jwt + local bucket", await measure(make_middleware(), jwt_scope, ITERATIONS), baseline)
+
+    print("\n3️⃣ IP + Redis 토큰 버킷")
+    redis = connect_redis()
+    if redis:
+        report("redis bucket", await measure(make_middleware(lambda: redis), ip_scope, REDIS_ITERATIONS), baseline)
+        for key in redis.scan_iter("ratelimit:bucket:*"):
+            redis.delete(key)
+
+    print("\n" + "=" * 60)
+    print(f"📊 목표: 요청당 추가 시간 {TARGET_OVERHEAD_MS}ms 미만 (Redis 경로는 왕복 시간 포함)")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_rate_limit())
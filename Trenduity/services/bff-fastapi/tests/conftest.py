@@ -4,7 +4,10 @@ Pytest 공통 설정 및 픽스처
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
+from app.core.config import settings
 from app.main import app
+from app.services.ai_response_cache import similarity_index
+from app.utils.cache import local_cache
 import os
 
 # 테스트 환경 변수 설정
@@ -16,6 +19,18 @@ os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.
 TEST_SENIOR_TOKEN = "test-jwt-token-for-senior-user"
 TEST_GUARDIAN_TOKEN = "test-jwt-token-for-guardian-user"
 
+@pytest.fixture(autouse=True)
+def clear_local_caches():
+    """테스트 간 프로세스 메모리 캐시(L1, AI 유사 질문 인덱스) 공유 방지"""
+    yield
+    local_cache.clear()
+    similarity_index.clear()
+
+@pytest.fixture(autouse=True)
+def disable_rate_limit(monkeypatch):
+    """전역 레이트 리미터는 끔 (tests/test_rate_limit.py에서만 켬)"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
 @pytest_asyncio.fixture
 async def client():
     """비동기 HTTP 클라이언트"""
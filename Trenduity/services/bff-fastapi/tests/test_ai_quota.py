@@ -0,0 +1,239 @@
+"""
+AI 일일 사용량(쿼터) 테스트
+
+쿼터 스크립트 확인/차감/환불, 전체 모델 사용량 반환, 이전 카운터 이어받기, Redis 장애 시 동작,
+/chat/send 한도 초과·실패 환불, /subscriptions/me 단일 조회 확인
+"""
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.deps import get_current_user, get_redis_client, get_supabase
+from app.main import app
+from app.services.ai_quota import (
+    AI_MODEL_IDS,
+    QUOTA_SCRIPT,
+    UNLIMITED,
+    get_quota,
+    legacy_usage_keys,
+    quota_key,
+    refund_quota,
+    reserve_quota,
+)
+from app.services.llm_gateway import LLMGateway, LLMProviderError, get_llm_gateway
+
+
+class FakeRedis:
+    """해시 + 쿼터 스크립트만 흉내내는 Redis (스크립트 1회 = 원자적)"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}  # 이전 일일 카운터 (ai_usage:*, usage:*)
+        self.eval_calls = 0
+        self.get = Mock(return_value=None)  # 분당 제한 카운터
+
+    def pipeline(self):
+        return Mock()
+
+    def eval(self, script, numkeys, *keys_and_args):
+        assert script == QUOTA_SCRIPT
+        self.eval_calls += 1
+        key, legacy_keys = keys_and_args[0], keys_and_args[1:numkeys]
+        op, target, ttl, *pairs = keys_and_args[numkeys:]
+        if key not in self.hashes and legacy_keys:
+            seeded = {}
+            for model_id, chat_key, subscription_key in zip(pairs[::2], legacy_keys[::2], legacy_keys[1::2]):
+                used = max(int(self.strings.get(chat_key, 0)), int(self.strings.get(subscription_key, 0)))
+                if used:
+                    seeded[model_id] = used
+            if seeded:
+                self.hashes[key] = seeded
+        counts = self.hashes.setdefault(key, {})
+        limits = dict(zip(pairs[::2], (int(v) for v in pairs[1::2])))
+        allowed = 1
+
+        if op == "reserve":
+            limit = limits.get(target, 0)
+            if limit >= 0 and counts.get(target, 0) >= limit:
+                allowed = 0
+            else:
+                counts[target] = counts.get(target, 0) + 1
+        elif op == "refund" and counts.get(target, 0) > 0:
+            counts[target] -= 1
+
+        return [allowed] + [counts.get(model_id, 0) for model_id in pairs[::2]]
+
+
+LIMITS = {"quick": 3, "allround": 1, "writer": UNLIMITED, "expert": 0, "genius": 0}
+
+
+class TestQuotaScript:
+    """확인 + 차감 + 환불"""
+
+    def test_reserve_until_limit(self):
+        redis = FakeRedis()
+
+        results = [reserve_quota(redis, "u1", "quick", LIMITS) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[-1].used["quick"] == 3
+        assert results[-1].remaining("quick") == 0
+
+    def test_returns_all_models(self):
+        """차감 결과에 5개 모델 사용량/남은 횟수가 함께 옴"""
+        redis = FakeRedis()
+        reserve_quota(redis, "u1", "allround", LIMITS)
+
+        status = reserve_quota(redis, "u1", "quick", LIMITS)
+
+        assert set(status.used) == set(AI_MODEL_IDS)
+        assert status.all_remaining() == {"quick": 2, "allround": 0, "writer": UNLIMITED, "expert": 0, "genius": 0}
+
+    def test_unlimited_and_unavailable(self):
+        redis = FakeRedis()
+
+        assert all(reserve_quota(redis, "u1", "writer", LIMITS).allowed for _ in range(10))
+        assert not reserve_quota(redis, "u1", "expert", LIMITS).allowed
+        assert not reserve_quota(redis, "u1", "unknown", LIMITS).allowed  # 한도 없는 모델은 0
+
+    def test_refund_never_negative(self):
+        redis = FakeRedis()
+        reserve_quota(redis, "u1", "allround", LIMITS)
+
+        refund_quota(redis, "u1", "allround")
+        status = refund_quota(redis, "u1", "allround", LIMITS)
+
+        assert status.used["allround"] == 0
+        assert reserve_quota(redis, "u1", "allround", LIMITS).allowed
+
+    def test_daily_key(self):
+        assert quota_key("u1", date(2026, 10, 17)) == "ai_quota:u1:2026-10-17"
+
+
+class TestLegacySeed:
+    """해시 도입 전 카운터에서 오늘 사용량 이어받기"""
+    
+    def test_seeded_from_legacy_counters(self):
+        """배포 당일 이미 쓴 횟수가 초기화되지 않음 (두 카운터 중 큰 값)"""
+        redis = FakeRedis()
+        chat_key, subscription_key = legacy_usage_keys("u1", ["quick"])
+        redis.strings[chat_key] = "2"
+        redis.strings[subscription_key] = "1"
+        
+        results = [reserve_quota(redis, "u1", "quick", LIMITS) for _ in range(2)]
+        
+        assert [r.allowed for r in results] == [True, False]
+        assert results[-1].used["quick"] == 3
+    
+    def test_legacy_ignored_once_hash_exists(self):
+        """해시가 생긴 뒤에는 이전 카운터를 다시 읽지 않음 (환불해도 되살아나지 않음)"""
+        redis = FakeRedis()
+        reserve_quota(redis, "u1", "allround", LIMITS)
+        refund_quota(redis, "u1", "allround")
+        redis.strings[legacy_usage_keys("u1", ["allround"])[0]] = "1"
+        
+        assert reserve_quota(redis, "u1", "allround", LIMITS).allowed
+    
+    def test_legacy_key_formats(self):
+        keys = legacy_usage_keys("u1", ["quick", "writer"])
+        
+        assert [key.rsplit(":", 1)[0] for key in keys] == [
+            "ai_usage:u1:quick",
+            "usage:u1:quick",
+            "ai_usage:u1:writer",
+            "usage:u1:writer",
+        ]
+
+
+class TestQuotaFallback:
+    """Redis 없음/장애"""
+
+    def test_no_redis_allows_available_models(self):
+        assert reserve_quota(None, "u1", "quick", LIMITS).allowed
+        assert not reserve_quota(None, "u1", "expert", LIMITS).allowed
+        assert get_quota(None, "u1", LIMITS).used["quick"] == 0
+
+    def test_eval_error_allows(self):
+        redis = Mock()
+        redis.eval.side_effect = ConnectionError("down")
+
+        status = reserve_quota(redis, "u1", "quick", LIMITS)
+
+        assert status.allowed
+        assert status.remaining("quick") == 3
+
+
+class TestRouters:
+    """/chat/send, /subscriptions/me"""
+
+    @pytest.fixture
+    def redis(self):
+        redis = FakeRedis()
+        app.dependency_overrides[get_current_user] = lambda: {"id": "u1", "subscription_plan": "FREE"}
+        app.dependency_overrides[get_redis_client] = lambda: redis
+        app.dependency_overrides[get_supabase] = lambda: None
+        yield redis
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    def use_gateway(reply=None, error=None):
+        async def fake_openai(messages, model, api_key, **params):
+            if error:
+                raise error
+            return reply, {"total_tokens": 10}
+
+        gateway = LLMGateway(api_keys={"openai": "k"}, calls={"openai": fake_openai})
+        app.dependency_overrides[get_llm_gateway] = lambda: gateway
+
+    @pytest.mark.asyncio
+    async def test_chat_limit_exceeded(self, client, redis):
+        """FREE 플랜 만능 비서 5회 사용 후 한도 초과"""
+        self.use_gateway(reply="네, 알려드릴게요")
+
+        for i in range(5):
+            response = await client.post("/v1/chat/send", json={"message": f"질문 {i}", "model_id": "allround"})
+            assert response.json()["ok"]
+
+        response = await client.post("/v1/chat/send", json={"message": "질문 5", "model_id": "allround"})
+
+        assert response.json()["error"]["code"] == "AI_LIMIT_EXCEEDED"
+        assert redis.hashes[quota_key("u1")]["allround"] == 5
+
+    @pytest.mark.asyncio
+    async def test_chat_failure_refunds(self, client, redis):
+        """모든 모델 실패(목업 응답) 시 차감한 사용량 환불"""
+        self.use_gateway(error=LLMProviderError("openai", 503))
+
+        response = await client.post("/v1/chat/send", json={"message": "안녕", "model_id": "allround"})
+
+        assert response.json()["data"]["model_used"] == "mock"
+        assert redis.hashes[quota_key("u1")]["allround"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unavailable_model_checked_without_redis_call(self, client, redis):
+        """플랜에서 쓸 수 없는 모델은 쿼터 스크립트 없이 거절"""
+        response = await client.post("/v1/chat/send", json={"message": "안녕", "model_id": "genius"})
+
+        assert response.json()["error"]["code"] == "AI_LIMIT_EXCEEDED"
+        assert redis.eval_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_subscription_me_single_lookup(self, client, redis):
+        """/subscriptions/me 사용량은 쿼터 스크립트 1회로 조회, /chat 사용량과 공유"""
+        reserve_quota(redis, "u1", "quick", {"quick": 5})
+        redis.eval_calls = 0
+
+        response = await client.get("/v1/subscriptions/me")
+
+        usage = response.json()["data"]["usage"]
+        assert usage["quick"]["used_count"] == 1
+        assert usage["quick"]["remaining"] == 4
+        assert redis.eval_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_record_usage(self, client, redis):
+        response = await client.post("/v1/subscriptions/record-usage?model_id=writer")
+
+        assert response.json()["data"]["used_count"] == 1
+        assert redis.hashes[quota_key("u1")]["writer"] == 1
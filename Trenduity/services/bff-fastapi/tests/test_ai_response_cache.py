@@ -0,0 +1,182 @@
+"""
+AI 응답 캐시 테스트
+
+질문 정규화, 정확 일치/유사 질문 히트, 캐시 제외 조건(대화 기록, 모델 제외),
+/chat/send 캐시 히트 시 LLM 미호출 + 사용량 미차감, 지표 확인
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.config import settings
+from app.core.deps import get_current_user, get_redis_client
+from app.main import app
+from app.services import ai_response_cache
+from app.services.ai_quota import QUOTA_SCRIPT
+from app.services.ai_response_cache import (
+    NgramIndex,
+    lookup_response,
+    normalize_prompt,
+    response_scope,
+    store_response,
+)
+from app.services.llm_gateway import LLMGateway, get_llm_gateway
+
+SCOPE = "chat:allround:gpt-4o-mini"
+SYSTEM = "친절하게 답하세요"
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    ai_response_cache.response_cache_stats.reset()
+    yield
+
+
+def store(prompt: str, text: str = "설정 → 사진 선택 → 보내기 순서예요", history=()):
+    return store_response(None, SCOPE, SYSTEM, prompt, history, text, "gpt-4o-mini", 42)
+
+
+class TestNormalize:
+    """질문 정규화"""
+
+    def test_spacing_punctuation_and_emoji_ignored(self):
+        assert normalize_prompt("카카오톡 사진 보내는 법?") == normalize_prompt("카카오톡 사진보내는법 😊")
+
+    def test_fullwidth_and_case(self):
+        assert normalize_prompt("ＣｈａｔＧＰＴ가 뭐예요") == normalize_prompt("chatgpt가 뭐예요!!")
+
+
+class TestLookup:
+    """조회/저장"""
+
+    def test_exact_hit(self):
+        store("스미싱이 뭐예요?")
+
+        hit = lookup_response(None, SCOPE, SYSTEM, "스미싱이  뭐예요")
+
+        assert hit.text == "설정 → 사진 선택 → 보내기 순서예요"
+        assert hit.similarity == 1.0
+        assert hit.tokens == 42
+
+    def test_system_prompt_and_scope_separate_entries(self):
+        store("스미싱이 뭐예요")
+
+        assert lookup_response(None, SCOPE, "다른 프롬프트", "스미싱이 뭐예요") is None
+        assert lookup_response(None, "chat:quick:gemini-1.5-flash", SYSTEM, "스미싱이 뭐예요") is None
+
+    def test_history_not_cached(self):
+        """이전 대화가 있으면 저장/조회하지 않음"""
+        history = [{"role": "user", "content": "안녕"}]
+
+        assert not store("그럼 어떻게 해요?", history=history)
+        store("그럼 어떻게 해요?")
+        assert lookup_response(None, SCOPE, SYSTEM, "그럼 어떻게 해요?", history) is None
+
+    def test_long_prompt_not_cached(self, monkeypatch):
+        monkeypatch.setattr(settings, "AI_CACHE_MAX_PROMPT_CHARS", 10)
+        store("아주 긴 질문입니다 정말 길어요")
+
+        assert lookup_response(None, SCOPE, SYSTEM, "아주 긴 질문입니다 정말 길어요") is None
+
+    def test_disabled_models(self, monkeypatch):
+        """모델별 캐시 제외, 전체 끄기"""
+        monkeypatch.setattr(settings, "AI_CACHE_DISABLED_MODELS", "expert, genius")
+
+        assert response_scope("chat", "genius", "claude-3-opus") is None
+        assert response_scope("chat", "quick", "gemini-1.5-flash") == "chat:quick:gemini-1.5-flash"
+
+        monkeypatch.setattr(settings, "AI_CACHE_ENABLED", False)
+        assert response_scope("chat", "quick", "gemini-1.5-flash") is None
+
+    def test_similar_hit(self, monkeypatch):
+        """유사 질문 인덱스 (조사/맞춤법 차이)"""
+        monkeypatch.setattr(settings, "AI_CACHE_SIMILARITY_ENABLED", True)
+        store("카카오톡 사진 보내는 법")
+
+        hit = lookup_response(None, SCOPE, SYSTEM, "카카오톡으로 사진 보내는 법")
+
+        assert hit is not None
+        assert 0.85 <= hit.similarity < 1.0
+        assert lookup_response(None, SCOPE, SYSTEM, "카카오톡 동영상 보내는 법") is None
+
+    def test_stats(self):
+        store("스미싱이 뭐예요")
+        lookup_response(None, SCOPE, SYSTEM, "스미싱이 뭐예요")
+        lookup_response(None, SCOPE, SYSTEM, "보이스피싱이 뭐예요")
+
+        stats = ai_response_cache.get_response_cache_stats()
+        assert stats["exact_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["saved_tokens"] == 42
+
+
+class TestNgramIndex:
+    """유사 질문 인덱스"""
+
+    def test_digits_must_match(self):
+        index = NgramIndex(100)
+        index.add("b", "경찰번호는112인가요")
+
+        assert index.find("b", "경찰번호는119인가요", 0.5) is None
+        assert index.find("b", "경찰번호는112인가요", 0.5)[1] == 1.0
+
+    def test_lru_eviction_cleans_postings(self):
+        index = NgramIndex(2)
+        index.add("b", "가나다라")
+        index.add("b", "마바사아")
+        index.add("b", "자차카타")
+
+        assert len(index) == 2
+        assert index.find("b", "가나다라", 0.5) is None
+        assert ("b", "가나") not in index._postings
+
+
+class TestChatSendCache:
+    """/chat/send 응답 캐시"""
+
+    @pytest.fixture
+    def redis(self):
+        redis = Mock()
+        redis.get.return_value = None
+        calls = []
+
+        async def fake_openai(messages, model, api_key, **params):
+            calls.append(model)
+            return "스미싱은 문자 사기예요 ⚠️", {"total_tokens": 30}
+
+        gateway = LLMGateway(api_keys={"openai": "k"}, calls={"openai": fake_openai})
+        app.dependency_overrides[get_current_user] = lambda: {"id": "u1"}
+        app.dependency_overrides[get_redis_client] = lambda: redis
+        app.dependency_overrides[get_llm_gateway] = lambda: gateway
+        redis.llm_calls = calls
+        yield redis
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    def usage_increments(redis) -> int:
+        ops = [call.args[call.args[1] + 2] for call in redis.eval.call_args_list if call.args[0] == QUOTA_SCRIPT]
+        return ops.count("reserve") - ops.count("refund")
+
+    @pytest.mark.asyncio
+    async def test_repeat_question_served_from_cache(self, client, redis):
+        """같은 질문은 LLM 호출 없이 반환, 일일 사용량 미차감"""
+        first = await client.post("/v1/chat/send", json={"message": "스미싱이 뭐예요?", "model_id": "allround"})
+        second = await client.post("/v1/chat/send", json={"message": "스미싱이 뭐예요", "model_id": "allround"})
+
+        assert first.json()["data"]["cached"] is False
+        assert second.json()["data"]["cached"] is True
+        assert second.json()["data"]["reply"] == "스미싱은 문자 사기예요 ⚠️"
+        assert len(redis.llm_calls) == 1
+        assert self.usage_increments(redis) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_cached_reply(self, client, redis):
+        """스트리밍 요청도 캐시된 답변을 한 번에 전송"""
+        await client.post("/v1/chat/send", json={"message": "스미싱이 뭐예요", "model_id": "allround"})
+
+        response = await client.post("/v1/chat/send/stream", json={"message": "스미싱이 뭐예요", "model_id": "allround"})
+
+        assert '{"text": "스미싱은 문자 사기예요 ⚠️"}' in response.text
+        assert '"cached": true' in response.text
+        assert len(redis.llm_calls) == 1
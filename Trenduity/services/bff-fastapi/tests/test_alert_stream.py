@@ -0,0 +1,367 @@
+"""
+가족 알림 실시간 푸시 테스트
+
+워커별 허브 전달/큐 초과 resync, 발행 스크립트의 읽지 않은 알림 수 증감,
+SSE 스트림 연결/해제, REST since_id 따라잡기 확인
+"""
+import asyncio
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.deps import get_current_user, get_current_user_optional, get_pooled_redis, get_supabase
+from app.main import app
+from app.services.alert_stream import (
+    DECREMENT_UNREAD_SCRIPT,
+    HEARTBEAT,
+    PUBLISH_ALERT_SCRIPT,
+    RESYNC_MESSAGE,
+    AlertHub,
+    alert_channel,
+    alert_hub,
+    get_unread_count,
+    mark_read,
+    publish_alerts,
+    unread_key,
+)
+
+
+class FakeRedis:
+    """문자열 + 발행/감소 스크립트만 흉내내는 Redis (PUBLISH는 self.published에 기록)"""
+
+    def __init__(self):
+        self.strings = {}
+        self.published = []
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value)
+        return True
+
+    def eval(self, script, numkeys, counter_key, channel, *args):
+        if script == PUBLISH_ALERT_SCRIPT:
+            prefix, _ttl = args
+            unread = "null"
+            if counter_key in self.strings:
+                unread = int(self.strings[counter_key]) + 1
+                self.strings[counter_key] = str(unread)
+            self.published.append((channel, f"{prefix}{unread}}}"))
+            return -1 if unread == "null" else unread
+
+        assert script == DECREMENT_UNREAD_SCRIPT
+        count, _ttl = args
+        if counter_key not in self.strings:
+            return -1
+        unread = max(0, int(self.strings[counter_key]) - int(count))
+        self.strings[counter_key] = str(unread)
+        self.published.append((channel, json.dumps({"event": "unread", "unread_count": unread})))
+        return unread
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def eval(self, *args):
+                self.calls.append(args)
+
+            def execute(self):
+                return [redis.eval(*args) for args in self.calls]
+
+        return Pipeline()
+
+
+SINCE_ID = "6f1c2d3e-4b5a-4c6d-8e7f-9a0b1c2d3e4f"
+
+
+def alert_row(alert_id="a1", user_id="senior-1", **extra):
+    row = {
+        "id": alert_id,
+        "user_id": user_id,
+        "type": "encouragement",
+        "title": "💖 가족의 응원",
+        "message": "오늘도 화이팅!",
+        "read": False,
+        "created_at": "2026-10-17T09:00:00+00:00",
+    }
+    row.update(extra)
+    return row
+
+
+class TestAlertHub:
+    """워커별 연결 큐"""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_to_user_connections_only(self):
+        hub = AlertHub(queue_size=5)
+        phone = hub.subscribe("u1")
+        tablet = hub.subscribe("u1")
+        other = hub.subscribe("u2")
+
+        assert hub.dispatch("u1", {"event": "alert"}) == 2
+        assert hub.dispatch("nobody", {"event": "alert"}) == 0
+
+        assert phone.get_nowait() == tablet.get_nowait() == {"event": "alert"}
+        assert other.empty()
+
+        hub.unsubscribe("u1", phone)
+        hub.unsubscribe("u1", tablet)
+        assert hub.stats()["users"] == 1
+        assert hub.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_overflow_replaced_by_resync(self):
+        """못 따라오는 연결은 쌓인 메시지 대신 resync 1개"""
+        hub = AlertHub(queue_size=2)
+        queue = hub.subscribe("u1")
+
+        for index in range(3):
+            hub.dispatch("u1", {"event": "alert", "n": index})
+
+        assert queue.qsize() == 1
+        assert queue.get_nowait() == RESYNC_MESSAGE
+        assert hub.resyncs == 1
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_only_to_idle_connections(self):
+        hub = AlertHub()
+        idle = hub.subscribe("u1")
+        busy = hub.subscribe("u2")
+        hub.dispatch("u2", {"event": "alert"})
+
+        assert await hub.send_heartbeats() == 1
+        assert idle.get_nowait() is HEARTBEAT
+        assert busy.qsize() == 1
+
+    @pytest.mark.asyncio
+    async def test_pubsub_message_handed_to_loop(self):
+        """구독 스레드 콜백은 이벤트 루프에서 전달"""
+        hub = AlertHub()
+        hub._loop = asyncio.get_running_loop()
+        queue = hub.subscribe("u1")
+
+        hub._on_message({"channel": alert_channel("u1"), "data": '{"event": "alert", "unread_count": 1}'})
+        hub._on_message({"channel": alert_channel("u1"), "data": "not-json"})
+        await asyncio.sleep(0)
+
+        assert queue.get_nowait() == {"event": "alert", "unread_count": 1}
+        assert queue.empty()
+
+
+class TestPublish:
+    """발행 + 읽지 않은 알림 수 카운터"""
+
+    def test_publish_increments_existing_counter(self):
+        redis = FakeRedis()
+        redis.strings[unread_key("senior-1")] = "2"
+
+        assert publish_alerts(redis, [alert_row("a1"), alert_row("a2", user_id="senior-2")]) == 2
+
+        channel, data = redis.published[0]
+        message = json.loads(data)
+        assert channel == alert_channel("senior-1")
+        assert message["event"] == "alert"
+        assert message["alert"]["id"] == "a1"
+        assert message["alert"]["message"] == "오늘도 화이팅!"
+        assert message["unread_count"] == 3
+        # 카운터가 없는 사용자는 새로 만들지 않음 (다음 조회 때 DB count로 채움)
+        assert json.loads(redis.published[1][1])["unread_count"] is None
+        assert unread_key("senior-2") not in redis.strings
+
+    @pytest.mark.asyncio
+    async def test_without_redis_dispatches_locally(self):
+        queue = alert_hub.subscribe("senior-1")
+        try:
+            assert publish_alerts(None, [alert_row()]) == 1
+            message = queue.get_nowait()
+        finally:
+            alert_hub.unsubscribe("senior-1", queue)
+
+        assert message["alert"]["id"] == "a1"
+        assert message["unread_count"] is None
+
+    def test_ignores_missing_insert_result(self):
+        assert publish_alerts(FakeRedis(), None) == 0
+
+    def test_mark_read_floors_at_zero_and_notifies(self):
+        redis = FakeRedis()
+        redis.strings[unread_key("u1")] = "2"
+
+        assert mark_read(redis, "u1", 5) == 0
+        assert json.loads(redis.published[-1][1]) == {"event": "unread", "unread_count": 0}
+        assert mark_read(redis, "u2", 1) is None
+        assert mark_read(redis, "u1", 0) is None
+
+    @pytest.mark.asyncio
+    async def test_unread_count_seeded_once(self):
+        """카운터가 없을 때만 DB count, 이후는 Redis"""
+        redis = FakeRedis()
+        db = Mock()
+        query = db.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value
+        query.execute.return_value = Mock(data=[], count=4)
+
+        assert await get_unread_count(db, redis, "u1") == 4
+        assert await get_unread_count(db, redis, "u1") == 4
+
+        assert query.execute.call_count == 1
+        assert redis.strings[unread_key("u1")] == "4"
+
+
+async def open_stream():
+    """스트림 엔드포인트를 ASGI로 직접 호출 (응답 본문을 조각 단위로 수집)"""
+    disconnect = asyncio.Event()
+    chunks = []
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append(message["body"].decode())
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/v1/alerts/stream",
+        "raw_path": b"/v1/alerts/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"test")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    return task, chunks, disconnect
+
+
+async def wait_for_chunk(chunks, text: str):
+    for _ in range(100):
+        if any(text in chunk for chunk in chunks):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{text!r} not received: {chunks}")
+
+
+class TestStreamEndpoint:
+    """GET /v1/alerts/stream"""
+
+    @pytest.mark.asyncio
+    async def test_stream_delivers_alert_and_unsubscribes(self):
+        app.dependency_overrides[get_current_user] = lambda: {"id": "guardian-1"}
+        app.dependency_overrides[get_supabase] = lambda: None
+        app.dependency_overrides[get_pooled_redis] = lambda: None
+        try:
+            task, chunks, disconnect = await open_stream()
+            await wait_for_chunk(chunks, "event: ready")
+            assert alert_hub.connections == 1
+
+            publish_alerts(None, [alert_row("a9", user_id="guardian-1")])
+            await wait_for_chunk(chunks, "event: alert")
+
+            disconnect.set()
+            await asyncio.wait_for(task, timeout=2)
+        finally:
+            app.dependency_overrides.clear()
+
+        assert '"unread_count": 0' in chunks[0]
+        assert '"id": "a9"' in "".join(chunks)
+        assert alert_hub.connections == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_requires_login(self, client):
+        response = await client.get("/v1/alerts/stream")
+
+        assert response.status_code == 401
+
+
+class TestCatchUp:
+    """GET /v1/alerts?since_id= (재연결 후 따라잡기)"""
+
+    @pytest.mark.asyncio
+    async def test_since_id_returns_newer_alerts_oldest_first(self, client):
+        redis = FakeRedis()
+        redis.strings[unread_key("guardian-1")] = "2"
+        db = Mock()
+        cursor_query = Mock()
+        cursor_query.execute.return_value = Mock(data=[{"created_at": "2026-10-17T09:00:00+00:00"}])
+        list_query = Mock()
+        for method in ("select", "eq", "or_", "order", "limit"):
+            getattr(list_query, method).return_value = list_query
+        list_query.execute.return_value = Mock(data=[
+            alert_row("a2", user_id="guardian-1"),
+            alert_row("a3", user_id="guardian-1"),
+            alert_row("a4", user_id="guardian-1"),
+        ])
+        cursor_query_builder = db.table.return_value
+        cursor_query_builder.select.side_effect = [list_query, Mock(**{
+            "eq.return_value.eq.return_value.limit.return_value": cursor_query,
+        })]
+
+        app.dependency_overrides[get_current_user_optional] = lambda: "guardian-1"
+        app.dependency_overrides[get_supabase] = lambda: db
+        app.dependency_overrides[get_pooled_redis] = lambda: redis
+        try:
+            response = await client.get("/v1/alerts", params={"since_id": SINCE_ID, "limit": 2})
+        finally:
+            app.dependency_overrides.clear()
+
+        data = response.json()["data"]
+        assert [alert["id"] for alert in data["alerts"]] == ["a2", "a3"]
+        assert data["latest_id"] == "a3"
+        assert data["has_more"] is True
+        assert data["unread_count"] == 2  # 카운터 사용, count 쿼리 없음
+        list_query.or_.assert_called_once_with(
+            "created_at.gt.2026-10-17T09:00:00+00:00,"
+            f"and(created_at.eq.2026-10-17T09:00:00+00:00,id.gt.{SINCE_ID})"
+        )
+        list_query.limit.assert_called_once_with(3)
+
+    @pytest.mark.asyncio
+    async def test_unknown_cursor(self, client):
+        db = Mock()
+        db.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value \
+            .execute.return_value = Mock(data=[])
+
+        app.dependency_overrides[get_current_user_optional] = lambda: "guardian-1"
+        app.dependency_overrides[get_supabase] = lambda: db
+        try:
+            response = await client.get("/v1/alerts", params={"since_id": "00000000-0000-4000-8000-000000000000"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"]["code"] == "INVALID_CURSOR"
+    
+    @pytest.mark.asyncio
+    async def test_malformed_since_id_rejected(self, client):
+        """UUID가 아닌 since_id는 DB 조회 전에 422 (이전에는 Postgres 형 변환 오류로 500)"""
+        db = Mock()
+        
+        app.dependency_overrides[get_current_user_optional] = lambda: "guardian-1"
+        app.dependency_overrides[get_supabase] = lambda: db
+        try:
+            response = await client.get("/v1/alerts", params={"since_id": "not-a-uuid"})
+        finally:
+            app.dependency_overrides.clear()
+        
+        assert response.status_code == 422
+        db.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dummy_alerts_without_login(self, client):
+        """미인증 요청도 더미 목록 (이전에는 NameError로 500)"""
+        response = await client.get("/v1/alerts")
+
+        assert response.status_code == 200
+        assert response.json()["data"]["unread_count"] == 2
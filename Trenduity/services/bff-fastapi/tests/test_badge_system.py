@@ -15,12 +15,19 @@
 """
 import pytest
 from app.services.gamification import GamificationService
-from unittest.mock import Mock, MagicMock
+from unittest.mock import AsyncMock, Mock, MagicMock
 
 
 class TestBadgeSystem:
     """배지 시스템 테스트"""
     
+    @pytest.fixture(autouse=True)
+    def award_all(self, monkeypatch):
+        """배지 규칙만 확인 (award_badges RPC 저장은 TestAwardBadges에서 확인)"""
+        async def award(service, user_id, held, new_badges):
+            return new_badges
+        monkeypatch.setattr(GamificationService, "_award_badges", award)
+    
     @pytest.fixture
     def gamification_service(self):
         """GamificationService 인스턴스 생성 (Mock DB)"""
@@ -434,3 +441,159 @@ class TestBadgeSystem:
         # 이미 획득한 배지는 반환되지 않음
         assert "첫걸음" not in badges
         assert "포인트 100" not in badges
+
+
+class CountingQuery:
+    """체인 메서드는 자기 자신을 반환하고 execute() 호출을 기록하는 가짜 쿼리"""
+    
+    def __init__(self, db, target, data):
+        self.db = db
+        self.target = target
+        self.data = data
+    
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+    
+    def execute(self):
+        self.db.executed.append(self.target)
+        result = Mock()
+        result.data = self.data
+        result.count = None
+        return result
+
+
+class CountingDB:
+    """실행된 쿼리(테이블/RPC 이름)를 순서대로 기록하는 가짜 Supabase 클라이언트"""
+    
+    def __init__(self, gamification_row, progress):
+        self.gamification_row = gamification_row
+        self.progress = progress
+        self.executed = []
+        self.rpc_params = []
+    
+    def table(self, name):
+        data = [self.gamification_row] if name == 'gamification' else []
+        return CountingQuery(self, name, data)
+    
+    def rpc(self, name, params):
+        if name == GamificationService.AWARD_BADGES_RPC:
+            # 보유하지 않은 배지가 모두 추가된 것으로 응답
+            return CountingQuery(self, f"rpc:{name}", params['p_badges'])
+        self.rpc_params.append(params)
+        return CountingQuery(self, f"rpc:{name}", self.progress)
+
+
+class TestBadgeQueryCount:
+    """카드 완료 경로의 배지 평가 쿼리 수"""
+    
+    @staticmethod
+    def make_row(badges):
+        return {
+            'user_id': 'test-user',
+            'total_points': 40,
+            'current_streak': 2,
+            'longest_streak': 2,
+            'last_activity_date': '2025-11-19',
+            'badges': badges
+        }
+    
+    @pytest.mark.asyncio
+    async def test_card_completion_uses_single_aggregate_query(self):
+        """활동 배지 집계는 RPC 1회 (테이블별 순차 조회 없음)"""
+        db = CountingDB(
+            self.make_row(["첫걸음"]),
+            {"badges": ["첫걸음"], "quiz_correct": 50, "scam_checks": 0, "med_checks": 0, "reactions_received": 0}
+        )
+        service = GamificationService(db)
+        
+        result = await service.award_for_card_completion('test-user', 1, 1, '2025-11-20')
+        
+        assert result["new_badges"] == ["퀴즈 마스터"]
+        # 게임화 조회 → 포인트 업데이트 → 배지 집계 RPC → 배지 추가 RPC
+        assert db.executed == ['gamification', 'gamification', 'rpc:get_badge_progress', 'rpc:award_badges']
+        assert not {'completed_cards', 'scam_checks', 'med_checks', 'qna_posts', 'reactions'} & set(db.executed)
+    
+    @pytest.mark.asyncio
+    async def test_only_unheld_badges_evaluated(self):
+        """이미 보유한 활동 배지의 집계는 요청하지 않음"""
+        db = CountingDB(
+            self.make_row(["첫걸음", "퀴즈 마스터", "사기 파수꾼"]),
+            {"badges": ["첫걸음", "퀴즈 마스터", "사기 파수꾼"], "med_checks": 3, "reactions_received": 1}
+        )
+        service = GamificationService(db)
+        
+        await service.award_for_card_completion('test-user', 0, 1, '2025-11-20')
+        
+        assert db.rpc_params == [{
+            'p_user_id': 'test-user',
+            'p_metrics': ['med_checks', 'reactions_received']
+        }]
+    
+    @pytest.mark.asyncio
+    async def test_no_aggregate_query_when_activity_badges_held(self):
+        """활동 배지를 모두 보유하면 집계 쿼리 없이 평가"""
+        held = ["첫걸음", "퀴즈 마스터", "사기 파수꾼", "안전 지킴이", "커뮤니티 스타"]
+        db = CountingDB(self.make_row(held), None)
+        service = GamificationService(db)
+        
+        result = await service.award_for_card_completion('test-user', 0, 1, '2025-11-20')
+        
+        assert result["new_badges"] == []
+        assert db.executed == ['gamification', 'gamification']
+
+
+class TestAwardBadges:
+    """배지 추가 (award_badges RPC, 동시 평가에서도 한 번만 추가/알림)"""
+    
+    @staticmethod
+    def make_service(award_result=None, award_error=None):
+        db = Mock()
+        if award_error is not None:
+            db.rpc.return_value.execute.side_effect = award_error
+        else:
+            db.rpc.return_value.execute.return_value = Mock(data=award_result)
+        service = GamificationService(db)
+        service._get_or_create_gamification = AsyncMock(return_value={"total_points": 8, "current_streak": 1})
+        service._fetch_badge_progress = AsyncMock(return_value={"badges": []})
+        service.deliver_badge_alerts = AsyncMock()
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_only_added_badges_alerted(self):
+        """다른 평가가 먼저 추가한 배지는 반환/알림하지 않음"""
+        service = self.make_service(award_result=[])
+        
+        assert await service.run_badge_check("u1") == []
+        
+        service.db.rpc.assert_called_once_with(
+            GamificationService.AWARD_BADGES_RPC, {"p_user_id": "u1", "p_badges": ["첫걸음"]}
+        )
+        service.db.table.assert_not_called()
+        service.deliver_badge_alerts.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_added_badges_alerted(self):
+        service = self.make_service(award_result=["첫걸음"])
+        
+        assert await service.run_badge_check("u1") == ["첫걸음"]
+        
+        service.deliver_badge_alerts.assert_called_once_with("u1", ["첫걸음"])
+    
+    @pytest.mark.asyncio
+    async def test_missing_rpc_falls_back_to_update(self):
+        """009 마이그레이션 미적용 시 배지 목록 덮어쓰기"""
+        service = self.make_service(award_error=Exception("PGRST202: Could not find the function award_badges"))
+        
+        assert await service.run_badge_check("u1") == ["첫걸음"]
+        
+        service.db.table.return_value.update.assert_called_once_with({"badges": ["첫걸음"]})
+    
+    @pytest.mark.asyncio
+    async def test_other_rpc_errors_propagate(self):
+        """RPC 자체 오류는 덮어쓰기로 대체하지 않음 (작업 재시도)"""
+        service = self.make_service(award_error=Exception("canceling statement due to lock timeout"))
+        
+        with pytest.raises(Exception, match="lock timeout"):
+            await service.run_badge_check("u1")
+        
+        service.db.table.assert_not_called()
@@ -0,0 +1,462 @@
+"""
+2단계 캐시 (L1 메모리 + Redis) 테스트
+"""
+import asyncio
+import json
+import time
+from fnmatch import fnmatchcase
+from unittest.mock import Mock
+
+import pytest
+
+from app.utils import cache
+from app.utils.cache import (
+    LocalCache,
+    cache_key,
+    cache_stats,
+    cached,
+    cleanup_stale_tagged_keys,
+    get_cached,
+    invalidate_cache,
+    invalidate_tags,
+    local_cache,
+    set_cached,
+    user_tag,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    """테스트마다 L1/통계/태그 세대 초기화"""
+    local_cache.clear()
+    cache_stats.reset()
+    cache._tag_versions.clear()
+    cache._inflight.clear()
+    yield
+    local_cache.clear()
+    cache_stats.reset()
+    cache._tag_versions.clear()
+
+
+class FakeRedis:
+    """태그 무효화 테스트용 최소 Redis (dict 기반)"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.commands = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+    
+    def expire(self, key, ttl):
+        if key not in self.data:
+            return 0
+        self.ttls[key] = ttl
+        return 1
+
+    def eval(self, script, numkeys, key, token):
+        # RELEASE_LOCK_SCRIPT: 토큰이 같을 때만 삭제
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    def pttl(self, key):
+        return 60000 if key in self.data else -2
+
+    def mget(self, keys):
+        self.commands.append("MGET")
+        return [self.data.get(k) for k in keys]
+
+    def incr(self, key):
+        self.commands.append("INCR")
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+    def publish(self, channel, message):
+        return 0
+
+    def scan_iter(self, match="*", count=None):
+        self.commands.append("SCAN")
+        return [k for k in list(self.data) if fnmatchcase(k, match)]
+
+    def keys(self, pattern):
+        raise AssertionError("KEYS는 사용하면 안 됨")
+
+    def unlink(self, *keys):
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    def pipeline(self):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args: self.calls.append((name, args))
+
+            def execute(self):
+                return [getattr(redis, name)(*args) for name, args in self.calls]
+
+        return Pipeline()
+
+
+def make_redis(value=None, pttl=60000):
+    """get+pttl 파이프라인을 흉내내는 Mock Redis"""
+    redis = Mock()
+    pipe = redis.pipeline.return_value
+    pipe.execute.return_value = [
+        json.dumps(value, ensure_ascii=False) if value is not None else None,
+        pttl,
+    ]
+    return redis
+
+
+class TestLocalCache:
+    """L1 TTL/LRU 캐시"""
+
+    def test_ttl_expiry(self):
+        """TTL이 지나면 조회되지 않음"""
+        l1 = LocalCache(max_entries=10, max_bytes=1000)
+        l1.set("k", {"a": 1}, ttl=0.01, size=10)
+        time.sleep(0.02)
+
+        assert l1.get("k") is None
+        assert l1.stats()["entries"] == 0
+
+    def test_entry_limit_evicts_lru(self):
+        """항목 수 상한 초과 시 가장 오래 사용되지 않은 항목 제거"""
+        l1 = LocalCache(max_entries=2, max_bytes=1000)
+        l1.set("a", 1, ttl=60, size=1)
+        l1.set("b", 2, ttl=60, size=1)
+        l1.get("a")
+        l1.set("c", 3, ttl=60, size=1)
+
+        assert l1.get("a") == 1
+        assert l1.get("b") is None
+        assert l1.get("c") == 3
+
+    def test_memory_cap(self):
+        """메모리 상한 초과 시 오래된 항목부터 제거"""
+        l1 = LocalCache(max_entries=100, max_bytes=100)
+        l1.set("a", "x", ttl=60, size=60)
+        l1.set("b", "y", ttl=60, size=60)
+
+        assert l1.get("a") is None
+        assert l1.get("b") == "y"
+        assert l1.stats()["bytes"] == 60
+
+    def test_oversized_value_skipped(self):
+        """상한보다 큰 값은 저장하지 않음"""
+        l1 = LocalCache(max_entries=100, max_bytes=100)
+        l1.set("big", "x", ttl=60, size=101)
+
+        assert l1.get("big") is None
+
+    def test_delete_pattern(self):
+        """glob 패턴으로 삭제"""
+        l1 = LocalCache(max_entries=100, max_bytes=1000)
+        l1.set("insights:list:a", 1, ttl=60, size=1)
+        l1.set("insights:detail:1", 2, ttl=60, size=1)
+        l1.set("courses:list:all", 3, ttl=60, size=1)
+
+        assert l1.delete_pattern("insights:*") == 2
+        assert l1.get("courses:list:all") == 3
+
+
+class TestTwoTierCache:
+    """get_cached / set_cached / invalidate_cache"""
+
+    def test_l1_hit_skips_redis(self):
+        """L1 히트 시 Redis 호출 없음"""
+        redis = Mock()
+        set_cached(redis, "insights:list", {"ok": True}, ttl=300)
+        redis.reset_mock()
+
+        assert get_cached(redis, "insights:list") == {"ok": True}
+        redis.pipeline.assert_not_called()
+        redis.get.assert_not_called()
+
+    def test_l2_hit_populates_l1(self):
+        """Redis 히트 값을 L1에 채워 다음 조회는 메모리에서"""
+        redis = make_redis({"ok": True, "data": "인사이트"})
+
+        assert get_cached(redis, "k") == {"ok": True, "data": "인사이트"}
+        assert get_cached(redis, "k") == {"ok": True, "data": "인사이트"}
+        assert redis.pipeline.call_count == 1
+
+    def test_l1_ttl_capped_by_redis_ttl(self, monkeypatch):
+        """L1 TTL은 Redis 남은 TTL을 넘지 않음"""
+        monkeypatch.setattr(cache.settings, "CACHE_L1_MAX_TTL", 30)
+        redis = make_redis({"v": 1}, pttl=10)  # 10ms 남음
+
+        get_cached(redis, "k")
+        time.sleep(0.02)
+
+        assert local_cache.get("k") is None
+
+    def test_local_false_bypasses_l1(self):
+        """local=False면 L1을 사용하지 않음"""
+        redis = Mock()
+        redis.get.return_value = json.dumps({"v": 1})
+
+        get_cached(redis, "k", local=False)
+        get_cached(redis, "k", local=False)
+
+        assert redis.get.call_count == 2
+        assert local_cache.get("k") is None
+
+    def test_works_without_redis(self):
+        """Redis 없이도 L1만으로 동작"""
+        set_cached(None, "k", [1, 2, 3], ttl=60)
+
+        assert get_cached(None, "k") == [1, 2, 3]
+
+    def test_invalidate_clears_l1_and_publishes(self):
+        """무효화 시 L1 삭제 + 다른 워커에 pub/sub 전파"""
+        redis = Mock()
+        redis.scan_iter.return_value = []
+        set_cached(redis, "insights:list:a", 1, ttl=60)
+
+        invalidate_cache(redis, "insights:*")
+
+        assert local_cache.get("insights:list:a") is None
+        redis.publish.assert_called_once_with(cache.settings.CACHE_INVALIDATION_CHANNEL, "insights:*")
+
+    def test_invalidation_message_clears_l1(self):
+        """다른 워커의 무효화 메시지 수신 시 L1 삭제"""
+        set_cached(None, "courses:detail:1", {"v": 1}, ttl=60)
+
+        cache._handle_invalidation({"type": "message", "data": "courses:*"})
+
+        assert local_cache.get("courses:detail:1") is None
+
+    def test_hit_ratio_per_tier(self):
+        """계층별 히트율 집계"""
+        redis = make_redis({"v": 1})
+        get_cached(redis, "k")  # L1 미스, L2 히트
+        get_cached(redis, "k")  # L1 히트
+
+        stats = cache.get_cache_stats()
+        assert stats["l1"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+        assert stats["l2"] == {"hits": 1, "misses": 0, "hit_ratio": 1.0}
+
+
+class TestTagInvalidation:
+    """태그(세대) 기반 무효화"""
+
+    def test_invalidate_user_tag(self):
+        """사용자 태그 무효화 시 해당 사용자 캐시만 미스"""
+        redis = FakeRedis()
+        set_cached(redis, "gamification:stats:a", {"p": 1}, 60, local=False, tags=[user_tag("a")])
+        set_cached(redis, "gamification:stats:b", {"p": 2}, 60, local=False, tags=[user_tag("b")])
+
+        invalidate_tags(redis, user_tag("a"))
+
+        assert get_cached(redis, "gamification:stats:a", local=False, tags=[user_tag("a")]) is None
+        assert get_cached(redis, "gamification:stats:b", local=False, tags=[user_tag("b")]) == {"p": 2}
+
+    def test_invalidation_is_constant_time(self):
+        """무효화는 키 개수와 무관하게 INCR만 실행 (SCAN/KEYS 없음)"""
+        redis = FakeRedis()
+        for i in range(100):
+            set_cached(redis, f"insights:list:{i}", i, 60, tags=["insights"])
+        redis.commands.clear()
+
+        invalidate_tags(redis, "insights")
+
+        assert redis.commands == ["INCR"]
+
+    def test_tag_version_key_expires(self, monkeypatch):
+        """세대 키는 TTL이 있고, 태그 캐시 항목은 세대 키보다 오래 남지 않음"""
+        monkeypatch.setattr(cache.settings, "CACHE_TAG_VERSION_TTL", 3600)
+        redis = FakeRedis()
+        
+        invalidate_tags(redis, "insights")
+        assert redis.ttls["cache:tag:insights"] == 3600
+        
+        redis.ttls.clear()
+        set_cached(redis, "insights:list:all", [1], 86400, local=False, tags=["insights"])
+        
+        assert redis.ttls["insights:list:all#insights=1"] == 3600
+        assert redis.ttls["cache:tag:insights"] == 3600
+    
+    def test_l1_entries_invalidated(self):
+        """같은 워커의 L1 항목도 즉시 무효화"""
+        redis = FakeRedis()
+        set_cached(redis, "insights:list:health", [1], 60, tags=["insights:topic:health"])
+        assert get_cached(redis, "insights:list:health", tags=["insights:topic:health"]) == [1]
+
+        invalidate_tags(redis, "insights:topic:health")
+
+        assert get_cached(redis, "insights:list:health", tags=["insights:topic:health"]) is None
+
+    def test_remote_tag_message_drops_local_version(self):
+        """다른 워커의 태그 무효화 메시지 수신 시 세대 캐시/L1 삭제"""
+        redis = FakeRedis()
+        set_cached(redis, "courses:list:all", [1], 60, tags=["courses"])
+        redis.incr("cache:tag:courses")  # 다른 워커가 무효화
+
+        cache._handle_invalidation({"type": "message", "data": "#courses"})
+
+        assert get_cached(redis, "courses:list:all", tags=["courses"]) is None
+
+    def test_cleanup_removes_only_stale_generations(self):
+        """SCAN 정리는 이전 세대 키만 삭제"""
+        redis = FakeRedis()
+        set_cached(redis, "gamification:stats:a", 1, 60, local=False, tags=[user_tag("a")])
+        invalidate_tags(redis, user_tag("a"))
+        set_cached(redis, "gamification:stats:a", 2, 60, local=False, tags=[user_tag("a")])
+        set_cached(redis, "plain:key", 3, 60, local=False)
+
+        deleted = cleanup_stale_tagged_keys(redis)
+
+        assert deleted == 1
+        assert "gamification:stats:a#user:a=1" in redis.data
+        assert "plain:key" in redis.data
+
+    def test_invalidate_cache_uses_scan(self):
+        """패턴 무효화는 KEYS 대신 SCAN + UNLINK"""
+        redis = FakeRedis()
+        set_cached(redis, "card:1", 1, 60, local=False)
+        set_cached(redis, "card:2", 2, 60, local=False)
+        set_cached(redis, "other", 3, 60, local=False)
+
+        assert invalidate_cache(redis, "card:*") == 2
+        assert list(redis.data) == ["other"]
+
+
+class TestStampedeProtection:
+    """@cached 스탬피드 방지 (single-flight / SWR / 조기 만료)"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_call_upstream_once(self):
+        """동시 미스 500건이어도 원본 조회는 1회"""
+        redis = FakeRedis()
+        calls = []
+
+        @cached(ttl=60, key_prefix="t", early_expiry_beta=0)
+        async def load(topic, redis_client=None):
+            calls.append(topic)
+            await asyncio.sleep(0.05)
+            return {"topic": topic}
+
+        results = await asyncio.gather(
+            *[load("health", redis_client=redis) for _ in range(500)]
+        )
+
+        assert len(calls) == 1
+        assert all(r == {"topic": "health"} for r in results)
+        assert not any(k.startswith("lock:") for k in redis.data)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_without_redis(self):
+        """Redis가 없어도 프로세스 내 동시 요청은 합쳐짐"""
+        calls = []
+
+        @cached(ttl=60, key_prefix="t")
+        async def load(redis_client=None):
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 1
+
+        await asyncio.gather(*[load(redis_client=None) for _ in range(50)])
+
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_waits_for_other_worker_holding_lock(self, monkeypatch):
+        """다른 워커가 락을 잡고 있으면 계산하지 않고 결과를 기다림"""
+        monkeypatch.setattr(cache, "LOCK_POLL_INTERVAL", 0.01)
+        redis = FakeRedis()
+        key = cache_key("t", "load")
+        redis.set(f"lock:{key}", "other-worker")
+        calls = []
+
+        @cached(ttl=60, key_prefix="t", early_expiry_beta=0)
+        async def load(redis_client=None):
+            calls.append(1)
+            return "mine"
+
+        async def other_worker_finishes():
+            await asyncio.sleep(0.05)
+            set_cached(redis, key, {"v": "theirs", "exp": time.time() + 60, "d": 0.05}, 60)
+            local_cache.clear()
+
+        result, _ = await asyncio.gather(load(redis_client=redis), other_worker_finishes())
+
+        assert result == "theirs"
+        assert calls == []
+        assert redis.data[f"lock:{key}"] == "other-worker"
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        """만료 후 stale 구간에서는 이전 값을 즉시 반환하고 한 번만 갱신"""
+        redis = FakeRedis()
+        key = cache_key("t", "load")
+        set_cached(redis, key, {"v": "old", "exp": time.time() - 1, "d": 0.01}, 60)
+        calls = []
+
+        @cached(ttl=60, key_prefix="t", stale_ttl=60, early_expiry_beta=0)
+        async def load(redis_client=None):
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "new"
+
+        results = await asyncio.gather(*[load(redis_client=redis) for _ in range(20)])
+        await asyncio.gather(*cache._background_tasks)
+
+        assert results == ["old"] * 20
+        assert len(calls) == 1
+        assert await load(redis_client=redis) == "new"
+
+    @pytest.mark.asyncio
+    async def test_expired_without_stale_recomputes(self):
+        """stale_ttl이 없으면 만료 값은 반환하지 않음"""
+        redis = FakeRedis()
+        key = cache_key("t", "load")
+        set_cached(redis, key, {"v": "old", "exp": time.time() - 1, "d": 0.01}, 60)
+
+        @cached(ttl=60, key_prefix="t", early_expiry_beta=0)
+        async def load(redis_client=None):
+            return "new"
+
+        assert await load(redis_client=redis) == "new"
+
+    @pytest.mark.asyncio
+    async def test_probabilistic_early_refresh(self, monkeypatch):
+        """만료 직전에는 확률적으로 미리 백그라운드 갱신"""
+        redis = FakeRedis()
+        key = cache_key("t", "load")
+        set_cached(redis, key, {"v": "old", "exp": time.time() + 1, "d": 1.0}, 60)
+        monkeypatch.setattr(cache.random, "random", lambda: 0.01)  # -ln(0.01) ≈ 4.6초 앞당김
+        calls = []
+
+        @cached(ttl=60, key_prefix="t", early_expiry_beta=1.0)
+        async def load(redis_client=None):
+            calls.append(1)
+            return "new"
+
+        assert await load(redis_client=redis) == "old"
+        await asyncio.gather(*cache._background_tasks)
+
+        assert calls == [1]
+
+    def test_far_from_expiry_no_early_refresh(self, monkeypatch):
+        """만료까지 충분히 남았으면 조기 갱신하지 않음"""
+        monkeypatch.setattr(cache.random, "random", lambda: 0.01)
+        entry = {"v": 1, "exp": time.time() + 3600, "d": 0.05}
+
+        assert cache._is_fresh(entry, 1.0) == (True, False)
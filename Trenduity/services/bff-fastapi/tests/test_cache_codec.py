@@ -0,0 +1,110 @@
+"""
+캐시 직렬화 코덱 테스트
+"""
+import json
+
+import pytest
+
+from app.utils import cache_codec
+from app.utils.cache import get_cached, local_cache, set_cached
+from app.utils.cache_codec import (
+    CacheCodecError,
+    JsonCodec,
+    decode_value,
+    encode_value,
+    get_codec,
+)
+
+
+# 카드 본문처럼 한글이 많은 페이로드
+KOREAN_PAYLOAD = {
+    "ok": True,
+    "data": {
+        "card": {
+            "id": "card-1",
+            "title": "스미싱 문자 구별하는 방법",
+            "body": "택배 조회, 정부 지원금을 사칭한 문자에 포함된 링크는 누르지 마세요. " * 40,
+            "quiz": [{"q": "링크를 눌러도 될까요?", "answer": 1}],
+        }
+    },
+}
+
+
+class TestCodecs:
+    """코덱별 왕복 변환"""
+
+    @pytest.mark.parametrize("name", sorted(cache_codec._codecs_by_name))
+    def test_round_trip(self, name):
+        """등록된 모든 코덱에서 값이 그대로 복원됨"""
+        codec = get_codec(name)
+
+        raw = encode_value(KOREAN_PAYLOAD, codec=codec, threshold=0)
+
+        assert raw[1:2] == codec.codec_id
+        assert decode_value(raw) == KOREAN_PAYLOAD
+
+    def test_unknown_codec_falls_back_to_json(self):
+        """설치되지 않은 코덱 설정 시 json 사용"""
+        assert get_codec("not-installed").name == "json"
+
+    def test_legacy_json_entry_readable(self):
+        """마커 없는 이전 형식(json.dumps 텍스트)도 읽힘"""
+        legacy = json.dumps(KOREAN_PAYLOAD, ensure_ascii=False)
+
+        assert decode_value(legacy) == KOREAN_PAYLOAD
+        assert decode_value(legacy.encode("utf-8")) == KOREAN_PAYLOAD
+
+    def test_unknown_marker_rejected(self):
+        """알 수 없는 코덱 ID는 오류"""
+        with pytest.raises(CacheCodecError):
+            decode_value(b"\x1fQ-{}")
+
+
+class TestCompression:
+    """임계값 기반 압축"""
+
+    def test_compressed_above_threshold(self):
+        """임계값 이상이면 압축되어 더 작게 저장"""
+        plain = encode_value(KOREAN_PAYLOAD, codec=JsonCodec(), threshold=0)
+        compressed = encode_value(KOREAN_PAYLOAD, codec=JsonCodec(), threshold=1024)
+
+        assert compressed[2:3] == b"z"
+        assert len(compressed) < len(plain) / 3
+        assert decode_value(compressed) == KOREAN_PAYLOAD
+
+    def test_small_value_not_compressed(self):
+        """임계값 미만은 압축하지 않음 (UTF-8 텍스트 그대로)"""
+        raw = encode_value({"points": 10}, codec=JsonCodec(), threshold=1024)
+
+        assert raw[2:3] == b"-"
+        assert raw[3:].decode("utf-8") == '{"points":10}'
+
+    def test_surrogateescape_string_round_trip(self):
+        """decode_responses=True 연결(surrogateescape)로 읽은 압축 값도 복원"""
+        raw = encode_value(KOREAN_PAYLOAD, threshold=1024)
+        as_text = raw.decode("utf-8", "surrogateescape")
+
+        assert decode_value(as_text) == KOREAN_PAYLOAD
+
+
+class TestCacheIntegration:
+    """set_cached / get_cached와 연동"""
+
+    def test_set_get_through_redis(self, monkeypatch):
+        """Redis에는 인코딩된 바이트가 저장되고 조회 시 복원"""
+        monkeypatch.setattr(cache_codec.settings, "CACHE_COMPRESSION_THRESHOLD", 1024)
+        store = {}
+
+        class Redis:
+            def setex(self, key, ttl, value):
+                store[key] = value
+
+            def get(self, key):
+                return store.get(key)
+
+        redis = Redis()
+        set_cached(redis, "cards:today", KOREAN_PAYLOAD, 60, local=False)
+
+        assert store["cards:today"].startswith(b"\x1f")
+        assert get_cached(redis, "cards:today", local=False) == KOREAN_PAYLOAD
+        local_cache.clear()
@@ -0,0 +1,255 @@
+"""
+카드 완료 원자성 테스트
+
+동시 완료 요청 중 하나만 포인트를 받는지, Idempotency-Key 재시도가
+같은 응답을 재전송하는지 확인
+"""
+import asyncio
+import threading
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers.cards import complete_card
+from app.schemas.card import CardCompleteRequest
+from app.services.gamification import GamificationService
+
+
+class FakeRedis:
+    """SET NX/GET/DELETE만 흉내내는 스레드 안전 Redis"""
+
+    def __init__(self):
+        self.store = {}
+        self.lock = threading.Lock()
+
+    def set(self, key, value, nx=False, ex=None, px=None):
+        with self.lock:
+            if nx and key in self.store:
+                return None
+            self.store[key] = value
+            return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def delete(self, key):
+        with self.lock:
+            return 1 if self.store.pop(key, None) is not None else 0
+
+    def eval(self, *args):
+        return 0
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, execute):
+        self._execute = execute
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def execute(self):
+        return self._execute()
+
+
+class FakeDB:
+    """
+    cards 조회 + complete_card_atomic RPC를 흉내내는 DB
+
+    RPC는 (user_id, card_id, completed_date) 유니크 제약과 gamification 행 잠금을 재현합니다.
+    """
+
+    def __init__(self, card):
+        self.card = card
+        self.completed = set()
+        self.gamification = {"total_points": 0, "current_streak": 0, "longest_streak": 0,
+                             "last_activity_date": None, "badges": []}
+        self.rpc_calls = 0
+        self.fail_next_rpc = False
+        self.rpc_error = None  # 설정하면 RPC가 매번 이 예외를 냄
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        assert name == "cards"
+        return FakeQuery(lambda: FakeResult([self.card]))
+
+    def rpc(self, name, params):
+        assert name == GamificationService.COMPLETE_CARD_RPC
+        return FakeQuery(lambda: FakeResult(self._complete(params)))
+
+    def _complete(self, params):
+        with self.lock:
+            self.rpc_calls += 1
+            if self.rpc_error is not None:
+                raise self.rpc_error
+            if self.fail_next_rpc:
+                self.fail_next_rpc = False
+                raise RuntimeError("connection reset")
+            claim = (params["p_user_id"], params["p_card_id"], params["p_completed_date"])
+            if claim in self.completed:
+                return {"already_completed": True}
+            self.completed.add(claim)
+
+            gamif = self.gamification
+            streak = 1 if gamif["last_activity_date"] is None else gamif["current_streak"]
+            points = params["p_base_points"] + params["p_quiz_correct"] * params["p_correct_points"]
+            if streak > 0:
+                points += params["p_streak_bonus"]
+            old_total = gamif["total_points"]
+            gamif.update(total_points=old_total + points, current_streak=streak,
+                         last_activity_date=params["p_activity_date"])
+            return {"points_added": points, "old_total": old_total, "total_points": old_total + points,
+                    "streak_days": streak, "badges": gamif["badges"]}
+
+
+CARD = {"id": "card-1", "user_id": "u1", "date": date.today().isoformat(), "payload": {}}
+
+
+def make_service(db, redis):
+    service = GamificationService(db, redis)
+    service._invalidate_user_cache = Mock()
+    service._check_new_badges = AsyncMock(return_value=[])
+    return service
+
+
+async def complete(db, redis, idempotency_key=None):
+    return await complete_card(
+        body=CardCompleteRequest(card_id="card-1"),
+        idempotency_key=idempotency_key,
+        user_id="u1",
+        db=db,
+        redis=redis,
+        gamification=make_service(db, redis),
+    )
+
+
+async def run_parallel(db, redis, n=50):
+    results = await asyncio.gather(*(complete(db, redis) for _ in range(n)), return_exceptions=True)
+    awarded = [r for r in results if isinstance(r, dict)]
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    return awarded, rejected
+
+
+class TestConcurrentCompletion:
+    """동시 완료 요청"""
+
+    @pytest.mark.asyncio
+    async def test_fifty_parallel_completions_award_once(self):
+        """50개 동시 요청 중 1개만 포인트 지급, 나머지는 ALREADY_COMPLETED"""
+        db, redis = FakeDB(CARD), FakeRedis()
+
+        awarded, rejected = await run_parallel(db, redis)
+
+        assert len(awarded) == 1
+        assert len(rejected) == 49
+        assert all(e.status_code == 400 for e in rejected)
+        assert all(e.detail["error"]["code"] == "ALREADY_COMPLETED" for e in rejected)
+        assert db.gamification["total_points"] == awarded[0]["data"]["points_added"]
+        # Redis 선점에서 걸러져 RPC는 1회만 실행
+        assert db.rpc_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_without_redis_db_constraint_awards_once(self):
+        """Redis 없이도 DB 유니크 제약으로 1회만 지급"""
+        db = FakeDB(CARD)
+
+        awarded, rejected = await run_parallel(db, None)
+
+        assert len(awarded) == 1
+        assert len(rejected) == 49
+        assert db.gamification["total_points"] == awarded[0]["data"]["points_added"]
+
+    @pytest.mark.asyncio
+    async def test_failure_releases_claim(self):
+        """처리 실패 시 Redis 선점을 풀어 재시도 가능"""
+        db, redis = FakeDB(CARD), FakeRedis()
+        service = make_service(db, redis)
+        service._insert_completed_card = AsyncMock(side_effect=RuntimeError("db down"))
+        db.fail_next_rpc = True
+
+        with pytest.raises(HTTPException) as exc:
+            await complete_card(
+                body=CardCompleteRequest(card_id="card-1"), idempotency_key=None,
+                user_id="u1", db=db, redis=redis, gamification=service,
+            )
+        assert exc.value.status_code == 500
+        assert redis.store == {}
+
+        result = await complete(db, redis)
+        assert result["ok"] is True
+
+
+class TestIdempotencyKey:
+    """Idempotency-Key 재시도"""
+
+    @pytest.mark.asyncio
+    async def test_retry_replays_stored_response(self):
+        """같은 키로 재시도하면 처리 없이 첫 응답 재전송"""
+        db, redis = FakeDB(CARD), FakeRedis()
+
+        first = await complete(db, redis, idempotency_key="retry-1")
+        second = await complete(db, redis, idempotency_key="retry-1")
+
+        assert second == first
+        assert db.rpc_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_parallel_same_key_single_execution(self):
+        """같은 키의 동시 요청도 한 번만 처리하고 모두 같은 응답"""
+        db, redis = FakeDB(CARD), FakeRedis()
+
+        results = await asyncio.gather(*(complete(db, redis, idempotency_key="tap") for _ in range(10)))
+
+        assert all(r == results[0] for r in results)
+        assert db.rpc_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_key_rejected(self):
+        """너무 긴 키는 400"""
+        with pytest.raises(HTTPException) as exc:
+            await complete(FakeDB(CARD), FakeRedis(), idempotency_key="x" * 200)
+        assert exc.value.detail["error"]["code"] == "INVALID_IDEMPOTENCY_KEY"
+
+
+class TestRpcFallback:
+    """RPC 실패 시 순차 처리 대체 여부"""
+    
+    def sequential_service(self, db):
+        service = make_service(db, None)
+        service._insert_completed_card = AsyncMock()
+        service.award_for_card_completion = AsyncMock(return_value={"points_added": 5})
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_missing_function_falls_back(self):
+        """마이그레이션 미적용(PGRST202)일 때만 순차 처리"""
+        db = FakeDB(CARD)
+        db.rpc_error = Exception({"code": "PGRST202", "message": "Could not find the function"})
+        service = self.sequential_service(db)
+        
+        result = await service.record_card_completion("u1", "card-1", 0, 0, date.today().isoformat())
+        
+        assert result == {"points_added": 5}
+        service._insert_completed_card.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_other_rpc_errors_propagate(self):
+        """타입 오류 등 다른 실패는 포인트 경합이 있는 순차 경로로 숨기지 않음"""
+        db = FakeDB(CARD)
+        db.rpc_error = Exception("column card_id is of type uuid but expression is of type text")
+        service = self.sequential_service(db)
+        
+        with pytest.raises(Exception, match="uuid"):
+            await service.record_card_completion("u1", "card-1", 0, 0, date.today().isoformat())
+        
+        service._insert_completed_card.assert_not_awaited()
+        service.award_for_card_completion.assert_not_awaited()
@@ -0,0 +1,167 @@
+"""
+다음 카드 큐 테스트
+
+Redis 큐 조회/재충전, 완료 후 큐 갱신, 자정 만료 확인
+"""
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from app.services import card_queue
+from app.services.card_queue import (
+    advance_card_queue,
+    card_queue_key,
+    get_next_card,
+    seconds_until_midnight,
+)
+
+
+class FakeRedis:
+    """리스트 명령만 흉내내는 Redis"""
+
+    def __init__(self):
+        self.lists = {}
+        self.ttls = {}
+
+    def lindex(self, key, index):
+        items = self.lists.get(key, [])
+        return items[index] if len(items) > index else None
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def lpop(self, key):
+        return self.lists[key].pop(0)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+
+    def delete(self, key):
+        return 1 if self.lists.pop(key, None) is not None else 0
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def pipeline(self):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args: self.calls.append((name, args))
+
+            def execute(self):
+                return [getattr(redis, name)(*args) for name, args in self.calls]
+
+        return Pipeline()
+
+
+CARDS = [{"id": f"card-{i}", "title": f"카드 {i}"} for i in range(3)]
+
+
+def make_db(cards=CARDS):
+    db = Mock()
+    db.rpc.return_value.execute.return_value = Mock(data=list(cards))
+    return db
+
+
+class TestGetNextCard:
+    """다음 카드 조회"""
+
+    @pytest.mark.asyncio
+    async def test_cold_queue_filled_by_rpc(self):
+        """큐가 없으면 RPC 1회로 채우고 이후 조회는 DB 없이 처리"""
+        redis, db = FakeRedis(), make_db()
+
+        assert await get_next_card(db, redis, "u1") == CARDS[0]
+        assert await get_next_card(db, redis, "u1") == CARDS[0]
+
+        db.rpc.assert_called_once_with("get_next_cards", {"p_user_id": "u1", "p_limit": 20})
+        db.table.assert_not_called()
+        assert len(redis.lists[card_queue_key("u1")]) == 3
+
+    @pytest.mark.asyncio
+    async def test_no_remaining_cards_cached(self):
+        """남은 카드가 없으면 빈 표시를 저장해 같은 날 다시 조회하지 않음"""
+        redis, db = FakeRedis(), make_db(cards=[])
+
+        assert await get_next_card(db, redis, "u1") is None
+        assert await get_next_card(db, redis, "u1") is None
+        db.rpc.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_without_redis_fetches_one(self):
+        """Redis가 없으면 RPC로 한 장만 조회"""
+        db = make_db(cards=CARDS[:1])
+
+        assert await get_next_card(db, None, "u1") == CARDS[0]
+        db.rpc.assert_called_once_with("get_next_cards", {"p_user_id": "u1", "p_limit": 1})
+
+    @pytest.mark.asyncio
+    async def test_rpc_missing_falls_back(self):
+        """RPC가 없으면 완료 목록 + NOT IN 조회로 대체"""
+        db = Mock()
+        db.rpc.return_value.execute.side_effect = Exception("function get_next_cards does not exist")
+        completed = db.table.return_value.select.return_value.eq.return_value
+        completed.execute.return_value = Mock(data=[{"card_id": "card-0"}])
+        remaining = db.table.return_value.select.return_value.not_.in_.return_value.limit.return_value
+        remaining.execute.return_value = Mock(data=CARDS[1:2])
+
+        assert await get_next_card(db, None, "u1") == CARDS[1]
+        db.table.return_value.select.return_value.not_.in_.assert_called_once_with("id", ["card-0"])
+
+
+class TestAdvanceCardQueue:
+    """완료 후 큐 갱신"""
+
+    @pytest.mark.asyncio
+    async def test_completed_head_popped(self):
+        """완료한 카드가 맨 앞이면 꺼내고 다음 카드 노출"""
+        redis, db = FakeRedis(), make_db()
+        await get_next_card(db, redis, "u1")
+
+        advance_card_queue(redis, "u1", "card-0")
+
+        assert await get_next_card(db, redis, "u1") == CARDS[1]
+        db.rpc.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_other_card_drops_queue(self):
+        """큐 맨 앞이 아닌 카드를 완료하면 큐를 비워 다시 채움"""
+        redis, db = FakeRedis(), make_db()
+        await get_next_card(db, redis, "u1")
+
+        advance_card_queue(redis, "u1", "card-2")
+
+        assert card_queue_key("u1") not in redis.lists
+
+    @pytest.mark.asyncio
+    async def test_last_card_drops_queue(self):
+        """마지막 카드를 완료하면 큐를 비워 새 카드 확인"""
+        redis, db = FakeRedis(), make_db(cards=CARDS[:1])
+        await get_next_card(db, redis, "u1")
+
+        advance_card_queue(redis, "u1", "card-0")
+
+        assert card_queue_key("u1") not in redis.lists
+
+
+class TestQueueExpiry:
+    """자정 만료"""
+
+    def test_seconds_until_midnight(self):
+        assert seconds_until_midnight(datetime(2026, 10, 17, 23, 59, 30)) == 30
+        assert seconds_until_midnight(datetime(2026, 10, 17, 0, 0, 0)) == 86400
+
+    @pytest.mark.asyncio
+    async def test_queue_expires_by_midnight(self, monkeypatch):
+        """큐 TTL은 자정을 넘지 않음"""
+        monkeypatch.setattr(card_queue, "seconds_until_midnight", lambda: 120)
+        redis = FakeRedis()
+
+        await get_next_card(make_db(), redis, "u1")
+
+        assert redis.ttls[card_queue_key("u1")] == 120
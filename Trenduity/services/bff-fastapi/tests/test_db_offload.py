@@ -0,0 +1,92 @@
+"""
+데이터 접근 레이어 부하 테스트
+
+동기 Supabase 쿼리가 워커 스레드로 넘어가서
+동시 요청이 이벤트 루프에서 직렬화되지 않는지 확인
+"""
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.db import run_query, run_sync
+from app.core.deps import get_supabase
+from app.main import app
+
+
+QUERY_DELAY = 0.2
+
+
+class SlowQuery:
+    """`.execute()`가 블로킹되는 가짜 쿼리 빌더 (Supabase 왕복 시간 흉내)"""
+
+    def __init__(self, delay: float = QUERY_DELAY):
+        self.delay = delay
+
+    def __getattr__(self, name):
+        # select/eq/gte/order 등 체인 메서드는 자기 자신 반환
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.delay)
+        result = Mock()
+        result.data = []
+        result.count = 0
+        return result
+
+
+class SlowSupabase:
+    """모든 테이블 쿼리가 SlowQuery를 반환하는 가짜 클라이언트"""
+
+    def table(self, name):
+        return SlowQuery()
+
+
+class TestRunQuery:
+    """run_query / run_sync 단위 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_returns_execute_result(self):
+        """execute() 결과를 그대로 반환"""
+        query = Mock()
+        query.execute.return_value = "result"
+
+        assert await run_query(query) == "result"
+        query.execute.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_run_sync_passes_arguments(self):
+        """위치/키워드 인자 전달"""
+        assert await run_sync(lambda a, b=0: a + b, 1, b=2) == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_not_serialized(self):
+        """동시 쿼리 10개가 쿼리 1개 시간 근처에 끝남"""
+        started = time.perf_counter()
+        await asyncio.gather(*(run_query(SlowQuery()) for _ in range(10)))
+        elapsed = time.perf_counter() - started
+
+        # 직렬 실행이면 2초, 병렬이면 ~0.2초
+        assert elapsed < QUERY_DELAY * 3
+
+
+class TestConcurrentRequests:
+    """HTTP 레벨 동시 요청 부하 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_not_serialized(self, client, senior_headers):
+        """느린 DB에서 동시 요청 10개가 서로를 막지 않음"""
+        app.dependency_overrides[get_supabase] = lambda: SlowSupabase()
+        try:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.get("/v1/med/history", headers=senior_headers)
+                for _ in range(10)
+            ))
+            elapsed = time.perf_counter() - started
+        finally:
+            app.dependency_overrides.pop(get_supabase, None)
+
+        assert all(r.status_code == 200 for r in responses)
+        assert elapsed < QUERY_DELAY * 3
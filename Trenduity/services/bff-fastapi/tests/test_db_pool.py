@@ -0,0 +1,141 @@
+"""
+PostgreSQL 연결 풀 테스트
+
+실제 DB 없이 가짜 연결로 풀의 재사용/대기/폐기 동작 확인
+"""
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import db
+from app.core.db import PgConnectionPool, PoolTimeout
+from app.core.deps import get_db_connection
+
+
+def make_connect():
+    """호출마다 새 가짜 연결을 만드는 connect 함수"""
+    connect = Mock(side_effect=lambda: Mock(closed=False))
+    return connect
+
+
+class TestPgConnectionPool:
+    """연결 풀 단위 테스트"""
+
+    def test_min_size_prefilled(self):
+        """시작 시 min_size개 연결 생성"""
+        connect = make_connect()
+        pool = PgConnectionPool(connect, min_size=2, max_size=5)
+
+        assert connect.call_count == 2
+        assert pool.metrics()["idle"] == 2
+
+    def test_connection_reused(self):
+        """반환된 연결을 다시 사용 (새 연결 생성 없음)"""
+        connect = make_connect()
+        pool = PgConnectionPool(connect, min_size=1, max_size=5)
+
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+
+        assert first is second
+        assert connect.call_count == 1
+        first.rollback.assert_called_once()
+
+    def test_grows_up_to_max_size(self):
+        """동시 사용 시 max_size까지 연결 생성"""
+        pool = PgConnectionPool(make_connect(), min_size=0, max_size=3)
+
+        conns = [pool.acquire() for _ in range(3)]
+
+        metrics = pool.metrics()
+        assert metrics["size"] == 3
+        assert metrics["in_use"] == 3
+        assert len({id(c) for c in conns}) == 3
+
+    def test_timeout_when_exhausted(self):
+        """풀이 가득 차면 timeout 후 PoolTimeout"""
+        pool = PgConnectionPool(make_connect(), min_size=0, max_size=1, timeout=0.05)
+        pool.acquire()
+
+        with pytest.raises(PoolTimeout):
+            pool.acquire()
+        assert pool.metrics()["timeouts_total"] == 1
+
+    def test_waiter_gets_released_connection(self):
+        """대기 중인 요청은 반환된 연결을 받고 대기 지표 기록"""
+        pool = PgConnectionPool(make_connect(), min_size=0, max_size=1, timeout=2)
+        held = pool.acquire()
+        result = {}
+
+        def waiter():
+            result["conn"] = pool.acquire()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        assert pool.metrics()["waiting"] == 1
+
+        pool.release(held)
+        thread.join(timeout=2)
+
+        metrics = pool.metrics()
+        assert result["conn"] is held
+        assert metrics["wait_total"] == 1
+        assert metrics["wait_ms_max"] > 0
+
+    def test_closed_connection_discarded(self):
+        """끊어진 연결은 풀에 돌려놓지 않음"""
+        pool = PgConnectionPool(make_connect(), min_size=0, max_size=2)
+        conn = pool.acquire()
+        conn.closed = True
+
+        pool.release(conn)
+
+        assert pool.metrics()["size"] == 0
+        assert pool.acquire() is not conn
+
+    def test_invalid_size(self):
+        """min_size > max_size 거부"""
+        with pytest.raises(ValueError):
+            PgConnectionPool(make_connect(), min_size=3, max_size=2)
+
+
+class TestGetDbConnection:
+    """get_db_connection yield 의존성"""
+
+    def test_returns_connection_to_pool(self, monkeypatch):
+        """의존성 종료 시 연결을 풀에 반환"""
+        pool = PgConnectionPool(make_connect(), min_size=1, max_size=1)
+        monkeypatch.setattr(db, "_db_pool", pool)
+
+        dependency = get_db_connection()
+        conn = next(dependency)
+        assert pool.metrics()["in_use"] == 1
+
+        with pytest.raises(StopIteration):
+            next(dependency)
+        assert pool.metrics()["idle"] == 1
+        assert pool.acquire() is conn
+
+    def test_pool_not_initialized(self, monkeypatch):
+        """풀이 없으면 DB_CONNECTION_FAILED"""
+        monkeypatch.setattr(db, "_db_pool", None)
+
+        with pytest.raises(HTTPException) as exc:
+            next(get_db_connection())
+        assert exc.value.detail["error"]["code"] == "DB_CONNECTION_FAILED"
+
+    def test_pool_timeout_returns_503(self, monkeypatch):
+        """풀 대기 시간 초과 시 503 DB_POOL_TIMEOUT"""
+        pool = PgConnectionPool(make_connect(), min_size=0, max_size=1, timeout=0.01)
+        pool.acquire()
+        monkeypatch.setattr(db, "_db_pool", pool)
+
+        with pytest.raises(HTTPException) as exc:
+            next(get_db_connection())
+        assert exc.value.status_code == 503
+        assert exc.value.detail["error"]["code"] == "DB_POOL_TIMEOUT"
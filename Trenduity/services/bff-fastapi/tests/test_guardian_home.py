@@ -0,0 +1,314 @@
+"""
+보호자 홈 스냅샷 테스트
+
+쓰기 경로 증분 갱신, 캐시가 모두 있을 때 Redis 왕복 1회,
+없는/오래된 스냅샷 재생성, 읽기 권한 없는 멤버, 초대 시 멤버 캐시 무효화 확인
+"""
+from datetime import date, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.deps import get_current_user, get_pooled_redis, get_supabase
+from app.main import app
+from app.services.alert_stream import unread_key
+from app.services.guardian_home import (
+    LINKS_LOADED_FIELD,
+    READ_HOME_SCRIPT,
+    UPDATE_SNAPSHOT_SCRIPT,
+    get_guardian_home,
+    links_key,
+    snapshot_key,
+    update_senior_snapshot,
+)
+from app.services.user_stats import COUNTERS_KEY_PREFIX, FILL_IF_ABSENT_SCRIPT, LAST_ACTIVITY_KEY_PREFIX
+
+
+TODAY = date.today()
+
+
+class FakeRedis:
+    """해시/문자열 + 보호자 홈 스크립트만 흉내내는 Redis (eval 호출 수 기록)"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}
+        self.evals = 0
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({field: str(value) for field, value in mapping.items()})
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def mget(self, keys):
+        return [self.strings.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value)
+        return True
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+        self.strings.pop(key, None)
+
+    def expire(self, key, ttl):
+        pass
+
+    def eval(self, script, numkeys, *args):
+        self.evals += 1
+        if script == READ_HOME_SCRIPT:
+            links_key_, unread_key_, snapshot_prefix, counters_prefix, activity_prefix, loaded = args
+            links = self.hashes.get(links_key_, {})
+            result = [[item for pair in links.items() for item in pair], self.strings.get(unread_key_)]
+            for member in links:
+                if member == loaded:
+                    continue
+                result += [
+                    member,
+                    [item for pair in self.hashes.get(snapshot_prefix + member, {}).items() for item in pair],
+                    [item for pair in self.hashes.get(counters_prefix + member, {}).items() for item in pair],
+                    self.strings.get(activity_prefix + member),
+                ]
+            return result
+        
+        if script == FILL_IF_ABSENT_SCRIPT:
+            key, token_key, token, _ttl, *pairs = args
+            if self.strings.pop(token_key, None) != token or key in self.hashes:
+                return 0
+            self.hashes[key] = {field: str(value) for field, value in zip(pairs[::2], pairs[1::2])}
+            return 1
+
+        assert script == UPDATE_SNAPSHOT_SCRIPT
+        key, _ttl, increments, *pairs = args
+        if key not in self.hashes:
+            return 0
+        snapshot = self.hashes[key]
+        increments = int(increments)
+        for field, amount in zip(pairs[:increments * 2:2], pairs[1:increments * 2:2]):
+            snapshot[field] = str(int(snapshot.get(field, 0)) + int(amount))
+        for field, value in zip(pairs[increments * 2::2], pairs[increments * 2 + 1::2]):
+            snapshot[field] = str(value)
+        return 1
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+        return Pipeline()
+
+
+def query(data, count=None):
+    """체이닝 메서드가 자기 자신을 돌려주는 쿼리 빌더"""
+    builder = Mock()
+    for method in ("select", "eq", "gte", "in_", "limit"):
+        getattr(builder, method).return_value = builder
+    builder.execute.return_value = Mock(data=data, count=count)
+    return builder
+
+
+def make_db(links=None):
+    """보호자 1명 + 시니어 2명 (senior-2는 읽기 권한 없음)"""
+    day = TODAY.isoformat()
+    tables = {
+        "family_links": query(links if links is not None else [
+            {"user_id": "senior-1", "perms": {"read": True}, "users": {"name": "김영희"}},
+            {"user_id": "senior-2", "perms": {"read": False}, "users": {"name": "박철수"}},
+        ]),
+        "gamification": query([{"total_points": 150, "current_streak": 3, "badges": ["첫 걸음"]}]),
+        "completed_cards": query([{"completed_date": day}, {"completed_date": day}]),
+        "med_checks": query([{"date": (TODAY - timedelta(days=1)).isoformat()}]),
+        "user_stats_counters": query([
+            {"user_id": "senior-1", "cards_completed": 12, "med_checks": 5, "last_activity_at": "2026-10-17T09:00:00+00:00"},
+            {"user_id": "senior-2", "last_activity_at": None},
+        ]),
+        "alerts": query([], count=4),
+    }
+    db = Mock()
+    db.table.side_effect = lambda name: tables[name]
+    return db
+
+
+def fully_cached_redis():
+    redis = FakeRedis()
+    redis.hashes[links_key("guardian-1")] = {
+        LINKS_LOADED_FIELD: "1",
+        "senior-1": '{"name": "김영희", "perms": {"read": true}}',
+    }
+    redis.hashes[snapshot_key("senior-1")] = {
+        "total_points": "150",
+        "streak_days": "3",
+        "built_on": TODAY.isoformat(),
+        f"cards:{TODAY.isoformat()}": "2",
+        "badge:첫 걸음": "1",
+    }
+    redis.hashes[f"{COUNTERS_KEY_PREFIX}senior-1"] = {"cards_completed": "12"}
+    redis.strings[f"{LAST_ACTIVITY_KEY_PREFIX}senior-1"] = "2026-10-17T09:00:00+00:00"
+    redis.strings[unread_key("guardian-1")] = "2"
+    return redis
+
+
+class TestSnapshotUpdate:
+    """쓰기 경로 증분 갱신"""
+
+    def test_updates_existing_snapshot(self):
+        redis = fully_cached_redis()
+
+        assert update_senior_snapshot(redis, "senior-1", cards_completed=1, total_points=160, badges=("7일 연속",))
+
+        snapshot = redis.hashes[snapshot_key("senior-1")]
+        assert snapshot[f"cards:{TODAY.isoformat()}"] == "3"
+        assert snapshot["total_points"] == "160"
+        assert snapshot["badge:7일 연속"] == "1"
+
+    def test_missing_snapshot_not_created(self):
+        """일부 필드만 있는 스냅샷을 만들지 않음 (다음 조회 때 DB에서 생성)"""
+        redis = FakeRedis()
+
+        assert update_senior_snapshot(redis, "senior-1", med_checks=1) is False
+        assert snapshot_key("senior-1") not in redis.hashes
+
+    def test_noop_without_fields_or_redis(self):
+        redis = FakeRedis()
+
+        assert update_senior_snapshot(redis, "senior-1") is False
+        assert update_senior_snapshot(None, "senior-1", cards_completed=1) is False
+        assert redis.evals == 0
+
+
+class TestGuardianHome:
+    """보호자 홈 문서 조회"""
+
+    @pytest.mark.asyncio
+    async def test_full_cache_hit_single_round_trip(self):
+        redis = fully_cached_redis()
+        db = make_db()
+
+        home = await get_guardian_home(db, redis, "guardian-1")
+
+        assert redis.evals == 1
+        db.table.assert_not_called()
+        assert home["unread_alerts"] == 2
+        assert home["today_completions"] == 2
+        member = home["members"][0]
+        assert member["total_points"] == 150
+        assert member["badges"] == ["첫 걸음"]
+        assert member["today"]["cards_completed"] == 2
+        assert member["totals"]["cards_completed"] == 12
+        assert member["last_activity"] == "2026-10-17T09:00:00+00:00"
+
+    @pytest.mark.asyncio
+    async def test_cold_cache_builds_then_serves_from_redis(self):
+        redis = FakeRedis()
+        db = make_db()
+
+        first = await get_guardian_home(db, redis, "guardian-1")
+        db.table.reset_mock()
+        second = await get_guardian_home(db, redis, "guardian-1")
+
+        assert first == second
+        db.table.assert_not_called()
+        assert first["unread_alerts"] == 4
+        assert [member["name"] for member in first["members"]] == ["김영희", "박철수"]
+        senior = first["members"][0]
+        assert senior["streak_days"] == 3
+        assert senior["total_cards_7days"] == 2
+        assert senior["total_med_checks_7days"] == 1
+        assert senior["daily_activities"][1]["med_checks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_member_without_read_permission_gets_no_stats(self):
+        redis = FakeRedis()
+        db = make_db()
+
+        home = await get_guardian_home(db, redis, "guardian-1")
+
+        restricted = home["members"][1]
+        assert restricted == {"user_id": "senior-2", "name": "박철수", "perms": {"read": False}}
+        assert snapshot_key("senior-2") not in redis.hashes
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_rebuilt(self):
+        redis = fully_cached_redis()
+        snapshot = redis.hashes[snapshot_key("senior-1")]
+        old_day = (TODAY - timedelta(days=30)).isoformat()
+        snapshot["built_on"] = old_day
+        snapshot[f"cards:{old_day}"] = "9"
+
+        home = await get_guardian_home(make_db(), redis, "guardian-1")
+
+        assert home["members"][0]["total_cards_7days"] == 2
+        assert redis.hashes[snapshot_key("senior-1")]["built_on"] == TODAY.isoformat()
+        assert f"cards:{old_day}" not in redis.hashes[snapshot_key("senior-1")]
+
+    @pytest.mark.asyncio
+    async def test_guardian_without_members_cached(self):
+        redis = FakeRedis()
+        db = make_db(links=[])
+
+        await get_guardian_home(db, redis, "guardian-1")
+        db.table.reset_mock()
+        home = await get_guardian_home(db, redis, "guardian-1")
+
+        assert home["members"] == []
+        db.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_without_redis_reads_db(self):
+        home = await get_guardian_home(make_db(), None, "guardian-1")
+
+        assert home["unread_alerts"] == 4
+        assert home["members"][0]["total_points"] == 150
+
+
+class TestEndpoints:
+    """GET /v1/dashboard/home, 초대 시 멤버 캐시 무효화"""
+
+    @pytest.mark.asyncio
+    async def test_home_endpoint(self, client):
+        app.dependency_overrides[get_current_user] = lambda: {"id": "guardian-1"}
+        app.dependency_overrides[get_supabase] = lambda: make_db()
+        app.dependency_overrides[get_pooled_redis] = lambda: fully_cached_redis()
+        try:
+            response = await client.get("/v1/dashboard/home")
+        finally:
+            app.dependency_overrides.clear()
+
+        body = response.json()
+        assert body["ok"] is True
+        assert body["data"]["members"][0]["user_id"] == "senior-1"
+
+    @pytest.mark.asyncio
+    async def test_invite_invalidates_links_cache(self, client):
+        redis = fully_cached_redis()
+        db = Mock()
+        db.table.return_value.select.return_value.eq.return_value.eq.return_value \
+            .execute.return_value = Mock(data=[])
+
+        app.dependency_overrides[get_current_user] = lambda: {"id": "guardian-1"}
+        app.dependency_overrides[get_supabase] = lambda: db
+        app.dependency_overrides[get_pooled_redis] = lambda: redis
+        try:
+            response = await client.post(
+                "/v1/family/invite",
+                json={"user_id": "senior-3", "perms": {"read": True}},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.json()["ok"] is True
+        assert links_key("guardian-1") not in redis.hashes
@@ -0,0 +1,74 @@
+"""
+LLM 공유 HTTP 클라이언트 테스트
+
+제공자별 클라이언트 재사용, 연결 상한/타임아웃 설정, 종료 후 재생성 확인
+"""
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core import http_clients
+from app.core.config import settings
+from app.core.http_clients import (
+    PROVIDER_LIMITS,
+    close_llm_clients,
+    get_llm_client,
+    init_llm_clients,
+)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def clean_registry():
+    await close_llm_clients()
+    yield
+    await close_llm_clients()
+
+
+class TestLlmClientRegistry:
+    """제공자별 클라이언트 레지스트리"""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_per_provider(self):
+        """같은 제공자는 같은 클라이언트(연결 풀)를 사용"""
+        init_llm_clients()
+
+        assert get_llm_client("openai") is get_llm_client("openai")
+        assert get_llm_client("openai") is not get_llm_client("anthropic")
+
+    @pytest.mark.asyncio
+    async def test_base_url_from_settings(self, monkeypatch):
+        """기본 URL은 설정값 사용 (목 서버로 교체 가능)"""
+        monkeypatch.setattr(settings, "OPENAI_API_BASE", "http://127.0.0.1:9999")
+
+        client = get_llm_client("openai")
+
+        assert str(client.base_url).startswith("http://127.0.0.1:9999")
+
+    @pytest.mark.asyncio
+    async def test_limits_and_timeouts(self, monkeypatch):
+        """제공자별 연결 상한과 연결/읽기 타임아웃 분리"""
+        monkeypatch.setattr(settings, "LLM_HTTP_CONNECT_TIMEOUT", 2.0)
+        monkeypatch.setattr(settings, "LLM_HTTP_READ_TIMEOUT", 45.0)
+
+        client = http_clients.create_llm_client("anthropic")
+        try:
+            assert client.timeout == httpx.Timeout(
+                connect=2.0,
+                read=45.0,
+                write=settings.LLM_HTTP_WRITE_TIMEOUT,
+                pool=settings.LLM_HTTP_POOL_TIMEOUT,
+            )
+            pool = client._transport._pool
+            assert pool._max_connections == PROVIDER_LIMITS["anthropic"][0]
+            assert pool._max_keepalive_connections == PROVIDER_LIMITS["anthropic"][1]
+        finally:
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_recreated_after_close(self):
+        """종료 후 다시 요청하면 새 클라이언트 생성"""
+        client = get_llm_client("google")
+        await close_llm_clients()
+
+        assert client.is_closed
+        assert get_llm_client("google") is not client
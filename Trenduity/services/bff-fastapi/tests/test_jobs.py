@@ -0,0 +1,272 @@
+"""
+백그라운드 작업 큐 테스트
+
+프로세스 내 큐의 실행/재시도/데드레터, Redis Stream 큐의 재시도 예약,
+배지 평가 지연과 alerts 전달 확인
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.core.config import settings
+from app.services import jobs
+from app.services.gamification import GamificationService, reaction_received_job
+from app.services.jobs import InProcessJobQueue, RedisStreamJobQueue, job_handler
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(settings, "JOBS_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(jobs, "_queue", None)
+
+
+calls = []
+
+
+@job_handler("test.echo")
+async def echo_job(db, redis, value):
+    calls.append(value)
+
+
+@job_handler("test.flaky")
+async def flaky_job(db, redis, fail_times):
+    calls.append("try")
+    if calls.count("try") <= fail_times:
+        raise RuntimeError("temporary")
+
+
+async def drain(queue):
+    """큐를 비울 때까지 실행 후 종료"""
+    stop = asyncio.Event()
+    task = asyncio.create_task(queue.run(stop))
+    for _ in range(200):
+        await asyncio.sleep(0.01)
+        if queue.pending() == 0 and not queue._retry_tasks:
+            break
+    stop.set()
+    await task
+
+
+class TestInProcessJobQueue:
+    """프로세스 내 큐"""
+
+    def setup_method(self):
+        calls.clear()
+
+    @pytest.mark.asyncio
+    async def test_runs_enqueued_job(self):
+        """추가한 작업을 핸들러로 실행"""
+        queue = InProcessJobQueue(Mock, lambda: None)
+
+        assert queue.enqueue("test.echo", value=1) is True
+        await drain(queue)
+
+        assert calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_retries_until_success(self):
+        """실패하면 백오프 후 재시도"""
+        queue = InProcessJobQueue(Mock, lambda: None)
+
+        queue.enqueue("test.flaky", fail_times=2)
+        await drain(queue)
+
+        assert calls.count("try") == 3
+        assert not queue.dead_letters
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_after_max_attempts(self):
+        """최대 시도 횟수를 넘으면 데드레터"""
+        queue = InProcessJobQueue(Mock, lambda: None)
+
+        queue.enqueue("test.flaky", fail_times=10)
+        await drain(queue)
+
+        assert calls.count("try") == 3
+        assert queue.dead_letters[0]["name"] == "test.flaky"
+        assert queue.dead_letters[0]["error"] == "temporary"
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_not_retried(self):
+        """등록되지 않은 작업은 바로 데드레터"""
+        queue = InProcessJobQueue(Mock, lambda: None)
+
+        queue.enqueue("test.missing")
+        await drain(queue)
+
+        assert queue.dead_letters[0]["attempts"] == 1
+
+
+class TestRedisStreamJobQueue:
+    """Redis Stream 큐"""
+
+    def setup_method(self):
+        calls.clear()
+
+    def test_enqueue_adds_stream_entry(self):
+        """작업 이름/payload를 스트림에 추가"""
+        redis = Mock()
+        queue = RedisStreamJobQueue(Mock, lambda: redis)
+
+        assert queue.enqueue("test.echo", value="배지") is True
+
+        stream, fields = redis.xadd.call_args.args
+        assert stream == settings.JOBS_STREAM
+        assert fields["name"] == "test.echo"
+        assert json.loads(fields["payload"]) == {"value": "배지"}
+    
+    @pytest.mark.asyncio
+    async def test_consumer_uses_dedicated_connection(self):
+        """소비 루프는 전용 연결로 읽고, 작업 추가는 요청용 공유 풀 사용"""
+        shared, dedicated = Mock(), Mock()
+        dedicated.eval.return_value = 0
+        dedicated.xautoclaim.return_value = ["0-0", []]
+        dedicated.xreadgroup.return_value = []
+        queue = RedisStreamJobQueue(Mock, lambda: shared, get_consumer_redis=lambda: dedicated)
+        stop = asyncio.Event()
+        dedicated.xreadgroup.side_effect = lambda *args, **kwargs: stop.set() or []
+        
+        queue.enqueue("test.echo", value=1)
+        await queue.run(stop)
+        
+        shared.xadd.assert_called_once()
+        shared.xreadgroup.assert_not_called()
+        dedicated.xreadgroup.assert_called_once()
+
+    def test_enqueue_failure_reported(self):
+        """Redis 오류 시 False (호출 측에서 바로 실행)"""
+        redis = Mock()
+        redis.xadd.side_effect = Exception("connection refused")
+
+        assert RedisStreamJobQueue(Mock, lambda: redis).enqueue("test.echo", value=1) is False
+
+    @pytest.mark.asyncio
+    async def test_success_acks_entry(self):
+        """성공하면 ACK 후 스트림에서 삭제"""
+        redis = Mock()
+        queue = RedisStreamJobQueue(Mock, lambda: redis)
+
+        await queue._process(redis, "1-0", {"name": "test.echo", "payload": '{"value": 7}', "attempts": "0"})
+
+        assert calls == [7]
+        redis.pipeline.return_value.xack.assert_called_once_with(queue.stream, queue.group, "1-0")
+        redis.zadd.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failure_scheduled_for_retry(self):
+        """실패하면 재시도 대기열에 시도 횟수와 함께 예약"""
+        redis = Mock()
+        queue = RedisStreamJobQueue(Mock, lambda: redis)
+
+        await queue._process(redis, "1-0", {"name": "test.flaky", "payload": '{"fail_times": 5}', "attempts": "0"})
+
+        delayed_key, mapping = redis.zadd.call_args.args
+        job = json.loads(next(iter(mapping)))
+        assert delayed_key == queue.delayed_key
+        assert job["attempts"] == 1
+        redis.pipeline.return_value.xack.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_last_attempt_dead_lettered(self):
+        """마지막 시도도 실패하면 데드레터 스트림으로"""
+        redis = Mock()
+        queue = RedisStreamJobQueue(Mock, lambda: redis)
+
+        await queue._process(redis, "1-0", {"name": "test.flaky", "payload": '{"fail_times": 5}', "attempts": "2"})
+
+        stream, fields = redis.xadd.call_args.args
+        assert stream == queue.dead_key
+        assert fields["attempts"] == 3
+        assert fields["error"] == "temporary"
+        redis.zadd.assert_not_called()
+
+
+class TestDeferredBadges:
+    """배지 평가 지연 + alerts 전달"""
+
+    @pytest.mark.asyncio
+    async def test_completion_defers_badge_check(self):
+        """작업 큐가 있으면 카드 완료 응답 전에 배지 집계를 하지 않음"""
+        db = Mock()
+        db.rpc.return_value.execute.return_value = Mock(data={
+            "points_added": 8, "old_total": 0, "total_points": 8, "streak_days": 1, "badges": []
+        })
+        queue = Mock()
+        queue.enqueue.return_value = True
+        service = GamificationService(db, None, jobs=queue)
+
+        result = await service.record_card_completion("u1", "card-1", 0, 0, "2026-10-17")
+
+        assert result["new_badges"] == []
+        db.rpc.assert_called_once()
+        assert db.rpc.call_args.args[0] == GamificationService.COMPLETE_CARD_RPC
+        queue.enqueue.assert_called_once_with(GamificationService.BADGE_CHECK_JOB, user_id="u1")
+
+    @pytest.mark.asyncio
+    async def test_badge_check_job_delivers_alerts(self):
+        """예약된 배지 평가가 새 배지를 alerts 테이블로 전달"""
+        db = Mock()
+        service = GamificationService(db, None)
+        service._get_or_create_gamification = AsyncMock(return_value={"total_points": 8, "current_streak": 1})
+        service._check_new_badges = AsyncMock(return_value=["첫걸음"])
+
+        assert await service.run_badge_check("u1") == ["첫걸음"]
+
+        db.table.assert_called_with("alerts")
+        rows = db.table.return_value.insert.call_args.args[0]
+        assert rows[0]["user_id"] == "u1"
+        assert rows[0]["type"] == "achievement"
+        assert "첫걸음" in rows[0]["message"]
+
+    @pytest.mark.asyncio
+    async def test_alert_delivery_queued_when_available(self):
+        """작업 큐가 있으면 알림 INSERT도 별도 작업으로"""
+        queue = Mock()
+        queue.enqueue.return_value = True
+        jobs._queue = queue
+        db = Mock()
+        service = GamificationService(db, None)
+        service._get_or_create_gamification = AsyncMock(return_value={"total_points": 8, "current_streak": 1})
+        service._check_new_badges = AsyncMock(return_value=["첫걸음"])
+
+        await service.run_badge_check("u1")
+
+        queue.enqueue.assert_called_once_with(GamificationService.BADGE_ALERT_JOB, user_id="u1", badges=["첫걸음"])
+        db.table.assert_not_called()
+
+
+class TestReactionReceivedJob:
+    """받은 리액션 카운터 작업 (재시도해도 카운터가 두 번 증가하지 않음)"""
+    
+    @staticmethod
+    def post_db():
+        db = Mock()
+        query = db.table.return_value.select.return_value.eq.return_value.limit.return_value
+        query.execute.return_value = Mock(data=[{"author_id": "author-1"}])
+        return db
+    
+    @pytest.mark.asyncio
+    async def test_badge_check_enqueued_separately(self):
+        """카운터 증가 후 배지 평가는 별도 작업으로 예약"""
+        queue = Mock()
+        queue.enqueue.return_value = True
+        jobs._queue = queue
+        redis = Mock()
+        
+        await reaction_received_job(self.post_db(), redis, post_id="post-1", delta=1)
+        
+        redis.eval.assert_called_once()
+        queue.enqueue.assert_called_once_with(GamificationService.BADGE_CHECK_JOB, user_id="author-1")
+    
+    @pytest.mark.asyncio
+    async def test_inline_badge_failure_not_retried(self, monkeypatch):
+        """큐 없이 바로 평가하다 실패해도 예외를 던지지 않음 (재시도 시 카운터 중복 증가 방지)"""
+        monkeypatch.setattr(GamificationService, "run_badge_check", AsyncMock(side_effect=RuntimeError("db down")))
+        redis = Mock()
+        
+        await reaction_received_job(self.post_db(), redis, post_id="post-1", delta=1)
+        
+        redis.eval.assert_called_once()
@@ -0,0 +1,173 @@
+"""
+Supabase JWT 로컬 검증 테스트
+
+- 서명/만료/audience 검증
+- 토큰 해시 기반 클레임 캐시 (만료 시각까지만 유지)
+- 원격 검증(supabase.auth.get_user)은 opt-in 폴백으로만 호출
+"""
+import time
+from unittest.mock import Mock, patch
+
+import jwt
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import security
+from app.core.config import settings
+from app.core.deps import get_current_user, verify_access_token
+from app.core.security import ClaimsCache, verify_supabase_token
+
+
+JWT_SECRET = "test-supabase-jwt-secret-for-unit-tests"
+
+
+def make_token(secret: str = JWT_SECRET, exp_in: int = 3600, **overrides) -> str:
+    """테스트용 Supabase 형식 액세스 토큰 생성"""
+    now = int(time.time())
+    payload = {
+        "sub": "user-123",
+        "email": "senior@example.com",
+        "aud": "authenticated",
+        "role": "authenticated",
+        "iat": now,
+        "exp": now + exp_in,
+    }
+    payload.update(overrides)
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+@pytest.fixture
+def local_auth(monkeypatch):
+    """로컬 검증 활성화 + 빈 캐시"""
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", JWT_SECRET)
+    monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", False)
+    security.claims_cache.clear()
+    yield
+    security.claims_cache.clear()
+
+
+class TestLocalVerification:
+    """로컬 서명/만료/audience 검증"""
+
+    def test_valid_token(self, local_auth):
+        """정상 토큰은 클레임 반환"""
+        claims = verify_supabase_token(make_token())
+
+        assert claims["sub"] == "user-123"
+        assert claims["email"] == "senior@example.com"
+
+    def test_expired_token(self, local_auth):
+        """만료된 토큰 거부"""
+        with pytest.raises(jwt.ExpiredSignatureError):
+            verify_supabase_token(make_token(exp_in=-10))
+
+    def test_wrong_audience(self, local_auth):
+        """audience 불일치 거부"""
+        with pytest.raises(jwt.InvalidAudienceError):
+            verify_supabase_token(make_token(aud="anon"))
+
+    def test_wrong_signature(self, local_auth):
+        """다른 시크릿으로 서명된 토큰 거부"""
+        with pytest.raises(jwt.InvalidSignatureError):
+            verify_supabase_token(make_token(secret="another-secret"))
+
+    def test_cached_claims_skip_decode(self, local_auth):
+        """두 번째 검증은 캐시에서 반환 (디코딩 1회)"""
+        token = make_token()
+
+        with patch.object(security, "decode_supabase_token", wraps=security.decode_supabase_token) as decode:
+            verify_supabase_token(token)
+            verify_supabase_token(token)
+
+        assert decode.call_count == 1
+
+
+class TestClaimsCache:
+    """클레임 LRU 캐시"""
+
+    def test_entry_expires_with_token(self):
+        """토큰 만료 시각이 지나면 캐시에서도 제거"""
+        cache = ClaimsCache(max_size=10)
+        cache.set("token", {"sub": "user-123", "exp": time.time() - 1})
+
+        assert cache.get("token") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """최대 크기 초과 시 가장 오래 사용되지 않은 항목 제거"""
+        cache = ClaimsCache(max_size=2)
+        exp = time.time() + 60
+        cache.set("a", {"sub": "a", "exp": exp})
+        cache.set("b", {"sub": "b", "exp": exp})
+        cache.get("a")
+        cache.set("c", {"sub": "c", "exp": exp})
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    def test_key_is_token_hash(self):
+        """원본 토큰이 아닌 해시를 키로 사용"""
+        cache = ClaimsCache(max_size=10)
+        cache.set("raw-token", {"sub": "a", "exp": time.time() + 60})
+
+        assert "raw-token" not in cache._entries
+
+
+class TestVerifyAccessToken:
+    """deps.verify_access_token 경로 선택"""
+
+    @pytest.mark.asyncio
+    async def test_local_path_skips_remote(self, local_auth):
+        """로컬 검증 성공 시 Supabase Auth를 호출하지 않음"""
+        supabase = Mock()
+
+        user = await verify_access_token(make_token(), supabase)
+
+        assert user == {"id": "user-123", "email": "senior@example.com"}
+        supabase.auth.get_user.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_without_fallback(self, local_auth):
+        """폴백 비활성화 시 로컬 실패는 그대로 실패"""
+        supabase = Mock()
+
+        user = await verify_access_token(make_token(secret="another-secret"), supabase)
+
+        assert user is None
+        supabase.auth.get_user.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_remote_fallback_opt_in(self, local_auth, monkeypatch):
+        """AUTH_REMOTE_FALLBACK=True면 로컬 실패 시 원격 검증"""
+        monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", True)
+        supabase = Mock()
+        supabase.auth.get_user.return_value.user.id = "user-123"
+        supabase.auth.get_user.return_value.user.email = "senior@example.com"
+
+        user = await verify_access_token(make_token(secret="another-secret"), supabase)
+
+        assert user["id"] == "user-123"
+        supabase.auth.get_user.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_expired_token_never_falls_back(self, local_auth, monkeypatch):
+        """만료된 토큰은 폴백 없이 거부"""
+        monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", True)
+        supabase = Mock()
+
+        user = await verify_access_token(make_token(exp_in=-10), supabase)
+
+        assert user is None
+        supabase.auth.get_user.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_current_user_with_local_token(self, local_auth):
+        """get_current_user가 로컬 검증 결과로 사용자 반환"""
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=make_token())
+        supabase = Mock()
+
+        user = await get_current_user(credentials=credentials, supabase=supabase)
+
+        assert user["id"] == "user-123"
+        supabase.auth.get_user.assert_not_called()
@@ -0,0 +1,276 @@
+"""
+LLM 게이트웨이 테스트
+
+가짜 제공자 호출로 대체 모델 전환, 서킷 브레이커, 헤징, 동시 호출 제한,
+지연 기반 라우팅, 호출 지표 확인
+"""
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core import http_clients
+from app.core.config import settings
+from app.services.llm_gateway import (
+    LLMCallFailed,
+    LLMGateway,
+    LLMProviderError,
+    LLMTarget,
+    NoProviderConfigured,
+)
+from app.services.llm_gateway.breaker import CircuitBreaker
+
+OPENAI = LLMTarget("openai", "gpt-4o-mini")
+GOOGLE = LLMTarget("google", "gemini-1.5-flash")
+CLAUDE = LLMTarget("anthropic", "claude-3-haiku-20240307")
+KEYS = {"openai": "k", "google": "k", "anthropic": "k"}
+MESSAGES = [{"role": "user", "content": "안녕하세요"}]
+
+
+class FakeProvider:
+    """지연/실패를 지정할 수 있는 가짜 제공자"""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self, messages, model, api_key, **params):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return f"{self.name} 답변", {"total_tokens": 10}
+
+
+def make_gateway(**providers) -> LLMGateway:
+    return LLMGateway(api_keys=KEYS, calls=providers)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def clean_clients():
+    yield
+    await http_clients.close_llm_clients()
+
+
+class TestCircuitBreaker:
+    """서킷 브레이커 상태 전이"""
+
+    def test_opens_after_consecutive_failures(self):
+        now = [0.0]
+        breaker = CircuitBreaker(3, 30.0, clock=lambda: now[0])
+
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_half_open_allows_single_trial(self):
+        now = [0.0]
+        breaker = CircuitBreaker(1, 30.0, clock=lambda: now[0])
+        breaker.record_failure()
+
+        now[0] = 31.0
+        assert breaker.allow()
+        assert not breaker.allow()  # 시험 호출 진행 중
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(1, 30.0, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 31.0
+        breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestFailover:
+    """대체 모델 전환"""
+
+    @pytest.mark.asyncio
+    async def test_next_target_on_failure(self):
+        """기본 모델이 실패하면 바로 다음 대상 호출"""
+        openai = FakeProvider("openai", error=LLMProviderError("openai", 503))
+        google = FakeProvider("google")
+        gateway = make_gateway(openai=openai, google=google)
+
+        result = await gateway.complete([OPENAI, GOOGLE], MESSAGES)
+
+        assert result.text == "google 답변"
+        assert result.target == GOOGLE
+        assert result.tokens == 10
+
+    @pytest.mark.asyncio
+    async def test_all_failed(self):
+        """모든 대상 실패 시 오류 목록과 함께 LLMCallFailed"""
+        gateway = make_gateway(
+            openai=FakeProvider("openai", error=LLMProviderError("openai", 500)),
+            google=FakeProvider("google", error=httpx.ConnectTimeout("timeout")),
+        )
+
+        with pytest.raises(LLMCallFailed) as exc_info:
+            await gateway.complete([OPENAI, GOOGLE], MESSAGES)
+
+        assert len(exc_info.value.errors) == 2
+
+    @pytest.mark.asyncio
+    async def test_targets_without_key_skipped(self):
+        """API 키가 없는 제공자는 건너뛰고, 하나도 없으면 NoProviderConfigured"""
+        google = FakeProvider("google")
+        gateway = LLMGateway(api_keys={"google": "k"}, calls={"google": google})
+
+        assert (await gateway.complete([OPENAI, GOOGLE], MESSAGES)).target == GOOGLE
+        with pytest.raises(NoProviderConfigured):
+            await gateway.complete([OPENAI, CLAUDE], MESSAGES)
+
+    @pytest.mark.asyncio
+    async def test_fake_provider_server(self):
+        """실제 제공자 호출 코드로 가짜 서버 응답 파싱 (OpenAI 500 → Anthropic)"""
+        def openai_handler(request):
+            return httpx.Response(500, json={"error": "overloaded"})
+
+        def anthropic_handler(request):
+            return httpx.Response(200, json={
+                "content": [{"type": "text", "text": "대체 답변이에요"}],
+                "usage": {"input_tokens": 7, "output_tokens": 5},
+            })
+
+        for provider, handler in (("openai", openai_handler), ("anthropic", anthropic_handler)):
+            http_clients._clients[provider] = httpx.AsyncClient(
+                base_url="http://fake-llm", transport=httpx.MockTransport(handler)
+            )
+        gateway = LLMGateway(api_keys=KEYS)
+
+        result = await gateway.complete([OPENAI, CLAUDE], MESSAGES, system_prompt="친절하게")
+
+        assert result.text == "대체 답변이에요"
+        assert result.tokens == 12
+
+
+class TestCircuitBreakerRouting:
+    """게이트웨이 서킷 브레이커"""
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_provider(self, monkeypatch):
+        """연속 실패로 열린 제공자는 호출하지 않고 대체 모델로"""
+        monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 2)
+        openai = FakeProvider("openai", error=LLMProviderError("openai", 503))
+        google = FakeProvider("google")
+        gateway = make_gateway(openai=openai, google=google)
+
+        for _ in range(3):
+            await gateway.complete([OPENAI, GOOGLE], MESSAGES)
+
+        assert openai.calls == 2
+        assert gateway.stats()["breakers"]["openai"] == CircuitBreaker.OPEN
+        assert gateway.stats()["calls"]["openai/gpt-4o-mini"]["breaker_open"] == 1
+
+    @pytest.mark.asyncio
+    async def test_request_errors_do_not_trip_breaker(self, monkeypatch):
+        """400 같은 요청 오류는 제공자 장애로 세지 않음"""
+        monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 1)
+        openai = FakeProvider("openai", error=LLMProviderError("openai", 400))
+        gateway = make_gateway(openai=openai, google=FakeProvider("google"))
+
+        await gateway.complete([OPENAI, GOOGLE], MESSAGES)
+
+        assert gateway.breaker("openai").state == CircuitBreaker.CLOSED
+
+
+class TestHedging:
+    """p95 초과 시 헤징"""
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_and_primary_cancelled(self, monkeypatch):
+        """기본 모델이 p95 안에 응답하지 않으면 대체 모델 동시 호출, 먼저 온 응답 사용"""
+        monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", True)
+        monkeypatch.setattr(settings, "LLM_HEDGE_MIN_SAMPLES", 5)
+        openai = FakeProvider("openai", delay=1.0)
+        google = FakeProvider("google", delay=0.01)
+        gateway = make_gateway(openai=openai, google=google)
+        for _ in range(5):
+            gateway.metrics.latency(*OPENAI).add(20.0)  # p95 = 20ms
+
+        result = await gateway.complete([OPENAI, GOOGLE], MESSAGES)
+        await asyncio.sleep(0)  # 취소 전달
+
+        assert result.target == GOOGLE
+        assert result.hedged
+        assert openai.cancelled == 1
+        stats = gateway.stats()["calls"]
+        assert stats["openai/gpt-4o-mini"]["hedge_started"] == 1
+        assert stats["openai/gpt-4o-mini"]["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_samples(self, monkeypatch):
+        """지연 표본이 부족하면 헤징하지 않음"""
+        monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", True)
+        openai = FakeProvider("openai", delay=0.05)
+        google = FakeProvider("google")
+        gateway = make_gateway(openai=openai, google=google)
+
+        result = await gateway.complete([OPENAI, GOOGLE], MESSAGES)
+
+        assert result.target == OPENAI
+        assert google.calls == 0
+
+
+class TestConcurrencyAndRouting:
+    """동시 호출 제한, 지연 기반 라우팅, 지표"""
+
+    @pytest.mark.asyncio
+    async def test_saturated_provider_falls_over(self, monkeypatch):
+        """제공자 동시 호출 상한에 걸리면 대기 후 대체 모델로"""
+        monkeypatch.setattr(settings, "LLM_PROVIDER_CONCURRENCY", 1)
+        monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUT", 0.05)
+        openai = FakeProvider("openai", delay=0.3)
+        google = FakeProvider("google")
+        gateway = make_gateway(openai=openai, google=google)
+
+        first, second = await asyncio.gather(
+            gateway.complete([OPENAI, GOOGLE], MESSAGES),
+            gateway.complete([OPENAI, GOOGLE], MESSAGES),
+        )
+
+        assert {first.target, second.target} == {OPENAI, GOOGLE}
+        assert openai.calls == 1
+        assert gateway.stats()["calls"]["openai/gpt-4o-mini"]["overloaded"] == 1
+
+    def test_fallbacks_ordered_by_latency(self):
+        """대체 모델은 최근 p50 지연이 짧은 순, 기본 모델은 맨 앞 유지"""
+        gateway = make_gateway()
+        gateway.metrics.latency(*GOOGLE).add(900.0)
+        gateway.metrics.latency(*CLAUDE).add(300.0)
+        gateway.metrics.latency(*OPENAI).add(5000.0)
+
+        assert gateway.route([OPENAI, GOOGLE, CLAUDE]) == [OPENAI, CLAUDE, GOOGLE]
+
+    @pytest.mark.asyncio
+    async def test_call_metrics(self):
+        """제공자/모델별 호출 수, 오류, 토큰, 지연 분포 기록"""
+        gateway = make_gateway(
+            openai=FakeProvider("openai", error=LLMProviderError("openai", 500)),
+            google=FakeProvider("google"),
+        )
+
+        await gateway.complete([OPENAI, GOOGLE], MESSAGES)
+
+        calls = gateway.stats()["calls"]
+        assert calls["openai/gpt-4o-mini"]["error"] == 1
+        assert calls["google/gemini-1.5-flash"]["ok"] == 1
+        assert calls["google/gemini-1.5-flash"]["tokens"] == 10
+        assert calls["google/gemini-1.5-flash"]["p50_ms"] is not None
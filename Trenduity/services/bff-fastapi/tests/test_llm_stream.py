@@ -0,0 +1,225 @@
+"""
+LLM 스트리밍 테스트
+
+가짜 제공자(httpx.MockTransport)로 제공자별 스트림 파싱,
+/chat/send/stream SSE 중계, 첫 토큰 전 대체 모델 전환, 완료/연결 끊김 시 사용량 기록 확인
+"""
+import asyncio
+import json
+from unittest.mock import Mock
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core import http_clients
+from app.core.deps import get_current_user, get_redis_client
+from app.main import app
+from app.routers import chat
+from app.services.ai_quota import QUOTA_SCRIPT
+from app.services.llm_gateway import LLMGateway, get_llm_gateway
+from app.services.llm_gateway.providers import (
+    LLMProviderError,
+    stream_anthropic,
+    stream_google,
+    stream_openai,
+)
+
+
+def sse_body(*events) -> bytes:
+    return "".join(f"data: {json.dumps(event)}\n\n" for event in events).encode()
+
+
+OPENAI_EVENTS = sse_body(
+    {"choices": [{"delta": {"role": "assistant"}}]},
+    {"choices": [{"delta": {"content": "안녕"}}]},
+    {"choices": [{"delta": {"content": "하세요"}}]},
+    {"choices": [], "usage": {"total_tokens": 12}},
+) + b"data: [DONE]\n\n"
+
+
+def install_fake_provider(provider: str, body: bytes, status_code: int = 200, requests: list = None):
+    """제공자 공유 클라이언트를 고정 응답을 주는 가짜 서버로 교체"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(request)
+        return httpx.Response(status_code, content=body, headers={"content-type": "text/event-stream"})
+
+    http_clients._clients[provider] = httpx.AsyncClient(
+        base_url="http://fake-llm", transport=httpx.MockTransport(handler)
+    )
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def clean_clients():
+    yield
+    await http_clients.close_llm_clients()
+
+
+def usage_increments(redis) -> int:
+    """일일 사용량 순증가 (쿼터 스크립트 차감 - 환불 횟수)"""
+    ops = [call.args[call.args[1] + 2] for call in redis.eval.call_args_list if call.args[0] == QUOTA_SCRIPT]
+    return ops.count("reserve") - ops.count("refund")
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+class TestProviderStreams:
+    """제공자별 스트림 파싱"""
+
+    @pytest.mark.asyncio
+    async def test_openai_deltas_and_usage(self):
+        """OpenAI delta.content와 마지막 usage 청크"""
+        requests = []
+        install_fake_provider("openai", OPENAI_EVENTS, requests=requests)
+
+        items = await collect(stream_openai([{"role": "user", "content": "hi"}], "gpt-4o-mini", api_key="k"))
+
+        assert items == [("delta", "안녕"), ("delta", "하세요"), ("usage", {"total_tokens": 12})]
+        payload = json.loads(requests[0].content)
+        assert payload["stream"] is True
+        assert payload["max_tokens"] == 500
+
+    @pytest.mark.asyncio
+    async def test_google_sse_stream(self):
+        """Gemini alt=sse 스트림, system은 systemInstruction으로"""
+        requests = []
+        install_fake_provider("google", sse_body(
+            {"candidates": [{"content": {"parts": [{"text": "반가워요"}]}}], "usageMetadata": {"totalTokenCount": 3}},
+            {"candidates": [{"content": {"parts": [{"text": "!"}]}}], "usageMetadata": {"totalTokenCount": 4}},
+        ), requests=requests)
+
+        items = await collect(stream_google(
+            [{"role": "system", "content": "친절하게"}, {"role": "user", "content": "hi"}],
+            "gemini-2.0-flash-lite",
+            api_key="k",
+        ))
+
+        assert items == [("delta", "반가워요"), ("delta", "!"), ("usage", {"totalTokenCount": 4})]
+        assert requests[0].url.params["alt"] == "sse"
+        assert ":streamGenerateContent" in requests[0].url.path
+        assert json.loads(requests[0].content)["systemInstruction"]["parts"][0]["text"] == "친절하게"
+
+    @pytest.mark.asyncio
+    async def test_anthropic_events(self):
+        """Anthropic content_block_delta + 입력/출력 토큰 합산"""
+        install_fake_provider("anthropic", sse_body(
+            {"type": "message_start", "message": {"usage": {"input_tokens": 10}}},
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "좋은 "}},
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "질문이에요"}},
+            {"type": "message_delta", "usage": {"output_tokens": 5}},
+            {"type": "message_stop"},
+        ))
+
+        items = await collect(stream_anthropic([{"role": "user", "content": "hi"}], "claude", api_key="k"))
+
+        assert items[:2] == [("delta", "좋은 "), ("delta", "질문이에요")]
+        assert items[2] == ("usage", {"input_tokens": 10, "output_tokens": 5})
+
+    @pytest.mark.asyncio
+    async def test_error_status_raises(self):
+        """스트림 시작 전 오류 응답"""
+        install_fake_provider("openai", b'{"error": "rate limited"}', status_code=429)
+
+        with pytest.raises(LLMProviderError) as exc_info:
+            await collect(stream_openai([{"role": "user", "content": "hi"}], "gpt-4o-mini", api_key="k"))
+
+        assert exc_info.value.status_code == 429
+        assert "rate limited" in exc_info.value.body
+
+
+class TestChatSendStream:
+    """/chat/send/stream"""
+
+    @pytest.fixture
+    def redis(self):
+        redis = Mock()
+        redis.get.return_value = None
+        gateway = LLMGateway(api_keys={"openai": "test-key"})
+        app.dependency_overrides[get_current_user] = lambda: {"id": "u1"}
+        app.dependency_overrides[get_redis_client] = lambda: redis
+        app.dependency_overrides[get_llm_gateway] = lambda: gateway
+        yield redis
+        app.dependency_overrides.clear()
+
+    @pytest.mark.asyncio
+    async def test_relays_tokens_and_counts_usage(self, client, redis):
+        """토큰을 SSE로 중계하고 완료 시 사용량 1회 증가"""
+        install_fake_provider("openai", OPENAI_EVENTS)
+
+        response = await client.post("/v1/chat/send/stream", json={"message": "안녕", "model_id": "allround"})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+        assert [lines[0] for lines in events] == ["event: delta", "event: delta", "event: done"]
+        assert json.loads(events[0][1][len("data: "):]) == {"text": "안녕"}
+        assert json.loads(events[2][1][len("data: "):])["usage"] == {"total_tokens": 12}
+        assert usage_increments(redis) == 1
+
+    @pytest.mark.asyncio
+    async def test_provider_failure_before_tokens_falls_back(self, client, redis):
+        """첫 토큰 전 실패는 /send처럼 목업 응답, 사용량 미차감"""
+        install_fake_provider("openai", b"", status_code=500)
+
+        response = await client.post("/v1/chat/send/stream", json={"message": "안녕", "model_id": "allround"})
+
+        assert '"model_used": "mock"' in response.text
+        assert usage_increments(redis) == 0
+
+    @pytest.mark.asyncio
+    async def test_falls_over_before_first_token(self, client, redis):
+        """첫 토큰 전 실패하면 같은 스트림에서 대체 모델로 이어서 답변"""
+        requests = []
+        install_fake_provider("openai", b"", status_code=503, requests=requests)
+        install_fake_provider("google", sse_body(
+            {"candidates": [{"content": {"parts": [{"text": "대체 답변"}]}}]},
+        ))
+        app.dependency_overrides[get_llm_gateway] = lambda: LLMGateway(api_keys={"openai": "k", "google": "k"})
+
+        response = await client.post("/v1/chat/send/stream", json={"message": "안녕", "model_id": "allround"})
+
+        assert '{"text": "대체 답변"}' in response.text
+        assert '"model_used": "gemini-1.5-flash"' in response.text
+        assert len(requests) == 2  # gpt-4o-mini → gpt-3.5-turbo → gemini
+        assert usage_increments(redis) == 1
+
+    @pytest.mark.asyncio
+    async def test_disconnect_after_tokens_keeps_usage(self):
+        """일부 답변을 보낸 뒤 연결이 끊기면 차감한 사용량을 환불하지 않음"""
+        install_fake_provider("openai", OPENAI_EVENTS)
+        redis = Mock()
+        stream = chat._stream_chat_reply(
+            LLMGateway(api_keys={"openai": "test-key"}), "u1", "allround", chat.AI_MODEL_CONFIG["allround"],
+            [{"role": "user", "content": "안녕"}], chat.SYSTEM_PROMPT, "안녕", redis,
+        )
+
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        assert first.startswith("event: delta")
+        assert usage_increments(redis) == 0
+
+    @pytest.mark.asyncio
+    async def test_disconnect_before_first_token_refunds(self):
+        """첫 토큰 전에 연결이 끊기면 미리 차감한 사용량 환불"""
+        async def slow_stream(messages, model, api_key, **params):
+            await asyncio.sleep(10)
+            yield "delta", "늦은 답변"
+        
+        redis = Mock()
+        stream = chat._stream_chat_reply(
+            LLMGateway(api_keys={"openai": "test-key"}, streams={"openai": slow_stream}),
+            "u1", "allround", chat.AI_MODEL_CONFIG["allround"],
+            [{"role": "user", "content": "안녕"}], chat.SYSTEM_PROMPT, "안녕", redis,
+        )
+        
+        task = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        
+        assert usage_increments(redis) == -1  # 라우터에서 차감한 1회 환불
@@ -0,0 +1,246 @@
+"""
+커서(키셋) 페이지네이션 테스트
+
+커서 인코딩/검증, Q&A 목록·답변·알림 목록의 (created_at, id) 키셋 조건과
+다음 페이지 커서, 추정 전체 개수는 요청한 첫 페이지에서만 계산하는지 확인
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.deps import get_current_user, get_current_user_optional, get_pooled_redis, get_supabase
+from app.main import app
+from app.utils.pagination import (
+    ESTIMATED_COUNT,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    page_rows,
+)
+
+
+def post_row(index: int) -> dict:
+    return {
+        "id": f"post-{index}",
+        "author_id": "senior-1",
+        "topic": "general",
+        "title": f"질문 {index}",
+        "body": "스마트폰 글씨를 크게 하고 싶어요.",
+        "is_anon": False,
+        "created_at": f"2026-10-17T09:00:{59 - index:02d}+00:00",
+        "users": {"name": "김영희"},
+    }
+
+
+def chain_query(data, count=None):
+    """체이닝 메서드가 자기 자신을 돌려주는 쿼리 빌더"""
+    query = Mock()
+    for method in ("select", "eq", "in_", "or_", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.return_value = Mock(data=data, count=count)
+    return query
+
+
+class TestCursor:
+    """커서 인코딩/검증"""
+
+    def test_round_trip(self):
+        cursor = encode_cursor("2026-10-17T09:00:00.123+00:00", "post-1")
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == ("2026-10-17T09:00:00.123+00:00", "post-1")
+
+    @pytest.mark.parametrize("cursor", [
+        "not-base64!",
+        encode_cursor("어제", "post-1"),
+        encode_cursor("2026-10-17T09:00:00+00:00", "post-1),id.gt.(0"),
+    ])
+    def test_rejects_malformed_or_injected(self, cursor):
+        """필터 문법이 섞인 커서는 PostgREST 조건으로 넘기지 않음"""
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+    def test_keyset_filter_direction(self):
+        assert keyset_filter("T", "a", descending=True) == "created_at.lt.T,and(created_at.eq.T,id.lt.a)"
+        assert keyset_filter("T", "a", descending=False) == "created_at.gt.T,and(created_at.eq.T,id.gt.a)"
+
+    def test_page_rows(self):
+        rows = [post_row(index) for index in range(3)]
+
+        page, next_cursor = page_rows(rows, 2)
+        assert [row["id"] for row in page] == ["post-0", "post-1"]
+        assert decode_cursor(next_cursor) == (rows[1]["created_at"], "post-1")
+
+        assert page_rows(rows, 3) == (rows, None)
+        assert page_rows(None, 3) == ([], None)
+
+
+class TestQnaList:
+    """GET /v1/community/qna"""
+
+    async def fetch(self, client, db, **params):
+        app.dependency_overrides[get_current_user] = lambda: {"id": "senior-1"}
+        app.dependency_overrides[get_supabase] = lambda: db
+        try:
+            return (await client.get("/v1/community/qna", params=params)).json()
+        finally:
+            app.dependency_overrides.clear()
+
+    @pytest.mark.asyncio
+    async def test_first_page_returns_next_cursor(self, client):
+        posts = chain_query([post_row(index) for index in range(3)])
+        db = Mock()
+        db.table.return_value = posts
+        db.rpc.return_value.execute.return_value = Mock(data=[
+            {"target_id": "post-0", "kind": "like", "count": 1, "user_reacted": False},
+        ])
+
+        body = await self.fetch(client, db, limit=2)
+
+        data = body["data"]
+        assert [post["id"] for post in data["posts"]] == ["post-0", "post-1"]
+        assert data["posts"][0]["reaction_count"] == 1
+        assert data["has_more"] is True
+        assert data["total"] is None
+        assert decode_cursor(data["next_cursor"])[1] == "post-1"
+        posts.select.assert_called_once_with("*, users!inner(name)", count=None)
+        posts.or_.assert_not_called()
+        posts.limit.assert_called_once_with(3)
+        assert db.rpc.call_args[0][1]["p_target_ids"] == ["post-0", "post-1"]
+
+    @pytest.mark.asyncio
+    async def test_next_page_uses_keyset_without_count(self, client):
+        posts = chain_query([post_row(2)], count=999)
+        db = Mock()
+        db.table.side_effect = lambda name: posts if name == "qna_posts" else chain_query([])
+        cursor = encode_cursor("2026-10-17T09:00:58+00:00", "post-1")
+
+        body = await self.fetch(client, db, limit=2, cursor=cursor, include_total=True)
+
+        data = body["data"]
+        assert [post["id"] for post in data["posts"]] == ["post-2"]
+        assert data["has_more"] is False
+        assert data["next_cursor"] is None
+        assert data["total"] is None  # 전체 개수는 첫 페이지에서만
+        posts.select.assert_called_once_with("*, users!inner(name)", count=None)
+        posts.or_.assert_called_once_with(
+            "created_at.lt.2026-10-17T09:00:58+00:00,"
+            "and(created_at.eq.2026-10-17T09:00:58+00:00,id.lt.post-1)"
+        )
+
+    @pytest.mark.asyncio
+    async def test_estimated_total_on_first_page(self, client):
+        posts = chain_query([post_row(0)], count=1200)
+        db = Mock()
+        db.table.side_effect = lambda name: posts if name == "qna_posts" else chain_query([])
+
+        body = await self.fetch(client, db, include_total=True)
+
+        assert body["data"]["total"] == 1200
+        posts.select.assert_called_once_with("*, users!inner(name)", count=ESTIMATED_COUNT)
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, client):
+        db = Mock()
+        db.table.return_value = chain_query([])
+
+        body = await self.fetch(client, db, cursor="garbage")
+
+        assert body["ok"] is False
+        assert body["error"]["code"] == "INVALID_CURSOR"
+
+
+class TestAnswers:
+    """GET /v1/community/qna/{post_id}/answers"""
+
+    @pytest.mark.asyncio
+    async def test_answers_oldest_first_with_cursor(self, client):
+        rows = [
+            {
+                "id": f"answer-{index}",
+                "post_id": "post-1",
+                "author_id": "senior-2",
+                "body": "설정에서 글자 크기를 바꿀 수 있어요.",
+                "is_anon": False,
+                "created_at": f"2026-10-17T10:00:0{index}+00:00",
+                "profiles": {"display_name": "박철수"},
+            }
+            for index in range(2)
+        ]
+        answers = chain_query(rows)
+        db = Mock()
+        db.table.return_value = answers
+        cursor = encode_cursor("2026-10-17T09:59:59+00:00", "answer-x")
+
+        app.dependency_overrides[get_supabase] = lambda: db
+        try:
+            response = await client.get(
+                "/v1/community/qna/post-1/answers", params={"limit": 1, "cursor": cursor},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        data = response.json()["data"]
+        assert [answer["id"] for answer in data["answers"]] == ["answer-0"]
+        assert data["has_more"] is True
+        answers.or_.assert_called_once_with(
+            "created_at.gt.2026-10-17T09:59:59+00:00,"
+            "and(created_at.eq.2026-10-17T09:59:59+00:00,id.gt.answer-x)"
+        )
+        answers.order.assert_any_call("created_at", desc=False)
+        answers.order.assert_any_call("id", desc=False)
+
+
+class TestAlerts:
+    """GET /v1/alerts?cursor= (최신순 목록의 이전 페이지)"""
+
+    @pytest.mark.asyncio
+    async def test_older_page(self, client):
+        rows = [
+            {
+                "id": f"a{index}",
+                "type": "encouragement",
+                "title": "💖 가족의 응원",
+                "message": "오늘도 화이팅!",
+                "read": False,
+                "created_at": f"2026-10-17T09:00:0{9 - index}+00:00",
+            }
+            for index in range(3)
+        ]
+        alerts = chain_query(rows)
+        db = Mock()
+        db.table.return_value = alerts
+        redis = Mock()
+        redis.get.return_value = "3"
+        cursor = encode_cursor("2026-10-17T09:00:10+00:00", "a")
+
+        app.dependency_overrides[get_current_user_optional] = lambda: "guardian-1"
+        app.dependency_overrides[get_supabase] = lambda: db
+        app.dependency_overrides[get_pooled_redis] = lambda: redis
+        try:
+            response = await client.get("/v1/alerts", params={"cursor": cursor, "limit": 2})
+        finally:
+            app.dependency_overrides.clear()
+
+        data = response.json()["data"]
+        assert [alert["id"] for alert in data["alerts"]] == ["a0", "a1"]
+        assert data["has_more"] is True
+        assert decode_cursor(data["next_cursor"]) == ("2026-10-17T09:00:08+00:00", "a1")
+        alerts.or_.assert_called_once_with(
+            "created_at.lt.2026-10-17T09:00:10+00:00,"
+            "and(created_at.eq.2026-10-17T09:00:10+00:00,id.lt.a)"
+        )
+        alerts.limit.assert_called_once_with(3)
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, client):
+        app.dependency_overrides[get_current_user_optional] = lambda: "guardian-1"
+        app.dependency_overrides[get_supabase] = lambda: Mock()
+        try:
+            response = await client.get("/v1/alerts", params={"cursor": "garbage"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"]["code"] == "INVALID_CURSOR"
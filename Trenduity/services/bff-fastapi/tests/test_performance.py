@@ -0,0 +1,219 @@
+"""
+성능 미들웨어 테스트
+
+라우트 템플릿별 지연 히스토그램/상태 코드/크기 집계, 느린 요청 임계값,
+스트림 TTFT, 로그 샘플링, /metrics Prometheus 형식과 접근 제한 확인
+"""
+import asyncio
+import logging
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.middleware.performance import (
+    UNMATCHED_ROUTE,
+    HTTPMetrics,
+    Histogram,
+    PerformanceMiddleware,
+)
+
+
+def make_app(metrics: HTTPMetrics, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/v1/cards/{card_id}")
+    async def card(card_id: str):
+        return {"ok": True, "data": {"id": card_id}}
+
+    @app.post("/v1/echo")
+    async def echo(payload: dict):
+        return payload
+
+    @app.get("/v1/slow")
+    async def slow():
+        await asyncio.sleep(0.03)
+        return {"ok": True}
+
+    @app.get("/v1/fail")
+    async def fail():
+        raise HTTPException(status_code=503, detail="down")
+
+    @app.get("/v1/stream")
+    async def stream():
+        async def events():
+            yield "event: delta\ndata: {}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    options.setdefault("log_sample_rate", 0)
+    app.add_middleware(PerformanceMiddleware, metrics=metrics, **options)
+    return app
+
+
+class TestHistogram:
+    """고정 버킷 히스토그램"""
+
+    def test_percentiles_interpolated(self):
+        histogram = Histogram((0.1, 0.2, 0.5))
+        for value in [0.05] * 50 + [0.15] * 45 + [0.4] * 5:
+            histogram.observe(value)
+
+        assert histogram.percentile(50) == pytest.approx(0.1)
+        assert histogram.percentile(95) == pytest.approx(0.2)
+        assert 0.2 < histogram.percentile(99) <= 0.5
+        assert histogram.cumulative() == [50, 95, 100, 100]
+
+    def test_overflow_bucket(self):
+        histogram = Histogram((0.1,))
+        histogram.observe(5.0)
+
+        assert histogram.counts == [0, 1]
+        assert histogram.percentile(99) == 0.1
+        assert Histogram().percentile(50) is None
+
+
+class TestPerformanceMiddleware:
+    """요청 집계"""
+
+    @pytest.mark.asyncio
+    async def test_groups_by_route_template(self):
+        """경로 파라미터가 달라도 라우트 하나로 집계, 없는 경로는 unmatched"""
+        metrics = HTTPMetrics()
+
+        async with AsyncClient(app=make_app(metrics), base_url="http://test") as client:
+            response = await client.get("/v1/cards/a")
+            await client.get("/v1/cards/b")
+            await client.get("/v1/nope/1")
+
+        assert response.headers["X-Process-Time"].endswith("ms")
+        route = metrics.routes[("GET", "/v1/cards/{card_id}")]
+        assert route.duration.count == 2
+        assert route.statuses == {200: 2}
+        assert route.response_bytes == 2 * len(response.content)
+        assert metrics.routes[("GET", UNMATCHED_ROUTE)].statuses == {404: 1}
+        assert metrics.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_sizes_and_status(self):
+        metrics = HTTPMetrics()
+        body = '{"message": "안녕하세요"}'.encode()
+
+        async with AsyncClient(app=make_app(metrics), base_url="http://test") as client:
+            await client.post("/v1/echo", content=body, headers={"Content-Type": "application/json"})
+            await client.get("/v1/fail")
+
+        echo = metrics.routes[("POST", "/v1/echo")]
+        assert echo.request_bytes == len(body)
+        assert echo.response_bytes == len(body) - 1  # 응답 JSON은 공백 없이 직렬화
+        assert metrics.routes[("GET", "/v1/fail")].statuses == {503: 1}
+
+    @pytest.mark.asyncio
+    async def test_slow_threshold_from_settings(self, monkeypatch, caplog):
+        """SLOW_REQUEST_THRESHOLD_MS를 넘은 요청만 경고 + 느린 요청 수"""
+        monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 20)
+        metrics = HTTPMetrics()
+
+        with caplog.at_level(logging.INFO, logger="app.middleware.performance"):
+            async with AsyncClient(app=make_app(metrics), base_url="http://test") as client:
+                await client.get("/v1/slow")
+                await client.get("/v1/cards/a")
+
+        assert metrics.routes[("GET", "/v1/slow")].slow == 1
+        assert metrics.routes[("GET", "/v1/cards/{card_id}")].slow == 0
+        assert [record.levelname for record in caplog.records] == ["WARNING"]  # 빠른 요청 로그는 샘플링 0
+
+    @pytest.mark.asyncio
+    async def test_log_sampling(self, caplog):
+        metrics = HTTPMetrics()
+
+        with caplog.at_level(logging.INFO, logger="app.middleware.performance"):
+            async with AsyncClient(app=make_app(metrics, log_sample_rate=1), base_url="http://test") as client:
+                await client.get("/v1/cards/a")
+
+        assert "GET /v1/cards/a" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_stream_ttft(self, caplog):
+        metrics = HTTPMetrics()
+
+        with caplog.at_level(logging.INFO, logger="app.middleware.performance"):
+            async with AsyncClient(app=make_app(metrics), base_url="http://test") as client:
+                response = await client.get("/v1/stream")
+
+        assert "event: done" in response.text
+        assert metrics.routes[("GET", "/v1/stream")].ttft.count == 1
+        assert "🌊 STREAM GET /v1/stream - TTFT" in caplog.text
+        assert "client disconnected" not in caplog.text
+
+
+class TestPrometheus:
+    """/metrics 노출 형식"""
+
+    @pytest.mark.asyncio
+    async def test_render(self):
+        metrics = HTTPMetrics()
+
+        async with AsyncClient(app=make_app(metrics), base_url="http://test") as client:
+            await client.get("/v1/cards/a")
+            await client.get("/v1/stream")
+
+        text = metrics.render_prometheus()
+
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert 'http_requests_total{method="GET",route="/v1/cards/{card_id}",status="200"} 1' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/v1/cards/{card_id}",le="+Inf"} 1' in text
+        assert 'http_request_duration_seconds_count{method="GET",route="/v1/cards/{card_id}"} 1' in text
+        assert 'http_stream_ttft_seconds_count{method="GET",route="/v1/stream"} 1' in text
+        assert "http_requests_in_flight 0" in text
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint(self, client, monkeypatch):
+        await client.get("/health")
+
+        response = await client.get("/metrics")
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'route="/health",status="200"' in response.text
+
+        monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+        response = await client.get("/metrics")
+        assert response.json()["error"]["code"] == "METRICS_DISABLED"
+
+    @pytest.mark.asyncio
+    async def test_metrics_requires_token(self, client, monkeypatch):
+        """METRICS_TOKEN이 있으면 Bearer 토큰 없이는 지표를 볼 수 없음"""
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+        
+        for path in ("/metrics", "/health/http"):
+            response = await client.get(path)
+            assert response.status_code == 401
+            assert response.json()["error"]["code"] == "METRICS_UNAUTHORIZED"
+            
+            response = await client.get(path, headers={"Authorization": "Bearer wrong"})
+            assert response.status_code == 401
+            
+            response = await client.get(path, headers={"Authorization": "Bearer scrape-secret"})
+            assert response.status_code == 200
+    
+    @pytest.mark.asyncio
+    async def test_metrics_hidden_in_production_without_token(self, client, monkeypatch):
+        """프로덕션에서 토큰이 없으면 지표 엔드포인트를 노출하지 않음"""
+        monkeypatch.setattr(settings, "ENV", "production")
+        monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+        
+        for path in ("/metrics", "/health/http"):
+            response = await client.get(path)
+            assert response.status_code == 404
+            assert response.json()["error"]["code"] == "METRICS_DISABLED"
+    
+    @pytest.mark.asyncio
+    async def test_health_http_percentiles(self, client):
+        await client.get("/health")
+
+        data = (await client.get("/health/http")).json()["data"]
+
+        assert data["routes"]["GET /health"]["p95_ms"] is not None
+        assert data["in_flight"] == 1  # /health/http 요청 자신
@@ -0,0 +1,307 @@
+"""
+전역 레이트 리미터 테스트
+
+토큰 버킷 소진/보충, 경로별·플랜별 버킷, 사용자/IP 구분,
+429 봉투 에러 + Retry-After, Redis 장애 시 로컬 버킷 대체 확인
+"""
+import time
+from unittest.mock import Mock
+
+import jwt
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.core import security
+from app.core.config import Settings, settings
+from app.middleware.rate_limit import (
+    TOKEN_BUCKET_SCRIPT,
+    LocalBuckets,
+    Limit,
+    RateLimitMiddleware,
+    parse_plan_multipliers,
+    parse_route_limits,
+)
+
+JWT_SECRET = "test-supabase-jwt-secret-for-rate-limit"
+
+
+class FakeRedis:
+    """토큰 버킷 스크립트만 흉내내는 Redis (시계는 self.now_ms)"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.now_ms = 1_000_000
+        self.eval_calls = 0
+
+    def eval(self, script, numkeys, key, rate, capacity):
+        assert script == TOKEN_BUCKET_SCRIPT
+        self.eval_calls += 1
+        rate, capacity = float(rate), int(capacity)
+        bucket = self.hashes.get(key, {})
+        tokens = bucket.get("tokens", capacity)
+        ts = bucket.get("ts", self.now_ms)
+        tokens = min(capacity, tokens + max(0, self.now_ms - ts) * rate / 1000)
+
+        allowed, wait_ms = 0, 0
+        if tokens >= 1:
+            tokens -= 1
+            allowed = 1
+        else:
+            wait_ms = -(-(1 - tokens) * 1000 // rate)
+
+        self.hashes[key] = {"tokens": tokens, "ts": self.now_ms}
+        return [allowed, int(tokens), int(wait_ms)]
+
+
+def make_token(sub: str, plan: str = None) -> str:
+    now = int(time.time())
+    payload = {"sub": sub, "aud": "authenticated", "iat": now, "exp": now + 3600}
+    if plan:
+        payload["app_metadata"] = {"subscription_plan": plan}
+    return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
+
+
+def make_app(redis=None, **options) -> FastAPI:
+    """경로 두 개짜리 앱 + 레이트 리미터"""
+    app = FastAPI()
+
+    @app.get("/v1/cards/today")
+    async def cards():
+        return {"ok": True}
+
+    @app.post("/v1/chat/send")
+    async def chat():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    options.setdefault("per_minute", 60)
+    options.setdefault("burst", 3)
+    options.setdefault("routes", "/v1/chat=6:1")
+    options.setdefault("plan_multipliers", "FREE=1,STRONG=3")
+    options.setdefault("exempt_paths", "/health")
+    app.add_middleware(RateLimitMiddleware, redis_getter=lambda: redis, buckets=LocalBuckets(100), **options)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def enable_rate_limit(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+
+
+@pytest.fixture
+def local_auth(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", JWT_SECRET)
+    security.claims_cache.clear()
+    yield
+    security.claims_cache.clear()
+
+
+class TestParsing:
+    """설정 문자열 파싱"""
+
+    def test_routes_longest_prefix_first(self):
+        routes = parse_route_limits("/v1/ai=20:5, /v1/ai/consult=5:1,잘못된항목")
+
+        assert routes == [("/v1/ai/consult", Limit(5, 1)), ("/v1/ai", Limit(20, 5))]
+
+    def test_plan_multipliers(self):
+        assert parse_plan_multipliers("free=1,STRONG=3") == {"FREE": 1.0, "STRONG": 3.0}
+
+
+class TestLocalBuckets:
+    """워커별 메모리 버킷"""
+
+    def test_burst_then_refill(self):
+        buckets = LocalBuckets(10)
+        limit = Limit(60, 2)  # 초당 1개
+
+        results = [buckets.take("k", limit, now=100.0) for _ in range(3)]
+
+        assert [r.allowed for r in results] == [True, True, False]
+        assert results[-1].retry_after == pytest.approx(1.0)
+        assert buckets.take("k", limit, now=101.0).allowed
+        assert not buckets.take("k", limit, now=101.5).allowed
+
+    def test_lru_eviction(self):
+        buckets = LocalBuckets(2)
+        for key in ("a", "b", "c"):
+            buckets.take(key, Limit(60, 1), now=0.0)
+
+        assert len(buckets) == 2
+        assert buckets.take("a", Limit(60, 1), now=0.0).allowed  # 제거된 버킷은 가득 찬 상태로 다시 시작
+
+
+class TestMiddleware:
+    """429 응답, 경로/플랜/사용자별 버킷"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_with_envelope_and_retry_after(self):
+        redis = FakeRedis()
+
+        async with AsyncClient(app=make_app(redis), base_url="http://test") as client:
+            statuses = [(await client.get("/v1/cards/today")).status_code for _ in range(3)]
+            response = await client.get("/v1/cards/today")
+
+        assert statuses == [200, 200, 200]
+        assert response.status_code == 429
+        assert response.json() == {
+            "ok": False,
+            "error": {"code": "RATE_LIMIT_EXCEEDED", "message": "요청이 너무 많아요. 1초 후 다시 시도해 주세요."},
+        }
+        assert response.headers["Retry-After"] == "1"
+        assert redis.eval_calls == 4
+
+    @pytest.mark.asyncio
+    async def test_refills_over_time(self):
+        redis = FakeRedis()
+
+        async with AsyncClient(app=make_app(redis), base_url="http://test") as client:
+            for _ in range(3):
+                await client.get("/v1/cards/today")
+            redis.now_ms += 1000  # 초당 1개 보충
+            assert (await client.get("/v1/cards/today")).status_code == 200
+            assert (await client.get("/v1/cards/today")).status_code == 429
+
+    @pytest.mark.asyncio
+    async def test_route_bucket_separate(self):
+        """/v1/chat은 자체 버킷 (분당 6, 버스트 1), 전역 버킷은 소모하지 않음"""
+        redis = FakeRedis()
+
+        async with AsyncClient(app=make_app(redis), base_url="http://test") as client:
+            assert (await client.post("/v1/chat/send")).status_code == 200
+            response = await client.post("/v1/chat/send")
+            assert (await client.get("/v1/cards/today")).status_code == 200
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "10"
+        assert "ratelimit:bucket:/v1/chat:ip:127.0.0.1" in redis.hashes
+
+    @pytest.mark.asyncio
+    async def test_exempt_paths_and_preflight(self):
+        redis = FakeRedis()
+
+        async with AsyncClient(app=make_app(redis), base_url="http://test") as client:
+            for _ in range(5):
+                assert (await client.get("/health")).status_code == 200
+            await client.options("/v1/cards/today", headers={"Origin": "http://localhost:3000"})
+
+        assert redis.eval_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_users_and_plans(self, local_auth):
+        """검증된 토큰은 사용자별 버킷, STRONG 플랜은 버스트 3배"""
+        redis = FakeRedis()
+        free = {"Authorization": f"Bearer {make_token('u-free')}"}
+        strong = {"Authorization": f"Bearer {make_token('u-strong', 'strong')}"}
+
+        async with AsyncClient(app=make_app(redis), base_url="http://test") as client:
+            free_statuses = [(await client.get("/v1/cards/today", headers=free)).status_code for _ in range(4)]
+            strong_statuses = [(await client.get("/v1/cards/today", headers=strong)).status_code for _ in range(10)]
+
+        assert free_statuses.count(200) == 3
+        assert strong_statuses.count(200) == 9
+        assert "ratelimit:bucket:default:user:u-strong" in redis.hashes
+
+    @pytest.mark.asyncio
+    async def test_unverified_token_limited_by_ip(self, local_auth):
+        """위조/임의 토큰은 IP 버킷 (토큰을 바꿔도 새 버킷이 생기지 않음)"""
+        redis = FakeRedis()
+
+        async with AsyncClient(app=make_app(redis), base_url="http://test") as client:
+            statuses = [
+                (await client.get("/v1/cards/today", headers={"Authorization": f"Bearer fake-{i}"})).status_code
+                for i in range(4)
+            ]
+
+        assert statuses == [200, 200, 200, 429]
+        assert list(redis.hashes) == ["ratelimit:bucket:default:ip:127.0.0.1"]
+
+    @pytest.mark.asyncio
+    async def test_forwarded_ip_only_when_trusted(self):
+        """신뢰 프록시 2단 (CDN → 로드밸런서): 오른쪽에서 두 번째 주소"""
+        redis = FakeRedis()
+        headers = {"X-Forwarded-For": "203.0.113.7, 10.0.0.1"}
+
+        app = make_app(redis, trust_forwarded=True, trusted_hops=2)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/v1/cards/today", headers=headers)
+
+        assert list(redis.hashes) == ["ratelimit:bucket:default:ip:203.0.113.7"]
+    
+    @pytest.mark.asyncio
+    async def test_spoofed_forwarded_prefix_ignored(self):
+        """클라이언트가 보낸 왼쪽 X-Forwarded-For 값을 바꿔도 같은 버킷 (여러 헤더도 합쳐서 판단)"""
+        redis = FakeRedis()
+        
+        app = make_app(redis, trust_forwarded=True, trusted_hops=1)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            statuses = []
+            for i in range(4):
+                response = await client.get("/v1/cards/today", headers=[
+                    ("X-Forwarded-For", f"198.51.100.{i}"),
+                    ("X-Forwarded-For", "203.0.113.7"),
+                ])
+                statuses.append(response.status_code)
+        
+        assert statuses == [200, 200, 200, 429]
+        assert list(redis.hashes) == ["ratelimit:bucket:default:ip:203.0.113.7"]
+
+
+class TestRedisFallback:
+    """Redis 장애 시 로컬 버킷"""
+
+    @pytest.mark.asyncio
+    async def test_local_bucket_when_redis_fails(self):
+        redis = Mock()
+        redis.eval.side_effect = ConnectionError("down")
+
+        async with AsyncClient(app=make_app(redis), base_url="http://test") as client:
+            statuses = [(await client.get("/v1/cards/today")).status_code for _ in range(4)]
+
+        assert statuses == [200, 200, 200, 429]
+        assert redis.eval.call_count == 1  # 실패 후 재시도 대기 동안 Redis 호출 안 함
+
+    @pytest.mark.asyncio
+    async def test_no_redis(self):
+        async with AsyncClient(app=make_app(None), base_url="http://test") as client:
+            statuses = [(await client.get("/v1/cards/today")).status_code for _ in range(4)]
+
+        assert statuses == [200, 200, 200, 429]
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+        async with AsyncClient(app=make_app(None), base_url="http://test") as client:
+            statuses = [(await client.get("/v1/cards/today")).status_code for _ in range(5)]
+
+        assert statuses == [200] * 5
+
+
+class TestDefaults:
+    """conftest의 비활성화 픽스처 없이 기본 설정 그대로"""
+    
+    @pytest.mark.asyncio
+    async def test_off_by_default_behind_proxy(self, monkeypatch):
+        """
+        기본값은 꺼짐: JWT 시크릿/X-Forwarded-For 설정 없이 프록시 뒤에 배포돼도
+        모든 사용자가 프록시 IP 버킷 하나로 함께 제한되지 않음
+        """
+        from app.core.deps import get_pooled_redis, get_supabase
+        from app.main import app
+        
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", Settings.model_fields["RATE_LIMIT_ENABLED"].default)
+        monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", None)
+        app.dependency_overrides[get_supabase] = lambda: None
+        app.dependency_overrides[get_pooled_redis] = lambda: None
+        try:
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                statuses = [(await client.get("/v1/alerts")).status_code for _ in range(settings.RATE_LIMIT_BURST * 3)]
+        finally:
+            app.dependency_overrides.clear()
+        
+        assert statuses == [200] * (settings.RATE_LIMIT_BURST * 3)
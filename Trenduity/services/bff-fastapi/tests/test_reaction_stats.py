@@ -0,0 +1,122 @@
+"""
+리액션 통계 테스트
+
+카운터 RPC 1회로 종류별 수 + 내 리액션 여부를 만드는지,
+마이그레이션 미적용 시 리액션 행 집계로 대체하는지,
+Q&A 목록/리액션 조회가 리액션 행을 읽지 않는지 확인
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.deps import get_current_user, get_supabase
+from app.main import app
+from app.routers.reactions import get_reactions
+from app.services.reaction_stats import (
+    REACTION_STATS_RPC,
+    get_reaction_stats,
+    total_count,
+    user_reacted_kinds,
+)
+
+
+def rpc_db(rows):
+    """get_reaction_stats RPC 결과를 돌려주는 DB (reactions 테이블 조회는 실패)"""
+    db = Mock()
+    db.rpc.return_value.execute.return_value = Mock(data=rows)
+    db.table.side_effect = AssertionError("reactions 테이블을 읽으면 안 됨")
+    return db
+
+
+STATS_ROWS = [
+    {"target_id": "post-1", "kind": "like", "count": 120, "user_reacted": True},
+    {"target_id": "post-1", "kind": "cheer", "count": 3, "user_reacted": False},
+    {"target_id": "post-2", "kind": "useful", "count": 1, "user_reacted": False},
+]
+
+
+class TestReactionStats:
+    """카운터 RPC 조회"""
+
+    @pytest.mark.asyncio
+    async def test_single_rpc_for_page(self):
+        db = rpc_db(STATS_ROWS)
+
+        stats = await get_reaction_stats(db, "qna_post", ["post-1", "post-2", "post-3"], "senior-1")
+
+        db.rpc.assert_called_once_with(REACTION_STATS_RPC, {
+            "p_target_type": "qna_post",
+            "p_target_ids": ["post-1", "post-2", "post-3"],
+            "p_user_id": "senior-1",
+        })
+        assert stats["post-1"]["like"] == {"count": 120, "user_reacted": True}
+        assert total_count(stats["post-1"]) == 123
+        assert user_reacted_kinds(stats["post-1"]) == ["like"]
+        assert "post-3" not in stats
+
+    @pytest.mark.asyncio
+    async def test_empty_targets_skip_query(self):
+        db = rpc_db([])
+
+        assert await get_reaction_stats(db, "qna_post", []) == {}
+        db.rpc.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fallback_without_counter_table(self):
+        """008 마이그레이션 미적용: 리액션 행을 읽어 집계"""
+        db = Mock()
+        db.rpc.return_value.execute.side_effect = Exception("function get_reaction_stats does not exist")
+        query = db.table.return_value.select.return_value.eq.return_value.in_.return_value
+        query.execute.return_value = Mock(data=[
+            {"target_id": "post-1", "kind": "like", "user_id": "senior-1"},
+            {"target_id": "post-1", "kind": "like", "user_id": "senior-2"},
+        ])
+
+        stats = await get_reaction_stats(db, "qna_post", ["post-1"], "senior-2")
+
+        assert stats == {"post-1": {"like": {"count": 2, "user_reacted": True}}}
+
+
+class TestEndpoints:
+    """Q&A 목록 / 리액션 조회"""
+
+    @pytest.mark.asyncio
+    async def test_qna_list_uses_counters(self, client):
+        posts = Mock()
+        for method in ("select", "eq", "or_", "order", "limit"):
+            getattr(posts, method).return_value = posts
+        posts.execute.return_value = Mock(data=[{
+            "id": "post-1",
+            "author_id": "senior-2",
+            "topic": "general",
+            "title": "사진 보내는 법",
+            "body": "카카오톡으로 사진을 보내고 싶어요.",
+            "is_anon": False,
+            "created_at": "2026-10-17T09:00:00+00:00",
+            "users": {"name": "박철수"},
+        }])
+        db = rpc_db(STATS_ROWS)
+        db.table.side_effect = lambda name: posts if name == "qna_posts" else pytest.fail(name)
+
+        app.dependency_overrides[get_current_user] = lambda: {"id": "senior-1"}
+        app.dependency_overrides[get_supabase] = lambda: db
+        try:
+            response = await client.get("/v1/community/qna")
+        finally:
+            app.dependency_overrides.clear()
+
+        post = response.json()["data"]["posts"][0]
+        assert post["reaction_count"] == 123
+        assert post["my_reactions"] == ["like"]
+        db.rpc.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_reactions_per_kind(self):
+        db = rpc_db(STATS_ROWS[:2])
+
+        result = await get_reactions("qna_post", "post-1", current_user={"id": "senior-1"}, supabase=db)
+
+        assert result["data"]["reactions"] == {
+            "like": {"count": 120, "user_reacted": True},
+            "cheer": {"count": 3, "user_reacted": False},
+        }
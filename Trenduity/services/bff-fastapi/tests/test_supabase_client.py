@@ -0,0 +1,74 @@
+"""
+공유 Supabase 클라이언트 테스트
+
+요청마다 클라이언트를 새로 만들지 않고
+연결 풀이 설정된 하나의 클라이언트를 재사용하는지 확인 (Redis 요청 풀 크기 포함)
+"""
+import pytest
+
+from app.core import deps
+from app.core.config import settings
+
+
+# create_client는 JWT 형식의 키만 허용
+DUMMY_SERVICE_KEY = (
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9."
+    "eyJyb2xlIjoic2VydmljZV9yb2xlIn0."
+    "c2lnbmF0dXJl"
+)
+
+
+@pytest.fixture
+def supabase_settings(monkeypatch):
+    """테스트용 Supabase 설정 + 공유 클라이언트 초기화"""
+    monkeypatch.setattr(settings, "SUPABASE_URL", "https://test.supabase.co")
+    monkeypatch.setattr(settings, "SUPABASE_SERVICE_ROLE_KEY", DUMMY_SERVICE_KEY)
+    monkeypatch.setattr(settings, "SUPABASE_HTTP_MAX_CONNECTIONS", 7)
+    monkeypatch.setattr(settings, "SUPABASE_HTTP_MAX_KEEPALIVE", 5)
+    deps.close_supabase_client()
+    yield settings
+    deps.close_supabase_client()
+
+
+class TestSharedSupabaseClient:
+    """공유 Supabase 클라이언트 수명 주기 테스트"""
+
+    def test_get_supabase_reuses_client(self, supabase_settings):
+        """의존성을 여러 번 해석해도 같은 클라이언트 반환"""
+        first = deps.get_supabase()
+
+        assert first is not None
+        assert deps.get_supabase() is first
+
+    def test_pool_limits_from_settings(self, supabase_settings):
+        """PostgREST 세션에 설정의 연결 풀 한도 적용"""
+        client = deps.get_supabase()
+        pool = client.postgrest.session._transport._pool
+
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 5
+        assert client.postgrest.session.headers["apikey"] == DUMMY_SERVICE_KEY
+
+    def test_close_releases_client(self, supabase_settings):
+        """종료 시 세션을 닫고 다음 호출에서 새로 생성"""
+        client = deps.get_supabase()
+        deps.close_supabase_client()
+
+        assert client.postgrest.session.is_closed
+        assert deps.get_supabase() is not client
+
+    def test_auth_client_is_separate(self, supabase_settings):
+        """로그인/회원가입용 클라이언트는 공유 클라이언트와 분리"""
+        assert deps.get_supabase_auth() is not deps.get_supabase()
+
+
+class TestRedisPool:
+    """요청용 Redis 연결 풀 크기"""
+    
+    def test_pool_size_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "REDIS_MAX_CONNECTIONS", 64)
+        monkeypatch.setattr(deps, "_redis_pool", None)
+        
+        deps.init_redis_pool()
+        
+        assert deps._redis_pool.max_connections == 64
@@ -0,0 +1,384 @@
+"""
+사용자 활동 카운터 테스트
+
+Redis 해시 캐시, DB 카운터 행 조회, 재계산 경로, 가족 멤버 마지막 활동 시각 확인
+"""
+from unittest.mock import Mock
+
+import pytest
+
+from app.core.deps import get_current_user, get_redis_client, get_supabase
+from app.main import app
+from app.services import user_stats
+from app.services.gamification import GamificationService
+from app.services.user_stats import (
+    bump_user_counters,
+    counters_key,
+    get_last_activities,
+    get_user_counters,
+    last_activity_key,
+    rebuild_user_counters,
+    touch_last_activity,
+)
+
+
+class FakeRedis:
+    """해시/문자열 + INCR_IF_EXISTS / FILL_IF_ABSENT 스크립트만 흉내내는 Redis"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    def mget(self, keys):
+        return [self.strings.get(key) for key in keys]
+
+    def hgetall(self, key):
+        return {k: str(v) for k, v in self.hashes.get(key, {}).items()}
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, ttl):
+        return True
+
+    def delete(self, key):
+        self.strings.pop(key, None)
+        return 1 if self.hashes.pop(key, None) is not None else 0
+
+    def eval(self, script, numkeys, key, token_key, *args):
+        if script == user_stats.FILL_IF_ABSENT_SCRIPT:
+            token, _ttl, *pairs = args
+            if self.strings.pop(token_key, None) != token or key in self.hashes:
+                return 0
+            self.hashes[key] = {field: int(value) for field, value in zip(pairs[::2], pairs[1::2])}
+            return 1
+        assert script == user_stats.INCR_IF_EXISTS_SCRIPT
+        if key not in self.hashes:
+            self.strings.pop(token_key, None)
+            return 0
+        for field, delta in zip(args[::2], args[1::2]):
+            self.hashes[key][field] = int(self.hashes[key].get(field, 0)) + int(delta)
+        return 1
+
+    def pipeline(self):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+        return Pipeline()
+
+
+def make_db(row=None, rebuilt=None):
+    """user_stats_counters 조회 결과와 재계산 RPC 결과를 지정한 Mock DB"""
+    db = Mock()
+    query = db.table.return_value.select.return_value.eq.return_value.limit.return_value
+    query.execute.return_value = Mock(data=[row] if row else [])
+    db.rpc.return_value.execute.return_value = Mock(data=[rebuilt] if rebuilt else [])
+    return db
+
+
+ROW = {
+    "cards_completed": 15,
+    "quizzes_correct": 25,
+    "med_checks": 30,
+    "scam_checks": 3,
+    "posts": 2,
+    "reactions_received": 11,
+}
+
+
+class TestBumpUserCounters:
+    """쓰기 경로의 Redis 카운터 증가"""
+
+    def test_increments_existing_hash(self):
+        """해시가 있으면 필드별로 증가"""
+        redis = FakeRedis()
+        redis.hset(counters_key("u1"), mapping=dict(ROW))
+
+        assert bump_user_counters(redis, "u1", cards_completed=1, quizzes_correct=3) is True
+        assert redis.hashes[counters_key("u1")]["cards_completed"] == 16
+        assert redis.hashes[counters_key("u1")]["quizzes_correct"] == 28
+
+    def test_missing_hash_not_created(self):
+        """해시가 없으면 만들지 않음 (다음 조회 때 DB에서 채움)"""
+        redis = FakeRedis()
+
+        assert bump_user_counters(redis, "u1", med_checks=1) is False
+        assert counters_key("u1") not in redis.hashes
+
+    def test_unknown_counter_rejected(self):
+        """정의되지 않은 카운터 이름은 오류"""
+        with pytest.raises(ValueError):
+            bump_user_counters(FakeRedis(), "u1", likes=1)
+
+    def test_error_drops_hash(self):
+        """증가 실패 시 어긋난 캐시를 남기지 않도록 해시 삭제"""
+        redis = Mock()
+        redis.eval.side_effect = Exception("connection reset")
+
+        assert bump_user_counters(redis, "u1", posts=1) is False
+        redis.delete.assert_called_once_with(counters_key("u1"))
+
+
+class TestGetUserCounters:
+    """카운터 조회 (Redis → DB 행 → 재계산)"""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_db(self):
+        """Redis 해시가 있으면 DB 조회 없음"""
+        redis = FakeRedis()
+        redis.hset(counters_key("u1"), mapping=dict(ROW))
+        db = make_db()
+
+        assert await get_user_counters(db, redis, "u1") == ROW
+        db.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_db_row_populates_cache(self):
+        """DB 카운터 행 1회 조회 후 Redis 해시 저장"""
+        redis = FakeRedis()
+        db = make_db(row=ROW)
+
+        assert await get_user_counters(db, redis, "u1") == ROW
+        assert await get_user_counters(db, redis, "u1") == ROW
+        db.table.assert_called_once_with("user_stats_counters")
+        db.rpc.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fill_keeps_hash_written_meanwhile(self):
+        """DB 조회 중 다른 요청이 채운 해시는 덮어쓰지 않음"""
+        redis = FakeRedis()
+        db = make_db(row=ROW)
+        newer = {**ROW, "cards_completed": 16}
+        query = db.table.return_value.select.return_value.eq.return_value.limit.return_value
+        
+        def read_row():
+            redis.hset(counters_key("u1"), mapping=dict(newer))
+            return Mock(data=[ROW])
+        
+        query.execute.side_effect = read_row
+        
+        await get_user_counters(db, redis, "u1")
+        
+        assert redis.hashes[counters_key("u1")]["cards_completed"] == 16
+    
+    @pytest.mark.asyncio
+    async def test_increment_during_fill_not_lost(self):
+        """DB 조회 중 들어온 증가가 있으면 이전 값으로 채우지 않고 다음 조회에서 다시 읽음"""
+        redis = FakeRedis()
+        db = make_db(row=ROW)
+        query = db.table.return_value.select.return_value.eq.return_value.limit.return_value
+        rows = iter([ROW, {**ROW, "cards_completed": 16}])
+        
+        def read_row():
+            row = next(rows)
+            if row is ROW:
+                # 조회 직후 카드 완료 (DB 트리거 반영 후 Redis 증가, 해시는 아직 없음)
+                assert bump_user_counters(redis, "u1", cards_completed=1) is False
+            return Mock(data=[row])
+        
+        query.execute.side_effect = read_row
+        
+        await get_user_counters(db, redis, "u1")
+        assert counters_key("u1") not in redis.hashes
+        
+        assert (await get_user_counters(db, redis, "u1"))["cards_completed"] == 16
+        assert redis.hashes[counters_key("u1")]["cards_completed"] == 16
+    
+    @pytest.mark.asyncio
+    async def test_missing_row_rebuilt(self):
+        """카운터 행이 없으면 원본에서 재집계"""
+        db = make_db(rebuilt=ROW)
+
+        assert await get_user_counters(db, None, "u1") == ROW
+        db.rpc.assert_called_once_with("rebuild_user_stats_counters", {"p_user_id": "u1"})
+
+
+class TestAggregateFromSources:
+    """카운터 테이블이 없을 때 원본 집계"""
+    
+    @pytest.mark.asyncio
+    async def test_counts_reactions_on_own_posts(self):
+        """reactions_received는 내 Q&A 게시물에 달린 리액션 수"""
+        tables = {}
+        
+        def table(name):
+            query = Mock()
+            for method in ("select", "eq", "in_", "limit"):
+                getattr(query, method).return_value = query
+            query.execute.return_value = Mock(data=[], count=0)
+            if name == "qna_posts":
+                query.execute.return_value = Mock(data=[{"id": "post-1"}, {"id": "post-2"}], count=2)
+            elif name == "reactions":
+                query.execute.return_value = Mock(data=[], count=7)
+            tables[name] = query
+            return query
+        
+        db = Mock()
+        db.table.side_effect = table
+        db.rpc.side_effect = Exception("function rebuild_user_stats_counters does not exist")
+        
+        counters = await get_user_counters(db, None, "u1")
+        
+        assert counters["posts"] == 2
+        assert counters["reactions_received"] == 7
+        tables["reactions"].eq.assert_called_once_with("target_type", "qna_post")
+        tables["reactions"].in_.assert_called_once_with("target_id", ["post-1", "post-2"])
+
+
+class TestRebuild:
+    """재계산 작업"""
+
+    @pytest.mark.asyncio
+    async def test_rebuild_user_drops_cached_hash(self):
+        """특정 사용자 재계산 후 캐시 해시 삭제"""
+        redis = FakeRedis()
+        redis.hset(counters_key("u1"), mapping={"cards_completed": 999})
+        db = make_db(rebuilt=ROW)
+
+        assert await rebuild_user_counters(db, redis, "u1") == 1
+        assert counters_key("u1") not in redis.hashes
+
+
+class TestUserStatsEndpointCost:
+    """get_user_stats가 이력 스캔 없이 카운터 사용"""
+
+    @pytest.mark.asyncio
+    async def test_stats_from_counters(self):
+        """completed_cards 전체 조회 없이 통계 반환"""
+        redis = FakeRedis()
+        redis.hset(counters_key("u1"), mapping=dict(ROW))
+        service = GamificationService(Mock(), redis)
+
+        async def gamif(user_id):
+            return {"total_points": 157, "current_streak": 7, "badges": ["첫걸음"]}
+
+        service._get_or_create_gamification = gamif
+
+        stats = await service.get_user_stats("u1")
+
+        assert stats["cards_completed"] == 15
+        assert stats["quizzes_correct"] == 25
+        service.db.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_badges_from_cached_counters(self):
+        """카운터 해시가 있으면 배지 집계 RPC 없이 평가"""
+        redis = FakeRedis()
+        redis.hset(counters_key("u1"), mapping={**ROW, "quizzes_correct": 50})
+        service = GamificationService(Mock(), redis)
+        service._invalidate_user_cache = Mock()
+        service.db.rpc.return_value.execute.return_value = Mock(data=["퀴즈 마스터", "안전 지킴이", "커뮤니티 스타"])
+
+        badges = await service._check_new_badges("u1", 40, 1, existing_badges=["첫걸음"])
+
+        assert badges == ["퀴즈 마스터", "안전 지킴이", "커뮤니티 스타"]
+        # 배지 추가 RPC만 호출 (집계 RPC 없음)
+        assert [call.args[0] for call in service.db.rpc.call_args_list] == [GamificationService.AWARD_BADGES_RPC]
+
+
+def make_activity_db(rows):
+    """user_stats_counters.last_activity_at 일괄 조회 결과를 지정한 Mock DB"""
+    db = Mock()
+    db.table.return_value.select.return_value.in_.return_value.execute.return_value = Mock(data=rows)
+    return db
+
+
+class TestLastActivity:
+    """가족 멤버 마지막 활동 시각"""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_db(self):
+        redis = FakeRedis()
+        touch_last_activity(redis, "u1")
+        redis.strings[last_activity_key("u2")] = ""  # 활동 없음도 캐시
+        db = make_activity_db([])
+
+        activities = await get_last_activities(db, redis, ["u1", "u2"])
+
+        assert activities["u1"].startswith("20")
+        assert activities["u2"] is None
+        db.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_users_loaded_in_one_query(self):
+        """캐시에 없는 사용자만 카운터 행 1회 조회 후 캐시"""
+        redis = FakeRedis()
+        redis.strings[last_activity_key("u1")] = "2026-10-16T09:00:00+00:00"
+        db = make_activity_db([{"user_id": "u2", "last_activity_at": "2026-10-17T08:00:00+00:00"}])
+
+        activities = await get_last_activities(db, redis, ["u1", "u2", "u3"])
+
+        assert activities == {
+            "u1": "2026-10-16T09:00:00+00:00",
+            "u2": "2026-10-17T08:00:00+00:00",
+            "u3": None,
+        }
+        db.table.return_value.select.return_value.in_.assert_called_once_with("user_id", ["u2", "u3"])
+        assert redis.strings[last_activity_key("u3")] == ""
+
+    @pytest.mark.asyncio
+    async def test_fill_keeps_activity_touched_meanwhile(self):
+        """DB 조회 중 쓰기 경로가 갱신한 활동 시각은 덮어쓰지 않음"""
+        redis = FakeRedis()
+        db = make_activity_db([{"user_id": "u1", "last_activity_at": None}])
+        query = db.table.return_value.select.return_value.in_.return_value
+        
+        def read_rows():
+            redis.strings[last_activity_key("u1")] = "2026-10-17T09:30:00+00:00"
+            return Mock(data=[{"user_id": "u1", "last_activity_at": None}])
+        
+        query.execute.side_effect = read_rows
+        
+        await get_last_activities(db, redis, ["u1"])
+        
+        assert redis.strings[last_activity_key("u1")] == "2026-10-17T09:30:00+00:00"
+    
+    @pytest.mark.asyncio
+    async def test_fallback_one_row_per_user(self):
+        """마이그레이션 미적용 시 사용자별 최근 완료 1건씩만 조회"""
+        db = Mock()
+        db.table.return_value.select.return_value.in_.return_value.execute.side_effect = Exception("column does not exist")
+        latest = db.table.return_value.select.return_value.eq.return_value.order.return_value.limit.return_value
+        latest.execute.return_value = Mock(data=[{"completed_at": "2026-10-15T10:00:00+00:00"}])
+
+        activities = await get_last_activities(db, None, ["u1", "u2"])
+
+        assert activities == {"u1": "2026-10-15T10:00:00+00:00", "u2": "2026-10-15T10:00:00+00:00"}
+        db.table.return_value.select.return_value.eq.return_value.order.return_value.limit.assert_called_with(1)
+
+    @pytest.mark.asyncio
+    async def test_family_members_endpoint(self, client):
+        """/family/members: 링크 1회 + 마지막 활동 조회, 활동 이력(cards) 스캔 없음"""
+        redis = FakeRedis()
+        redis.strings[last_activity_key("senior-1")] = "2026-10-17T07:30:00+00:00"
+        db = Mock()
+        links = db.table.return_value.select.return_value.eq.return_value
+        links.execute.return_value = Mock(data=[
+            {"user_id": "senior-1", "perms": {"read": True}, "users": {"name": "김어머니"}},
+        ])
+        app.dependency_overrides[get_current_user] = lambda: {"id": "guardian-1"}
+        app.dependency_overrides[get_supabase] = lambda: db
+        app.dependency_overrides[get_redis_client] = lambda: redis
+        try:
+            response = await client.get("/v1/family/members")
+        finally:
+            app.dependency_overrides.clear()
+
+        member = response.json()["data"]["members"][0]
+        assert member["last_activity"] == "2026-10-17T07:30:00+00:00"
+        assert [call.args[0] for call in db.table.call_args_list] == ["family_links"]